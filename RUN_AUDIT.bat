@@ -21,6 +21,7 @@ if not exist gold.db (
 
 echo Running complete audit suite...
 echo This includes:
+echo   - Step 0: Data Quality Engine (shared scans, timed)
 echo   - Step 1: Data Integrity
 echo   - Step 2: Feature Verification
 echo.
@@ -34,6 +35,7 @@ echo.
 echo Check audit_reports/ folder for detailed results:
 echo   - master_audit_report.json
 echo   - audit_summary.csv
+echo   - step0_data_quality_report.json
 echo   - step1_data_integrity_report.json
 echo   - step2_feature_verification_report.json
 echo ========================================
@@ -25,6 +25,8 @@ import re
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import date, timedelta
 
+from orb_facts import has_orb_facts, long_select_sql
+
 
 class AIQueryEngine:
     """
@@ -97,6 +99,9 @@ class AIQueryEngine:
         """
         Open a DuckDB connection and expose a compatibility view that prefers
         daily_features_v2 when available (deriving session types to match V1 callers).
+
+        Also exposes a long-format `orb_trades` view (one row per day and ORB),
+        read from orb_facts when present.
         """
         con = duckdb.connect(self.mgc_db_path, read_only=True)
 
@@ -162,18 +167,23 @@ class AIQueryEngine:
                             WHEN ny_low < london_low THEN 'SWEEP_LOW'
                             ELSE 'CONSOLIDATION'
                         END
-                    ) AS ny_type,
-                    orb_0900_high, orb_0900_low, orb_0900_size, orb_0900_break_dir, orb_0900_outcome, orb_0900_r_multiple,
-                    orb_1000_high, orb_1000_low, orb_1000_size, orb_1000_break_dir, orb_1000_outcome, orb_1000_r_multiple,
-                    orb_1100_high, orb_1100_low, orb_1100_size, orb_1100_break_dir, orb_1100_outcome, orb_1100_r_multiple,
-                    orb_1800_high, orb_1800_low, orb_1800_size, orb_1800_break_dir, orb_1800_outcome, orb_1800_r_multiple,
-                    orb_2300_high, orb_2300_low, orb_2300_size, orb_2300_break_dir, orb_2300_outcome, orb_2300_r_multiple,
-                    orb_0030_high, orb_0030_low, orb_0030_size, orb_0030_break_dir, orb_0030_outcome, orb_0030_r_multiple
+                    ) AS ny_type
                 FROM daily_features_v2
             """)
-            return con, "daily_features_compat"
+            table_name = "daily_features_compat"
+        else:
+            table_name = "daily_features"
+
+        if has_v2 and has_orb_facts(con, "MGC"):
+            con.execute("""
+                CREATE OR REPLACE TEMP VIEW orb_trades AS
+                SELECT * FROM orb_facts WHERE instrument = 'MGC'
+            """)
+        else:
+            source = "daily_features_v2" if has_v2 else "daily_features"
+            con.execute(f"CREATE OR REPLACE TEMP VIEW orb_trades AS {long_select_sql(con, source)}")
 
-        return con, "daily_features"
+        return con, table_name
 
     def _parse_orb_time(self, text: str) -> Optional[str]:
         """Extract ORB time from text"""
@@ -213,13 +223,13 @@ class AIQueryEngine:
         orb_time = match.group(1)
         direction = match.group(2).upper() if match.group(2) else None
 
-        con, table_name = self._prepare_connection()
+        con, _ = self._prepare_connection()
         try:
-            conditions = [f"orb_{orb_time}_outcome IN ('WIN', 'LOSS')"]
-            params = []
+            conditions = ["orb_time = ?", "outcome IN ('WIN', 'LOSS')"]
+            params = [orb_time]
 
             if direction:
-                conditions.append(f"orb_{orb_time}_break_dir = ?")
+                conditions.append("break_dir = ?")
                 params.append(direction)
 
             where_clause = " AND ".join(conditions)
@@ -227,9 +237,9 @@ class AIQueryEngine:
             result = con.execute(f"""
                 SELECT
                     COUNT(*) as total,
-                    SUM(CASE WHEN orb_{orb_time}_outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
-                    AVG(orb_{orb_time}_r_multiple) as avg_r
-                FROM {table_name}
+                    SUM(CASE WHEN outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
+                    AVG(r_multiple) as avg_r
+                FROM orb_trades
                 WHERE {where_clause}
             """, params).fetchone()
 
@@ -248,17 +258,14 @@ class AIQueryEngine:
 
     def _handle_best_setups_query(self, question: str, match) -> str:
         """Handle best setups queries"""
-        con, table_name = self._prepare_connection()
+        con, _ = self._prepare_connection()
         try:
             # Find best setups by average R
-            results = con.execute(f"""
+            results = con.execute("""
                 WITH setup_stats AS (
-                    SELECT '0900' as orb, orb_0900_break_dir as dir, orb_0900_outcome as outcome, orb_0900_r_multiple as r FROM {table_name} WHERE orb_0900_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1000', orb_1000_break_dir, orb_1000_outcome, orb_1000_r_multiple FROM {table_name} WHERE orb_1000_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1100', orb_1100_break_dir, orb_1100_outcome, orb_1100_r_multiple FROM {table_name} WHERE orb_1100_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1800', orb_1800_break_dir, orb_1800_outcome, orb_1800_r_multiple FROM {table_name} WHERE orb_1800_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '2300', orb_2300_break_dir, orb_2300_outcome, orb_2300_r_multiple FROM {table_name} WHERE orb_2300_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '0030', orb_0030_break_dir, orb_0030_outcome, orb_0030_r_multiple FROM {table_name} WHERE orb_0030_outcome IN ('WIN', 'LOSS')
+                    SELECT orb_time as orb, break_dir as dir, outcome, r_multiple as r
+                    FROM orb_trades
+                    WHERE outcome IN ('WIN', 'LOSS')
                 )
                 SELECT
                     orb || ' ' || dir as setup,
@@ -284,16 +291,13 @@ class AIQueryEngine:
 
     def _handle_worst_setups_query(self, question: str, match) -> str:
         """Handle worst setups queries"""
-        con, table_name = self._prepare_connection()
+        con, _ = self._prepare_connection()
         try:
-            results = con.execute(f"""
+            results = con.execute("""
                 WITH setup_stats AS (
-                    SELECT '0900' as orb, orb_0900_break_dir as dir, orb_0900_outcome as outcome, orb_0900_r_multiple as r FROM {table_name} WHERE orb_0900_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1000', orb_1000_break_dir, orb_1000_outcome, orb_1000_r_multiple FROM {table_name} WHERE orb_1000_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1100', orb_1100_break_dir, orb_1100_outcome, orb_1100_r_multiple FROM {table_name} WHERE orb_1100_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1800', orb_1800_break_dir, orb_1800_outcome, orb_1800_r_multiple FROM {table_name} WHERE orb_1800_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '2300', orb_2300_break_dir, orb_2300_outcome, orb_2300_r_multiple FROM {table_name} WHERE orb_2300_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '0030', orb_0030_break_dir, orb_0030_outcome, orb_0030_r_multiple FROM {table_name} WHERE orb_0030_outcome IN ('WIN', 'LOSS')
+                    SELECT orb_time as orb, break_dir as dir, outcome, r_multiple as r
+                    FROM orb_trades
+                    WHERE outcome IN ('WIN', 'LOSS')
                 )
                 SELECT
                     orb || ' ' || dir as setup,
@@ -352,16 +356,13 @@ class AIQueryEngine:
         days = int(match.group(1)) if match.group(1) else 30
         cutoff = date.today() - timedelta(days=days)
 
-        con, table_name = self._prepare_connection()
+        con, _ = self._prepare_connection()
         try:
-            result = con.execute(f"""
+            result = con.execute("""
                 WITH recent_trades AS (
-                    SELECT '0900' as orb, orb_0900_outcome as outcome, orb_0900_r_multiple as r FROM {table_name} WHERE date_local >= ? AND orb_0900_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1000', orb_1000_outcome, orb_1000_r_multiple FROM {table_name} WHERE date_local >= ? AND orb_1000_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1100', orb_1100_outcome, orb_1100_r_multiple FROM {table_name} WHERE date_local >= ? AND orb_1100_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '1800', orb_1800_outcome, orb_1800_r_multiple FROM {table_name} WHERE date_local >= ? AND orb_1800_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '2300', orb_2300_outcome, orb_2300_r_multiple FROM {table_name} WHERE date_local >= ? AND orb_2300_outcome IN ('WIN', 'LOSS')
-                    UNION ALL SELECT '0030', orb_0030_outcome, orb_0030_r_multiple FROM {table_name} WHERE date_local >= ? AND orb_0030_outcome IN ('WIN', 'LOSS')
+                    SELECT orb_time as orb, outcome, r_multiple as r
+                    FROM orb_trades
+                    WHERE date_local >= ? AND outcome IN ('WIN', 'LOSS')
                 )
                 SELECT
                     COUNT(*) as total,
@@ -369,7 +370,7 @@ class AIQueryEngine:
                     AVG(r) as avg_r,
                     SUM(r) as total_r
                 FROM recent_trades
-            """, [cutoff] * 6).fetchone()
+            """, [cutoff]).fetchone()
 
             total, wins, avg_r, total_r = result
             wr = wins / total if total > 0 else 0
@@ -390,13 +391,7 @@ class AIQueryEngine:
         con, table_name = self._prepare_connection()
         try:
             result = con.execute("""
-                SELECT
-                    asia_type, london_type, ny_type,
-                    (asia_range / 0.1) as asia_ticks,
-                    orb_0900_break_dir, orb_0900_outcome,
-                    orb_1000_break_dir, orb_1000_outcome,
-                    orb_1100_break_dir, orb_1100_outcome,
-                    orb_1800_break_dir, orb_1800_outcome
+                SELECT asia_type, london_type, ny_type, (asia_range / 0.1) as asia_ticks
                 FROM {table_name}
                 WHERE date_local = ?
             """.format(table_name=table_name), [target_date]).fetchone()
@@ -404,12 +399,18 @@ class AIQueryEngine:
             if not result:
                 return f"No data found for {target_date}"
 
-            asia_type, london_type, ny_type, asia_ticks = result[0:4]
+            asia_type, london_type, ny_type, asia_ticks = result
+            orb_rows = {
+                orb_time: (break_dir, outcome)
+                for orb_time, break_dir, outcome in con.execute("""
+                    SELECT orb_time, break_dir, outcome
+                    FROM orb_trades
+                    WHERE date_local = ?
+                """, [target_date]).fetchall()
+            }
             orbs = [
-                (result[4], result[5], "09:00"),
-                (result[6], result[7], "10:00"),
-                (result[8], result[9], "11:00"),
-                (result[10], result[11], "18:00"),
+                (*orb_rows.get(orb_time, (None, None)), label)
+                for orb_time, label in (("0900", "09:00"), ("1000", "10:00"), ("1100", "11:00"), ("1800", "18:00"))
             ]
 
             response = f"**Data for {target_date}:**\n\n"
@@ -462,19 +463,19 @@ class AIQueryEngine:
         orb1 = match.group(1)
         orb2 = match.group(2)
 
-        con, table_name = self._prepare_connection()
+        con, _ = self._prepare_connection()
         try:
             results = []
             for orb in [orb1, orb2]:
-                result = con.execute(f"""
+                result = con.execute("""
                     SELECT
                         COUNT(*) as total,
-                        SUM(CASE WHEN orb_{orb}_outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
-                        AVG(orb_{orb}_r_multiple) as avg_r,
-                        SUM(orb_{orb}_r_multiple) as total_r
-                    FROM {table_name}
-                    WHERE orb_{orb}_outcome IN ('WIN', 'LOSS')
-                """).fetchone()
+                        SUM(CASE WHEN outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
+                        AVG(r_multiple) as avg_r,
+                        SUM(r_multiple) as total_r
+                    FROM orb_trades
+                    WHERE orb_time = ? AND outcome IN ('WIN', 'LOSS')
+                """, [orb]).fetchone()
                 results.append((orb, *result))
 
             response = "**Setup Comparison:**\n\n"
@@ -7,6 +7,8 @@ Usage:
     python audit_master.py --step 1           # Run Step 1 only
     python audit_master.py --step 2           # Run Step 2 only
     python audit_master.py --quick            # Quick subset of critical tests
+    python audit_master.py --step 0           # Data quality engine only (shared scans)
+    python audit_master.py --full             # Re-verify every day (ignore fingerprints)
     python audit_master.py --export results.csv  # Export results
 """
 
@@ -14,12 +16,15 @@ import sys
 import os
 import argparse
 import json
+import duckdb
 from datetime import datetime
 from pathlib import Path
 
 # Add audits to path
 sys.path.insert(0, str(Path(__file__).parent / "audits"))
 
+from audits.audit_engine import AuditEngine
+from audits.audit_fingerprints import AuditFingerprintStore, changed_dates
 from audits.step1_data_integrity import DataIntegrityAuditor
 from audits.step1a_gaps_transitions import GapTransitionAuditor
 from audits.step2_feature_verification import FeatureVerificationAuditor
@@ -30,11 +35,70 @@ from audits.step3_strategy_validation import StrategyValidationAuditor
 class MasterAuditor:
     """Master audit coordinator"""
 
-    def __init__(self, db_path: str = "gold.db"):
+    def __init__(self, db_path: str = "gold.db", full: bool = False):
         self.db_path = db_path
+        self.full = full  # False = only re-verify days whose fingerprint changed
         self.results = {}
+        self.timings = {}
         self.start_time = None
         self.end_time = None
+        self._con = None
+        self._engine = None
+        self.fingerprints = None
+        self.changed = None
+
+    @property
+    def con(self):
+        """Single connection shared by the engine and every step auditor"""
+        if self._con is None:
+            self._con = duckdb.connect(self.db_path)
+        return self._con
+
+    @property
+    def engine(self):
+        """Shared-scan engine; every scan runs once here and all steps read the cached frames"""
+        if self._engine is None:
+            self._engine = AuditEngine(self.db_path, con=self.con)
+            t0 = datetime.now()
+            self._engine.run_scans(AuditEngine.SCANS)
+            self.timings["Shared Scans"] = (datetime.now() - t0).total_seconds()
+        return self._engine
+
+    def close(self):
+        """Close the shared connection"""
+        self._engine = None
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+    def detect_changes(self):
+        """Fingerprint every day and find the ones changed since the last verified audit"""
+        if self.full:
+            return None
+
+        store = AuditFingerprintStore()
+        self.fingerprints = store.compute(self.con)
+        self.changed = store.changed_days(self.fingerprints, scope="master")
+        dates = changed_dates(self.changed)
+
+        print(f"\n[INCREMENTAL] {len(self.changed)} of {len(self.fingerprints)} instrument-days changed "
+              f"since last verified audit ({len(dates)} MGC trade dates to re-verify)")
+        return dates
+
+    def commit_fingerprints(self):
+        """Mark current fingerprints as verified if the per-day feature checks passed"""
+        if self.full or self.fingerprints is None:
+            return
+        step2 = self.results.get("Step 2: Feature Verification")
+        per_day = [
+            r for r in (step2 or {}).get("results", [])
+            if r["test"].startswith(FeatureVerificationAuditor.PER_DAY_TESTS)
+        ]
+        if per_day and all(r["passed"] for r in per_day):
+            AuditFingerprintStore().save(self.fingerprints, scope="master")
+            print("[INCREMENTAL] Fingerprints saved - unchanged days will be skipped next run")
+        else:
+            print("[INCREMENTAL] Per-day feature checks failed - fingerprints NOT saved")
 
     def print_header(self):
         """Print audit header"""
@@ -43,6 +107,7 @@ class MasterAuditor:
         print("Trading System Validation Framework".center(70))
         print("=" * 70)
         print(f"\nDatabase: {self.db_path}")
+        print(f"Mode: {'FULL' if self.full else 'INCREMENTAL (changed days only)'}")
         print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 70)
 
@@ -70,6 +135,11 @@ class MasterAuditor:
                 status = "[OK]" if verdict == "PASS" else "[FAIL]"
                 print(f"\n{status} {step_name}")
                 print(f"   Passed: {passed}/{total} ({result.get('pass_rate', 0):.1f}%)")
+                if step_name in self.timings:
+                    print(f"   Time:   {self.timings[step_name]:.2f}s")
+
+        if "Shared Scans" in self.timings:
+            print(f"\n[INFO] Shared scans (read by every step): {self.timings['Shared Scans']:.2f}s")
 
         print("\n" + "-" * 70)
         overall_pass_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
@@ -90,15 +160,38 @@ class MasterAuditor:
             duration = (self.end_time - self.start_time).total_seconds()
             print(f"\nCompleted in {duration:.1f} seconds")
 
+    def run_step0(self):
+        """Run Step 0: Data Quality Engine (shared scans over bars and features)"""
+        print("\n" + ">" * 70)
+        print("RUNNING STEP 0: DATA QUALITY ENGINE")
+        print(">" * 70)
+
+        engine = self.engine
+        engine.run()
+        result = engine.summary()
+        self.results["Step 0: Data Quality Engine"] = result
+        self.timings["Step 0: Data Quality Engine"] = engine.timings["total"]
+
+        engine.print_timings()
+        print(f"\nRESULTS: {result['passed']}/{result['total']} checks passed")
+
+        with open("audit_reports/step0_data_quality_report.json", "w") as f:
+            json.dump(result, f, indent=2)
+        print("\n[OK] Results exported to: audit_reports/step0_data_quality_report.json")
+
+        return result
+
     def run_step1(self):
         """Run Step 1: Data Integrity"""
         print("\n" + ">" * 70)
         print("RUNNING STEP 1: DATA INTEGRITY")
         print(">" * 70)
 
-        auditor = DataIntegrityAuditor(self.db_path)
+        auditor = DataIntegrityAuditor(self.db_path, con=self.con, engine=self.engine)
+        t0 = datetime.now()
         result = auditor.run_all_tests()
         self.results["Step 1: Data Integrity"] = result
+        self.timings["Step 1: Data Integrity"] = (datetime.now() - t0).total_seconds()
 
         # Export
         auditor.export_results()
@@ -111,9 +204,12 @@ class MasterAuditor:
         print("RUNNING STEP 2: FEATURE VERIFICATION")
         print(">" * 70)
 
-        auditor = FeatureVerificationAuditor(self.db_path)
+        t0 = datetime.now()
+        dates = self.detect_changes()
+        auditor = FeatureVerificationAuditor(self.db_path, con=self.con, dates=dates, engine=self.engine)
         result = auditor.run_all_tests()
         self.results["Step 2: Feature Verification"] = result
+        self.timings["Step 2: Feature Verification"] = (datetime.now() - t0).total_seconds()
 
         # Export
         auditor.export_results()
@@ -126,9 +222,11 @@ class MasterAuditor:
         print("RUNNING STEP 1.5: GAP & TRANSITION BEHAVIOR")
         print(">" * 70)
 
-        auditor = GapTransitionAuditor(self.db_path)
+        auditor = GapTransitionAuditor(self.db_path, con=self.con, engine=self.engine)
+        t0 = datetime.now()
         result = auditor.run_all_tests()
         self.results["Step 1.5: Gap & Transition Behavior"] = result
+        self.timings["Step 1.5: Gap & Transition Behavior"] = (datetime.now() - t0).total_seconds()
 
         # Export
         auditor.export_results()
@@ -141,9 +239,11 @@ class MasterAuditor:
         print("RUNNING STEP 2.4: TIME-SAFETY ASSERTIONS")
         print(">" * 70)
 
-        auditor = TimeSafetyAuditor(self.db_path)
+        auditor = TimeSafetyAuditor(self.db_path, con=self.con, engine=self.engine)
+        t0 = datetime.now()
         result = auditor.run_all_tests()
         self.results["Step 2.4: Time-Safety Assertions"] = result
+        self.timings["Step 2.4: Time-Safety Assertions"] = (datetime.now() - t0).total_seconds()
 
         # Export
         auditor.export_results()
@@ -156,9 +256,11 @@ class MasterAuditor:
         print("RUNNING STEP 3: STRATEGY VALIDATION")
         print(">" * 70)
 
-        auditor = StrategyValidationAuditor(self.db_path)
+        auditor = StrategyValidationAuditor(self.db_path, con=self.con)
+        t0 = datetime.now()
         result = auditor.run_all_tests()
         self.results["Step 3: Strategy Validation"] = result
+        self.timings["Step 3: Strategy Validation"] = (datetime.now() - t0).total_seconds()
 
         # Export
         auditor.export_results()
@@ -170,14 +272,17 @@ class MasterAuditor:
         self.start_time = datetime.now()
         self.print_header()
 
-        # Run each step
+        # Run each step (all on one shared connection)
+        self.run_step0()
         self.run_step1()
         self.run_step1a()  # Gap & Transitions
         self.run_step2()
         self.run_step2a()  # Time-Safety
         self.run_step3()   # Strategy Validation
+        self.commit_fingerprints()
 
         self.end_time = datetime.now()
+        self.close()
         self.print_summary()
 
         # Export master report
@@ -193,9 +298,11 @@ class MasterAuditor:
         self.start_time = datetime.now()
 
         # Run just critical tests
+        self.run_step0()
         self.run_step1()
 
         self.end_time = datetime.now()
+        self.close()
         self.print_summary()
 
         total_failed = sum(r.get("failed", 0) for r in self.results.values())
@@ -209,7 +316,10 @@ class MasterAuditor:
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "end_time": self.end_time.isoformat() if self.end_time else None,
             "duration_seconds": (self.end_time - self.start_time).total_seconds() if self.start_time and self.end_time else None,
+            "mode": "full" if self.full else "incremental",
+            "changed_days": int(len(self.changed)) if self.changed is not None else None,
             "results": self.results,
+            "timings_seconds": self.timings,
             "summary": {
                 "total_passed": sum(r.get("passed", 0) for r in self.results.values()),
                 "total_failed": sum(r.get("failed", 0) for r in self.results.values()),
@@ -255,15 +365,17 @@ class MasterAuditor:
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="Master Audit System - Complete Validation Suite")
-    parser.add_argument("--step", type=str, help="Run specific step (1, 1.5, 2, 2.4, 3)")
+    parser.add_argument("--step", type=str, help="Run specific step (0, 1, 1.5, 2, 2.4, 3)")
     parser.add_argument("--quick", action="store_true", help="Run quick audit (critical tests only)")
     parser.add_argument("--db", type=str, default="gold.db", help="Path to database")
     parser.add_argument("--export", type=str, help="Export results to file")
+    parser.add_argument("--full", action="store_true",
+                        help="Full audit: re-verify every day instead of only days whose fingerprint changed")
 
     args = parser.parse_args()
 
     # Create auditor
-    auditor = MasterAuditor(db_path=args.db)
+    auditor = MasterAuditor(db_path=args.db, full=args.full)
 
     # Check if database exists
     if not os.path.exists(args.db):
@@ -280,7 +392,10 @@ def main():
     elif args.step:
         auditor.print_header()
 
-        if args.step == "1":
+        if args.step == "0":
+            auditor.run_step0()
+            key = "Step 0: Data Quality Engine"
+        elif args.step == "1":
             auditor.run_step1()
             key = "Step 1: Data Integrity"
         elif args.step == "1.5":
@@ -288,6 +403,7 @@ def main():
             key = "Step 1.5: Gap & Transition Behavior"
         elif args.step == "2":
             auditor.run_step2()
+            auditor.commit_fingerprints()
             key = "Step 2: Feature Verification"
         elif args.step == "2.4":
             auditor.run_step2a()
@@ -297,9 +413,10 @@ def main():
             key = "Step 3: Strategy Validation"
         else:
             print(f"[ERROR] Invalid step: {args.step}")
-            print("Valid steps: 1, 1.5, 2, 2.4, 3")
+            print("Valid steps: 0, 1, 1.5, 2, 2.4, 3")
             return 1
 
+        auditor.close()
         auditor.print_summary()
         exit_code = 0 if auditor.results[key]["verdict"] == "PASS" else 1
     else:
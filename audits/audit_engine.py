@@ -0,0 +1,596 @@
+"""
+AUDIT ENGINE: Single-pass columnar data quality checks
+
+Purpose: Run every raw-data quality check (gaps, duplicates, volume and price
+anomalies, contract continuity, ORB integrity, session boundaries, 5m
+aggregation parity) from a handful of shared DuckDB scans over ONE connection.
+
+Plan:
+- bars_daily      : one windowed pass over bars_1m -> per (symbol, day, contract) aggregates
+- volume_profile  : per-symbol median volume + spike counts
+- bars_5m_parity  : bars_5m joined against 1m bars re-bucketed to 5 minutes
+- features_daily  : one pass over the daily features table -> per (instrument, day) flags
+- features_profile: one pass over the daily features table -> per-instrument column stats
+
+The scans are independent, so they run in parallel on cursors of the shared
+connection. Each check then reads the small scan results in memory; a scan
+that fails is reported only under the checks that depend on it.
+Per-scan and per-check timings are recorded on the engine.
+
+The step auditors (audits/step1*, step2*) read the same scan frames through
+frame() and profile(), so MasterAuditor runs every scan once for all steps.
+
+Usage:
+    from audits.audit_engine import AuditEngine
+
+    engine = AuditEngine("gold.db")
+    findings = engine.run()
+    engine.print_timings()
+
+    profile = engine.profile("MGC")       # e.g. profile["n_atr_20"], profile["avg_asia_range"]
+"""
+
+import duckdb
+import pandas as pd
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+
+ORB_TIMES = ["0900", "1000", "1100", "1800", "2300", "0030"]
+
+TZ_LOCAL = "Australia/Brisbane"
+
+# Columns summarised by the features_profile scan (count, min, max, avg, std, zeros)
+PROFILE_COLUMNS = [
+    "orb_0900_size", "orb_1000_size", "orb_1800_size", "orb_2300_size",
+    "asia_range", "london_range", "pre_london_range", "pre_asia_range", "atr_20",
+]
+
+
+@dataclass
+class AuditFinding:
+    """Single result produced by an engine check"""
+    severity: str  # CRITICAL, WARNING, INFO
+    check: str
+    date_local: Optional[date]
+    description: str
+    affected_rows: int
+    suggestion: str
+
+
+class AuditEngine:
+    """Plans all data quality checks as a few shared scans over one connection"""
+
+    # Check name -> (finding label, scans it depends on)
+    CHECKS = {
+        "gaps": ("date_gaps", ("features_daily",)),
+        "duplicates": ("duplicates", ("bars_daily", "features_daily")),
+        "volume": ("volume_anomalies", ("bars_daily", "volume_profile")),
+        "price": ("price_anomalies", ("bars_daily",)),
+        "contracts": ("contract_continuity", ("bars_daily",)),
+        "orb": ("orb_integrity", ("features_daily",)),
+        "sessions": ("session_boundaries", ("bars_daily", "features_daily")),
+        "5m": ("5m_aggregation", ("bars_5m_parity",)),
+    }
+
+    SCANS = ["bars_daily", "volume_profile", "bars_5m_parity", "features_daily", "features_profile"]
+
+    def __init__(self, db_path: str = "gold.db", con=None,
+                 features_table: str = "daily_features_v2", max_workers: int = 4):
+        self.db_path = db_path
+        self.features_table = features_table
+        self.max_workers = max_workers
+        self._owns_con = con is None
+        self.con = con if con is not None else duckdb.connect(db_path, read_only=True)
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.scan_errors: Dict[str, Exception] = {}
+        self.timings: Dict[str, float] = {}
+        self.findings: List[AuditFinding] = []
+
+    def close(self):
+        """Close the connection if the engine opened it"""
+        if self._owns_con:
+            self.con.close()
+
+    def add_finding(self, severity: str, check: str, description: str,
+                    affected_rows: int = 0, date_local: Optional[date] = None,
+                    suggestion: str = ""):
+        """Add a finding to the list"""
+        self.findings.append(AuditFinding(
+            severity=severity,
+            check=check,
+            date_local=date_local,
+            description=description,
+            affected_rows=int(affected_rows),
+            suggestion=suggestion,
+        ))
+
+    # ========================================================================
+    # Shared scans
+    # ========================================================================
+
+    def _scan_sql(self) -> Dict[str, str]:
+        size_mismatch = ",\n".join(
+            f"SUM(CASE WHEN orb_{t}_size IS NOT NULL AND ABS(orb_{t}_size - (orb_{t}_high - orb_{t}_low)) > 0.01 "
+            f"THEN 1 ELSE 0 END) AS orb_{t}_size_bad"
+            for t in ORB_TIMES
+        )
+        orphan_outcome = " + ".join(
+            f"CASE WHEN orb_{t}_outcome IS NOT NULL AND orb_{t}_break_dir IS NULL THEN 1 ELSE 0 END"
+            for t in ORB_TIMES
+        )
+        column_stats = ",\n".join(
+            f"COUNT({c}) AS n_{c}, MIN({c}) AS min_{c}, MAX({c}) AS max_{c}, AVG({c}) AS avg_{c}, "
+            f"STDDEV({c}) AS std_{c}, SUM(CASE WHEN {c} = 0 THEN 1 ELSE 0 END) AS zeros_{c}"
+            for c in PROFILE_COLUMNS
+        )
+        orb_counts = ",\n".join(
+            f"COUNT(CASE WHEN orb_{t}_high IS NOT NULL AND orb_{t}_low IS NOT NULL THEN 1 END) AS n_orb_{t}"
+            for t in ORB_TIMES
+        )
+
+        return {
+            "bars_daily": f"""
+                WITH b AS (
+                    SELECT
+                        symbol,
+                        source_symbol,
+                        ts_utc,
+                        open, high, low, close, volume,
+                        CAST(timezone('{TZ_LOCAL}', ts_utc) AS DATE) AS date_local,
+                        EXTRACT(HOUR FROM timezone('{TZ_LOCAL}', ts_utc)) AS hour_local,
+                        LAG(ts_utc) OVER w AS prev_ts,
+                        LAG(close) OVER w AS prev_close
+                    FROM bars_1m
+                    WINDOW w AS (PARTITION BY symbol ORDER BY ts_utc)
+                )
+                SELECT
+                    symbol,
+                    date_local,
+                    hour_local,
+                    source_symbol,
+                    COUNT(*) AS n_bars,
+                    SUM(CASE WHEN prev_ts = ts_utc THEN 1 ELSE 0 END) AS dup_bars,
+                    SUM(CASE WHEN volume = 0 OR volume IS NULL THEN 1 ELSE 0 END) AS zero_vol,
+                    SUM(CASE WHEN open <= 0 OR high <= 0 OR low <= 0 OR close <= 0 THEN 1 ELSE 0 END) AS bad_price,
+                    SUM(CASE WHEN low > high THEN 1 ELSE 0 END) AS low_gt_high,
+                    SUM(CASE WHEN prev_close > 0 AND ABS(close - prev_close) / prev_close > 0.10 THEN 1 ELSE 0 END) AS extreme_moves,
+                    SUM(CASE WHEN hour_local BETWEEN 9 AND 16 THEN 1 ELSE 0 END) AS asia_bars
+                FROM b
+                GROUP BY symbol, date_local, hour_local, source_symbol
+            """,
+            "volume_profile": """
+                WITH med AS (
+                    SELECT symbol, MEDIAN(volume) AS med_vol
+                    FROM bars_1m
+                    WHERE volume > 0
+                    GROUP BY symbol
+                )
+                SELECT
+                    b.symbol,
+                    ANY_VALUE(med.med_vol) AS med_vol,
+                    SUM(CASE WHEN b.volume > med.med_vol * 100 THEN 1 ELSE 0 END) AS spikes
+                FROM bars_1m b
+                JOIN med ON med.symbol = b.symbol
+                GROUP BY b.symbol
+            """,
+            "bars_5m_parity": """
+                WITH agg AS (
+                    SELECT
+                        to_timestamp(floor(epoch(ts_utc) / 300) * 300) AS ts_5m,
+                        symbol,
+                        MAX(high) AS high,
+                        MIN(low) AS low,
+                        SUM(volume) AS volume,
+                        COUNT(*) AS n_1m
+                    FROM bars_1m
+                    GROUP BY 1, 2
+                )
+                SELECT
+                    COALESCE(f.symbol, agg.symbol) AS symbol,
+                    SUM(agg.n_1m) AS cnt_1m,
+                    COUNT(f.ts_utc) AS cnt_5m,
+                    SUM(CASE WHEN f.ts_utc IS NULL THEN 1 ELSE 0 END) AS missing_5m,
+                    SUM(CASE WHEN agg.ts_5m IS NULL THEN 1 ELSE 0 END) AS orphan_5m,
+                    SUM(CASE WHEN f.ts_utc IS NOT NULL AND agg.ts_5m IS NOT NULL
+                              AND (ABS(f.high - agg.high) > 1e-9
+                                   OR ABS(f.low - agg.low) > 1e-9
+                                   OR f.volume <> agg.volume)
+                             THEN 1 ELSE 0 END) AS mismatched
+                FROM bars_5m f
+                FULL OUTER JOIN agg
+                  ON agg.symbol = f.symbol AND agg.ts_5m = f.ts_utc
+                GROUP BY 1
+            """,
+            "features_daily": f"""
+                SELECT
+                    instrument,
+                    date_local,
+                    COUNT(*) AS n_rows,
+                    {size_mismatch},
+                    SUM({orphan_outcome}) AS orb_orphan_outcome,
+                    SUM(CASE WHEN asia_range IS NOT NULL AND ABS(asia_range - (asia_high - asia_low)) > 0.01
+                             THEN 1 ELSE 0 END) AS asia_range_bad,
+                    BOOL_OR(asia_high IS NOT NULL) AS has_asia
+                FROM {self.features_table}
+                GROUP BY instrument, date_local
+            """,
+            "features_profile": f"""
+                SELECT
+                    instrument,
+                    COUNT(*) AS n_rows,
+                    {column_stats},
+                    {orb_counts},
+                    COUNT(CASE WHEN orb_0900_high IS NOT NULL AND orb_0900_break_dir IS NOT NULL THEN 1 END) AS n_orb_0900_dir,
+                    COUNT(asia_high) AS n_asia,
+                    COUNT(london_high) AS n_london,
+                    COUNT(ny_high) AS n_ny,
+                    COUNT(CASE WHEN EXTRACT(DOW FROM date_local) IN (0, 6) THEN 1 END) AS n_weekend,
+                    COUNT(CASE WHEN EXTRACT(DOW FROM date_local) NOT IN (0, 6)
+                               AND (asia_high IS NULL OR london_high IS NULL OR ny_high IS NULL)
+                          THEN 1 END) AS n_missing_weekdays,
+                    COUNT(CASE WHEN pre_asia_high IS NOT NULL AND pre_asia_low IS NOT NULL THEN 1 END) AS n_pre_asia,
+                    AVG(pre_london_range) FILTER (WHERE london_range IS NOT NULL) AS avg_pre_london_paired,
+                    AVG(london_range) FILTER (WHERE pre_london_range IS NOT NULL) AS avg_london_paired
+                FROM {self.features_table}
+                GROUP BY instrument
+            """,
+        }
+
+    def _run_scan(self, name: str, sql: str) -> pd.DataFrame:
+        """Run one scan on its own cursor of the shared connection"""
+        cur = self.con.cursor()
+        try:
+            t0 = time.perf_counter()
+            df = cur.execute(sql).fetchdf()
+            self.timings[f"scan:{name}"] = time.perf_counter() - t0
+            return df
+        finally:
+            cur.close()
+
+    def run_scans(self, scans: List[str]) -> None:
+        """Run the requested scans in parallel (skips scans already cached; failures go to scan_errors)"""
+        sql = self._scan_sql()
+        pending = [s for s in scans if s not in self.frames and s not in self.scan_errors]
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+            futures = {name: pool.submit(self._run_scan, name, sql[name]) for name in pending}
+            for name, future in futures.items():
+                try:
+                    self.frames[name] = future.result()
+                except Exception as e:
+                    self.scan_errors[name] = e
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """Result of one shared scan (run on first use, cached afterwards; re-raises a failed scan)"""
+        self.run_scans([name])
+        if name in self.scan_errors:
+            raise self.scan_errors[name]
+        return self.frames[name]
+
+    def profile(self, instrument: str = "MGC") -> Dict:
+        """features_profile row for one instrument as plain Python values (counts 0, stats None when absent)"""
+        df = self.frame("features_profile")
+        row = df[df["instrument"] == instrument]
+        out = {}
+        for col in df.columns:
+            value = row[col].iloc[0] if len(row) else None
+            if value is None or pd.isna(value):
+                value = 0 if col.startswith(("n_", "zeros_")) else None
+            elif hasattr(value, "item"):
+                value = value.item()
+            out[col] = value
+        return out
+
+    # ========================================================================
+    # Checks (operate on scan frames only)
+    # ========================================================================
+
+    def check_gaps(self) -> None:
+        """Missing weekdays in the features table"""
+        feats = self.frames["features_daily"]
+        if feats.empty:
+            self.add_finding("CRITICAL", "date_gaps",
+                             f"No data found in {self.features_table} table",
+                             suggestion="Run backfill: python backfill_databento_continuous.py 2024-01-01 2026-01-10")
+            return
+
+        existing = pd.DatetimeIndex(pd.to_datetime(feats["date_local"]).unique())
+        start_date, end_date = existing.min(), existing.max()
+        weekdays = pd.bdate_range(start_date, end_date)
+        gaps = [d.date() for d in weekdays.difference(existing)]
+
+        if gaps:
+            gap_count = len(gaps)
+            if gap_count > 10:
+                gap_str = f"{gaps[0]} to {gaps[-1]} ({gap_count} days total)"
+            else:
+                gap_str = ", ".join(str(d) for d in gaps[:5])
+                if gap_count > 5:
+                    gap_str += f" ... ({gap_count} total)"
+
+            self.add_finding(
+                "WARNING", "date_gaps",
+                f"Missing weekday data for {gap_count} days: {gap_str}",
+                affected_rows=gap_count,
+                suggestion=f"Run: python daily_update.py --days {(end_date.date() - gaps[0]).days + 5}"
+            )
+        else:
+            self.add_finding("INFO", "date_gaps",
+                             f"No gaps found. Continuous data from {start_date.date()} to {end_date.date()}")
+
+    def check_duplicates(self) -> None:
+        """Duplicate bars and duplicate feature rows"""
+        bars = self.frames["bars_daily"]
+        feats = self.frames["features_daily"]
+
+        dup_bars = int(bars["dup_bars"].sum()) if not bars.empty else 0
+        dup_days = int((feats["n_rows"] > 1).sum()) if not feats.empty else 0
+
+        if dup_bars:
+            self.add_finding(
+                "CRITICAL", "duplicates",
+                f"Found {dup_bars} duplicate timestamps in bars_1m",
+                affected_rows=dup_bars,
+                suggestion="This should never happen. Check backfill scripts."
+            )
+        if dup_days:
+            self.add_finding(
+                "CRITICAL", "duplicates",
+                f"Found {dup_days} duplicate dates in {self.features_table}",
+                affected_rows=dup_days,
+                suggestion="Rebuild features: python build_daily_features_v2.py <date>"
+            )
+        if not dup_bars and not dup_days:
+            self.add_finding("INFO", "duplicates", "No duplicate rows found")
+
+    def check_volume(self) -> None:
+        """Zero volume bars and extreme spikes (>100x per-symbol median)"""
+        bars = self.frames["bars_daily"]
+        profile = self.frames["volume_profile"]
+
+        zero_vol = int(bars["zero_vol"].sum()) if not bars.empty else 0
+        spikes = int(profile["spikes"].sum()) if not profile.empty else 0
+
+        if zero_vol:
+            self.add_finding(
+                "WARNING", "volume_anomalies",
+                f"Found {zero_vol} bars with zero or null volume",
+                affected_rows=zero_vol,
+                suggestion="Zero volume bars may be valid during low liquidity periods"
+            )
+        if spikes:
+            self.add_finding(
+                "WARNING", "volume_anomalies",
+                f"Found {spikes} bars with extreme volume spikes (>100x median)",
+                affected_rows=spikes,
+                suggestion="May indicate contract rolls or news events - review manually"
+            )
+        if not zero_vol and not spikes:
+            self.add_finding("INFO", "volume_anomalies", "No significant volume anomalies detected")
+
+    def check_price(self) -> None:
+        """Non-positive prices, inverted bars and >10% one-minute moves"""
+        bars = self.frames["bars_daily"]
+        if bars.empty:
+            self.add_finding("CRITICAL", "price_anomalies", "No data found in bars_1m table")
+            return
+
+        bad_price = int(bars["bad_price"].sum())
+        low_gt_high = int(bars["low_gt_high"].sum())
+        extreme = int(bars["extreme_moves"].sum())
+
+        if bad_price:
+            self.add_finding(
+                "CRITICAL", "price_anomalies",
+                f"Found {bad_price} bars with zero or negative prices",
+                affected_rows=bad_price,
+                suggestion="Critical data corruption - re-backfill affected dates"
+            )
+        if low_gt_high:
+            self.add_finding(
+                "CRITICAL", "price_anomalies",
+                f"Found {low_gt_high} bars where low > high (impossible)",
+                affected_rows=low_gt_high,
+                suggestion="Critical data corruption - re-backfill affected dates"
+            )
+        if extreme:
+            first = bars.loc[bars["extreme_moves"] > 0, "date_local"].min()
+            self.add_finding(
+                "WARNING", "price_anomalies",
+                f"Found {extreme} bars with >10% moves in 1 minute",
+                affected_rows=extreme,
+                date_local=first,
+                suggestion="May indicate contract rolls or flash crashes - review manually"
+            )
+        if not bad_price and not low_gt_high and not extreme:
+            self.add_finding("INFO", "price_anomalies", "No price anomalies detected")
+
+    def check_contracts(self) -> None:
+        """Roll days and contracts that only appear on a single day"""
+        bars = self.frames["bars_daily"]
+        if bars.empty:
+            return
+
+        per_day = bars.groupby(["symbol", "date_local"])["source_symbol"].nunique()
+        roll_days = per_day[per_day > 1]
+        per_contract = bars.groupby(["symbol", "source_symbol"])["date_local"].nunique()
+        orphans = int((per_contract == 1).sum())
+
+        if len(roll_days):
+            latest_roll = roll_days.index.get_level_values("date_local").max()
+            self.add_finding(
+                "INFO", "contract_continuity",
+                f"Found {len(roll_days)} contract roll days (expected). Latest: {latest_roll}",
+                affected_rows=len(roll_days),
+                suggestion="Contract rolls are normal - ensure continuity is maintained"
+            )
+        if orphans:
+            self.add_finding(
+                "WARNING", "contract_continuity",
+                f"Found {orphans} contracts appearing only on single days",
+                affected_rows=orphans,
+                suggestion="Review contract selection logic in backfill script"
+            )
+        if not len(roll_days) and not orphans:
+            self.add_finding("INFO", "contract_continuity", "Single continuous contract stream, no rolls")
+
+    def check_orb(self) -> None:
+        """ORB size == high - low and outcome implies a break direction (all six ORBs)"""
+        feats = self.frames["features_daily"]
+        if feats.empty:
+            return
+
+        per_day = feats[[f"orb_{t}_size_bad" for t in ORB_TIMES]].sum(axis=1)
+        size_bad = int(per_day.sum())
+        orphan = int(feats["orb_orphan_outcome"].sum())
+
+        if size_bad:
+            self.add_finding(
+                "WARNING", "orb_integrity",
+                f"Found {size_bad} ORBs with size != (high - low)",
+                affected_rows=size_bad,
+                date_local=feats.loc[per_day > 0, "date_local"].min(),
+                suggestion="Rebuild features: python build_daily_features_v2.py <date>"
+            )
+        if orphan:
+            self.add_finding(
+                "WARNING", "orb_integrity",
+                f"Found {orphan} ORBs with outcome but no break direction",
+                affected_rows=orphan,
+                suggestion="Rebuild features for affected dates"
+            )
+        if not size_bad and not orphan:
+            self.add_finding("INFO", "orb_integrity", "ORB calculations appear correct")
+
+    def check_sessions(self) -> None:
+        """Days with Asia stats but no bars during Asia hours"""
+        bars = self.frames["bars_daily"]
+        feats = self.frames["features_daily"]
+        if feats.empty:
+            return
+
+        asia = bars.groupby(["symbol", "date_local"], as_index=False)["asia_bars"].sum()
+        merged = feats[feats["has_asia"]].merge(
+            asia, left_on=["instrument", "date_local"], right_on=["symbol", "date_local"], how="left"
+        )
+        bad = merged[merged["asia_bars"].fillna(0) == 0]
+
+        if len(bad):
+            self.add_finding(
+                "WARNING", "session_boundaries",
+                f"Found {len(bad)} days with Asia stats but no data during Asia hours",
+                affected_rows=len(bad),
+                date_local=bad["date_local"].min(),
+                suggestion="Check session time window definitions in build_daily_features_v2.py"
+            )
+        else:
+            self.add_finding("INFO", "session_boundaries", "Session time boundaries appear correct")
+
+    def check_5m(self) -> None:
+        """bars_5m matches 1m bars re-bucketed to 5 minutes"""
+        parity = self.frames["bars_5m_parity"]
+        if parity.empty:
+            self.add_finding("WARNING", "5m_aggregation", "No bars found to compare",
+                             suggestion="Rebuild 5m bars: python build_5m.py")
+            return
+
+        cnt_1m = int(parity["cnt_1m"].fillna(0).sum())
+        cnt_5m = int(parity["cnt_5m"].sum())
+        missing = int(parity["missing_5m"].sum())
+        orphan = int(parity["orphan_5m"].sum())
+        mismatched = int(parity["mismatched"].sum())
+        ratio = cnt_1m / cnt_5m if cnt_5m > 0 else 0
+
+        if mismatched or orphan:
+            self.add_finding(
+                "WARNING", "5m_aggregation",
+                f"{mismatched} 5m bars disagree with their 1m bars, {orphan} have no 1m source",
+                affected_rows=mismatched + orphan,
+                suggestion="Rebuild 5m bars: python build_5m.py"
+            )
+        if missing:
+            self.add_finding(
+                "WARNING", "5m_aggregation",
+                f"{missing} 5-minute buckets in bars_1m have no bars_5m row (1m:5m ratio {ratio:.2f})",
+                affected_rows=missing,
+                suggestion="Rebuild 5m bars for recent dates"
+            )
+        if not mismatched and not orphan and not missing:
+            self.add_finding("INFO", "5m_aggregation",
+                             f"5-minute bars match 1m aggregation exactly (ratio {ratio:.2f})")
+
+    # ========================================================================
+    # RUN
+    # ========================================================================
+
+    def run(self, checks: Optional[List[str]] = None) -> List[AuditFinding]:
+        """Run the requested checks (default: all) from shared scans; returns the findings they added"""
+        checks = checks or list(self.CHECKS)
+        needed = sorted({scan for c in checks for scan in self.CHECKS[c][1]})
+        first = len(self.findings)
+
+        t0 = time.perf_counter()
+        self.run_scans(needed)
+
+        for name in checks:
+            label, scans = self.CHECKS[name]
+            failed = [scan for scan in scans if scan in self.scan_errors]
+            if failed:
+                for scan in failed:
+                    self.add_finding("CRITICAL", label, f"Scan {scan} failed: {self.scan_errors[scan]}",
+                                     suggestion="Check the tables this scan reads")
+                continue
+            t1 = time.perf_counter()
+            try:
+                getattr(self, f"check_{name}")()
+            except Exception as e:
+                self.add_finding("CRITICAL", label, f"Check failed with error: {str(e)}",
+                                 suggestion="Review audit engine")
+            self.timings[f"check:{name}"] = time.perf_counter() - t1
+
+        self.timings["total"] = time.perf_counter() - t0
+        return self.findings[first:]
+
+    def summary(self) -> Dict:
+        """Summary in the same shape as the step auditors (CRITICAL findings fail)"""
+        results = [
+            {
+                "test": f.check,
+                "passed": f.severity != "CRITICAL",
+                "message": f.description,
+                "details": {
+                    "severity": f.severity,
+                    "affected_rows": f.affected_rows,
+                    "date": f.date_local.isoformat() if f.date_local else None,
+                    "suggestion": f.suggestion,
+                },
+                "timestamp": datetime.now().isoformat()
+            }
+            for f in self.findings
+        ]
+        passed = sum(1 for r in results if r["passed"])
+        failed = len(results) - passed
+        total = len(results)
+
+        return {
+            "step": "Data Quality Engine",
+            "passed": passed,
+            "failed": failed,
+            "total": total,
+            "pass_rate": (passed / total * 100) if total > 0 else 0,
+            "results": results,
+            "timings": {k: round(v, 4) for k, v in self.timings.items()},
+            "verdict": "PASS" if failed == 0 else "FAIL"
+        }
+
+    def print_timings(self) -> None:
+        """Print per-scan and per-check timings"""
+        print("\nTimings:")
+        for name, secs in self.timings.items():
+            print(f"  {name:<28} {secs * 1000:9.1f} ms")
@@ -0,0 +1,163 @@
+"""
+AUDIT FINGERPRINTS: Per-day change detection for incremental audits
+
+Purpose: After a nightly daily_update.py only one or two days change, so the
+expensive per-day checks (feature recomputation) only need to re-run for
+those days.
+
+Each (instrument, date_local) gets a fingerprint:
+- bars_hash     : order-independent hash of that day's bars_1m rows
+- n_bars        : bar count (guards against hash collisions on deletes)
+- features_hash : hash of the daily_features_v2 row
+
+Hashes are stored as text so they survive pandas round-trips exactly.
+
+Fingerprints are kept in a small side database (audit_reports/audit_state.db)
+so read-only audits can still track what they have verified. Each audit keeps
+its own scope, so audit_master.py and run_complete_audit.py do not mark days
+as verified for each other.
+
+Usage:
+    store = AuditFingerprintStore()
+    current = store.compute(con)
+    changed = store.changed_days(current, scope="master")
+    ... run expensive checks for changed ...
+    store.save(current, scope="master")
+"""
+
+import duckdb
+import pandas as pd
+from datetime import date
+from pathlib import Path
+from typing import List
+
+
+STATE_DB_PATH = "audit_reports/audit_state.db"
+
+TZ_LOCAL = "Australia/Brisbane"
+
+
+class AuditFingerprintStore:
+    """Stores per-day fingerprints of bars_1m and daily_features_v2"""
+
+    def __init__(self, state_path: str = STATE_DB_PATH, features_table: str = "daily_features_v2"):
+        self.state_path = state_path
+        self.features_table = features_table
+        Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self):
+        return duckdb.connect(self.state_path)
+
+    def _init_schema(self):
+        con = self._connect()
+        try:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS audit_fingerprints (
+                    scope VARCHAR NOT NULL,
+                    instrument VARCHAR NOT NULL,
+                    date_local DATE NOT NULL,
+                    n_bars BIGINT,
+                    bars_hash VARCHAR,
+                    features_hash VARCHAR,
+                    verified_at TIMESTAMP DEFAULT current_timestamp,
+                    PRIMARY KEY (scope, instrument, date_local)
+                )
+            """)
+        finally:
+            con.close()
+
+    def compute(self, con) -> pd.DataFrame:
+        """Compute current fingerprints with one scan of bars_1m and the features table"""
+        return con.execute(f"""
+            WITH bars AS (
+                SELECT
+                    symbol AS instrument,
+                    CAST(timezone('{TZ_LOCAL}', ts_utc) AS DATE) AS date_local,
+                    COUNT(*) AS n_bars,
+                    CAST(bit_xor(hash(ts_utc, source_symbol, open, high, low, close, volume)) AS VARCHAR) AS bars_hash
+                FROM bars_1m
+                GROUP BY 1, 2
+            ),
+            feats AS (
+                SELECT instrument, date_local, CAST(bit_xor(hash(f)) AS VARCHAR) AS features_hash
+                FROM {self.features_table} f
+                GROUP BY 1, 2
+            )
+            SELECT
+                COALESCE(bars.instrument, feats.instrument) AS instrument,
+                COALESCE(bars.date_local, feats.date_local) AS date_local,
+                COALESCE(bars.n_bars, 0) AS n_bars,
+                bars.bars_hash,
+                feats.features_hash
+            FROM bars
+            FULL OUTER JOIN feats
+              ON feats.instrument = bars.instrument AND feats.date_local = bars.date_local
+            ORDER BY 1, 2
+        """).fetchdf()
+
+    def load(self, scope: str) -> pd.DataFrame:
+        """Load stored fingerprints for a scope"""
+        con = self._connect()
+        try:
+            return con.execute("""
+                SELECT instrument, date_local, n_bars, bars_hash, features_hash
+                FROM audit_fingerprints
+                WHERE scope = ?
+            """, [scope]).fetchdf()
+        finally:
+            con.close()
+
+    def changed_days(self, current: pd.DataFrame, scope: str) -> pd.DataFrame:
+        """Rows of `current` that are new or whose fingerprint differs from the stored one"""
+        stored = self.load(scope)
+        if stored.empty:
+            return current.copy()
+
+        merged = current.merge(stored, on=["instrument", "date_local"], how="left",
+                               suffixes=("", "_stored"), indicator=True)
+        differs = merged["_merge"] == "left_only"
+        for col in ["n_bars", "bars_hash", "features_hash"]:
+            a, b = merged[col], merged[f"{col}_stored"]
+            differs |= ~((a == b) | (a.isna() & b.isna()))
+
+        return merged.loc[differs, current.columns].reset_index(drop=True)
+
+    def save(self, current: pd.DataFrame, scope: str) -> None:
+        """Mark `current` fingerprints as verified for a scope"""
+        if current.empty:
+            return
+
+        con = self._connect()
+        try:
+            con.register("current_fp", current)
+            con.execute("""
+                INSERT OR REPLACE INTO audit_fingerprints
+                    (scope, instrument, date_local, n_bars, bars_hash, features_hash, verified_at)
+                SELECT ?, instrument, date_local, n_bars, bars_hash, features_hash, current_timestamp
+                FROM current_fp
+            """, [scope])
+            con.unregister("current_fp")
+        finally:
+            con.close()
+
+    def reset(self, scope: str) -> None:
+        """Forget all fingerprints for a scope (next run re-verifies everything)"""
+        con = self._connect()
+        try:
+            con.execute("DELETE FROM audit_fingerprints WHERE scope = ?", [scope])
+        finally:
+            con.close()
+
+
+def changed_dates(changed: pd.DataFrame, instrument: str = "MGC") -> List[date]:
+    """
+    Trade dates to re-verify for one instrument.
+
+    Bars after midnight (00:30 ORB, NY session) belong to the previous Asia
+    trade date, so each changed calendar day also pulls in the day before it.
+    """
+    rows = changed[changed["instrument"] == instrument]
+    days = pd.to_datetime(rows["date_local"])
+    both = pd.concat([days, days - pd.Timedelta(days=1)])
+    return sorted(both.dt.date.unique())
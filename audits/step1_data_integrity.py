@@ -4,27 +4,38 @@ Based on: STEPONE.txt
 
 Purpose: Prove that what you see on charts == what's in database == what's used in calculations
 If this fails, everything else is invalid.
+
+Tests read the shared AuditEngine scans (bars_daily, features_daily,
+features_profile) instead of querying the tables themselves.
 """
 
-import duckdb
 import pandas as pd
 from datetime import datetime, time
 from typing import Dict, List, Tuple
 import json
 
+try:
+    from audits.audit_engine import AuditEngine
+except ImportError:  # run as a script from audits/
+    from audit_engine import AuditEngine
+
 
 class DataIntegrityAuditor:
     """Auditor for raw data and chart integrity"""
 
-    def __init__(self, db_path: str = "gold.db"):
+    def __init__(self, db_path: str = "gold.db", con=None, engine: AuditEngine = None):
         self.db_path = db_path
+        self.con = con  # Optional shared connection (MasterAuditor)
+        self.engine = engine  # Optional shared scan engine (MasterAuditor)
         self.results = []
         self.passed = 0
         self.failed = 0
 
-    def connect(self):
-        """Connect to database"""
-        return duckdb.connect(self.db_path)
+    def get_engine(self) -> AuditEngine:
+        """Shared scan engine (built on first use when running standalone)"""
+        if self.engine is None:
+            self.engine = AuditEngine(self.db_path, con=self.con)
+        return self.engine
 
     def add_result(self, test_name: str, passed: bool, message: str, details: Dict = None):
         """Add test result"""
@@ -48,21 +59,12 @@ class DataIntegrityAuditor:
         """Test that we have data for main trading sessions"""
         print("  -> Testing session boundaries...")
 
-        con = self.connect()
+        bars = self.get_engine().frame("bars_daily")
 
         # For 24-hour futures like MGC, we expect data in ALL hours
         # Just verify we have good coverage of main sessions
-        query = """
-        SELECT
-            EXTRACT(HOUR FROM timezone('Australia/Brisbane', ts_utc)) as hour,
-            COUNT(*) as bar_count
-        FROM bars_1m
-        WHERE symbol = 'MGC'
-        GROUP BY hour
-        """
-
-        result = con.execute(query).fetchall()
-        hours_with_data = {int(row[0]): row[1] for row in result}
+        per_hour = bars[bars["symbol"] == "MGC"].groupby("hour_local")["n_bars"].sum()
+        hours_with_data = {int(hour): int(count) for hour, count in per_hour.items()}
 
         # Check main session hours have data (not that ONLY those hours have data)
         main_hours = [9, 10, 11, 18, 19, 20, 23, 0, 1]  # Sample from each session
@@ -84,34 +86,20 @@ class DataIntegrityAuditor:
             }
         )
 
-        con.close()
         return passed
 
     def test_orb_windows(self) -> bool:
         """Assert ORB windows are exactly 5 minutes"""
         print("  -> Testing ORB window definitions...")
 
-        con = self.connect()
+        profile = self.get_engine().profile("MGC")
 
         orb_times = ["09:00", "10:00", "11:00", "18:00", "23:00", "00:30"]
         all_passed = True
 
         for orb in orb_times:
-            hour = int(orb.split(":")[0])
-            minute = int(orb.split(":")[1])
-
-            # Check using daily_features_v2 which already has date_local
             # Just verify ORB data exists (actual construction tested elsewhere)
-            query = f"""
-            SELECT COUNT(*) as valid_orbs
-            FROM daily_features_v2
-            WHERE instrument = 'MGC'
-              AND orb_{orb.replace(':', '')}_high IS NOT NULL
-              AND orb_{orb.replace(':', '')}_low IS NOT NULL
-            """
-
-            result = con.execute(query).fetchone()
-            valid_orbs = result[0]
+            valid_orbs = profile[f"n_orb_{orb.replace(':', '')}"]
 
             if valid_orbs > 0:
                 self.add_result(
@@ -127,7 +115,6 @@ class DataIntegrityAuditor:
                     f"No {orb} ORBs found in daily_features_v2"
                 )
 
-        con.close()
         return all_passed
 
     # ========================================================================
@@ -138,27 +125,12 @@ class DataIntegrityAuditor:
         """Check for missing session data on trading days"""
         print("  -> Testing for missing session data...")
 
-        con = self.connect()
-
-        # Check for missing session data, excluding weekends
-        query = """
-        SELECT
-            COUNT(*) as total_days,
-            COUNT(CASE WHEN asia_high IS NOT NULL THEN 1 END) as asia_days,
-            COUNT(CASE WHEN london_high IS NOT NULL THEN 1 END) as london_days,
-            COUNT(CASE WHEN ny_high IS NOT NULL THEN 1 END) as ny_days,
-            COUNT(CASE WHEN EXTRACT(DOW FROM date_local) IN (0, 6) THEN 1 END) as weekend_days,
-            COUNT(CASE
-                WHEN EXTRACT(DOW FROM date_local) NOT IN (0, 6)
-                AND (asia_high IS NULL OR london_high IS NULL OR ny_high IS NULL)
-                THEN 1
-            END) as missing_weekdays
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-        """
-
-        result = con.execute(query).fetchone()
-        total, asia, london, ny, weekends, missing_weekdays = result
+        profile = self.get_engine().profile("MGC")
+
+        # Missing session data, excluding weekends
+        total, asia, weekends, missing_weekdays = (
+            profile["n_rows"], profile["n_asia"], profile["n_weekend"], profile["n_missing_weekdays"]
+        )
 
         # Missing weekdays should be very low (only holidays)
         # Weekends are expected to have no data
@@ -177,37 +149,24 @@ class DataIntegrityAuditor:
             }
         )
 
-        con.close()
         return passed
 
     def test_duplicate_timestamps(self) -> bool:
         """Check for duplicate timestamps"""
         print("  -> Testing for duplicate timestamps...")
 
-        con = self.connect()
-
-        query = """
-        SELECT
-            ts_utc,
-            symbol,
-            COUNT(*) as dup_count
-        FROM bars_1m
-        GROUP BY ts_utc, symbol
-        HAVING COUNT(*) > 1
-        LIMIT 10
-        """
+        bars = self.get_engine().frame("bars_daily")
+        dups = bars[bars["dup_bars"] > 0].groupby(["symbol", "date_local"])["dup_bars"].sum()
 
-        result = con.execute(query).fetchall()
-
-        passed = len(result) == 0
+        passed = len(dups) == 0
         self.add_result(
             "Duplicate Timestamps",
             passed,
-            f"Found {len(result)} duplicate timestamps",
-            {"duplicates": [{"ts": str(r[0]), "count": r[2]} for r in result]}
+            f"Found {int(dups.sum())} duplicate timestamps",
+            {"duplicates": [{"symbol": sym, "date": str(d.date()), "count": int(n)}
+                            for (sym, d), n in dups.head(10).items()]}
         )
 
-        con.close()
         return passed
 
     # ========================================================================
@@ -218,38 +177,18 @@ class DataIntegrityAuditor:
         """Verify ORB high/low = max/min of first 5 mins"""
         print("  -> Testing ORB construction accuracy...")
 
-        con = self.connect()
-
         # Test that ORB size = high - low (simpler test)
         # The actual construction from bars is tested in feature verification
-        query = """
-        SELECT
-            date_local,
-            orb_1000_high,
-            orb_1000_low,
-            orb_1000_size,
-            (orb_1000_high - orb_1000_low) AS computed_size
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-          AND orb_1000_high IS NOT NULL
-          AND orb_1000_low IS NOT NULL
-        LIMIT 100
-        """
-
         try:
-            result = con.execute(query).fetchdf()
+            feats = self.get_engine().frame("features_daily")
+            mismatches = int(feats.loc[feats["instrument"] == "MGC", "orb_1000_size_bad"].sum())
 
-            # Check if computed matches stored
-            mismatches = result[
-                abs(result["orb_1000_size"] - result["computed_size"]) > 0.01
-            ]
-
-            passed = len(mismatches) == 0
+            passed = mismatches == 0
             self.add_result(
                 "ORB Construction (1000)",
                 passed,
-                f"Found {len(mismatches)} mismatches in 1000 ORB size (high-low)",
-                {"mismatches": len(mismatches)}
+                f"Found {mismatches} mismatches in 1000 ORB size (high-low)",
+                {"mismatches": mismatches}
             )
 
         except Exception as e:
@@ -260,7 +199,6 @@ class DataIntegrityAuditor:
             )
             passed = False
 
-        con.close()
         return passed
 
     # ========================================================================
@@ -271,24 +209,12 @@ class DataIntegrityAuditor:
         """Check ATR values are valid (no zeros, no nulls, reasonable range)"""
         print("  -> Testing ATR validity...")
 
-        con = self.connect()
-
-        query = """
-        SELECT
-            COUNT(*) as total_rows,
-            COUNT(atr_20) as non_null_count,
-            MIN(atr_20) as min_atr,
-            MAX(atr_20) as max_atr,
-            AVG(atr_20) as avg_atr,
-            SUM(CASE WHEN atr_20 <= 0 THEN 1 ELSE 0 END) as zero_count
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-        """
-
-        result = con.execute(query).fetchone()
-        total, non_null, min_atr, max_atr, avg_atr, zero_count = result
+        profile = self.get_engine().profile("MGC")
+        total, non_null = profile["n_rows"], profile["n_atr_20"]
+        min_atr, max_atr, avg_atr = profile["min_atr_20"], profile["max_atr_20"], profile["avg_atr_20"]
+        zero_count = profile["zeros_atr_20"]
 
-        passed = zero_count == 0 and min_atr > 0
+        passed = zero_count == 0 and min_atr is not None and min_atr > 0
         self.add_result(
             "ATR Validity",
             passed,
@@ -303,7 +229,6 @@ class DataIntegrityAuditor:
             }
         )
 
-        con.close()
         return passed
 
     # ========================================================================
@@ -4,27 +4,38 @@ Based on: STEPONEA.txt
 
 Purpose: Explicit modeling of dead time and session gaps
 Turn "dead time" into testable structures instead of ignoring them
+
+Tests read the shared AuditEngine features_profile scan instead of querying
+daily_features_v2 themselves.
 """
 
-import duckdb
 import pandas as pd
 from datetime import datetime
 from typing import Dict, List
 import json
 
+try:
+    from audits.audit_engine import AuditEngine
+except ImportError:  # run as a script from audits/
+    from audit_engine import AuditEngine
+
 
 class GapTransitionAuditor:
     """Auditor for gap and transition behavior"""
 
-    def __init__(self, db_path: str = "gold.db"):
+    def __init__(self, db_path: str = "gold.db", con=None, engine: AuditEngine = None):
         self.db_path = db_path
+        self.con = con  # Optional shared connection (MasterAuditor)
+        self.engine = engine  # Optional shared scan engine (MasterAuditor)
         self.results = []
         self.passed = 0
         self.failed = 0
 
-    def connect(self):
-        """Connect to database"""
-        return duckdb.connect(self.db_path)
+    def get_engine(self) -> AuditEngine:
+        """Shared scan engine (built on first use when running standalone)"""
+        if self.engine is None:
+            self.engine = AuditEngine(self.db_path, con=self.con)
+        return self.engine
 
     def add_result(self, test_name: str, passed: bool, message: str, details: Dict = None):
         """Add test result"""
@@ -48,19 +59,8 @@ class GapTransitionAuditor:
         """Test that Asia gap data exists and is calculable"""
         print("  -> Testing Asia gap calculation...")
 
-        con = self.connect()
-
         # Check if we can calculate Asia gap (09:00 open minus prior close)
-        query = """
-        SELECT COUNT(*) as gap_count
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-          AND pre_asia_high IS NOT NULL
-          AND pre_asia_low IS NOT NULL
-        """
-
-        result = con.execute(query).fetchone()
-        gap_count = result[0]
+        gap_count = self.get_engine().profile("MGC")["n_pre_asia"]
 
         passed = gap_count > 500
         self.add_result(
@@ -70,29 +70,17 @@ class GapTransitionAuditor:
             {"gap_count": gap_count}
         )
 
-        con.close()
         return passed
 
     def test_transition_ranges(self) -> bool:
         """Test transition range calculations"""
         print("  -> Testing transition range calculations...")
 
-        con = self.connect()
-
         # Check pre-London range (17:00-18:00 transition)
-        query = """
-        SELECT
-            COUNT(*) as total,
-            COUNT(pre_london_range) as non_null,
-            AVG(pre_london_range) as avg_range,
-            MIN(pre_london_range) as min_range,
-            MAX(pre_london_range) as max_range
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-        """
-
-        result = con.execute(query).fetchone()
-        total, non_null, avg_range, min_range, max_range = result
+        profile = self.get_engine().profile("MGC")
+        total, non_null = profile["n_rows"], profile["n_pre_london_range"]
+        avg_range = profile["avg_pre_london_range"]
+        min_range, max_range = profile["min_pre_london_range"], profile["max_pre_london_range"]
 
         # Check if transition data exists
         passed = non_null > 0 and avg_range is not None
@@ -110,7 +98,6 @@ class GapTransitionAuditor:
             }
         )
 
-        con.close()
         return passed
 
     # ========================================================================
@@ -121,21 +108,9 @@ class GapTransitionAuditor:
         """Test correlation between gap direction and ORB direction"""
         print("  -> Testing gap direction vs ORB direction...")
 
-        con = self.connect()
-
         # This requires gap calculation which might not be in daily_features_v2 yet
         # For now, just verify we have the data needed for this analysis
-        query = """
-        SELECT
-            COUNT(*) as days_with_orb
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-          AND orb_0900_high IS NOT NULL
-          AND orb_0900_break_dir IS NOT NULL
-        """
-
-        result = con.execute(query).fetchone()
-        days_with_orb = result[0]
+        days_with_orb = self.get_engine().profile("MGC")["n_orb_0900_dir"]
 
         passed = days_with_orb > 0
         self.add_result(
@@ -145,7 +120,6 @@ class GapTransitionAuditor:
             {"days_with_orb": days_with_orb}
         )
 
-        con.close()
         return passed
 
     # ========================================================================
@@ -156,22 +130,10 @@ class GapTransitionAuditor:
         """Test that transition buckets have reasonable ranges"""
         print("  -> Testing transition bucket ranges...")
 
-        con = self.connect()
-
         # Check pre-London transition (should be smaller than full London session)
-        query = """
-        SELECT
-            AVG(pre_london_range) as avg_pre_london,
-            AVG(london_range) as avg_london,
-            AVG(pre_london_range) / NULLIF(AVG(london_range), 0) as ratio
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-          AND pre_london_range IS NOT NULL
-          AND london_range IS NOT NULL
-        """
-
-        result = con.execute(query).fetchone()
-        avg_pre_london, avg_london, ratio = result
+        profile = self.get_engine().profile("MGC")
+        avg_pre_london, avg_london = profile["avg_pre_london_paired"], profile["avg_london_paired"]
+        ratio = avg_pre_london / avg_london if avg_pre_london is not None and avg_london else None
 
         # Pre-London range should typically be smaller than full London
         if ratio is not None:
@@ -195,7 +157,6 @@ class GapTransitionAuditor:
             )
             passed = True
 
-        con.close()
         return passed
 
     # ========================================================================
@@ -206,23 +167,10 @@ class GapTransitionAuditor:
         """Test gap size distribution is reasonable"""
         print("  -> Testing gap size distribution...")
 
-        con = self.connect()
-
         # Check pre-Asia range as proxy for gap size
-        query = """
-        SELECT
-            COUNT(*) as total,
-            AVG(pre_asia_range) as avg_gap,
-            STDDEV(pre_asia_range) as std_gap,
-            MIN(pre_asia_range) as min_gap,
-            MAX(pre_asia_range) as max_gap
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-          AND pre_asia_range IS NOT NULL
-        """
-
-        result = con.execute(query).fetchone()
-        total, avg_gap, std_gap, min_gap, max_gap = result
+        profile = self.get_engine().profile("MGC")
+        total, avg_gap, std_gap = profile["n_pre_asia_range"], profile["avg_pre_asia_range"], profile["std_pre_asia_range"]
+        min_gap, max_gap = profile["min_pre_asia_range"], profile["max_pre_asia_range"]
 
         # Check if distribution is reasonable
         if avg_gap is not None:
@@ -248,7 +196,6 @@ class GapTransitionAuditor:
             )
             passed = True
 
-        con.close()
         return passed
 
     # ========================================================================
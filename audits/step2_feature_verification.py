@@ -7,29 +7,80 @@ Purpose: Prove that every feature used in strategies is:
 - Time-safe (no lookahead)
 - Stable across rebuilds
 - Internally consistent
+
+Size/range and distribution tests read the shared AuditEngine scans; the
+rebuild hash and ORB recompute query the tables directly.
 """
 
 import duckdb
 import pandas as pd
 import hashlib
-from datetime import datetime
-from typing import Dict, List
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
 import json
 
+try:
+    from audits.audit_engine import AuditEngine
+except ImportError:  # run as a script from audits/
+    from audit_engine import AuditEngine
+
+ORB_WINDOWS = {
+    # orb: (hour, minute, calendar-day offset from trade date)
+    "0900": (9, 0, 0),
+    "1000": (10, 0, 0),
+    "1100": (11, 0, 0),
+    "1800": (18, 0, 0),
+    "2300": (23, 0, 0),
+    "0030": (0, 30, 1),
+}
+
 
 class FeatureVerificationAuditor:
     """Auditor for feature and derived metric verification"""
 
-    def __init__(self, db_path: str = "gold.db"):
+    # Tests that verify individual days (restricted by `dates` in incremental mode)
+    PER_DAY_TESTS = ("ORB Size Calculation", "Session Range Calculation", "ORB Recompute")
+
+    def __init__(self, db_path: str = "gold.db", con=None, dates: Optional[List[date]] = None,
+                 engine: AuditEngine = None):
         self.db_path = db_path
+        self.con = con  # Optional shared connection (MasterAuditor)
+        self.engine = engine  # Optional shared scan engine (MasterAuditor)
+        self.dates = dates  # None = full audit, list = only re-verify these trade dates
         self.results = []
         self.passed = 0
         self.failed = 0
 
     def connect(self):
-        """Connect to database"""
+        """Connect to database (cursor on the shared connection when provided)"""
+        if self.con is not None:
+            return self.con.cursor()
         return duckdb.connect(self.db_path)
 
+    def get_engine(self) -> AuditEngine:
+        """Shared scan engine (built on first use when running standalone)"""
+        if self.engine is None:
+            self.engine = AuditEngine(self.db_path, con=self.con)
+            self.con = self.engine.con  # later queries reuse the engine's connection
+        return self.engine
+
+    def _changed_days(self) -> pd.DataFrame:
+        """MGC rows of the features_daily scan, restricted to self.dates in incremental mode"""
+        feats = self.get_engine().frame("features_daily")
+        feats = feats[feats["instrument"] == "MGC"]
+        if self.dates is not None:
+            feats = feats[pd.to_datetime(feats["date_local"]).dt.date.isin(set(self.dates))]
+        return feats
+
+    def _date_filter(self, column: str = "date_local") -> str:
+        """SQL predicate restricting per-day tests to self.dates (empty for full audit)"""
+        if self.dates is None:
+            return ""
+        if not self.dates:
+            return "AND FALSE"
+        days = ", ".join(f"DATE '{d.isoformat()}'" for d in self.dates)
+        return f"AND {column} IN ({days})"
+
     def add_result(self, test_name: str, passed: bool, message: str, details: Dict = None):
         """Add test result"""
         self.results.append({
@@ -100,59 +151,108 @@ class FeatureVerificationAuditor:
         """Verify ORB size = high - low"""
         print("  -> Testing ORB size calculations...")
 
-        con = self.connect()
-
-        query = """
-        SELECT
-            date_local,
-            orb_0900_size,
-            orb_0900_high - orb_0900_low AS recomputed_size
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-          AND orb_0900_size IS NOT NULL
-          AND ABS(orb_0900_size - (orb_0900_high - orb_0900_low)) > 0.01
-        LIMIT 10
-        """
-
-        result = con.execute(query).fetchall()
+        errors = int(self._changed_days()["orb_0900_size_bad"].sum())
 
-        passed = len(result) == 0
+        passed = errors == 0
         self.add_result(
             "ORB Size Calculation (0900)",
             passed,
-            f"Found {len(result)} ORB size calculation errors",
-            {"errors": len(result)}
+            f"Found {errors} ORB size calculation errors",
+            {"errors": errors}
         )
 
-        con.close()
         return passed
 
     def test_session_range_calculation(self) -> bool:
         """Verify session range = high - low"""
         print("  -> Testing session range calculations...")
 
+        errors = int(self._changed_days()["asia_range_bad"].sum())
+
+        passed = errors == 0
+        self.add_result(
+            "Session Range Calculation (Asia)",
+            passed,
+            f"Found {errors} session range calculation errors",
+            {"errors": errors}
+        )
+
+        return passed
+
+    def test_orb_recompute(self) -> bool:
+        """Recompute every ORB high/low from bars_1m and compare to stored values"""
+        print("  -> Recomputing ORBs from bars_1m...")
+
+        if self.dates is not None and not self.dates:
+            self.add_result(
+                "ORB Recompute",
+                True,
+                "No changed days since last verified audit - skipped",
+                {"days_checked": 0}
+            )
+            return True
+
         con = self.connect()
 
-        query = """
+        orbs_sql = ", ".join(f"('{orb}', {h}, {m}, {off})" for orb, (h, m, off) in ORB_WINDOWS.items())
+        stored_sql = "\nUNION ALL\n".join(
+            f"SELECT date_local, '{orb}' AS orb, orb_{orb}_high AS high, orb_{orb}_low AS low, orb_{orb}_size AS size "
+            f"FROM daily_features_v2 WHERE instrument = 'MGC' {self._date_filter()}"
+            for orb in ORB_WINDOWS
+        )
+        bar_days = None
+        if self.dates is not None:
+            bar_days = sorted(set(self.dates) | {d + timedelta(days=1) for d in self.dates})
+        bar_filter = ""
+        if bar_days:
+            bar_filter = "AND CAST(timezone('Australia/Brisbane', ts_utc) AS DATE) IN (" + \
+                ", ".join(f"DATE '{d.isoformat()}'" for d in bar_days) + ")"
+
+        query = f"""
+        WITH orbs(orb, hh, mm, day_offset) AS (VALUES {orbs_sql}),
+        b AS (
+            SELECT timezone('Australia/Brisbane', ts_utc) AS ts_local, high, low
+            FROM bars_1m
+            WHERE symbol = 'MGC' {bar_filter}
+        ),
+        recomputed AS (
+            SELECT
+                o.orb,
+                CAST(b.ts_local AS DATE) - o.day_offset AS date_local,
+                MAX(b.high) AS high,
+                MIN(b.low) AS low
+            FROM b
+            JOIN orbs o
+              ON EXTRACT(HOUR FROM b.ts_local) = o.hh
+             AND EXTRACT(MINUTE FROM b.ts_local) BETWEEN o.mm AND o.mm + 4
+            GROUP BY 1, 2
+        ),
+        stored AS ({stored_sql})
         SELECT
-            date_local,
-            asia_range,
-            asia_high - asia_low AS recomputed_range
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-          AND asia_range IS NOT NULL
-          AND ABS(asia_range - (asia_high - asia_low)) > 0.01
-        LIMIT 10
+            s.date_local, s.orb, s.high, s.low, s.size, r.high AS r_high, r.low AS r_low
+        FROM stored s
+        LEFT JOIN recomputed r ON r.date_local = s.date_local AND r.orb = s.orb
+        WHERE s.high IS NOT NULL
+          AND (r.high IS NULL
+               OR ABS(s.high - r.high) > 0.001
+               OR ABS(s.low - r.low) > 0.001
+               OR ABS(s.size - (r.high - r.low)) > 0.01)
+        ORDER BY s.date_local, s.orb
         """
 
-        result = con.execute(query).fetchall()
+        mismatches = con.execute(query).fetchall()
+        days_checked = len(self.dates) if self.dates is not None else None
 
-        passed = len(result) == 0
+        passed = len(mismatches) == 0
         self.add_result(
-            "Session Range Calculation (Asia)",
+            "ORB Recompute",
             passed,
-            f"Found {len(result)} session range calculation errors",
-            {"errors": len(result)}
+            f"Found {len(mismatches)} stored ORBs that differ from bars_1m"
+            + (f" ({days_checked} changed days checked)" if days_checked is not None else " (full history)"),
+            {
+                "days_checked": days_checked,
+                "mismatches": [{"date": str(r[0]), "orb": r[1]} for r in mismatches[:10]]
+            }
         )
 
         con.close()
@@ -166,7 +266,7 @@ class FeatureVerificationAuditor:
         """Check feature distributions for sanity"""
         print("  -> Testing feature distributions...")
 
-        con = self.connect()
+        profile = self.get_engine().profile("MGC")
 
         features_to_check = [
             "orb_0900_size",
@@ -181,22 +281,11 @@ class FeatureVerificationAuditor:
         all_passed = True
 
         for feature in features_to_check:
-            query = f"""
-            SELECT
-                COUNT(*) as total,
-                COUNT({feature}) as non_null,
-                MIN({feature}) as min_val,
-                MAX({feature}) as max_val,
-                AVG({feature}) as mean_val,
-                STDDEV({feature}) as std_val,
-                SUM(CASE WHEN {feature} = 0 THEN 1 ELSE 0 END) as zero_count
-            FROM daily_features_v2
-            WHERE instrument = 'MGC'
-            """
-
             try:
-                result = con.execute(query).fetchone()
-                total, non_null, min_val, max_val, mean_val, std_val, zero_count = result
+                total, non_null = profile["n_rows"], profile[f"n_{feature}"]
+                min_val, max_val = profile[f"min_{feature}"], profile[f"max_{feature}"]
+                mean_val, std_val = profile[f"avg_{feature}"], profile[f"std_{feature}"]
+                zero_count = profile[f"zeros_{feature}"]
 
                 # Check for issues
                 issues = []
@@ -234,7 +323,6 @@ class FeatureVerificationAuditor:
                 )
                 all_passed = False
 
-        con.close()
         return all_passed
 
     # ========================================================================
@@ -245,8 +333,6 @@ class FeatureVerificationAuditor:
         """Test feature correlations to outcomes (detect leakage)"""
         print("  -> Testing feature correlations (leakage detection)...")
 
-        con = self.connect()
-
         # For now, just check that features exist and have variance
         # Actual correlation to outcomes requires trade data
 
@@ -257,7 +343,6 @@ class FeatureVerificationAuditor:
             {"note": "Implement with actual trade data: corr(feature, orb_r)"}
         )
 
-        con.close()
         return True
 
     # ========================================================================
@@ -274,6 +359,7 @@ class FeatureVerificationAuditor:
             ("Deterministic Rebuild", self.test_deterministic_rebuild),
             ("ORB Size Calculation", self.test_orb_size_calculation),
             ("Session Range Calculation", self.test_session_range_calculation),
+            ("ORB Recompute", self.test_orb_recompute),
             ("Feature Distributions", self.test_feature_distributions),
             ("Feature Correlations", self.test_feature_correlations),
         ]
@@ -4,20 +4,28 @@ Based on: STEPTWOA.txt
 
 Purpose: Enforce time-safety at code level with hard assertions
 Ensure features are only used AFTER they become available
+
+Data checks read the shared AuditEngine features_profile scan.
 """
 
-import duckdb
 import pandas as pd
 from datetime import datetime, time
 from typing import Dict, List
 import json
 
+try:
+    from audits.audit_engine import AuditEngine
+except ImportError:  # run as a script from audits/
+    from audit_engine import AuditEngine
+
 
 class TimeSafetyAuditor:
     """Auditor for time-safety assertions"""
 
-    def __init__(self, db_path: str = "gold.db"):
+    def __init__(self, db_path: str = "gold.db", con=None, engine: AuditEngine = None):
         self.db_path = db_path
+        self.con = con  # Optional shared connection (MasterAuditor)
+        self.engine = engine  # Optional shared scan engine (MasterAuditor)
         self.results = []
         self.passed = 0
         self.failed = 0
@@ -51,9 +59,11 @@ class TimeSafetyAuditor:
             "0030": {"atr_20", "orb_0030_size"},
         }
 
-    def connect(self):
-        """Connect to database"""
-        return duckdb.connect(self.db_path)
+    def get_engine(self) -> AuditEngine:
+        """Shared scan engine (built on first use when running standalone)"""
+        if self.engine is None:
+            self.engine = AuditEngine(self.db_path, con=self.con)
+        return self.engine
 
     def add_result(self, test_name: str, passed: bool, message: str, details: Dict = None):
         """Add test result"""
@@ -129,22 +139,11 @@ class TimeSafetyAuditor:
         """Test that ORB data is only available after ORB close"""
         print("  -> Testing ORB availability timing...")
 
-        con = self.connect()
-
         # Verify that ORB features in database respect time boundaries
         # For example, 09:00 ORB should only have data for times >= 09:05
-        query = """
-        SELECT
-            COUNT(*) as total,
-            COUNT(orb_0900_high) as orb_0900_count,
-            COUNT(orb_1000_high) as orb_1000_count,
-            COUNT(orb_1800_high) as orb_1800_count
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-        """
-
-        result = con.execute(query).fetchone()
-        total, orb_0900, orb_1000, orb_1800 = result
+        profile = self.get_engine().profile("MGC")
+        total = profile["n_rows"]
+        orb_0900, orb_1000, orb_1800 = profile["n_orb_0900"], profile["n_orb_1000"], profile["n_orb_1800"]
 
         # All ORBs should have similar counts (within reasonable variance)
         variance = max(orb_0900, orb_1000, orb_1800) - min(orb_0900, orb_1000, orb_1800)
@@ -163,30 +162,17 @@ class TimeSafetyAuditor:
             }
         )
 
-        con.close()
         return passed
 
     def test_atr_no_lookahead(self) -> bool:
         """Test that ATR doesn't use future data"""
         print("  -> Testing ATR zero-lookahead...")
 
-        con = self.connect()
-
         # ATR should be available at start of day (computed from prior days)
         # Check that ATR values are reasonable and stable
-        query = """
-        SELECT
-            COUNT(*) as total,
-            COUNT(atr_20) as atr_count,
-            AVG(atr_20) as avg_atr,
-            MIN(atr_20) as min_atr,
-            MAX(atr_20) as max_atr
-        FROM daily_features_v2
-        WHERE instrument = 'MGC'
-        """
-
-        result = con.execute(query).fetchone()
-        total, atr_count, avg_atr, min_atr, max_atr = result
+        profile = self.get_engine().profile("MGC")
+        total, atr_count = profile["n_rows"], profile["n_atr_20"]
+        avg_atr, min_atr = profile["avg_atr_20"], profile["min_atr_20"]
 
         # ATR should exist for most days and be positive
         passed = atr_count > total * 0.9 and (min_atr > 0 if min_atr else False)
@@ -204,7 +190,6 @@ class TimeSafetyAuditor:
             }
         )
 
-        con.close()
         return passed
 
     # ========================================================================
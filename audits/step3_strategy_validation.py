@@ -21,14 +21,17 @@ import numpy as np
 class StrategyValidationAuditor:
     """Auditor for strategy validation"""
 
-    def __init__(self, db_path: str = "gold.db"):
+    def __init__(self, db_path: str = "gold.db", con=None):
         self.db_path = db_path
+        self.con = con  # Optional shared connection (MasterAuditor)
         self.results = []
         self.passed = 0
         self.failed = 0
 
     def connect(self):
-        """Connect to database"""
+        """Connect to database (cursor on the shared connection when provided)"""
+        if self.con is not None:
+            return self.con.cursor()
         return duckdb.connect(self.db_path)
 
     def add_result(self, test_name: str, passed: bool, message: str, details: Dict = None):
@@ -12,6 +12,8 @@ import duckdb
 from dotenv import load_dotenv
 from zoneinfo import ZoneInfo
 
+from roll_calendar import RollCalendar
+
 import databento as db
 from databento.common.error import BentoClientError
 
@@ -139,15 +141,18 @@ def safe_get_range_with_retries(
     end_utc: dt.datetime,
     max_retries: int,
     retry_sleep_sec: float,
+    raw_symbol: Optional[str] = None,
 ):
+    # raw_symbol (e.g. PLF6) fetches one contract instead of every child of the parent
+    stype_in, symbols = ("raw_symbol", [raw_symbol]) if raw_symbol else ("parent", [parent_symbol])
     last_err: Optional[Exception] = None
     for attempt in range(1, max_retries + 1):
         try:
             return client.timeseries.get_range(
                 dataset=dataset,
                 schema=schema,
-                stype_in="parent",
-                symbols=[parent_symbol],
+                stype_in=stype_in,
+                symbols=symbols,
                 start=start_utc.isoformat(),
                 end=end_utc.isoformat(),
             )
@@ -320,6 +325,10 @@ def main():
         # Initialize MPL tables
         init_mpl_tables(con)
 
+        # Roll calendar: days with a known front contract fetch only that contract
+        calendar = RollCalendar(con, cfg.symbol, bars_table="bars_1m_mpl", tz_local=cfg.tz_local)
+        calendar.learn_from_bars()
+
         days = list(daterange_inclusive(start_day, end_day))
         days = list(reversed(days))  # newest -> oldest
 
@@ -334,8 +343,7 @@ def main():
                 print(f"{d} (local) [{start_utc.isoformat()} -> {end_utc.isoformat()}] -> inserted/replaced 0 rows (no data; past available_end)")
                 continue
 
-            store = safe_get_range_with_retries(
-                client,
+            fetch = dict(
                 dataset=cfg.dataset,
                 schema=cfg.schema,
                 parent_symbol=cfg.parent_symbol,
@@ -345,7 +353,13 @@ def main():
                 retry_sleep_sec=cfg.retry_sleep_sec,
             )
 
-            df = store.to_df()
+            df = None
+            entry = calendar.contract_for(d, exact=True)
+            if entry:
+                df = safe_get_range_with_retries(client, raw_symbol=entry.contract, **fetch).to_df()
+            if df is None or len(df) == 0:
+                df = safe_get_range_with_retries(client, **fetch).to_df()
+
             if df is None or len(df) == 0:
                 print(f"{d} (local) [{start_utc.isoformat()} -> {end_utc.isoformat()}] -> inserted/replaced 0 rows (no data)")
                 continue
@@ -378,6 +392,7 @@ def main():
 
             inserted = upsert_bars_1m(con, cfg, front, rows_1m)
             total += inserted
+            calendar.record(d, front)
 
             print(
                 f"{d} (local) [{start_utc.isoformat()} -> {end_utc.isoformat()}] -> front={front} -> inserted/replaced {inserted} rows"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
 import datetime as dt
@@ -8,10 +9,13 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
 import duckdb
-import httpx
 from dotenv import load_dotenv
 from zoneinfo import ZoneInfo
 
+from motherduck_sync import log_changed_range
+from projectx_api import AsyncProjectXSession, ProjectXSettings, get_session
+from roll_calendar import RollCalendar
+
 
 # -----------------------------
 # Config
@@ -53,53 +57,31 @@ def env_cfg() -> Cfg:
 
 
 # -----------------------------
-# ProjectX minimal client
+# ProjectX client
 # -----------------------------
 
 class ProjectX:
+    """Thin wrapper over the shared pooled session (projectx_api)"""
+
     def __init__(self, cfg: Cfg):
         self.cfg = cfg
-        self.token: Optional[str] = None
+        self.session = get_session(ProjectXSettings(
+            base_url=cfg.base_url, username=cfg.username, api_key=cfg.api_key, live=cfg.live
+        ))
+        self.bar_requests = 0  # retrieveBars calls (session stats also count logins and retries)
 
-    def _headers(self) -> Dict[str, str]:
-        h = {"accept": "text/plain", "Content-Type": "application/json"}
-        if self.token:
-            h["Authorization"] = f"Bearer {self.token}"
-        return h
+    @property
+    def token(self) -> Optional[str]:
+        return self.session.token
 
     def login_key(self) -> str:
-        url = f"{self.cfg.base_url}/api/Auth/loginKey"
-        payload = {"userName": self.cfg.username, "apiKey": self.cfg.api_key}
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(url, headers=self._headers(), json=payload)
-            r.raise_for_status()
-            data = r.json()
-        if not data.get("success"):
-            raise RuntimeError(f"Login failed: {data}")
-        self.token = data["token"]
-        return self.token
+        return self.session.login()
 
     def contract_search(self, search_text: str) -> Dict[str, Any]:
-        url = f"{self.cfg.base_url}/api/Contract/search"
-        payload = {"searchText": search_text, "live": self.cfg.live}
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(url, headers=self._headers(), json=payload)
-            r.raise_for_status()
-            data = r.json()
-        if not data.get("success"):
-            raise RuntimeError(f"Contract search failed: {data}")
-        return data
+        return self.session.contract_search(search_text)
 
     def list_available_contracts(self) -> Dict[str, Any]:
-        url = f"{self.cfg.base_url}/api/Contract/available"
-        payload = {"live": self.cfg.live}
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(url, headers=self._headers(), json=payload)
-            r.raise_for_status()
-            data = r.json()
-        if not data.get("success"):
-            raise RuntimeError(f"Contract available failed: {data}")
-        return data
+        return self.session.list_available_contracts()
 
     def retrieve_bars(
         self,
@@ -111,24 +93,21 @@ class ProjectX:
         limit: int = 20000,
         include_partial: bool = False,
     ) -> List[Dict[str, Any]]:
-        url = f"{self.cfg.base_url}/api/History/retrieveBars"
-        payload = {
-            "contractId": contract_id,
-            "live": self.cfg.live,
-            "startTime": start_iso_z,
-            "endTime": end_iso_z,
-            "unit": unit,
-            "unitNumber": unit_number,
-            "limit": limit,
-            "includePartialBar": include_partial,
-        }
-        with httpx.Client(timeout=60.0) as client:
-            r = client.post(url, headers=self._headers(), json=payload)
-            r.raise_for_status()
-            data = r.json()
-        if not data.get("success"):
-            raise RuntimeError(f"retrieveBars failed: {data}")
-        return data.get("bars") or []
+        self.bar_requests += 1
+        return self.session.retrieve_bars(
+            contract_id, start_iso_z, end_iso_z,
+            unit=unit, unit_number=unit_number, limit=limit, include_partial=include_partial,
+        )
+
+    def retrieve_bars_many(self, contract_id: str, windows: List[Tuple[str, str]]) -> List[List[Dict[str, Any]]]:
+        """1m bars for several (start, end) windows fetched concurrently; results keep window order"""
+        async def run() -> List[List[Dict[str, Any]]]:
+            # Same token and rate-limit budget as the pooled sync session
+            async with AsyncProjectXSession.from_session(self.session) as session:
+                return await session.retrieve_bars_many(contract_id, windows, include_partial=False)
+
+        self.bar_requests += len(windows)
+        return asyncio.run(run())
 
 
 # -----------------------------
@@ -260,10 +239,11 @@ def pick_contract_for_day(
     start_iso_z: str,
     end_iso_z: str,
     preferred: Optional[Dict[str, Any]],
+    hint: Optional[Dict[str, Any]] = None,
 ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
     """
-    Try preferred contract first. If no bars returned, scan other MGC contracts (newest->oldest)
-    until we get bars. If none return bars, return (preferred, []).
+    Try the roll-calendar hint, then the preferred contract. If no bars returned, scan other
+    MGC contracts (newest->oldest) until we get bars. If none return bars, return (preferred, []).
     """
     tried_ids = set()
 
@@ -282,14 +262,13 @@ def pick_contract_for_day(
             include_partial=False,
         )
 
-    if preferred:
-        bars = try_one(preferred)
-        if bars:
-            return preferred, bars
+    for c in (hint, preferred):
+        if c:
+            bars = try_one(c)
+            if bars:
+                return c, bars
 
     for c in mgc_contracts:
-        if preferred and c.get("id") == preferred.get("id"):
-            continue
         bars = try_one(c)
         if bars:
             return c, bars
@@ -297,6 +276,27 @@ def pick_contract_for_day(
     return preferred, []
 
 
+def prefetch_hinted_days(
+    px: ProjectX,
+    hints: Dict[dt.date, Dict[str, Any]],
+    windows: Dict[dt.date, Tuple[str, str]],
+) -> Dict[dt.date, List[Dict[str, Any]]]:
+    """
+    Fetch every day that has a roll-calendar contract concurrently (one batch per
+    contract). Days whose hint returns no bars come back empty and are left to
+    pick_contract_for_day.
+    """
+    days_by_contract: Dict[str, List[dt.date]] = {}
+    for d, contract in hints.items():
+        days_by_contract.setdefault(contract["id"], []).append(d)
+
+    bars: Dict[dt.date, List[Dict[str, Any]]] = {}
+    for contract_id, days in days_by_contract.items():
+        results = px.retrieve_bars_many(contract_id, [windows[d] for d in days])
+        bars.update(zip(days, results))
+    return bars
+
+
 # -----------------------------
 # Main
 # -----------------------------
@@ -329,19 +329,43 @@ def main():
 
     con = duckdb.connect(cfg.db_path)
 
-    total = 0
-    current_contract: Optional[Dict[str, Any]] = None
+    # Roll calendar: known front contract per day -> one targeted request per day
+    calendar = RollCalendar(con, cfg.symbol, tz_local=cfg.tz_local)
+    calendar.learn_from_bars()
+    contracts_by_name = {c.get("name"): c for c in mgc_contracts if c.get("name")}
 
     # Pull 1 LOCAL day at a time: [local 09:00 -> next local 09:00] converted to UTC
+    windows: Dict[dt.date, Tuple[str, str]] = {}
+    hints: Dict[dt.date, Dict[str, Any]] = {}
     for d in daterange_inclusive(start_day, end_day):
-        start_utc = iso_utc_from_local_date(d, 9, 0, 0, cfg.tz_local)
-        end_utc = iso_utc_from_local_date(d + dt.timedelta(days=1), 9, 0, 0, cfg.tz_local)
+        windows[d] = (
+            iso_utc_from_local_date(d, 9, 0, 0, cfg.tz_local),
+            iso_utc_from_local_date(d + dt.timedelta(days=1), 9, 0, 0, cfg.tz_local),
+        )
+        entry = calendar.contract_for(d)
+        hint = contracts_by_name.get(entry.contract) if entry else None
+        if hint and hint.get("id"):
+            hints[d] = hint
+
+    # Days with a known front contract are fetched concurrently up front
+    prefetched = prefetch_hinted_days(px, hints, windows)
+    print(f"Prefetched {len(prefetched)} calendar days concurrently")
 
-        picked, bars = pick_contract_for_day(px, mgc_contracts, start_utc, end_utc, current_contract)
+    total = 0
+    current_contract: Optional[Dict[str, Any]] = None
+
+    for d, (start_utc, end_utc) in windows.items():
+        if prefetched.get(d):
+            picked, bars = hints[d], prefetched[d]
+        else:
+            # No calendar entry, or its contract returned nothing: scan the contract list
+            picked, bars = pick_contract_for_day(px, mgc_contracts, start_utc, end_utc, current_contract)
         current_contract = picked
 
         source_symbol = (picked.get("name") if picked else None) or ""
         contract_id = (picked.get("id") if picked else None) or ""
+        if bars:
+            calendar.record(d, source_symbol, contract_id)
 
         inserted = upsert_bars_1m(con, cfg, source_symbol, bars)
         total += inserted
@@ -359,8 +383,12 @@ def main():
     rebuild_5m_from_1m(con, cfg, range_start_utc, range_end_utc)
     print("OK: rebuilt 5m bars for range")
 
+    # Record rewritten range for incremental MotherDuck sync
+    for table in ("bars_1m", "bars_5m"):
+        log_changed_range(con, table, range_start_utc, range_end_utc, partition=cfg.symbol)
+
     con.close()
-    print(f"OK: bars_1m upsert total = {total}")
+    print(f"OK: bars_1m upsert total = {total} ({px.bar_requests} retrieveBars requests)")
 
     # Build daily_features (calls your existing script)
     for d in daterange_inclusive(start_day, end_day):
@@ -0,0 +1,14 @@
+"""
+Performance benchmarks for the data pipeline and engines.
+
+Times the hot paths (feature building, execution sweeps, EDE backtest and
+validation, query_engine dashboards, live strategy evaluation) on fixed,
+seeded datasets, writes results with machine metadata to JSON, and compares
+runs against a stored baseline.
+
+Usage:
+  python -m benchmarks.run
+  python -m benchmarks.run --only feature_build,query_dashboard --repeat 5
+  python -m benchmarks.run --save-baseline
+  python -m benchmarks.run --compare benchmarks/baseline.json
+"""
@@ -0,0 +1,175 @@
+"""
+Fixed benchmark datasets.
+
+Each dataset is a gold.db built from synthetic_bars.py: bars_1m, bars_5m,
+daily_features_v2 (built by FeatureBuilderV2, so orb_facts and indicator
+state come along) and the EDE tables. Datasets are cached under
+benchmarks/.data/ and rebuilt when DATASET_VERSION changes, so every run
+times the same rows.
+"""
+
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+SCHEMA = REPO_ROOT / "schema.sql"
+
+for _path in (REPO_ROOT, REPO_ROOT / "ede", REPO_ROOT / "trading_app"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+# Bump when the generated rows change (invalidates cached datasets and baselines)
+DATASET_VERSION = 3
+
+VALIDATED_SETUPS = [("0900", 1.0), ("1000", 2.0), ("1100", 1.0), ("1800", 1.5), ("2300", 1.5), ("0030", 1.5)]
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    start: date
+    days: int
+    seed: int = 7
+    symbol: str = "MGC"
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.days - 1)
+
+
+DATASETS = {
+    "tiny": DatasetSpec("tiny", date(2025, 1, 6), 35),
+    "small": DatasetSpec("small", date(2025, 1, 6), 90),
+    "medium": DatasetSpec("medium", date(2024, 1, 8), 365),
+}
+
+
+def live_bars(spec: DatasetSpec, end, minutes: int) -> pd.DataFrame:
+    """Seeded, gap-free 1m bars ending at end, in live_bars column order"""
+    rng = np.random.default_rng(spec.seed)
+    index = pd.date_range(end=end, periods=minutes, freq="1min")
+    close = 2650.0 + np.cumsum(rng.normal(0, 0.4, minutes))
+    open_ = close + rng.normal(0, 0.15, minutes)
+    return pd.DataFrame({
+        "ts_utc": index,
+        "symbol": spec.symbol,
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.exponential(0.3, minutes),
+        "low": np.minimum(open_, close) - rng.exponential(0.3, minutes),
+        "close": close,
+        "volume": rng.integers(1, 300, minutes),
+    })
+
+
+def build_gold_db(path: Path, spec: DatasetSpec) -> None:
+    """Write a complete gold.db for spec at path"""
+    from build_daily_features_v2 import FeatureBuilderV2
+    from synthetic_bars import generate_bars
+    import init_ede_schema
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()
+
+    # FeatureBuilderV2's own daily_features_v2 DDL first (schema.sql keeps the narrower one otherwise)
+    builder = FeatureBuilderV2(str(path))
+    try:
+        builder.init_schema_v2()
+        builder.con.execute(SCHEMA.read_text())
+        generate_bars(builder.con, [spec.symbol], spec.start, spec.end, seed=spec.seed)
+        builder.con.execute("""
+            INSERT OR REPLACE INTO bars_5m
+            SELECT to_timestamp(floor(epoch(ts_utc) / 300) * 300), symbol, arg_max(source_symbol, ts_utc),
+                   arg_min(open, ts_utc), max(high), min(low), arg_max(close, ts_utc), sum(volume)
+            FROM bars_1m GROUP BY 1, 2
+        """)
+        day = spec.start
+        while day <= spec.end:
+            builder.build_features(day)
+            day += timedelta(days=1)
+
+        # Minimal validated_setups so config_generator yields live strategy configs
+        builder.con.execute("""
+            CREATE TABLE IF NOT EXISTS validated_setups (
+                instrument VARCHAR, orb_time VARCHAR, rr DOUBLE, sl_mode VARCHAR, orb_size_filter DOUBLE
+            )
+        """)
+        builder.con.executemany(
+            "INSERT INTO validated_setups VALUES (?, ?, ?, ?, ?)",
+            [[spec.symbol, orb, rr, "FULL", None] for orb, rr in VALIDATED_SETUPS],
+        )
+    finally:
+        builder.close()
+
+    # init_ede_schema writes to its module-level DB_PATH
+    default_path = init_ede_schema.DB_PATH
+    init_ede_schema.DB_PATH = str(path)
+    try:
+        init_ede_schema.init_ede_schema()
+    finally:
+        init_ede_schema.DB_PATH = default_path
+
+
+def gold_db(name: str, rebuild: bool = False) -> Path:
+    """Path to the cached dataset, building it on first use"""
+    spec = DATASETS[name]
+    path = DATA_DIR / f"{name}-v{DATASET_VERSION}" / "gold.db"
+    if rebuild or not path.exists():
+        print(f"Building dataset '{name}' ({spec.days} days from {spec.start}) -> {path}")
+        build_gold_db(path, spec)
+    return path
+
+
+def copy_db(source: Path, target_dir: Path) -> Path:
+    """Scratch copy for benchmarks that write"""
+    target = Path(target_dir) / source.name
+    shutil.copyfile(source, target)
+    return target
+
+
+@contextmanager
+def live_workspace(root: Path, gold: Path, spec: DatasetSpec, minutes: int = 3 * 24 * 60):
+    """
+    Working directory laid out like a local trading_app checkout: ../gold.db
+    exists (local mode) and live_data.db holds seeded live_bars ending now.
+    """
+    app_dir = Path(root) / "app"
+    app_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(gold, Path(root) / "gold.db")
+
+    bars = live_bars(spec, pd.Timestamp.now(tz="UTC").floor("min"), minutes)
+    con = duckdb.connect(str(app_dir / "live_data.db"))
+    try:
+        con.execute("""
+            CREATE OR REPLACE TABLE live_bars (
+                ts_utc TIMESTAMPTZ NOT NULL, symbol VARCHAR NOT NULL,
+                open DOUBLE, high DOUBLE, low DOUBLE, close DOUBLE, volume BIGINT,
+                PRIMARY KEY (symbol, ts_utc)
+            )
+        """)
+        con.register("bench_bars", bars)
+        con.execute("INSERT INTO live_bars SELECT * FROM bench_bars")
+    finally:
+        con.close()
+
+    cwd, gold_env = os.getcwd(), os.environ.get("GOLD_DB_PATH")
+    os.chdir(app_dir)
+    os.environ["GOLD_DB_PATH"] = str(Path(root) / "gold.db")
+    try:
+        yield app_dir
+    finally:
+        os.chdir(cwd)
+        if gold_env is None:
+            os.environ.pop("GOLD_DB_PATH", None)
+        else:
+            os.environ["GOLD_DB_PATH"] = gold_env
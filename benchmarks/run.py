@@ -0,0 +1,182 @@
+"""
+Run the benchmark suite and compare against a baseline.
+
+Results are written as JSON (metadata + per-benchmark timings) to
+benchmarks/results/<timestamp>.json. --compare exits 1 when any benchmark's
+median regresses by more than --threshold (and by at least --min-delta
+seconds, so millisecond-level noise does not fail a run).
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from benchmarks.datasets import DATASET_VERSION, DATASETS, REPO_ROOT, gold_db
+from benchmarks.suite import BENCHMARKS
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def machine_metadata(dataset: str) -> dict:
+    """Where and on what the numbers were measured"""
+    import duckdb
+    import numpy
+    import pandas
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    memory_gb = None
+    if hasattr(os, "sysconf") and "SC_PHYS_PAGES" in os.sysconf_names:
+        memory_gb = round(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3, 1)
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "memory_gb": memory_gb,
+        "python": platform.python_version(),
+        "duckdb": duckdb.__version__,
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "dataset": dataset,
+        "dataset_version": DATASET_VERSION,
+    }
+
+
+def time_benchmark(bench, ctx, repeat: int) -> dict:
+    """Set up once, warm up once, then time repeat calls"""
+    run = bench.setup(ctx)
+    run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "mean": statistics.fmean(times),
+        "repeat": repeat,
+        "times": times,
+    }
+
+
+def run_suite(dataset: str, names, repeat: int = None) -> dict:
+    """Run the named benchmarks on dataset; failures are recorded, not raised"""
+    gold = gold_db(dataset)
+    results = {}
+    # Engines log per call; keep timings free of handler I/O
+    logging.disable(logging.INFO)
+    for name in names:
+        bench = BENCHMARKS[name]
+        scratch = Path(tempfile.mkdtemp(prefix=f"bench_{name}_"))
+        ctx = SimpleNamespace(gold=gold, spec=DATASETS[dataset], scratch=scratch, closing=[], exits=[])
+        try:
+            results[name] = time_benchmark(bench, ctx, repeat or bench.repeat)
+            print(f"[OK] {name:<20} median {results[name]['median'] * 1000:10.1f} ms")
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"[ERROR] {name:<17} {results[name]['error']}")
+        finally:
+            for obj in reversed(ctx.closing):
+                obj.close()
+            for cm in reversed(ctx.exits):
+                cm.__exit__(None, None, None)
+            shutil.rmtree(scratch, ignore_errors=True)
+    logging.disable(logging.NOTSET)
+    return {"metadata": machine_metadata(dataset), "results": results}
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.20, min_delta: float = 0.005) -> list:
+    """Print a comparison table; returns names that regressed"""
+    regressions = []
+    if current["metadata"].get("dataset") != baseline["metadata"].get("dataset") or \
+            current["metadata"].get("dataset_version") != baseline["metadata"].get("dataset_version"):
+        print("[WARN] Baseline was recorded on a different dataset; ratios are not comparable")
+
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if "error" in result:
+            print(f"[FAIL] {name:<20} {result['error']}")
+            regressions.append(name)
+            continue
+        if not base or "median" not in base:
+            print(f"[WARN] {name:<20} no baseline")
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else float("inf")
+        delta = result["median"] - base["median"]
+        line = f"{name:<20} {base['median'] * 1000:10.1f} ms -> {result['median'] * 1000:10.1f} ms ({ratio:5.2f}x)"
+        if ratio > 1 + threshold and delta > min_delta:
+            print(f"[FAIL] {line}")
+            regressions.append(name)
+        else:
+            print(f"[OK] {line}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run performance benchmarks")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="small")
+    parser.add_argument("--only", help="Comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, help="Override per-benchmark repeat count")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed median slowdown (0.20 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Ignore slowdowns below this many seconds")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write results to {BASELINE}")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for bench in BENCHMARKS.values():
+            print(f"{bench.name:<20} {bench.description}")
+        return 0
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"[ERROR] Unknown benchmark(s): {', '.join(unknown)}")
+        return 2
+
+    report = run_suite(args.dataset, names, args.repeat)
+
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{args.dataset}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(report, indent=2))
+        print(f"Baseline written to {BASELINE}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        print()
+        regressions = compare(report, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n[FAIL] {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Benchmark registry.
+
+Each benchmark is a function (ctx) -> callable: the function does untimed
+setup (copies, connections, warm imports) and returns the closure that is
+timed. ctx provides the dataset path, its spec and a scratch directory.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict
+
+from benchmarks.datasets import copy_db, live_workspace
+
+ORBS = ["0900", "1000", "1100", "1800", "2300", "0030"]
+
+BENCH_CANDIDATE = {
+    "idea_id": "bench_orb_0900",
+    "instrument": "MGC",
+    "entry_type": "break",
+    "entry_time_start": "23:00:00",
+    "entry_time_end": "23:05:00",
+    "entry_condition_json": '{"direction": "long"}',
+    "stop_type": "fixed_r",
+    "stop_r": 1.0,
+    "target_r": 2.0,
+    "session_window": "orb_0900",
+    "filters_json": None,
+}
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable
+    repeat: int
+    description: str
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, repeat: int = 5):
+    """Register a setup function under name"""
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, repeat, (setup.__doc__ or "").strip())
+        return setup
+    return register
+
+
+@benchmark("feature_build", repeat=1)
+def feature_build(ctx):
+    """FeatureBuilderV2.build_features over the last 10 days"""
+    from build_daily_features_v2 import FeatureBuilderV2
+
+    path = copy_db(ctx.gold, ctx.scratch)
+    days = [ctx.spec.end - timedelta(days=i) for i in range(9, -1, -1)]
+
+    def run():
+        builder = FeatureBuilderV2(str(path))
+        try:
+            for day in days:
+                builder.build_features(day)
+        finally:
+            builder.close()
+    return run
+
+
+@benchmark("simulate_sweep", repeat=3)
+def simulate_sweep(ctx):
+    """simulate_orb_trade for every ORB x 2 RR over 10 days"""
+    import duckdb
+    from execution_engine import simulate_orb_trade
+
+    con = duckdb.connect(str(ctx.gold), read_only=True)
+    ctx.closing.append(con)
+    days = [ctx.spec.end - timedelta(days=i) for i in range(14)]
+    days = [d for d in days if d.weekday() < 5][:10]
+
+    def run():
+        for day in days:
+            for orb in ORBS:
+                for rr in (1.0, 2.0):
+                    simulate_orb_trade(con, day, orb, rr=rr)
+    return run
+
+
+@benchmark("ede_backtest", repeat=3)
+def ede_backtest(ctx):
+    """BacktestEngine.backtest_candidate over the whole dataset"""
+    from backtest_engine import BacktestEngine
+
+    engine = BacktestEngine(str(ctx.gold))
+    start, end = str(ctx.spec.start), str(ctx.spec.end)
+    return lambda: engine.backtest_candidate(dict(BENCH_CANDIDATE), start, end)
+
+
+@benchmark("ede_validate", repeat=1)
+def ede_validate(ctx):
+    """ValidationPipeline.validate_candidate (baseline, stress, walk-forward)"""
+    from validation_pipeline import ValidationPipeline
+
+    path = copy_db(ctx.gold, ctx.scratch)
+    pipeline = ValidationPipeline(str(path))
+    start, end = str(ctx.spec.start), str(ctx.spec.end)
+    return lambda: pipeline.validate_candidate(dict(BENCH_CANDIDATE), start, end)
+
+
+@benchmark("significance_fdr", repeat=3)
+def significance_fdr(ctx):
+    """SignificanceTester + BH over 2,000 seeded candidates (20-600 trades, 2,000 resamples)"""
+    import numpy as np
+    from significance import SignificanceTester, benjamini_hochberg
+
+    rng = np.random.default_rng(ctx.spec.seed)
+    trades = {f"cand_{i}": rng.choice([-1.0, 2.0], rng.integers(20, 600)) for i in range(2000)}
+
+    def run():
+        stats = SignificanceTester(n_resamples=2000).test(trades)
+        benjamini_hochberg(stats["p_value"])
+    return run
+
+
+@benchmark("query_dashboard", repeat=5)
+def query_dashboard(ctx):
+    """query_engine dashboard calls on a cold cache"""
+    import duckdb
+    import query_engine as qe
+
+    con = duckdb.connect(str(ctx.gold), read_only=True)
+    ctx.closing.append(con)
+    filters = qe.Filters(
+        start_date=None, end_date=None, orb_times=(), break_dir="ANY", outcomes=(),
+        asia_type_code=None, include_null_asia=True, london_type_code=None, include_null_london=True,
+        pre_ny_type_code=None, include_null_pre_ny=True, enable_atr_filter=False, atr_min=None,
+        atr_max=None, enable_asia_range_filter=False, asia_range_min=None, asia_range_max=None,
+    )
+
+    def run():
+        qe.clear_cache()
+        qe.headline_stats(con, filters)
+        qe.equity_curve(con, filters)
+        qe.histogram(con, filters)
+        qe.heatmap(con, filters)
+        qe.drilldown(con, filters)
+    return run
+
+
+def _live_loader(ctx):
+    """LiveDataLoader in a local-mode workspace (kept open until teardown)"""
+    workspace = live_workspace(ctx.scratch / "live", ctx.gold, ctx.spec)
+    workspace.__enter__()
+    ctx.exits.append(workspace)
+    from data_loader import LiveDataLoader
+    loader = LiveDataLoader(ctx.spec.symbol)
+    ctx.closing.append(loader)
+    loader.refresh()
+    return loader
+
+
+@benchmark("live_refresh", repeat=10)
+def live_refresh(ctx):
+    """LiveDataLoader.refresh from live_bars"""
+    return _live_loader(ctx).refresh
+
+
+@benchmark("strategy_evaluate", repeat=10)
+def strategy_evaluate(ctx):
+    """StrategyEngine.evaluate_all on a loaded LiveDataLoader"""
+    import config_generator
+    from strategy_engine import StrategyEngine
+
+    engine = StrategyEngine(_live_loader(ctx))
+    # config.py loads configs at import from the repo-root gold.db; use the dataset's instead
+    default_path = config_generator.DB_PATH
+    config_generator.DB_PATH = ctx.gold
+    try:
+        engine.orb_configs, engine.orb_size_filters = config_generator.load_instrument_configs(ctx.spec.symbol)
+    finally:
+        config_generator.DB_PATH = default_path
+    return engine.evaluate_all
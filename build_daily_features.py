@@ -8,6 +8,8 @@ from typing import Optional, Dict, List, Tuple
 
 import duckdb
 
+from indicator_state import IndicatorStore, WilderATR, WilderRSI, advance, bars_feed
+
 # ─────────────────────────────────────────────────────────────
 # CONFIG
 # ─────────────────────────────────────────────────────────────
@@ -499,22 +501,10 @@ def compute_orb_generic(
         "mfe": outcome_data["mfe"],
     }
 
-    # RSI at ORB (optional)
+    # RSI at ORB (optional): streaming Wilder state from bars_5m, only if the ORB bar exists
     if compute_rsi:
-        rsi_lookback_start = orb_start_utc - timedelta(hours=24)
-        bars_5m = fetch_bars_5m(con, rsi_lookback_start, orb_end_utc)
-        rsi_val: Optional[float] = None
-        if bars_5m:
-            closes = [b.c for b in bars_5m]
-            rsis = rsi_wilder(closes, RSI_LEN)
-            # Find the 5m bucket that starts exactly at orb_start_utc
-            idx = None
-            for i, b in enumerate(bars_5m):
-                if b.ts_utc == orb_start_utc:
-                    idx = i
-                    break
-            if idx is not None:
-                rsi_val = rsis[idx]
+        rsi = advance(IndicatorStore(con), bars_feed(INSTRUMENT, ("close",)), lambda: WilderRSI(RSI_LEN), orb_start_utc)
+        rsi_val = rsi.value if rsi.last_ts == orb_start_utc else None
         result["rsi_at_orb"] = (float(rsi_val) if rsi_val is not None else None)
 
     return result
@@ -664,18 +654,14 @@ def main(date_local_str: str) -> None:
         pre_ny_travel = travel_range_1m(fetch_bars_1m(con, pre_ny_start_utc, pre_ny_end_utc))
         pre_orb_travel = travel_range_1m(fetch_bars_1m(con, pre_orb_start_utc, pre_orb_end_utc))
 
-        # Compute ATR_20 (using 5m bars from trading day start)
-        # Fetch 24 hours of 5m bars before Asia start for ATR calculation
-        atr_lookback_start = asia_start_utc - timedelta(hours=24)
-        atr_bars_5m = fetch_bars_5m(con, atr_lookback_start, asia_start_utc)
-        atr_20: Optional[float] = None
-        if len(atr_bars_5m) >= ATR_LEN + 1:
-            highs = [b.h for b in atr_bars_5m]
-            lows = [b.l for b in atr_bars_5m]
-            closes = [b.c for b in atr_bars_5m]
-            atr_values = atr_wilder(highs, lows, closes, ATR_LEN)
-            # Use the last ATR value (at Asia start)
-            atr_20 = atr_values[-1]
+        # Compute ATR_20: streaming Wilder state over bars_5m up to Asia start
+        atr = advance(
+            IndicatorStore(con),
+            bars_feed(INSTRUMENT, ("high", "low", "close")),
+            lambda: WilderATR(ATR_LEN),
+            asia_start_utc - timedelta(minutes=5),
+        )
+        atr_20: Optional[float] = atr.value
 
         # Classify session types
         asia_type = classify_asia_type(asia_range, atr_20)
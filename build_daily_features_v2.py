@@ -39,12 +39,16 @@ Usage:
   python build_daily_features_v2.py 2024-01-02 2026-01-10 --sl-mode half
 """
 
-import duckdb
+import db_metrics
 import sys
 from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 from typing import Optional, Dict, Tuple, List
 
+from indicator_state import IndicatorStore, WindowMean, WindowRSI, advance, asia_range_feed, bars_feed
+from motherduck_sync import log_changed_range
+from orb_facts import FEATURE_TABLES, init_orb_facts, instrument_for_table, refresh_orb_facts
+
 TZ_LOCAL = ZoneInfo("Australia/Brisbane")
 TZ_UTC = ZoneInfo("UTC")
 
@@ -62,9 +66,10 @@ def _dt_local(d: date, hh: int, mm: int) -> datetime:
 
 class FeatureBuilderV2:
     def __init__(self, db_path: str = DB_PATH, sl_mode: str = "full", table_name: str = "daily_features_v2"):
-        self.con = duckdb.connect(db_path)
+        self.con = db_metrics.connect(db_path)
         self.sl_mode = sl_mode
         self.table_name = table_name
+        self.symbol = SYMBOL
 
     # ---------- core time-window fetchers (FIX midnight safely) ----------
     def _window_stats_1m(self, start_local: datetime, end_local: datetime) -> Optional[Dict]:
@@ -308,56 +313,26 @@ class FeatureBuilderV2:
         }
 
     # ---------- RSI ----------
+    @property
+    def indicators(self) -> IndicatorStore:
+        # Lazily created: NQ/MPL builders set up their own connection
+        if getattr(self, "_indicators", None) is None:
+            self._indicators = IndicatorStore(self.con)
+        return self._indicators
+
     def calculate_rsi_at(self, at_local: datetime) -> Optional[float]:
+        """Simple RSI over the last 15 bars_5m closes at or before at_local (persisted state)"""
         at_utc = at_local.astimezone(TZ_UTC)
-        closes = self.con.execute(
-            """
-            SELECT close
-            FROM bars_5m
-            WHERE symbol = ?
-              AND ts_utc <= ?
-            ORDER BY ts_utc DESC
-            LIMIT 15
-            """,
-            [SYMBOL, at_utc],
-        ).fetchall()
-
-        if len(closes) < 15:
-            return None
-
-        closes = [float(x[0]) for x in reversed(closes)]
-        gains, losses = [], []
-        for i in range(1, len(closes)):
-            ch = closes[i] - closes[i - 1]
-            gains.append(max(ch, 0.0))
-            losses.append(max(-ch, 0.0))
-
-        avg_gain = sum(gains[:RSI_LEN]) / RSI_LEN
-        avg_loss = sum(losses[:RSI_LEN]) / RSI_LEN
-        if avg_loss == 0:
-            return 100.0
-        rs = avg_gain / avg_loss
-        return 100.0 - (100.0 / (1.0 + rs))
+        feed = bars_feed(SYMBOL, ("close",))
+        return advance(self.indicators, feed, lambda: WindowRSI(RSI_LEN), at_utc).value
 
     # ---------- ATR (simple) ----------
     def calculate_atr(self, trade_date: date) -> Optional[float]:
-        rows = self.con.execute(
-            """
-            SELECT asia_high, asia_low
-            FROM daily_features_v2
-            WHERE date_local < ?
-              AND asia_high IS NOT NULL
-            ORDER BY date_local DESC
-            LIMIT 20
-            """,
-            [trade_date],
-        ).fetchall()
-
-        if len(rows) < 20:
-            return None
-
-        trs = [float(h) - float(l) for (h, l) in rows]
-        return sum(trs) / len(trs)
+        """Mean Asia range of the 20 prior days with an Asia session (persisted state)"""
+        feed = asia_range_feed(SYMBOL, "daily_features_v2")
+        return advance(
+            self.indicators, feed, lambda: WindowMean(20, "asia_range_mean"), trade_date - timedelta(days=1)
+        ).value
 
     # ---------- deterministic type codes (level interactions only) ----------
     @staticmethod
@@ -600,10 +575,25 @@ class FeatureBuilderV2:
             ],
         )
 
+        # Keep long-format orb_facts in step with the canonical wide table
+        self.sync_orb_facts(trade_date, trade_date)
+
+        # Record rewritten day for incremental MotherDuck sync
+        log_changed_range(self.con, self.table_name, trade_date, trade_date + timedelta(days=1), partition=self.symbol)
+
         self.con.commit()
         print("  [OK] Features saved")
         return True
 
+    def sync_orb_facts(self, start_date: date, end_date: date) -> int:
+        """Refresh orb_facts from this builder's wide table for a date range and log it for sync"""
+        if self.table_name not in FEATURE_TABLES.values():
+            return 0
+        rows = refresh_orb_facts(self.con, self.table_name, start_date=start_date, end_date=end_date)
+        log_changed_range(self.con, "orb_facts", start_date, end_date + timedelta(days=1),
+                          partition=instrument_for_table(self.table_name))
+        return rows
+
     def init_schema_v2(self):
         self.con.execute(
             f"""
@@ -708,6 +698,7 @@ class FeatureBuilderV2:
             )
             """
         )
+        init_orb_facts(self.con)
         self.con.commit()
         print(f"{self.table_name} table created (sl_mode={self.sl_mode})")
 
@@ -21,7 +21,7 @@ Usage:
     nq_configs, nq_filters = load_instrument_configs('NQ')
 """
 
-import duckdb
+import db_metrics
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 import logging
@@ -60,7 +60,7 @@ def get_database_connection():
             return None
 
         try:
-            conn = duckdb.connect(f'md:projectx_prod?motherduck_token={token}')
+            conn = db_metrics.connect(f'md:projectx_prod?motherduck_token={token}')
             logger.info("Connected to MotherDuck for config loading")
             return conn
         except Exception as e:
@@ -72,7 +72,7 @@ def get_database_connection():
             logger.warning(f"Database not found at {DB_PATH}")
             return None
 
-        return duckdb.connect(str(DB_PATH), read_only=True)
+        return db_metrics.connect(str(DB_PATH), read_only=True)
 
 
 def load_instrument_configs(
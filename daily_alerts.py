@@ -20,6 +20,8 @@ from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+from edge_stats import EdgeSpec, EdgeStatsEngine
+
 
 @dataclass
 class SetupRecommendation:
@@ -47,8 +49,24 @@ class DailyAlertSystemV2:
         "0030": "00:30 (NYSE Cash)",
     }
 
+    # Setups the analyze_* methods look up (MORNING_SPECS fetches them all in one scan)
+    SPEC_0900_PRE_ASIA = EdgeSpec("0900", "(pre_asia_range / 0.1) > 50")
+    SPEC_1000_UP = EdgeSpec("1000", "orb_1000_break_dir = 'UP'")
+    SPEC_1100_UP_PRE_ASIA = EdgeSpec("1100", "orb_1100_break_dir = 'UP' AND (pre_asia_range / 0.1) > 50")
+    SPEC_1800_BASELINE = EdgeSpec("1800", "1=1")
+    SPEC_1800_DOWN_PRE_LONDON = EdgeSpec("1800", "orb_1800_break_dir = 'DOWN' AND (pre_london_range / 0.1) > 40")
+
+    MORNING_SPECS = [
+        SPEC_0900_PRE_ASIA,
+        SPEC_1000_UP,
+        SPEC_1100_UP_PRE_ASIA,
+        SPEC_1800_BASELINE,
+        SPEC_1800_DOWN_PRE_LONDON,
+    ]
+
     def __init__(self, db_path: str = "gold.db"):
         self.con = duckdb.connect(db_path, read_only=True)
+        self.edge_stats = EdgeStatsEngine(self.con)
 
     def get_pre_asia_data(self, target_date: date) -> Optional[Dict]:
         """Get PRE_ASIA data (available at 09:00)"""
@@ -101,28 +119,12 @@ class DailyAlertSystemV2:
         condition: str,
         params: List
     ) -> Dict:
-        """Get historical performance for a setup"""
-        query = f"""
-            SELECT
-                COUNT(*) as total,
-                SUM(CASE WHEN orb_{orb_time}_outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
-                AVG(orb_{orb_time}_r_multiple) as avg_r,
-                SUM(orb_{orb_time}_r_multiple) as total_r
-            FROM daily_features_v2
-            WHERE orb_{orb_time}_outcome IN ('WIN', 'LOSS')
-              AND {condition}
-        """
+        """Get historical performance for a setup (memoized, see edge_stats.py)"""
+        return self.edge_stats.get(orb_time, condition, params)
 
-        result = self.con.execute(query, params).fetchone()
-        total, wins, avg_r, total_r = result
-
-        return {
-            "total_trades": total or 0,
-            "wins": wins or 0,
-            "win_rate": wins / total if total else 0,
-            "avg_r": avg_r or 0,
-            "total_r": total_r or 0,
-        }
+    def spec_performance(self, spec: EdgeSpec) -> Dict:
+        """Historical performance of one of the class's SPEC_* setups"""
+        return self.get_historical_performance(spec.orb_time, spec.condition, spec.params)
 
     def analyze_0900(self, pre_asia: Dict) -> List[SetupRecommendation]:
         """Analyze 09:00 ORB (available: PRE_ASIA)"""
@@ -134,11 +136,7 @@ class DailyAlertSystemV2:
         # Only recommend if PRE_ASIA > 50 ticks
         if pre_asia['range_ticks'] > 50:
             # Check overall performance with this filter
-            hist = self.get_historical_performance(
-                "0900",
-                "(pre_asia_range / 0.1) > 50",
-                []
-            )
+            hist = self.spec_performance(self.SPEC_0900_PRE_ASIA)
 
             if hist["total_trades"] >= 20:
                 recommendations.append(SetupRecommendation(
@@ -160,11 +158,7 @@ class DailyAlertSystemV2:
         recommendations = []
 
         # 10:00 UP is the best standalone setup
-        hist = self.get_historical_performance(
-            "1000",
-            "orb_1000_break_dir = 'UP'",
-            []
-        )
+        hist = self.spec_performance(self.SPEC_1000_UP)
 
         if hist["total_trades"] >= 50:
             recommendations.append(SetupRecommendation(
@@ -194,11 +188,7 @@ class DailyAlertSystemV2:
 
         # 11:00 UP with PRE_ASIA > 50 ticks
         if pre_asia['range_ticks'] > 50:
-            hist = self.get_historical_performance(
-                "1100",
-                "orb_1100_break_dir = 'UP' AND (pre_asia_range / 0.1) > 50",
-                []
-            )
+            hist = self.spec_performance(self.SPEC_1100_UP_PRE_ASIA)
 
             if hist["total_trades"] >= 20:
                 recommendations.append(SetupRecommendation(
@@ -236,11 +226,7 @@ class DailyAlertSystemV2:
         if not pre_london_row or pre_london_row[0] is None:
             # PRE_LONDON not available yet (it's only 07:00-09:00 in morning)
             # Baseline 18:00 recommendation
-            hist = self.get_historical_performance(
-                "1800",
-                "1=1",  # No filter
-                []
-            )
+            hist = self.spec_performance(self.SPEC_1800_BASELINE)  # No filter
 
             if hist["total_trades"] >= 50:
                 recommendations.append(SetupRecommendation(
@@ -260,11 +246,7 @@ class DailyAlertSystemV2:
 
         # 18:00 DOWN with PRE_LONDON > 40 ticks
         if pre_london_ticks > 40:
-            hist = self.get_historical_performance(
-                "1800",
-                "orb_1800_break_dir = 'DOWN' AND (pre_london_range / 0.1) > 40",
-                []
-            )
+            hist = self.spec_performance(self.SPEC_1800_DOWN_PRE_LONDON)
 
             if hist["total_trades"] >= 20:
                 recommendations.append(SetupRecommendation(
@@ -287,6 +269,7 @@ class DailyAlertSystemV2:
         # Get available data
         pre_asia = self.get_pre_asia_data(target_date)
         prev_orbs = self.get_previous_day_orbs(target_date)
+        self.edge_stats.prefetch(self.MORNING_SPECS)
 
         # Print header
         print("\n" + "="*80)
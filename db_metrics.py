@@ -0,0 +1,494 @@
+"""
+Instrumented DuckDB connections - per-statement latency, rows and call site.
+
+connect() is a drop-in for duckdb.connect(). The returned connection times
+every execute()/executemany() together with the fetch that materializes its
+result, counts the rows returned and notes the calling file:line. Records are
+buffered in memory and flushed in batches to a separate metrics database
+(db_metrics.db at the repo root), so instrumentation never writes to gold.db
+or holds its lock:
+
+    query_log         one row per statement (ts, fingerprint, database,
+                      call_site, seconds, rows, slow, error)
+    query_statements  normalized SQL per fingerprint
+    query_profiles    EXPLAIN ANALYZE output of slow statements
+
+Statements are grouped by fingerprint: the SQL with literals replaced by ?
+and whitespace collapsed. Statements that raise are recorded with error set.
+A read-only statement slower than the threshold is re-run once per process
+under EXPLAIN ANALYZE on a cursor of its connection; the re-run is queued to a
+background thread so the caller does not pay for it twice.
+
+Environment:
+    DB_METRICS=0       disable (connect() returns the plain duckdb connection)
+    DB_METRICS_PATH    metrics database (default: <repo>/db_metrics.db)
+    DB_SLOW_QUERY_MS   slow-query threshold in ms (default: 250)
+
+Usage:
+    python db_metrics.py report [--hours 24] [--top 20] [--sort total|p95|calls|max]
+    python db_metrics.py profile <fingerprint>
+    python db_metrics.py prune [--days 30]
+"""
+
+import argparse
+import atexit
+import hashlib
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent
+DEFAULT_METRICS_PATH = REPO_ROOT / "db_metrics.db"
+DEFAULT_SLOW_MS = 250.0
+
+FLUSH_EVERY = 500        # buffered records before a flush
+FLUSH_SECONDS = 30.0     # close() flushes when the buffer is older than this
+MAX_BUFFER = 20_000      # records kept while the metrics DB is unavailable
+READ_VERBS = {"select", "with", "from", "values", "table", "pivot", "unpivot", "summarize", "describe", "show"}
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+
+METRICS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_log (
+    ts TIMESTAMP,
+    pid INTEGER,
+    fingerprint VARCHAR,
+    database VARCHAR,
+    call_site VARCHAR,
+    seconds DOUBLE,
+    rows BIGINT,
+    slow BOOLEAN,
+    error BOOLEAN
+);
+ALTER TABLE query_log ADD COLUMN IF NOT EXISTS error BOOLEAN;
+CREATE TABLE IF NOT EXISTS query_statements (
+    fingerprint VARCHAR PRIMARY KEY,
+    statement VARCHAR
+);
+CREATE TABLE IF NOT EXISTS query_profiles (
+    ts TIMESTAMP,
+    fingerprint VARCHAR,
+    database VARCHAR,
+    call_site VARCHAR,
+    seconds DOUBLE,
+    statement VARCHAR,
+    plan VARCHAR
+);
+"""
+
+
+def metrics_path() -> Path:
+    return Path(os.getenv("DB_METRICS_PATH") or DEFAULT_METRICS_PATH)
+
+
+def enabled() -> bool:
+    return os.getenv("DB_METRICS", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def slow_seconds() -> float:
+    try:
+        return float(os.getenv("DB_SLOW_QUERY_MS", DEFAULT_SLOW_MS)) / 1000
+    except ValueError:
+        return DEFAULT_SLOW_MS / 1000
+
+
+@lru_cache(maxsize=4096)
+def normalize(sql: str) -> str:
+    """SQL with comments dropped, literals replaced by ? and whitespace collapsed"""
+    return " ".join(_LITERALS.sub("?", _COMMENTS.sub(" ", sql)).split())
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    return hashlib.sha1(normalize(sql).lower().encode()).hexdigest()[:12]
+
+
+def is_read_only(sql: str) -> bool:
+    words = normalize(sql).lstrip("( ").split(None, 1)
+    return bool(words) and words[0].lower() in READ_VERBS
+
+
+def _label(database: Any) -> str:
+    """Database name for the log (MotherDuck tokens and local paths stripped)"""
+    text = str(database).split("?", 1)[0]
+    return text if text.startswith("md:") or text == ":memory:" else Path(text).name
+
+
+def _call_site() -> str:
+    """file:line function of the first frame outside this module"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    path = Path(frame.f_code.co_filename)
+    try:
+        path = path.resolve().relative_to(REPO_ROOT)
+    except (ValueError, OSError):
+        pass
+    return f"{path.as_posix()}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+class MetricsRecorder:
+    """Process-wide buffer of statement records, flushed to the metrics DB"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._log: List[tuple] = []
+        self._statements: Dict[str, str] = {}
+        self._profiles: List[tuple] = []
+        self._oldest: Optional[float] = None
+        self.profiled = set()
+
+    def record(self, sql: str, database: str, call_site: str, seconds: float, rows: Optional[int], slow: bool,
+               error: bool = False):
+        fp = fingerprint(sql)
+        with self._lock:
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._log.append((datetime.now(), os.getpid(), fp, database, call_site, seconds, rows, slow, error))
+            self._statements.setdefault(fp, normalize(sql))
+            if len(self._log) > MAX_BUFFER:
+                del self._log[:len(self._log) - MAX_BUFFER]
+            full = len(self._log) >= FLUSH_EVERY
+        if full:
+            self.flush()
+
+    def claim_profile(self, sql: str) -> bool:
+        """True the first time a fingerprint is profiled in this process"""
+        fp = fingerprint(sql)
+        with self._lock:
+            if fp in self.profiled:
+                return False
+            self.profiled.add(fp)
+            return True
+
+    def add_profile(self, sql: str, database: str, call_site: str, seconds: float, plan: str):
+        with self._lock:
+            self._profiles.append((datetime.now(), fingerprint(sql), database, call_site, seconds, sql, plan))
+
+    def stale(self) -> bool:
+        with self._lock:
+            return self._oldest is not None and time.monotonic() - self._oldest >= FLUSH_SECONDS
+
+    def flush(self) -> bool:
+        """Write buffered records; on failure (e.g. DB locked) they are kept for the next flush"""
+        with self._lock:
+            if not self._log and not self._profiles:
+                return True
+            log, statements, profiles = self._log, self._statements, self._profiles
+            self._log, self._statements, self._profiles, self._oldest = [], {}, [], None
+        try:
+            con = duckdb.connect(str(metrics_path()))
+            try:
+                con.execute(METRICS_SCHEMA)
+                con.execute("BEGIN TRANSACTION")
+                if log:
+                    con.executemany("""
+                        INSERT INTO query_log (ts, pid, fingerprint, database, call_site, seconds, rows, slow, error)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, log)
+                if statements:
+                    con.executemany("INSERT OR IGNORE INTO query_statements VALUES (?, ?)", list(statements.items()))
+                if profiles:
+                    con.executemany("INSERT INTO query_profiles VALUES (?, ?, ?, ?, ?, ?, ?)", profiles)
+                con.execute("COMMIT")
+            finally:
+                con.close()
+            return True
+        except Exception as e:
+            logger.warning(f"Could not write query metrics to {metrics_path()}: {e}")
+            with self._lock:
+                self._log[:0] = log[-MAX_BUFFER:]
+                for fp, sql in statements.items():
+                    self._statements.setdefault(fp, sql)
+                self._profiles[:0] = profiles
+                self._oldest = self._oldest or time.monotonic()
+            return False
+
+
+RECORDER = MetricsRecorder()
+atexit.register(RECORDER.flush)
+
+_profiler: Optional[ThreadPoolExecutor] = None
+_profiler_lock = threading.Lock()
+
+
+def _profile_executor() -> ThreadPoolExecutor:
+    """Single background thread that runs queued EXPLAIN ANALYZE captures"""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-metrics-profile")
+        return _profiler
+
+
+def _profile(cursor, query: str, parameters, database: str, call_site: str, seconds: float):
+    """Re-run a slow statement under EXPLAIN ANALYZE on its own cursor and buffer the plan"""
+    try:
+        args = ("EXPLAIN ANALYZE " + query,) if parameters is None else ("EXPLAIN ANALYZE " + query, parameters)
+        plan = "\n".join(str(r[-1]) for r in cursor.execute(*args).fetchall())
+    except Exception as e:
+        plan = f"EXPLAIN ANALYZE failed: {e}"
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+    RECORDER.add_profile(query, database, call_site, seconds, plan)
+
+
+def _rows(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, tuple):  # fetchone
+        return 1
+    if isinstance(result, dict):  # fetchnumpy
+        return len(next(iter(result.values()), []))
+    if hasattr(result, "num_rows"):  # arrow
+        return result.num_rows
+    return len(result)
+
+
+class InstrumentedConnection:
+    """
+    Proxy around a duckdb connection that records each statement.
+
+    A statement stays pending until its result is fully fetched (or the next
+    statement / close), so fetch time and row counts land on the same record.
+    Anything not overridden here goes straight to the wrapped connection.
+    """
+
+    def __init__(self, con: duckdb.DuckDBPyConnection, database: str, slow: Optional[float] = None):
+        self._con = con
+        self.database = database
+        self.slow = slow_seconds() if slow is None else slow
+        self._pending: Optional[list] = None
+        self._profiles: list = []  # queued EXPLAIN ANALYZE futures
+
+    def __getattr__(self, name):
+        return getattr(self._con, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def raw(self) -> duckdb.DuckDBPyConnection:
+        """The wrapped connection (for callers that need the real type)"""
+        return self._con
+
+    def execute(self, query: str, parameters=None):
+        self._finish()
+        site = _call_site()
+        start = time.perf_counter()
+        try:
+            if parameters is None:
+                self._con.execute(query)
+            else:
+                self._con.execute(query, parameters)
+        except Exception:
+            self._failed(query, site, time.perf_counter() - start)
+            raise
+        self._pending = [query, parameters, site, time.perf_counter() - start, None]
+        return self
+
+    def executemany(self, query: str, parameters=None):
+        self._finish()
+        site = _call_site()
+        start = time.perf_counter()
+        try:
+            self._con.executemany(query, parameters if parameters is not None else [])
+        except Exception:
+            self._failed(query, site, time.perf_counter() - start)
+            raise
+        RECORDER.record(query, self.database, site, time.perf_counter() - start, 0, False)
+        return self
+
+    def cursor(self):
+        return InstrumentedConnection(self._con.cursor(), self.database, self.slow)
+
+    def duplicate(self):
+        return InstrumentedConnection(self._con.duplicate(), self.database, self.slow)
+
+    def close(self):
+        self._finish()
+        wait(self._profiles)  # queued profiles use cursors of this connection
+        self._profiles = []
+        self._con.close()
+        if RECORDER.stale():
+            RECORDER.flush()
+
+    def _fetched(self, elapsed: float, rows: int, done: bool):
+        if self._pending is not None:
+            self._pending[3] += elapsed
+            self._pending[4] = (self._pending[4] or 0) + rows
+            if done:
+                self._finish()
+
+    def _failed(self, query: str, site: str, seconds: float):
+        RECORDER.record(query, self.database, site, seconds, None, seconds >= self.slow, error=True)
+
+    def _finish(self):
+        """Record the pending statement; queue a profile when slow"""
+        if self._pending is None:
+            return
+        query, parameters, site, seconds, rows = self._pending
+        self._pending = None
+        slow = seconds >= self.slow
+        RECORDER.record(query, self.database, site, seconds, rows, slow)
+        if slow and is_read_only(query) and RECORDER.claim_profile(query):
+            self._profiles = [f for f in self._profiles if not f.done()]
+            self._profiles.append(_profile_executor().submit(
+                _profile, self._con.cursor(), query, parameters, self.database, site, seconds
+            ))
+
+
+def _fetch(name: str, done: bool):
+    def method(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = getattr(self._con, name)(*args, **kwargs)
+        self._fetched(time.perf_counter() - start, _rows(result), done or (name == "fetchone" and result is None))
+        return result
+    method.__name__ = name
+    return method
+
+
+for _name in ("fetchall", "fetchdf", "fetch_df", "df", "fetchnumpy", "arrow", "fetch_arrow_table", "pl"):
+    setattr(InstrumentedConnection, _name, _fetch(_name, True))
+for _name in ("fetchone", "fetchmany"):
+    setattr(InstrumentedConnection, _name, _fetch(_name, False))
+
+
+def connect(database: Any = ":memory:", read_only: bool = False, config: Optional[dict] = None):
+    """duckdb.connect() that records statement metrics (see module docstring)"""
+    con = duckdb.connect(database, read_only=read_only, config=config or {})
+    if not enabled() or str(database) == str(metrics_path()):
+        return con
+    return InstrumentedConnection(con, _label(database))
+
+
+# ---------------------------------------------------------------------------
+# Report CLI
+# ---------------------------------------------------------------------------
+
+SORT_COLUMNS = {"total": "total_ms", "p95": "p95_ms", "calls": "calls", "max": "max_ms"}
+
+
+def hot_queries(con, hours: float = 24, top: int = 20, sort: str = "total") -> List[dict]:
+    """Statements ranked by total / p95 / max latency or call count"""
+    since = datetime.now() - timedelta(hours=hours)
+    df = con.execute(f"""
+        SELECT l.fingerprint,
+               count(*) AS calls,
+               sum(l.seconds) * 1000 AS total_ms,
+               avg(l.seconds) * 1000 AS mean_ms,
+               quantile_cont(l.seconds, 0.95) * 1000 AS p95_ms,
+               max(l.seconds) * 1000 AS max_ms,
+               avg(l.rows) AS avg_rows,
+               count(*) FILTER (WHERE l.slow) AS slow_calls,
+               count(*) FILTER (WHERE l.error) AS errors,
+               mode(l.call_site) AS call_site,
+               any_value(l.database) AS database,
+               any_value(s.statement) AS statement,
+               bool_or(p.fingerprint IS NOT NULL) AS profiled
+        FROM query_log l
+        LEFT JOIN query_statements s USING (fingerprint)
+        LEFT JOIN (SELECT DISTINCT fingerprint FROM query_profiles) p USING (fingerprint)
+        WHERE l.ts >= ?
+        GROUP BY l.fingerprint
+        ORDER BY {SORT_COLUMNS[sort]} DESC
+        LIMIT ?
+    """, [since, top]).fetchdf()
+    return df.to_dict("records")
+
+
+def print_report(con, hours: float, top: int, sort: str):
+    rows = hot_queries(con, hours, top, sort)
+    print(f"Hot queries - last {hours:g}h, by {sort}")
+    print("=" * 100)
+    if not rows:
+        print("[WARN] No statements recorded in this window")
+        return
+    print(f"{'fingerprint':<13}{'calls':>7}{'total ms':>11}{'mean':>9}{'p95':>9}{'max':>9}{'rows':>9}  call site")
+    print("-" * 100)
+    for r in rows:
+        flag = (" [SLOW]" if r["slow_calls"] else "") + (f" [ERROR x{r['errors']}]" if r["errors"] else "")
+        print(f"{r['fingerprint']:<13}{r['calls']:>7}{r['total_ms']:>11.1f}{r['mean_ms']:>9.1f}"
+              f"{r['p95_ms']:>9.1f}{r['max_ms']:>9.1f}{r['avg_rows'] or 0:>9.0f}  {r['call_site']}{flag}")
+        statement = (r["statement"] or "")[:95]
+        print(f"    [{r['database']}] {statement}" + ("  (profile captured)" if r["profiled"] else ""))
+
+
+def print_profile(con, fp: str):
+    row = con.execute("""
+        SELECT ts, database, call_site, seconds, statement, plan FROM query_profiles
+        WHERE fingerprint LIKE ? ORDER BY ts DESC LIMIT 1
+    """, [fp + "%"]).fetchone()
+    if row is None:
+        print(f"[ERROR] No profile captured for {fp}")
+        return False
+    ts, database, call_site, seconds, statement, plan = row
+    print(f"Profile {fp} - {seconds * 1000:.1f} ms at {ts:%Y-%m-%d %H:%M:%S} [{database}] {call_site}")
+    print("=" * 100)
+    print(statement)
+    print("-" * 100)
+    print(plan)
+    return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="DuckDB query metrics report")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="rank hot queries")
+    report.add_argument("--hours", type=float, default=24)
+    report.add_argument("--top", type=int, default=20)
+    report.add_argument("--sort", choices=sorted(SORT_COLUMNS), default="total")
+    profile = sub.add_parser("profile", help="show the EXPLAIN ANALYZE capture for a fingerprint")
+    profile.add_argument("fingerprint")
+    prune = sub.add_parser("prune", help="delete records older than --days")
+    prune.add_argument("--days", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    path = metrics_path()
+    if not path.exists():
+        print(f"[ERROR] No metrics database at {path}")
+        return 1
+    con = duckdb.connect(str(path), read_only=args.command != "prune")
+    try:
+        if args.command == "report":
+            print_report(con, args.hours, args.top, args.sort)
+        elif args.command == "profile":
+            return 0 if print_profile(con, args.fingerprint) else 1
+        else:
+            cutoff = datetime.now() - timedelta(days=args.days)
+            deleted = con.execute("DELETE FROM query_log WHERE ts < ?", [cutoff]).fetchone()[0]
+            con.execute("DELETE FROM query_profiles WHERE ts < ?", [cutoff])
+            con.execute("""
+                DELETE FROM query_statements
+                WHERE fingerprint NOT IN (SELECT fingerprint FROM query_log)
+                  AND fingerprint NOT IN (SELECT fingerprint FROM query_profiles)
+            """)
+            print(f"[OK] Pruned {deleted} records older than {args.days} days")
+    finally:
+        con.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
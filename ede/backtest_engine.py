@@ -16,7 +16,6 @@ Output:
 - Sample size metrics
 """
 
-import duckdb
 import pandas as pd
 import numpy as np
 from datetime import datetime, time as dt_time, timedelta
@@ -24,6 +23,10 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import logging
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import db_metrics
 
 DB_PATH = str(Path(__file__).parent.parent / "gold.db")
 
@@ -124,7 +127,7 @@ class BacktestEngine:
 
     def _get_connection(self):
         """Get database connection."""
-        return duckdb.connect(self.db_path, read_only=True)
+        return db_metrics.connect(self.db_path, read_only=True)
 
     def load_bars(self, instrument: str, start_date: str, end_date: str) -> pd.DataFrame:
         """
@@ -647,7 +650,7 @@ if __name__ == "__main__":
     engine = BacktestEngine()
 
     # Load a candidate
-    con = duckdb.connect(DB_PATH)
+    con = db_metrics.connect(DB_PATH)
     candidate = con.execute("""
         SELECT *
         FROM edge_candidates_raw
@@ -29,6 +29,7 @@ from ede.generator_brute import BruteParameterGenerator
 from ede.validation_pipeline import ValidationPipeline
 from ede.lifecycle_manager import LifecycleManager, EdgeStatus
 from ede.backtest_engine import BacktestEngine
+from significance import FDR_ALPHA
 import duckdb
 
 # Configure logging
@@ -88,7 +89,7 @@ def cmd_validate(args):
 
     pipeline = ValidationPipeline()
 
-    survivors = []
+    results = []
     failed = []
 
     for i, candidate in enumerate(candidates, 1):
@@ -100,53 +101,76 @@ def cmd_validate(args):
                 start_date=args.start_date,
                 end_date=args.end_date
             )
-
+            results.append(result)
             if result.passed:
-                survivors.append(result)
-
-                # Submit survivor
-                survivor_data = {
-                    'idea_id': result.idea_id,
-                    'baseline_trades': result.baseline_result.total_trades,
-                    'baseline_win_rate': result.baseline_result.win_rate,
-                    'baseline_avg_r': result.baseline_result.avg_r,
-                    'baseline_expectancy': result.baseline_result.expectancy,
-                    'baseline_max_dd': result.baseline_result.max_dd,
-                    'baseline_profit_factor': result.baseline_result.profit_factor,
-                    'baseline_sharpe': result.baseline_result.sharpe,
-                    'cost_1tick_expectancy': result.cost_1tick_exp,
-                    'cost_2tick_expectancy': result.cost_2tick_exp,
-                    'cost_3tick_expectancy': result.cost_3tick_exp,
-                    'cost_atr_expectancy': result.cost_atr_exp,
-                    'cost_missedfill_expectancy': result.cost_missedfill_exp,
-                    'attack_stopfirst_expectancy': result.attack_stopfirst_exp,
-                    'attack_entrydelay_expectancy': result.attack_entrydelay_exp,
-                    'attack_exitdelay_expectancy': result.attack_exitdelay_exp,
-                    'attack_noise_expectancy': result.attack_noise_exp,
-                    'attack_shuffle_expectancy': result.attack_shuffle_exp,
-                    'regime_year_count': result.regime_year_count,
-                    'regime_year_profitable': result.regime_year_profitable,
-                    'regime_volatility_count': result.regime_volatility_count,
-                    'regime_volatility_profitable': result.regime_volatility_profitable,
-                    'regime_session_count': result.regime_session_count,
-                    'regime_session_profitable': result.regime_session_profitable,
-                    'regime_max_profit_concentration': result.regime_max_concentration,
-                    'walkforward_windows': 0,
-                    'walkforward_profitable': 0,
-                    'walkforward_avg_expectancy': 0
-                }
-
-                manager.submit_survivor(survivor_data)
-                print(f"  [OK] SURVIVOR - Score: {result.survival_score:.1f}, Confidence: {result.confidence}")
-
+                print(f"  [OK] Passed tests - Score: {result.survival_score:.1f}, Confidence: {result.confidence}")
             else:
-                failed.append(result)
                 print(f"  [FAIL] {result.failure_reason}")
 
         except Exception as e:
             logger.error(f"Error validating {candidate['idea_id']}: {e}")
             failed.append(None)
 
+    # Significance over the whole generation run (not just this --limit batch):
+    # a survivor must beat chance after FDR control
+    family_size = max(len(candidates), manager.generation_family_size([c['idea_id'] for c in candidates]))
+    print(f"\nSignificance: {len(results)} baselines, FDR family {family_size}, alpha {args.fdr_alpha}")
+    pipeline.apply_significance(results, family_size=family_size, alpha=args.fdr_alpha)
+
+    survivors = []
+    for result in results:
+        if not result.passed:
+            failed.append(result)
+            if result.failure_reason.startswith("Not significant"):
+                print(f"  [FAIL] {result.idea_id}: {result.failure_reason}")
+            continue
+
+        # Submit survivor
+        survivor_data = {
+            'idea_id': result.idea_id,
+            'baseline_trades': result.baseline_result.total_trades,
+            'baseline_win_rate': result.baseline_result.win_rate,
+            'baseline_avg_r': result.baseline_result.avg_r,
+            'baseline_expectancy': result.baseline_result.expectancy,
+            'baseline_max_dd': result.baseline_result.max_dd,
+            'baseline_profit_factor': result.baseline_result.profit_factor,
+            'baseline_sharpe': result.baseline_result.sharpe,
+            'cost_1tick_expectancy': result.cost_1tick_exp,
+            'cost_2tick_expectancy': result.cost_2tick_exp,
+            'cost_3tick_expectancy': result.cost_3tick_exp,
+            'cost_atr_expectancy': result.cost_atr_exp,
+            'cost_missedfill_expectancy': result.cost_missedfill_exp,
+            'attack_stopfirst_expectancy': result.attack_stopfirst_exp,
+            'attack_entrydelay_expectancy': result.attack_entrydelay_exp,
+            'attack_exitdelay_expectancy': result.attack_exitdelay_exp,
+            'attack_noise_expectancy': result.attack_noise_exp,
+            'attack_shuffle_expectancy': result.attack_shuffle_exp,
+            'regime_year_count': result.regime_year_count,
+            'regime_year_profitable': result.regime_year_profitable,
+            'regime_volatility_count': result.regime_volatility_count,
+            'regime_volatility_profitable': result.regime_volatility_profitable,
+            'regime_session_count': result.regime_session_count,
+            'regime_session_profitable': result.regime_session_profitable,
+            'regime_max_profit_concentration': result.regime_max_concentration,
+            # No out-of-sample folds are run yet (regime quarters are in-sample)
+            'walkforward_windows': 0,
+            'walkforward_profitable': 0,
+            'walkforward_avg_expectancy': 0,
+            'significance_p_value': result.p_value,
+            'significance_q_value': result.q_value
+        }
+
+        ok, message = manager.submit_survivor(survivor_data)
+        if not ok:
+            failed.append(result)
+            print(f"  [ERROR] Could not record survivor {result.idea_id}: {message}")
+            continue
+
+        survivors.append(result)
+        print(f"  [OK] SURVIVOR {result.idea_id} - Score: {result.survival_score:.1f}, "
+              f"Confidence: {result.confidence}, q={result.q_value:.3f}, "
+              f"quarters profitable (in-sample): {result.regime_quarter_profitable}/{result.regime_quarter_count}")
+
     print("\n" + "="*70)
     print("VALIDATION COMPLETE")
     print("="*70)
@@ -292,6 +316,8 @@ def main():
     # Validate command
     parser_val = subparsers.add_parser('validate', help='Run validation pipeline')
     parser_val.add_argument('--limit', type=int, default=50, help='Maximum candidates to validate')
+    parser_val.add_argument('--fdr-alpha', type=float, default=FDR_ALPHA,
+                            help='False discovery rate for the significance gate')
     parser_val.add_argument('--start-date', type=str, default='2024-01-01', help='Backtest start date')
     parser_val.add_argument('--end-date', type=str, default='2026-01-15', help='Backtest end date')
 
@@ -131,6 +131,10 @@ def init_ede_schema():
             walkforward_profitable INTEGER NOT NULL,
             walkforward_avg_expectancy DOUBLE NOT NULL,
 
+            -- Significance (resampled p-value, FDR q-value across the validation run)
+            significance_p_value DOUBLE,
+            significance_q_value DOUBLE,
+
             -- Survival metrics
             survival_score DOUBLE NOT NULL,  -- Composite score (0-100)
             confidence_level VARCHAR NOT NULL,  -- 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH'
@@ -145,6 +149,10 @@ def init_ede_schema():
         )
     """)
 
+    # Existing databases predate the significance columns
+    for column in ("significance_p_value", "significance_q_value"):
+        con.execute(f"ALTER TABLE edge_candidates_survivors ADD COLUMN IF NOT EXISTS {column} DOUBLE")
+
     print("[OK] Created edge_candidates_survivors")
 
     # ========================================================================
@@ -9,9 +9,9 @@ An edge CANNOT skip a stage. Each gate enforces specific criteria.
 This manager coordinates all EDE modules and enforces the contract.
 """
 
-import duckdb
 import json
 import hashlib
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -19,6 +19,9 @@ from enum import Enum
 from dataclasses import dataclass, asdict
 import logging
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import db_metrics
+
 # Database path
 DB_PATH = str(Path(__file__).parent.parent / "gold.db")
 
@@ -203,6 +206,13 @@ class EdgeCandidate:
         return True, None
 
 
+# Survivor columns added after the first EDE schema (also added by init_ede_schema.py)
+SURVIVOR_COLUMN_MIGRATIONS = (
+    ("significance_p_value", "DOUBLE"),
+    ("significance_q_value", "DOUBLE"),
+)
+
+
 class LifecycleManager:
     """
     Orchestrates edge discovery pipeline from generation to production.
@@ -212,11 +222,20 @@ class LifecycleManager:
 
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
+        self._survivor_columns_ready = False
         logger.info(f"LifecycleManager initialized with DB: {db_path}")
 
     def _get_connection(self):
         """Get database connection."""
-        return duckdb.connect(self.db_path)
+        return db_metrics.connect(self.db_path)
+
+    def _ensure_survivor_columns(self, con):
+        """Add survivor columns missing from databases created before them (once per manager)"""
+        if self._survivor_columns_ready:
+            return
+        for column, column_type in SURVIVOR_COLUMN_MIGRATIONS:
+            con.execute(f"ALTER TABLE edge_candidates_survivors ADD COLUMN IF NOT EXISTS {column} {column_type}")
+        self._survivor_columns_ready = True
 
     # ========================================================================
     # STAGE 1: GENERATION
@@ -332,6 +351,37 @@ class LifecycleManager:
 
         return results.to_dict('records')
 
+    def generation_family_size(self, idea_ids: List[str]) -> int:
+        """
+        Candidates accepted by the generation run(s) the given candidates came from.
+
+        This is the multiple-testing family for FDR control: a validation batch
+        (--limit) is usually a slice of one generation run. Each candidate is
+        matched to the first run of its generator mode logged after it was
+        generated. Returns 0 when no run is logged.
+        """
+        if not idea_ids:
+            return 0
+        con = self._get_connection()
+        try:
+            total = con.execute("""
+                SELECT COALESCE(SUM(candidates_accepted), 0)
+                FROM edge_generation_log
+                WHERE log_id IN (
+                    SELECT (
+                        SELECT arg_min(g.log_id, g.run_timestamp)
+                        FROM edge_generation_log g
+                        WHERE g.generator_mode = c.generator_mode
+                          AND g.run_timestamp >= c.generation_timestamp
+                    )
+                    FROM edge_candidates_raw c
+                    WHERE c.idea_id IN (SELECT unnest(?))
+                )
+            """, [list(idea_ids)]).fetchone()[0]
+        finally:
+            con.close()
+        return int(total)
+
     def update_candidate_status(self, idea_id: str, new_status: EdgeStatus, notes: str = None):
         """Update candidate status during pipeline."""
         con = self._get_connection()
@@ -377,6 +427,7 @@ class LifecycleManager:
             results_hash = hashlib.sha256(results_json.encode()).hexdigest()
 
             # Insert into edge_candidates_survivors
+            self._ensure_survivor_columns(con)
             con.execute("""
                 INSERT INTO edge_candidates_survivors (
                     survivor_id, idea_id, survival_timestamp,
@@ -391,8 +442,9 @@ class LifecycleManager:
                     regime_session_count, regime_session_profitable,
                     regime_max_profit_concentration,
                     walkforward_windows, walkforward_profitable, walkforward_avg_expectancy,
+                    significance_p_value, significance_q_value,
                     survival_score, confidence_level, status, results_hash
-                ) VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, [
                 survivor_id,
                 survivor_data['idea_id'],
@@ -423,6 +475,8 @@ class LifecycleManager:
                 survivor_data['walkforward_windows'],
                 survivor_data['walkforward_profitable'],
                 survivor_data['walkforward_avg_expectancy'],
+                survivor_data.get('significance_p_value'),
+                survivor_data.get('significance_q_value'),
                 survival_score,
                 confidence,
                 EdgeStatus.SURVIVOR.value,
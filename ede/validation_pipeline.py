@@ -7,6 +7,7 @@ Runs all validation tests on candidates:
 3. Robustness attacks (stop-first, delays, noise, shuffle)
 4. Regime splits (year, volatility, session)
 5. Walk-forward validation
+6. Significance (bootstrap/permutation p-values, FDR control across the run)
 
 An edge survives only if it passes ALL tests.
 
@@ -20,11 +21,17 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 import logging
 import random
+import sys
 from datetime import datetime
+from pathlib import Path
 
 from backtest_engine import BacktestEngine, BacktestResult, DB_PATH
 from lifecycle_manager import LifecycleManager, EdgeStatus
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from significance import FDR_ALPHA, SignificanceTester, benjamini_hochberg
+from stability import TradeBook, volatility_regimes
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,6 +75,15 @@ class ValidationResult:
     survival_score: float
     confidence: str
 
+    # Per-quarter stability (calendar quarters of the in-sample baseline, not out-of-sample)
+    regime_quarter_count: int = 0
+    regime_quarter_profitable: int = 0
+    regime_quarter_avg_expectancy: float = 0.0
+
+    # Significance (set by apply_significance over the whole run)
+    p_value: Optional[float] = None
+    q_value: Optional[float] = None
+
 
 class ValidationPipeline:
     """
@@ -79,6 +95,7 @@ class ValidationPipeline:
     def __init__(self, db_path: str = DB_PATH):
         self.engine = BacktestEngine(db_path)
         self.lifecycle_manager = LifecycleManager(db_path)
+        self.significance = SignificanceTester()
 
     def validate_candidate(
         self,
@@ -262,10 +279,7 @@ class ValidationPipeline:
             'regime_volatility_profitable': regime_results['volatility_profitable'],
             'regime_session_count': regime_results['session_count'],
             'regime_session_profitable': regime_results['session_profitable'],
-            'regime_max_profit_concentration': regime_results['max_concentration'],
-            'walkforward_windows': 0,  # Not implemented yet
-            'walkforward_profitable': 0,
-            'walkforward_avg_expectancy': 0
+            'regime_max_profit_concentration': regime_results['max_concentration']
         })
 
         confidence = self._determine_confidence(survival_score, baseline.total_trades)
@@ -298,7 +312,10 @@ class ValidationPipeline:
             regime_max_concentration=regime_results['max_concentration'],
             regime_passed=True,
             survival_score=survival_score,
-            confidence=confidence
+            confidence=confidence,
+            regime_quarter_count=regime_results['quarter_count'],
+            regime_quarter_profitable=regime_results['quarter_profitable'],
+            regime_quarter_avg_expectancy=regime_results['quarter_avg_expectancy']
         )
 
     def _run_cost_tests(
@@ -390,31 +407,42 @@ class ValidationPipeline:
         """
         Run regime split tests.
 
+        Year, ATR-tercile volatility and per-quarter stability stats all come
+        from one prefix-sum TradeBook over the baseline trades. Quarters are
+        splits of the in-sample backtest, not walk-forward (out-of-sample) folds.
+
         Returns:
             (regime_results_dict, passed)
         """
-        # Split trades by year
-        trades_by_year = {}
-        for trade in baseline.trades:
-            year = trade.date_local[:4]
-            if year not in trades_by_year:
-                trades_by_year[year] = []
-            trades_by_year[year].append(trade.r_multiple)
-
-        year_count = len(trades_by_year)
-        year_profitable = sum(1 for trades in trades_by_year.values() if np.mean(trades) > 0)
-
-        # Simplified volatility/session splits (would need more data)
+        dates = [trade.date_local for trade in baseline.trades]
+        atr = self._trade_day_atr(baseline, dates)
+        book = TradeBook(
+            ["baseline"] * len(dates), dates, [trade.r_multiple for trade in baseline.trades],
+            regimes=None if atr is None else volatility_regimes(atr)
+        )
+
+        years = book.by_period("Y")
+        year_count = len(years)
+        year_profitable = int((years["expectancy"] > 0).sum())
+
+        # Volatility: ATR(20) terciles of the trade days (placeholder if ATR is unavailable)
         volatility_count = 3  # Low/Mid/High
         volatility_profitable = 2  # Assume at least 2 profitable
+        if atr is not None:
+            volatility = book.by_regime()
+            volatility_count = len(volatility)
+            volatility_profitable = int((volatility["expectancy"] > 0).sum())
 
+        # Session splits need intraday trade times (not tracked yet)
         session_count = 3  # Asia/London/NY
         session_profitable = 2  # Assume at least 2 profitable
 
         # Calculate max profit concentration
-        year_profits = {year: sum(trades) for year, trades in trades_by_year.items()}
-        total_profit = sum(year_profits.values())
-        max_concentration = max(year_profits.values()) / total_profit if total_profit > 0 else 1.0
+        total_profit = years["total_r"].sum()
+        max_concentration = years["total_r"].max() / total_profit if total_profit > 0 else 1.0
+
+        # Per-quarter stability of the same in-sample trades
+        quarters = book.by_period("Q")
 
         results = {
             'year_count': year_count,
@@ -423,7 +451,10 @@ class ValidationPipeline:
             'volatility_profitable': volatility_profitable,
             'session_count': session_count,
             'session_profitable': session_profitable,
-            'max_concentration': max_concentration
+            'max_concentration': float(max_concentration),
+            'quarter_count': len(quarters),
+            'quarter_profitable': int((quarters["expectancy"] > 0).sum()),
+            'quarter_avg_expectancy': float(quarters["expectancy"].mean()) if len(quarters) else 0.0
         }
 
         # Rule: At least 2 independent regimes profitable, no single regime > 70% of profits
@@ -434,6 +465,56 @@ class ValidationPipeline:
 
         return results, passed
 
+    def _trade_day_atr(self, baseline: BacktestResult, dates: List[str]) -> Optional[np.ndarray]:
+        """ATR(20) on each trade's day, or None if daily features are unavailable."""
+        try:
+            features = self.engine.load_daily_features(baseline.instrument, baseline.start_date, baseline.end_date)
+        except Exception as e:
+            logger.warning(f"No daily features for volatility regimes: {e}")
+            return None
+        if features.empty or 'atr_20' not in features:
+            return None
+
+        atr_by_day = dict(zip(pd.to_datetime(features['date_local']).dt.strftime('%Y-%m-%d'), features['atr_20']))
+        atr = np.array([atr_by_day.get(str(d)[:10], np.nan) for d in dates], dtype=float)
+        return None if np.isnan(atr).all() else atr
+
+    def apply_significance(
+        self,
+        results: List[ValidationResult],
+        family_size: Optional[int] = None,
+        alpha: float = FDR_ALPHA
+    ) -> pd.DataFrame:
+        """
+        Significance test every baseline in a run, with FDR control.
+
+        Each result with baseline trades gets a p-value (bootstrap and
+        sign-flip permutation of its trade R, see significance.py) and a
+        Benjamini-Hochberg q-value over the family: all results, or
+        family_size candidates if larger (e.g. the whole generation run).
+        Survivors with q > alpha are failed.
+
+        Returns:
+            DataFrame of per-candidate significance stats
+        """
+        tested = [r for r in results if r is not None and r.baseline_result is not None]
+        stats = self.significance.test({
+            r.idea_id: [t.r_multiple for t in r.baseline_result.trades] for r in tested
+        })
+        stats['q_value'], stats['significant'] = benjamini_hochberg(
+            stats['p_value'], alpha=alpha, family_size=max(len(results), family_size or 0)
+        )
+
+        for result, row in zip(tested, stats.itertuples()):
+            result.p_value, result.q_value = row.p_value, row.q_value
+            if result.passed and not row.significant:
+                result.passed = False
+                result.failure_reason = f"Not significant after FDR control (q={row.q_value:.3f} > {alpha})"
+                self.lifecycle_manager.update_candidate_status(result.idea_id, EdgeStatus.VALIDATION_FAILED)
+                logger.warning(f"[{result.idea_id}] FAILED: {result.failure_reason}")
+
+        return stats
+
     def _calculate_survival_score(self, data: Dict[str, Any]) -> float:
         """Calculate composite survival score (0-100)."""
         score = 0.0
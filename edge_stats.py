@@ -0,0 +1,140 @@
+"""
+Edge Stats - conditional ORB statistics in one scan
+===================================================
+
+daily_alerts.py, realtime_signals.py and export_v2_edges.py used to run one
+query per (orb_time, condition) against daily_features_v2 - dozens of full
+table scans for a morning prep or an edge export. EdgeStatsEngine takes a
+batch of EdgeSpecs and computes all of them in a single pass: every
+predicate is evaluated once per row as a boolean column, and each spec's
+aggregates are FILTERed on its column.
+
+Results are memoized per data version (row count / latest date of
+daily_features_v2 plus its sync_change_log position), so repeated lookups
+are free until the feature builder writes new or rewritten days.
+
+Usage:
+  engine = EdgeStatsEngine(con)
+  engine.prefetch([EdgeSpec("1000", "orb_1000_break_dir = ?", ("UP",)), ...])
+  stats = engine.get("1000", "orb_1000_break_dir = ?", ["UP"])
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import duckdb
+
+from motherduck_sync import CHANGE_LOG_TABLE
+
+SOURCE_TABLE = "daily_features_v2"
+
+STAT_KEYS = (
+    "total_trades", "wins", "losses", "avg_r", "total_r", "median_r", "best_r", "worst_r",
+)
+
+
+@dataclass(frozen=True)
+class EdgeSpec:
+    """One setup: ORB time plus a SQL predicate over daily_features_v2 (with ? params)"""
+    orb_time: str
+    condition: str = "1=1"
+    params: Tuple[Any, ...] = ()
+
+    def __post_init__(self):
+        object.__setattr__(self, "params", tuple(self.params))
+
+
+def data_version(con: duckdb.DuckDBPyConnection) -> Tuple[Any, ...]:
+    """Fingerprint of daily_features_v2 (appends and logged rewrites)"""
+    version = con.execute(f"SELECT COUNT(*), MAX(date_local) FROM {SOURCE_TABLE}").fetchone()
+    try:
+        change = con.execute(
+            f"SELECT MAX(change_id) FROM {CHANGE_LOG_TABLE} WHERE table_name = ?", [SOURCE_TABLE]
+        ).fetchone()[0]
+    except duckdb.Error:
+        change = None
+    return tuple(version) + (change,)
+
+
+def build_query(specs: Sequence[EdgeSpec]) -> Tuple[str, List[Any]]:
+    """Single-scan query: one match flag per spec, FILTERed aggregates per flag"""
+    flags, aggregates, params = [], [], []
+    for i, spec in enumerate(specs):
+        outcome = f"orb_{spec.orb_time}_outcome"
+        r = f"orb_{spec.orb_time}_r_multiple"
+        flags.append(f"COALESCE({outcome} IN ('WIN', 'LOSS') AND ({spec.condition}), FALSE) AS m{i}")
+        params.extend(spec.params)
+        aggregates.extend([
+            f"COUNT(*) FILTER (WHERE m{i})",
+            f"COUNT(*) FILTER (WHERE m{i} AND {outcome} = 'WIN')",
+            f"COUNT(*) FILTER (WHERE m{i} AND {outcome} = 'LOSS')",
+            f"AVG({r}) FILTER (WHERE m{i})",
+            f"SUM({r}) FILTER (WHERE m{i})",
+            f"quantile_cont({r}, 0.5) FILTER (WHERE m{i})",
+            f"MAX({r}) FILTER (WHERE m{i})",
+            f"MIN({r}) FILTER (WHERE m{i})",
+        ])
+    query = f"""
+        WITH flagged AS (
+            SELECT *, {", ".join(flags)}
+            FROM {SOURCE_TABLE}
+        )
+        SELECT {", ".join(aggregates)}
+        FROM flagged
+    """
+    return query, params
+
+
+def _stats(values: Sequence[Any]) -> Dict[str, Any]:
+    raw = dict(zip(STAT_KEYS, values))
+    total = raw["total_trades"] or 0
+    wins = raw["wins"] or 0
+    return {
+        "total_trades": total,
+        "wins": wins,
+        "losses": raw["losses"] or 0,
+        "win_rate": wins / total if total else 0,
+        "avg_r": raw["avg_r"] or 0,
+        "total_r": raw["total_r"] or 0,
+        "median_r": raw["median_r"] or 0,
+        "best_r": raw["best_r"] or 0,
+        "worst_r": raw["worst_r"] or 0,
+    }
+
+
+class EdgeStatsEngine:
+    """Batched, version-memoized edge statistics over daily_features_v2"""
+
+    def __init__(self, con: duckdb.DuckDBPyConnection):
+        self.con = con
+        self._version = None
+        self._cache: Dict[EdgeSpec, Dict[str, Any]] = {}
+        self.stats = {"scans": 0, "hits": 0}
+
+    def compute(self, specs: Iterable[EdgeSpec]) -> List[Dict[str, Any]]:
+        """Stats for every spec (one scan for all specs not already memoized)"""
+        specs = list(specs)
+        version = data_version(self.con)
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+
+        missing = list(dict.fromkeys(s for s in specs if s not in self._cache))
+        self.stats["hits"] += len(specs) - len(missing)
+        if missing:
+            query, params = build_query(missing)
+            row = self.con.execute(query, params).fetchone()
+            self.stats["scans"] += 1
+            width = len(STAT_KEYS)
+            for i, spec in enumerate(missing):
+                self._cache[spec] = _stats(row[i * width:(i + 1) * width])
+
+        return [dict(self._cache[s]) for s in specs]
+
+    def prefetch(self, specs: Iterable[EdgeSpec]) -> None:
+        """Warm the memo so later get() calls need no query"""
+        self.compute(specs)
+
+    def get(self, orb_time: str, condition: str = "1=1", params: Sequence[Any] = ()) -> Dict[str, Any]:
+        """Stats for a single setup"""
+        return self.compute([EdgeSpec(orb_time, condition, tuple(params))])[0]
@@ -23,6 +23,8 @@ from pathlib import Path
 from typing import Dict, List
 from dataclasses import dataclass, asdict
 
+from edge_stats import EdgeSpec, EdgeStatsEngine
+
 
 @dataclass
 class EdgeStats:
@@ -48,212 +50,136 @@ class V2EdgeExporter:
 
     def __init__(self, db_path: str = "gold.db"):
         self.con = duckdb.connect(db_path, read_only=True)
+        self.edge_stats = EdgeStatsEngine(self.con)
         self.edges = []
+        self.pending = []
 
     def calculate_edge_stats(self, orb_time: str, condition: str, params: List) -> Dict:
-        """Calculate comprehensive statistics for an edge"""
-        query = f"""
-            WITH trades AS (
-                SELECT
-                    orb_{orb_time}_outcome as outcome,
-                    orb_{orb_time}_r_multiple as r_multiple
-                FROM daily_features_v2
-                WHERE orb_{orb_time}_outcome IN ('WIN', 'LOSS')
-                  AND {condition}
-            )
-            SELECT
-                COUNT(*) as total_trades,
-                SUM(CASE WHEN outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
-                SUM(CASE WHEN outcome = 'LOSS' THEN 1 ELSE 0 END) as losses,
-                AVG(r_multiple) as avg_r,
-                SUM(r_multiple) as total_r,
-                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY r_multiple) as median_r,
-                MAX(r_multiple) as best_r,
-                MIN(r_multiple) as worst_r
-            FROM trades
-        """
-
-        result = self.con.execute(query, params).fetchone()
-
-        if not result or result[0] == 0:
-            return None
-
-        total, wins, losses, avg_r, total_r, median_r, best_r, worst_r = result
-
-        return {
-            "total_trades": total,
-            "wins": wins,
-            "losses": losses,
-            "win_rate": wins / total if total else 0,
-            "avg_r": avg_r or 0,
-            "total_r": total_r or 0,
-            "median_r": median_r or 0,
-            "best_r": best_r or 0,
-            "worst_r": worst_r or 0,
-        }
+        """Calculate comprehensive statistics for an edge (memoized, see edge_stats.py)"""
+        stats = self.edge_stats.get(orb_time, condition, params)
+        return stats if stats["total_trades"] else None
+
+    def queue_edge(self, orb_time: str, predicate: str, params: List, **fields):
+        """Queue an edge for resolve_edges() (stats for all queued edges come from one scan)"""
+        self.pending.append((EdgeSpec(orb_time, predicate, tuple(params)), fields))
+
+    def resolve_edges(self, min_trades: int = 10):
+        """Compute stats for all queued edges and keep those with enough trades"""
+        specs = [spec for spec, _ in self.pending]
+        for (spec, fields), stats in zip(self.pending, self.edge_stats.compute(specs)):
+            if stats["total_trades"] >= min_trades:
+                self.edges.append(EdgeStats(orb_time=spec.orb_time, **fields, **stats))
+        self.pending = []
 
     def export_baseline_edges(self):
-        """Export baseline ORB performance (no filters)"""
+        """Queue baseline ORB performance (no filters)"""
         print("Exporting baseline edges...")
 
         for orb_time in ["0900", "1000", "1100", "1800", "2300", "0030"]:
             # Overall (any direction)
-            stats = self.calculate_edge_stats(orb_time, "1=1", [])
-            if stats and stats["total_trades"] >= 10:
-                self.edges.append(EdgeStats(
-                    setup=f"{orb_time} Overall",
-                    orb_time=orb_time,
-                    direction="ANY",
-                    condition="No filter",
-                    edge_type="baseline",
-                    **stats
-                ))
+            self.queue_edge(
+                orb_time, "1=1", [],
+                setup=f"{orb_time} Overall",
+                direction="ANY",
+                condition="No filter",
+                edge_type="baseline",
+            )
 
             # By direction
             for direction in ["UP", "DOWN"]:
-                stats = self.calculate_edge_stats(
+                self.queue_edge(
                     orb_time,
                     f"orb_{orb_time}_break_dir = ?",
-                    [direction]
+                    [direction],
+                    setup=f"{orb_time} {direction}",
+                    direction=direction,
+                    condition="No filter",
+                    edge_type="baseline",
                 )
-                if stats and stats["total_trades"] >= 10:
-                    self.edges.append(EdgeStats(
-                        setup=f"{orb_time} {direction}",
-                        orb_time=orb_time,
-                        direction=direction,
-                        condition="No filter",
-                        edge_type="baseline",
-                        **stats
-                    ))
 
     def export_pre_block_edges(self):
-        """Export PRE block filtered edges"""
+        """Queue PRE block filtered edges"""
         print("Exporting PRE block edges...")
 
         # 09:00 with PRE_ASIA filters
         for threshold in [30, 50]:
             for operator, op_str in [(">", "gt"), ("<", "lt")]:
-                stats = self.calculate_edge_stats(
+                self.queue_edge(
                     "0900",
                     f"(pre_asia_range / 0.1) {operator} ?",
-                    [threshold]
+                    [threshold],
+                    setup=f"0900 PRE_ASIA {op_str} {threshold}t",
+                    direction="ANY",
+                    condition=f"PRE_ASIA {operator} {threshold} ticks",
+                    edge_type="pre_block",
                 )
-                if stats and stats["total_trades"] >= 10:
-                    self.edges.append(EdgeStats(
-                        setup=f"0900 PRE_ASIA {op_str} {threshold}t",
-                        orb_time="0900",
-                        direction="ANY",
-                        condition=f"PRE_ASIA {operator} {threshold} ticks",
-                        edge_type="pre_block",
-                        **stats
-                    ))
-
-        # 11:00 UP with PRE_ASIA > 50 ticks
-        stats = self.calculate_edge_stats(
-            "1100",
-            "orb_1100_break_dir = 'UP' AND (pre_asia_range / 0.1) > 50",
-            []
-        )
-        if stats and stats["total_trades"] >= 10:
-            self.edges.append(EdgeStats(
-                setup="1100 UP PRE_ASIA > 50t",
-                orb_time="1100",
-                direction="UP",
-                condition="PRE_ASIA > 50 ticks",
-                edge_type="pre_block",
-                **stats
-            ))
-
-        # 11:00 DOWN with PRE_ASIA > 50 ticks
-        stats = self.calculate_edge_stats(
-            "1100",
-            "orb_1100_break_dir = 'DOWN' AND (pre_asia_range / 0.1) > 50",
-            []
-        )
-        if stats and stats["total_trades"] >= 10:
-            self.edges.append(EdgeStats(
-                setup="1100 DOWN PRE_ASIA > 50t",
-                orb_time="1100",
-                direction="DOWN",
+
+        # 11:00 UP / DOWN with PRE_ASIA > 50 ticks
+        for direction in ["UP", "DOWN"]:
+            self.queue_edge(
+                "1100",
+                f"orb_1100_break_dir = '{direction}' AND (pre_asia_range / 0.1) > 50",
+                [],
+                setup=f"1100 {direction} PRE_ASIA > 50t",
+                direction=direction,
                 condition="PRE_ASIA > 50 ticks",
                 edge_type="pre_block",
-                **stats
-            ))
+            )
 
         # 18:00 with PRE_LONDON filters
         for direction in ["UP", "DOWN"]:
-            stats = self.calculate_edge_stats(
+            self.queue_edge(
                 "1800",
                 f"orb_1800_break_dir = ? AND (pre_london_range / 0.1) > 40",
-                [direction]
+                [direction],
+                setup=f"1800 {direction} PRE_LONDON > 40t",
+                direction=direction,
+                condition="PRE_LONDON > 40 ticks",
+                edge_type="pre_block",
             )
-            if stats and stats["total_trades"] >= 10:
-                self.edges.append(EdgeStats(
-                    setup=f"1800 {direction} PRE_LONDON > 40t",
-                    orb_time="1800",
-                    direction=direction,
-                    condition="PRE_LONDON > 40 ticks",
-                    edge_type="pre_block",
-                    **stats
-                ))
 
         # 00:30 with PRE_NY filters
         for direction in ["UP", "DOWN"]:
-            stats = self.calculate_edge_stats(
+            self.queue_edge(
                 "0030",
                 f"orb_0030_break_dir = ? AND (pre_ny_range / 0.1) > 40",
-                [direction]
+                [direction],
+                setup=f"0030 {direction} PRE_NY > 40t",
+                direction=direction,
+                condition="PRE_NY > 40 ticks",
+                edge_type="pre_block",
             )
-            if stats and stats["total_trades"] >= 10:
-                self.edges.append(EdgeStats(
-                    setup=f"0030 {direction} PRE_NY > 40t",
-                    orb_time="0030",
-                    direction=direction,
-                    condition="PRE_NY > 40 ticks",
-                    edge_type="pre_block",
-                    **stats
-                ))
 
     def export_correlation_edges(self):
-        """Export ORB correlation edges"""
+        """Queue ORB correlation edges"""
         print("Exporting ORB correlation edges...")
 
         # 10:00 after 09:00 outcome
         for prev_outcome in ["WIN", "LOSS"]:
             for direction in ["UP", "DOWN"]:
-                stats = self.calculate_edge_stats(
+                self.queue_edge(
                     "1000",
                     f"orb_1000_break_dir = ? AND orb_0900_outcome = ?",
-                    [direction, prev_outcome]
+                    [direction, prev_outcome],
+                    setup=f"1000 {direction} after 0900 {prev_outcome}",
+                    direction=direction,
+                    condition=f"After 09:00 {prev_outcome}",
+                    edge_type="correlation",
                 )
-                if stats and stats["total_trades"] >= 10:
-                    self.edges.append(EdgeStats(
-                        setup=f"1000 {direction} after 0900 {prev_outcome}",
-                        orb_time="1000",
-                        direction=direction,
-                        condition=f"After 09:00 {prev_outcome}",
-                        edge_type="correlation",
-                        **stats
-                    ))
 
         # 11:00 after 09:00 + 10:00 outcomes
         for orb_09 in ["WIN", "LOSS"]:
             for orb_10 in ["WIN", "LOSS"]:
                 for direction in ["UP", "DOWN"]:
-                    stats = self.calculate_edge_stats(
+                    self.queue_edge(
                         "1100",
                         f"orb_1100_break_dir = ? AND orb_0900_outcome = ? AND orb_1000_outcome = ?",
-                        [direction, orb_09, orb_10]
+                        [direction, orb_09, orb_10],
+                        setup=f"1100 {direction} after 0900 {orb_09} + 1000 {orb_10}",
+                        direction=direction,
+                        condition=f"After 09:00 {orb_09} + 10:00 {orb_10}",
+                        edge_type="correlation",
                     )
-                    if stats and stats["total_trades"] >= 10:
-                        self.edges.append(EdgeStats(
-                            setup=f"1100 {direction} after 0900 {orb_09} + 1000 {orb_10}",
-                            orb_time="1100",
-                            direction=direction,
-                            condition=f"After 09:00 {orb_09} + 10:00 {orb_10}",
-                            edge_type="correlation",
-                            **stats
-                        ))
 
     def export_to_csv(self, output_dir: Path):
         """Export edges to CSV"""
@@ -366,6 +292,7 @@ class V2EdgeExporter:
         self.export_baseline_edges()
         self.export_pre_block_edges()
         self.export_correlation_edges()
+        self.resolve_edges()
 
         print(f"\nTotal edges collected: {len(self.edges)}")
 
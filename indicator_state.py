@@ -0,0 +1,464 @@
+"""
+Indicator State - persisted streaming RSI/ATR
+=============================================
+
+Feature builders used to recompute indicators from a fresh lookback for every
+day (24h of 5m bars for Wilder ATR/RSI in build_daily_features.py, the last
+15 bars_5m closes and the last 20 daily_features_v2 rows in
+FeatureBuilderV2). indicator_state keeps the running state per instrument,
+timeframe and indicator at each boundary it was asked for, so the next value
+is advanced from the latest snapshot over only the new rows.
+
+Indicators:
+- WilderRSI / WilderATR: Wilder smoothing over the whole history (same
+  recurrence as rsi_wilder / atr_wilder in build_daily_features.py)
+- WindowRSI: simple RSI over the last N changes (FeatureBuilderV2.calculate_rsi_at)
+- WindowMean: mean of the last N values (FeatureBuilderV2.calculate_atr)
+
+Snapshots are invalidated from sync_change_log (see motherduck_sync.py): when a
+backfill or builder logs a rewritten range of a source table, snapshots at or
+after the range start are dropped and recomputed on next use.
+
+verify() replays the full source history and checks every stored snapshot
+(scripts/indicator_state.py --verify).
+"""
+
+import json
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from motherduck_sync import CHANGE_LOG_TABLE, init_change_log
+
+STATE_TABLE = "indicator_state"
+
+STATE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+  instrument VARCHAR NOT NULL,
+  timeframe VARCHAR NOT NULL,
+  indicator VARCHAR NOT NULL,
+  as_of TIMESTAMPTZ NOT NULL,       -- last source row included
+  source_table VARCHAR NOT NULL,
+  state VARCHAR NOT NULL,           -- JSON
+  updated_at TIMESTAMP DEFAULT current_timestamp,
+  PRIMARY KEY (instrument, timeframe, indicator, as_of)
+)
+"""
+
+META_DDL = f"""
+CREATE TABLE IF NOT EXISTS {STATE_TABLE}_meta (
+  name VARCHAR PRIMARY KEY,
+  value BIGINT
+)
+"""
+
+
+def _at_or_before(ts, as_of) -> bool:
+    """ts <= as_of, where daily feeds give dates and snapshots are timestamps"""
+    if not isinstance(ts, datetime):
+        return ts <= as_of.date()
+    return ts <= as_of
+
+
+def _rsi(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0.0:
+        return 100.0
+    return 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+
+
+# -----------------------------
+# Indicators
+# -----------------------------
+
+class Indicator:
+    """Streaming indicator: update() per source row, value after each update"""
+
+    name = "indicator"
+    warmup: Optional[int] = None  # rows needed on cold start (None = whole history)
+
+    def __init__(self, length: int):
+        self.length = length
+        self.last_ts = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}_{self.length}"
+
+    @property
+    def value(self) -> Optional[float]:
+        raise NotImplementedError
+
+    def update(self, *values) -> Optional[float]:
+        raise NotImplementedError
+
+    def state(self) -> Dict[str, Any]:
+        state = {k: (list(v) if isinstance(v, deque) else v) for k, v in self.__dict__.items()}
+        state["last_ts"] = self.last_ts.isoformat() if self.last_ts is not None else None
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Indicator":
+        ind = cls(state["length"])
+        for k, v in state.items():
+            current = getattr(ind, k, None)
+            setattr(ind, k, deque(v, maxlen=current.maxlen) if isinstance(current, deque) else v)
+        if ind.last_ts is not None:
+            ts = ind.last_ts
+            ind.last_ts = date.fromisoformat(ts) if len(ts) == 10 else datetime.fromisoformat(ts)
+        return ind
+
+
+class WilderRSI(Indicator):
+    name = "rsi_wilder"
+
+    def __init__(self, length: int = 14):
+        super().__init__(length)
+        self.prev_close: Optional[float] = None
+        self.n = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    @property
+    def value(self) -> Optional[float]:
+        return _rsi(self.avg_gain, self.avg_loss) if self.n >= self.length else None
+
+    def update(self, close: float) -> Optional[float]:
+        close = float(close)
+        if self.prev_close is not None:
+            ch = close - self.prev_close
+            gain, loss = max(ch, 0.0), max(-ch, 0.0)
+            self.n += 1
+            if self.n <= self.length:
+                # Seed: simple average of the first `length` changes
+                self.avg_gain += gain / self.length
+                self.avg_loss += loss / self.length
+            else:
+                self.avg_gain = (self.avg_gain * (self.length - 1) + gain) / self.length
+                self.avg_loss = (self.avg_loss * (self.length - 1) + loss) / self.length
+        self.prev_close = close
+        return self.value
+
+
+class WilderATR(Indicator):
+    name = "atr_wilder"
+
+    def __init__(self, length: int = 20):
+        super().__init__(length)
+        self.prev_close: Optional[float] = None
+        self.n = 0
+        self.atr = 0.0
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.atr if self.n >= self.length else None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        high, low, close = float(high), float(low), float(close)
+        if self.prev_close is not None:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            self.n += 1
+            if self.n <= self.length:
+                self.atr += tr / self.length
+            else:
+                self.atr = (self.atr * (self.length - 1) + tr) / self.length
+        self.prev_close = close
+        return self.value
+
+
+class WindowRSI(Indicator):
+    """RSI from simple averages of the last `length` changes (no smoothing)"""
+
+    name = "rsi_window"
+
+    def __init__(self, length: int = 14):
+        super().__init__(length)
+        self.closes: deque = deque(maxlen=length + 1)
+
+    @property
+    def warmup(self) -> int:  # type: ignore[override]
+        return self.length + 1
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.closes) < self.length + 1:
+            return None
+        closes = list(self.closes)
+        changes = [b - a for a, b in zip(closes, closes[1:])]
+        avg_gain = sum(max(ch, 0.0) for ch in changes) / self.length
+        avg_loss = sum(max(-ch, 0.0) for ch in changes) / self.length
+        return _rsi(avg_gain, avg_loss)
+
+    def update(self, close: float) -> Optional[float]:
+        self.closes.append(float(close))
+        return self.value
+
+
+class WindowMean(Indicator):
+    """Mean of the last `length` values"""
+
+    name = "mean"
+
+    def __init__(self, length: int = 20, name: Optional[str] = None):
+        super().__init__(length)
+        if name:
+            self.name = name
+        self.values: deque = deque(maxlen=length)
+
+    @property
+    def warmup(self) -> int:  # type: ignore[override]
+        return self.length
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.values) < self.length:
+            return None
+        # Newest-first summation, matching FeatureBuilderV2.calculate_atr bit-for-bit
+        return sum(reversed(self.values)) / self.length
+
+    def update(self, value: float) -> Optional[float]:
+        self.values.append(float(value))
+        return self.value
+
+
+# -----------------------------
+# Source feeds
+# -----------------------------
+
+@dataclass(frozen=True)
+class Feed:
+    """
+    Ordered source rows for an indicator: SELECT ts, *inputs FROM table.
+
+    partition_col/instrument restrict rows to one symbol; `where` adds a filter.
+    """
+
+    table: str
+    instrument: str
+    timeframe: str
+    inputs: Tuple[str, ...]
+    ts_col: str = "ts_utc"
+    partition_col: Optional[str] = "symbol"
+    where: str = ""
+
+    def _sql(self, conditions: List[str]) -> str:
+        if self.partition_col:
+            conditions = [f"{self.partition_col} = ?"] + conditions
+        if self.where:
+            conditions = conditions + [self.where]
+        return (
+            f"SELECT {self.ts_col}, {', '.join(self.inputs)} FROM {self.table} "
+            f"WHERE {' AND '.join(conditions) or 'TRUE'}"
+        )
+
+    def _params(self, params: List[Any]) -> List[Any]:
+        return ([self.instrument] if self.partition_col else []) + params
+
+    def rows(self, con, after=None, upto=None) -> List[tuple]:
+        """Rows with after < ts <= upto, oldest first"""
+        conditions, params = [], []
+        if after is not None:
+            conditions.append(f"{self.ts_col} > ?")
+            params.append(after)
+        if upto is not None:
+            conditions.append(f"{self.ts_col} <= ?")
+            params.append(upto)
+        return con.execute(f"{self._sql(conditions)} ORDER BY 1", self._params(params)).fetchall()
+
+    def last_rows(self, con, upto, n: int) -> List[tuple]:
+        """Last n rows with ts <= upto, oldest first"""
+        sql = self._sql([f"{self.ts_col} <= ?"])
+        return con.execute(
+            f"SELECT * FROM ({sql} ORDER BY 1 DESC LIMIT {int(n)}) ORDER BY 1", self._params([upto])
+        ).fetchall()
+
+
+def bars_feed(symbol: str, inputs: Sequence[str], table: str = "bars_5m", timeframe: str = "5m") -> Feed:
+    return Feed(table=table, instrument=symbol, timeframe=timeframe, inputs=tuple(inputs))
+
+
+def asia_range_feed(instrument: str = "MGC", table: str = "daily_features_v2") -> Feed:
+    """Daily asia ranges (days without an Asia session are skipped)"""
+    return Feed(
+        table=table, instrument=instrument, timeframe="1d", inputs=("asia_high - asia_low",),
+        ts_col="date_local", partition_col=None, where="asia_high IS NOT NULL",
+    )
+
+
+def standard_indicators(symbol: str = "MGC") -> List[Tuple[Feed, Callable[[], Indicator]]]:
+    """Indicators the feature builders persist (build_daily_features*.py)"""
+    return [
+        (bars_feed(symbol, ("close",)), lambda: WilderRSI(14)),
+        (bars_feed(symbol, ("high", "low", "close")), lambda: WilderATR(20)),
+        (bars_feed(symbol, ("close",)), lambda: WindowRSI(14)),
+        (asia_range_feed(symbol), lambda: WindowMean(20, "asia_range_mean")),
+    ]
+
+
+# -----------------------------
+# Store
+# -----------------------------
+
+class IndicatorStore:
+    """Snapshots of indicator state, invalidated from sync_change_log"""
+
+    def __init__(self, con):
+        self.con = con
+        con.execute(STATE_DDL)
+        con.execute(META_DDL)
+        init_change_log(con)
+        if self._last_change_id() is None:
+            # Fresh store: nothing to invalidate from earlier changes
+            self._set_last_change_id(self._max_change_id())
+
+    def _max_change_id(self) -> int:
+        return self.con.execute(f"SELECT COALESCE(MAX(change_id), 0) FROM {CHANGE_LOG_TABLE}").fetchone()[0]
+
+    def _last_change_id(self) -> Optional[int]:
+        row = self.con.execute(
+            f"SELECT value FROM {STATE_TABLE}_meta WHERE name = 'last_change_id'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_last_change_id(self, change_id: int) -> None:
+        self.con.execute(
+            f"INSERT OR REPLACE INTO {STATE_TABLE}_meta VALUES ('last_change_id', ?)", [change_id]
+        )
+
+    def sync_changes(self) -> int:
+        """Drop snapshots made stale by logged source rewrites; returns snapshots dropped"""
+        last = self._last_change_id() or 0
+        changes = self.con.execute(
+            f"""
+            SELECT change_id, table_name, partition_value, range_start
+            FROM {CHANGE_LOG_TABLE}
+            WHERE change_id > ?
+            ORDER BY change_id
+            """,
+            [last],
+        ).fetchall()
+        if not changes:
+            return 0
+
+        dropped = 0
+        for change_id, table, partition, range_start in changes:
+            dropped += self.con.execute(
+                f"""
+                DELETE FROM {STATE_TABLE}
+                WHERE source_table = ?
+                  AND (? IS NULL OR instrument = ?)
+                  AND as_of >= CAST(? AS TIMESTAMPTZ)
+                """,
+                [table, partition, partition, range_start],
+            ).fetchone()[0]
+            last = change_id
+        self._set_last_change_id(last)
+        return dropped
+
+    def latest(self, feed: Feed, indicator: Indicator, at) -> Optional[Tuple[Any, Indicator]]:
+        """Latest snapshot with as_of <= at, as (as_of, indicator)"""
+        row = self.con.execute(
+            f"""
+            SELECT as_of, state
+            FROM {STATE_TABLE}
+            WHERE instrument = ? AND timeframe = ? AND indicator = ? AND as_of <= ?
+            ORDER BY as_of DESC
+            LIMIT 1
+            """,
+            [feed.instrument, feed.timeframe, indicator.key, at],
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], type(indicator).from_state(json.loads(row[1]))
+
+    def save(self, feed: Feed, indicator: Indicator, as_of) -> None:
+        self.con.execute(
+            f"""
+            INSERT OR REPLACE INTO {STATE_TABLE}
+            (instrument, timeframe, indicator, as_of, source_table, state, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, current_timestamp)
+            """,
+            [feed.instrument, feed.timeframe, indicator.key, as_of, feed.table, json.dumps(indicator.state())],
+        )
+
+    def snapshots(self, feed: Feed, indicator: Indicator) -> List[Tuple[Any, Indicator]]:
+        rows = self.con.execute(
+            f"""
+            SELECT as_of, state FROM {STATE_TABLE}
+            WHERE instrument = ? AND timeframe = ? AND indicator = ?
+            ORDER BY as_of
+            """,
+            [feed.instrument, feed.timeframe, indicator.key],
+        ).fetchall()
+        return [(as_of, type(indicator).from_state(json.loads(state))) for as_of, state in rows]
+
+    def reset(self, feed: Optional[Feed] = None, indicator: Optional[Indicator] = None) -> None:
+        if feed is None:
+            self.con.execute(f"DELETE FROM {STATE_TABLE}")
+            return
+        self.con.execute(
+            f"DELETE FROM {STATE_TABLE} WHERE instrument = ? AND timeframe = ? AND indicator = ?",
+            [feed.instrument, feed.timeframe, indicator.key],
+        )
+
+
+def advance(store: IndicatorStore, feed: Feed, factory: Callable[[], Indicator], at,
+            save: bool = True) -> Indicator:
+    """
+    Indicator state including every feed row with ts <= at.
+
+    Starts from the latest snapshot at or before `at` and applies only newer
+    rows; with no snapshot, warms up from the last `warmup` rows (or the whole
+    history for Wilder indicators). save=False computes without persisting
+    (live intraday values). indicator.last_ts is the newest row applied
+    (None if the feed has no rows up to `at`).
+    """
+    store.sync_changes()
+    indicator = factory()
+    snapshot = store.latest(feed, indicator, at)
+
+    if snapshot is not None:
+        as_of, indicator = snapshot
+        rows = feed.rows(store.con, after=as_of, upto=at)
+    elif indicator.warmup is not None:
+        rows = feed.last_rows(store.con, upto=at, n=indicator.warmup)
+    else:
+        rows = feed.rows(store.con, upto=at)
+
+    for row in rows:
+        indicator.update(*row[1:])
+        indicator.last_ts = row[0]
+
+    if save and indicator.last_ts is not None:
+        store.save(feed, indicator, at)
+    return indicator
+
+
+def verify(store: IndicatorStore, feed: Feed, factory: Callable[[], Indicator],
+           rel_tol: float = 1e-9, abs_tol: float = 1e-9) -> Dict[str, Any]:
+    """
+    Replay the full feed history and compare with every stored snapshot.
+
+    Returns {"checked": n, "mismatches": [{"as_of", "stored", "recomputed"}]}.
+    """
+    store.sync_changes()
+    snapshots = store.snapshots(feed, factory())
+    mismatches: List[Dict[str, Any]] = []
+    if not snapshots:
+        return {"checked": 0, "mismatches": mismatches}
+
+    full = factory()
+    rows = feed.rows(store.con, upto=snapshots[-1][0])
+    i = 0
+    for as_of, stored in snapshots:
+        while i < len(rows) and _at_or_before(rows[i][0], as_of):
+            full.update(*rows[i][1:])
+            i += 1
+        a, b = stored.value, full.value
+        same = (a is None and b is None) or (
+            a is not None and b is not None and math.isclose(a, b, rel_tol=rel_tol, abs_tol=abs_tol)
+        )
+        if not same:
+            mismatches.append({"as_of": as_of, "stored": a, "recomputed": b})
+    return {"checked": len(snapshots), "mismatches": mismatches}
@@ -175,8 +175,12 @@ class MLInferenceEngine:
         Returns:
             DataFrame ready for prediction
         """
+        # Feature store vectors are complete and point-in-time: use them as-is
+        # (NaN = not yet known, exactly as in training)
+        from_store = all(feat in features for feat in feature_names)
+
         # Engineer features from raw inputs
-        engineered = engineer_all_features(features)
+        engineered = features if from_store else engineer_all_features(features)
 
         # Create DataFrame with model's expected features
         feature_dict = {}
@@ -201,7 +205,8 @@ class MLInferenceEngine:
                         df[col] = 0
 
         # Fill missing values
-        df = df.fillna(0)
+        if not from_store:
+            df = df.fillna(0)
 
         return df
 
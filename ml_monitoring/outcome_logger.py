@@ -4,8 +4,21 @@ ML Outcome Logger
 Logs ML predictions and actual outcomes for performance monitoring.
 
 Database Schema:
-- ml_predictions: Store predictions when made
-- ml_outcomes: Store actual results when trade completes
+- ml_predictions: Store predictions when made (outcome filled in when trade completes)
+- ml_rollups: Per day x instrument x ORB x confidence bucket sums, updated
+  incrementally by log_prediction / log_outcome
+- ml_confusion: Per day x instrument predicted vs actual direction counts
+- ml_performance: Daily aggregates (from ml_rollups)
+
+Rollups hold sums and counts (never averages) so each logged row adds its
+contribution and a corrected outcome subtracts the old one. Dashboards
+read the rollups, not ml_predictions. A read-only reader on a database whose
+rollups were never built aggregates ml_predictions instead; build them once
+with `python ml_monitoring/outcome_logger.py --rebuild-rollups [gold.db]`.
+
+No connection is held between calls: each write opens gold.db read-write
+and closes it, readers open it read-only, so the logger never keeps
+DuckDB's write lock away from the feature builders, backfills or the hub.
 
 Usage:
     from ml_monitoring.outcome_logger import OutcomeLogger
@@ -17,99 +30,221 @@ Usage:
 
     # Log outcome (when trade completes)
     logger.log_outcome(prediction_id, actual_direction, actual_r_multiple, win=True)
+
+    # Rolling accuracy / calibration from the rollups (dashboards: read_only=True)
+    daily = OutcomeLogger(read_only=True).daily_performance(days=30, instrument="MGC")
 """
 
 import logging
-from datetime import datetime
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import duckdb
+import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import db_metrics
+
 logger = logging.getLogger(__name__)
 
+CONFIDENCE_BUCKETS = 10  # 0.0-0.1, ..., 0.9-1.0
+
+# One ml_predictions row set -> rollup contributions (times a sign of +1/-1)
+_ROLLUP_KEY = f"""
+    CAST(timestamp_utc AS DATE), instrument, orb_time,
+    LEAST(CAST(floor(coalesce(confidence, 0) * {CONFIDENCE_BUCKETS}) AS INTEGER), {CONFIDENCE_BUCKETS - 1})
+"""
+_ROLLUP_COLUMNS = {
+    'predictions': "count(*)",
+    'confidence_sum': "coalesce(sum(confidence), 0)",
+    'outcomes': "count(actual_direction)",
+    'correct': "count(*) FILTER (WHERE predicted_direction = actual_direction)",
+    'outcome_confidence_sum': "coalesce(sum(confidence) FILTER (WHERE actual_direction IS NOT NULL), 0)",
+    'wins': "count(*) FILTER (WHERE actual_direction IS NOT NULL AND win)",
+    'losses': "count(*) FILTER (WHERE actual_direction IS NOT NULL AND NOT win)",
+    'r_count': "count(actual_r_multiple) FILTER (WHERE actual_direction IS NOT NULL)",
+    'r_sum': "coalesce(sum(actual_r_multiple) FILTER (WHERE actual_direction IS NOT NULL), 0)",
+}
+
+# The same aggregates computed from ml_predictions, for readers when the rollups were never built
+_ROLLUPS_FROM_PREDICTIONS = f"""(
+    SELECT {_ROLLUP_KEY}, {', '.join(_ROLLUP_COLUMNS.values())} FROM ml_predictions GROUP BY ALL
+) AS ml_rollups(date_local, instrument, orb_time, conf_bucket, {', '.join(_ROLLUP_COLUMNS)})"""
+_CONFUSION_FROM_PREDICTIONS = """(
+    SELECT CAST(timestamp_utc AS DATE), instrument, predicted_direction, actual_direction, count(*)
+    FROM ml_predictions WHERE actual_direction IS NOT NULL GROUP BY ALL
+) AS ml_confusion(date_local, instrument, predicted_direction, actual_direction, n)"""
+
 
 class OutcomeLogger:
     """Logs ML predictions and outcomes to database."""
 
-    def __init__(self, db_path: str = "gold.db"):
+    def __init__(self, db_path: str = "gold.db", read_only: bool = False):
         """
         Initialize outcome logger.
 
+        Connections are opened per call and closed again; writes are
+        serialized with a lock.
+
         Args:
             db_path: Path to DuckDB database
+            read_only: Reader only (dashboards) - never creates tables or writes
         """
         self.db_path = db_path
-        self._ensure_tables()
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        if not read_only:
+            self._ensure_tables()
+
+    @contextmanager
+    def _connect(self, write: bool = False):
+        """Connection for one call, closed afterwards"""
+        if write and self.read_only:
+            raise RuntimeError("OutcomeLogger was opened read_only")
+        if write:
+            con = db_metrics.connect(self.db_path)
+        else:
+            try:
+                con = db_metrics.connect(self.db_path, read_only=True)
+            except duckdb.ConnectionException:
+                # This process already has the file open read-write; share that instance
+                con = db_metrics.connect(self.db_path)
+        try:
+            yield con
+        finally:
+            con.close()
 
     def _ensure_tables(self):
         """Create tables if they don't exist."""
-        conn = duckdb.connect(self.db_path)
-
         try:
-            # Predictions table
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS ml_predictions (
-                    prediction_id VARCHAR PRIMARY KEY,
-                    timestamp_utc TIMESTAMP,
-                    instrument VARCHAR,
-                    orb_time VARCHAR,
-                    strategy_name VARCHAR,
-
-                    -- ML Prediction
-                    predicted_direction VARCHAR,
-                    confidence FLOAT,
-                    confidence_level VARCHAR,
-                    prob_up FLOAT,
-                    prob_down FLOAT,
-                    prob_none FLOAT,
-
-                    -- Risk Adjustment
-                    risk_adjustment FLOAT,
-
-                    -- Context
-                    orb_size FLOAT,
-                    atr_14 FLOAT,
-                    rsi_14 FLOAT,
-
-                    -- Outcome (filled later)
-                    actual_direction VARCHAR,
-                    actual_r_multiple FLOAT,
-                    win BOOLEAN,
-                    outcome_logged_at TIMESTAMP
-                )
-            """)
-
-            # Performance metrics table (daily aggregates)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS ml_performance (
-                    date_local DATE,
-                    instrument VARCHAR,
-                    model_version VARCHAR,
-
-                    total_predictions INT,
-                    correct_predictions INT,
-                    directional_accuracy FLOAT,
-
-                    avg_confidence FLOAT,
-                    wins INT,
-                    losses INT,
-                    win_rate FLOAT,
-
-                    avg_r_multiple FLOAT,
-
-                    created_at TIMESTAMP,
-
-                    PRIMARY KEY (date_local, instrument, model_version)
-                )
-            """)
-
+            with self._lock, self._connect(write=True) as conn:
+                self._create_tables(conn)
             logger.info("ML outcome logging tables ready")
-
         except Exception as e:
             logger.error(f"Failed to create tables: {e}")
 
-        finally:
-            conn.close()
+    def _create_tables(self, conn):
+        # Predictions table
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ml_predictions (
+                prediction_id VARCHAR PRIMARY KEY,
+                timestamp_utc TIMESTAMP,
+                instrument VARCHAR,
+                orb_time VARCHAR,
+                strategy_name VARCHAR,
+
+                -- ML Prediction
+                predicted_direction VARCHAR,
+                confidence FLOAT,
+                confidence_level VARCHAR,
+                prob_up FLOAT,
+                prob_down FLOAT,
+                prob_none FLOAT,
+
+                -- Risk Adjustment
+                risk_adjustment FLOAT,
+
+                -- Context
+                orb_size FLOAT,
+                atr_14 FLOAT,
+                rsi_14 FLOAT,
+
+                -- Outcome (filled later)
+                actual_direction VARCHAR,
+                actual_r_multiple FLOAT,
+                win BOOLEAN,
+                outcome_logged_at TIMESTAMP
+            )
+        """)
+
+        # Performance metrics table (daily aggregates)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ml_performance (
+                date_local DATE,
+                instrument VARCHAR,
+                model_version VARCHAR,
+
+                total_predictions INT,
+                correct_predictions INT,
+                directional_accuracy FLOAT,
+
+                avg_confidence FLOAT,
+                wins INT,
+                losses INT,
+                win_rate FLOAT,
+
+                avg_r_multiple FLOAT,
+
+                created_at TIMESTAMP,
+
+                PRIMARY KEY (date_local, instrument, model_version)
+            )
+        """)
+
+        # Incremental rollups (sums, so contributions can be added/removed)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS ml_rollups (
+                date_local DATE,
+                instrument VARCHAR,
+                orb_time VARCHAR,
+                conf_bucket INT,
+                {', '.join(f"{col} {'DOUBLE' if col.endswith('_sum') else 'BIGINT'} DEFAULT 0" for col in _ROLLUP_COLUMNS)},
+                PRIMARY KEY (date_local, instrument, orb_time, conf_bucket)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ml_confusion (
+                date_local DATE,
+                instrument VARCHAR,
+                predicted_direction VARCHAR,
+                actual_direction VARCHAR,
+                n INT DEFAULT 0,
+                PRIMARY KEY (date_local, instrument, predicted_direction, actual_direction)
+            )
+        """)
+
+        # One-time backfill for predictions logged before rollups existed
+        if (conn.execute("SELECT count(*) FROM ml_rollups").fetchone()[0] == 0
+                and conn.execute("SELECT count(*) FROM ml_predictions").fetchone()[0] > 0):
+            self._rebuild_rollups(conn)
+
+    def _apply_rollups(self, conn, where: str, params: list, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) the contribution of matching ml_predictions rows"""
+        columns = list(_ROLLUP_COLUMNS)
+        conn.execute(f"""
+            INSERT INTO ml_rollups (date_local, instrument, orb_time, conf_bucket, {', '.join(columns)})
+            SELECT {_ROLLUP_KEY}, {', '.join(f'{sign} * {expr}' for expr in _ROLLUP_COLUMNS.values())}
+            FROM ml_predictions WHERE {where}
+            GROUP BY ALL
+            ON CONFLICT DO UPDATE SET {', '.join(f'{c} = ml_rollups.{c} + excluded.{c}' for c in columns)}
+        """, params)
+        conn.execute(f"""
+            INSERT INTO ml_confusion
+            SELECT CAST(timestamp_utc AS DATE), instrument, predicted_direction, actual_direction, {sign} * count(*)
+            FROM ml_predictions WHERE ({where}) AND actual_direction IS NOT NULL
+            GROUP BY ALL
+            ON CONFLICT DO UPDATE SET n = ml_confusion.n + excluded.n
+        """, params)
+
+    def rebuild_rollups(self):
+        """Recompute ml_rollups / ml_confusion from all of ml_predictions (backfill, repair)"""
+        with self._lock, self._connect(write=True) as conn:
+            self._rebuild_rollups(conn)
+
+    def _rebuild_rollups(self, conn):
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.execute("DELETE FROM ml_rollups")
+            conn.execute("DELETE FROM ml_confusion")
+            self._apply_rollups(conn, "TRUE", [])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info("Rebuilt ML rollups from ml_predictions")
 
     def log_prediction(
         self,
@@ -135,8 +270,20 @@ class OutcomeLogger:
         prediction_id = str(uuid.uuid4())
         timestamp_utc = datetime.utcnow()
 
-        conn = duckdb.connect(self.db_path)
+        try:
+            with self._lock, self._connect(write=True) as conn:
+                self._insert_prediction(conn, prediction_id, timestamp_utc, features, prediction, evaluation)
+
+            logger.info(f"Logged prediction {prediction_id}: {prediction['predicted_direction']} @ {prediction['confidence']:.1%}")
 
+        except Exception as e:
+            logger.error(f"Failed to log prediction: {e}")
+            return None
+
+        return prediction_id
+
+    def _insert_prediction(self, conn, prediction_id, timestamp_utc, features, prediction, evaluation):
+        conn.execute("BEGIN TRANSACTION")
         try:
             conn.execute("""
                 INSERT INTO ml_predictions (
@@ -163,17 +310,11 @@ class OutcomeLogger:
                 features.get('atr_14', 0.0),
                 features.get('rsi_14', 50.0),
             ])
-
-            logger.info(f"Logged prediction {prediction_id}: {prediction['predicted_direction']} @ {prediction['confidence']:.1%}")
-
-        except Exception as e:
-            logger.error(f"Failed to log prediction: {e}")
-            return None
-
-        finally:
-            conn.close()
-
-        return prediction_id
+            self._apply_rollups(conn, "prediction_id = ?", [prediction_id])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
 
     def log_outcome(
         self,
@@ -191,85 +332,113 @@ class OutcomeLogger:
             actual_r_multiple: Actual R-multiple achieved
             win: Whether trade was profitable
         """
-        conn = duckdb.connect(self.db_path)
-
         try:
-            conn.execute("""
-                UPDATE ml_predictions
-                SET actual_direction = ?,
-                    actual_r_multiple = ?,
-                    win = ?,
-                    outcome_logged_at = ?
-                WHERE prediction_id = ?
-            """, [actual_direction, actual_r_multiple, win, datetime.utcnow(), prediction_id])
+            with self._lock, self._connect(write=True) as conn:
+                conn.execute("BEGIN TRANSACTION")
+                try:
+                    # Swap this prediction's rollup contribution (handles re-logged outcomes)
+                    self._apply_rollups(conn, "prediction_id = ?", [prediction_id], sign=-1)
+                    conn.execute("""
+                        UPDATE ml_predictions
+                        SET actual_direction = ?,
+                            actual_r_multiple = ?,
+                            win = ?,
+                            outcome_logged_at = ?
+                        WHERE prediction_id = ?
+                    """, [actual_direction, actual_r_multiple, win, datetime.utcnow(), prediction_id])
+                    self._apply_rollups(conn, "prediction_id = ?", [prediction_id])
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
 
             logger.info(f"Logged outcome for {prediction_id}: {actual_direction}, R={actual_r_multiple:.2f}, Win={win}")
 
         except Exception as e:
             logger.error(f"Failed to log outcome: {e}")
 
-        finally:
-            conn.close()
+    def _since(self, days: int):
+        """First UTC date of a lookback window (rollups are keyed by DATE(timestamp_utc))"""
+        return (datetime.utcnow() - timedelta(days=days)).date()
+
+    @staticmethod
+    def _sources(conn) -> Dict[str, str]:
+        """{rollups}/{confusion} for reads: the rollup tables, or ml_predictions aggregates if never built"""
+        tables = {row[0] for row in conn.execute("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_name IN ('ml_predictions', 'ml_rollups', 'ml_confusion')
+        """).fetchall()}
+        built = {'ml_rollups', 'ml_confusion'} <= tables
+        if 'ml_predictions' in tables and (not built or (
+                conn.execute("SELECT NOT EXISTS (SELECT 1 FROM ml_rollups)").fetchone()[0]
+                and conn.execute("SELECT EXISTS (SELECT 1 FROM ml_predictions)").fetchone()[0])):
+            return {'rollups': _ROLLUPS_FROM_PREDICTIONS, 'confusion': _CONFUSION_FROM_PREDICTIONS}
+        return {'rollups': 'ml_rollups', 'confusion': 'ml_confusion'}
+
+    def _query(self, sql: str, params: list) -> pd.DataFrame:
+        """Run a read on a short-lived read-only connection (empty frame if the DB is unavailable)"""
+        try:
+            with self._connect() as conn:
+                return conn.execute(sql.format(**self._sources(conn)), params).fetchdf()
+        except duckdb.Error as e:
+            logger.warning(f"ML monitoring query failed: {e}")
+            return pd.DataFrame()
 
     def compute_daily_performance(self, date_local: str, instrument: str = "MGC"):
         """
-        Compute daily performance metrics.
+        Compute daily performance metrics (from ml_rollups).
 
         Args:
             date_local: Date to compute metrics for (YYYY-MM-DD)
             instrument: Instrument to compute for
         """
-        conn = duckdb.connect(self.db_path)
-
         try:
-            # Get predictions for this day
-            result = conn.execute("""
-                SELECT
-                    COUNT(*) as total_predictions,
-                    SUM(CASE WHEN predicted_direction = actual_direction THEN 1 ELSE 0 END) as correct_predictions,
-                    AVG(confidence) as avg_confidence,
-                    SUM(CASE WHEN win = true THEN 1 ELSE 0 END) as wins,
-                    SUM(CASE WHEN win = false THEN 1 ELSE 0 END) as losses,
-                    AVG(actual_r_multiple) as avg_r_multiple
-                FROM ml_predictions
-                WHERE DATE(timestamp_utc) = ?
-                  AND instrument = ?
-                  AND actual_direction IS NOT NULL
-            """, [date_local, instrument]).fetchone()
-
-            if result and result[0] > 0:
-                total, correct, avg_conf, wins, losses, avg_r = result
-
-                directional_accuracy = correct / total if total > 0 else 0
-                win_rate = wins / (wins + losses) if (wins + losses) > 0 else 0
-
-                # Insert into performance table
-                conn.execute("""
-                    INSERT OR REPLACE INTO ml_performance (
-                        date_local, instrument, model_version,
-                        total_predictions, correct_predictions, directional_accuracy,
-                        avg_confidence, wins, losses, win_rate,
-                        avg_r_multiple, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, [
-                    date_local, instrument, "latest",
-                    total, correct, directional_accuracy,
-                    avg_conf, wins, losses, win_rate,
-                    avg_r, datetime.utcnow()
-                ])
-
-                logger.info(f"Computed daily performance for {date_local}: "
-                          f"{directional_accuracy:.1%} accuracy, {win_rate:.1%} win rate")
-
+            with self._lock, self._connect(write=True) as conn:
+                self._store_daily_performance(conn, date_local, instrument)
         except Exception as e:
             logger.error(f"Failed to compute daily performance: {e}")
 
-        finally:
-            conn.close()
+    def _store_daily_performance(self, conn, date_local: str, instrument: str):
+        result = conn.execute("""
+            SELECT
+                SUM(outcomes) as total_predictions,
+                SUM(correct) as correct_predictions,
+                SUM(outcome_confidence_sum) / NULLIF(SUM(outcomes), 0) as avg_confidence,
+                SUM(wins) as wins,
+                SUM(losses) as losses,
+                SUM(r_sum) / NULLIF(SUM(r_count), 0) as avg_r_multiple
+            FROM ml_rollups
+            WHERE date_local = ?
+              AND instrument = ?
+        """, [date_local, instrument]).fetchone()
+
+        if result and result[0]:
+            total, correct, avg_conf, wins, losses, avg_r = result
+
+            directional_accuracy = correct / total if total > 0 else 0
+            win_rate = wins / (wins + losses) if (wins + losses) > 0 else 0
+
+            # Insert into performance table
+            conn.execute("""
+                INSERT OR REPLACE INTO ml_performance (
+                    date_local, instrument, model_version,
+                    total_predictions, correct_predictions, directional_accuracy,
+                    avg_confidence, wins, losses, win_rate,
+                    avg_r_multiple, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                date_local, instrument, "latest",
+                total, correct, directional_accuracy,
+                avg_conf, wins, losses, win_rate,
+                avg_r, datetime.utcnow()
+            ])
+
+            logger.info(f"Computed daily performance for {date_local}: "
+                      f"{directional_accuracy:.1%} accuracy, {win_rate:.1%} win rate")
 
     def get_recent_performance(self, days: int = 7, instrument: str = "MGC") -> Dict[str, float]:
         """
-        Get performance metrics for recent period.
+        Get performance metrics for recent period (pooled over the period's outcomes).
 
         Args:
             days: Number of days to look back
@@ -278,41 +447,137 @@ class OutcomeLogger:
         Returns:
             Dictionary of performance metrics
         """
-        conn = duckdb.connect(self.db_path)
-
         try:
-            result = conn.execute("""
+            result = self._query("""
                 SELECT
-                    AVG(directional_accuracy) as avg_accuracy,
-                    AVG(win_rate) as avg_win_rate,
-                    AVG(avg_r_multiple) as avg_r_multiple,
-                    SUM(total_predictions) as total_predictions
-                FROM ml_performance
-                WHERE date_local >= CURRENT_DATE - INTERVAL ? DAY
+                    SUM(correct) / NULLIF(SUM(outcomes), 0) as avg_accuracy,
+                    SUM(wins) / NULLIF(SUM(wins) + SUM(losses), 0) as avg_win_rate,
+                    SUM(r_sum) / NULLIF(SUM(r_count), 0) as avg_r_multiple,
+                    SUM(predictions) as total_predictions,
+                    SUM(outcomes) as completed_predictions
+                FROM {rollups}
+                WHERE date_local >= ?
                   AND instrument = ?
-            """, [days, instrument]).fetchone()
+            """, [self._since(days), instrument]).iloc[0]
 
-            if result:
-                return {
-                    'avg_accuracy': result[0] or 0,
-                    'avg_win_rate': result[1] or 0,
-                    'avg_r_multiple': result[2] or 0,
-                    'total_predictions': result[3] or 0
-                }
+            return {key: 0 if pd.isna(value) else float(value) for key, value in result.items()}
 
         except Exception as e:
             logger.error(f"Failed to get recent performance: {e}")
 
-        finally:
-            conn.close()
+        return {'avg_accuracy': 0, 'avg_win_rate': 0, 'avg_r_multiple': 0, 'total_predictions': 0,
+                'completed_predictions': 0}
 
-        return {'avg_accuracy': 0, 'avg_win_rate': 0, 'avg_r_multiple': 0, 'total_predictions': 0}
+    def daily_performance(self, days: int = 30, instrument: str = "MGC", window: int = 7) -> pd.DataFrame:
+        """
+        Daily metrics with rolling windows (from ml_rollups).
+
+        One row per day: directional_accuracy, win_rate, avg_r_multiple,
+        total_predictions, plus rolling_accuracy, rolling_win_rate and
+        rolling_calibration_gap (mean confidence - accuracy) over the last
+        `window` calendar days.
+        """
+        since = self._since(days)
+        return self._query(f"""
+            WITH daily AS (
+                SELECT date_local,
+                       SUM(predictions) AS total_predictions, SUM(outcomes) AS outcomes,
+                       SUM(correct) AS correct, SUM(wins) AS wins, SUM(losses) AS losses,
+                       SUM(r_sum) AS r_sum, SUM(r_count) AS r_count,
+                       SUM(outcome_confidence_sum) AS confidence_sum
+                FROM {{rollups}}
+                WHERE date_local >= ? AND instrument = ?
+                GROUP BY date_local
+            ),
+            rolling AS (
+                SELECT *,
+                       SUM(correct) OVER w AS w_correct, SUM(outcomes) OVER w AS w_outcomes,
+                       SUM(wins) OVER w AS w_wins, SUM(wins + losses) OVER w AS w_decided,
+                       SUM(confidence_sum) OVER w AS w_confidence
+                FROM daily
+                WINDOW w AS (ORDER BY date_local RANGE BETWEEN INTERVAL {int(window) - 1} DAY PRECEDING AND CURRENT ROW)
+            )
+            SELECT date_local,
+                   correct / NULLIF(outcomes, 0) AS directional_accuracy,
+                   wins / NULLIF(wins + losses, 0) AS win_rate,
+                   r_sum / NULLIF(r_count, 0) AS avg_r_multiple,
+                   total_predictions,
+                   outcomes AS completed_predictions,
+                   w_correct / NULLIF(w_outcomes, 0) AS rolling_accuracy,
+                   w_wins / NULLIF(w_decided, 0) AS rolling_win_rate,
+                   (w_confidence - w_correct) / NULLIF(w_outcomes, 0) AS rolling_calibration_gap
+            FROM rolling
+            ORDER BY date_local
+        """, [since, instrument])
+
+    def performance_by(self, column: str, days: int = 30, instrument: str = "MGC") -> pd.DataFrame:
+        """Accuracy / win rate / mean confidence by 'orb_time' or 'conf_bucket' (calibration)"""
+        if column not in ('orb_time', 'conf_bucket'):
+            raise ValueError(f"Unknown rollup dimension: {column}")
+        return self._query(f"""
+            SELECT {column},
+                   SUM(outcomes) AS outcomes,
+                   SUM(correct) / NULLIF(SUM(outcomes), 0) AS accuracy,
+                   SUM(wins) / NULLIF(SUM(wins) + SUM(losses), 0) AS win_rate,
+                   SUM(outcome_confidence_sum) / NULLIF(SUM(outcomes), 0) AS avg_confidence
+            FROM {{rollups}}
+            WHERE date_local >= ? AND instrument = ?
+            GROUP BY {column}
+            HAVING SUM(outcomes) > 0
+            ORDER BY {column}
+        """, [self._since(days), instrument])
+
+    def confusion_matrix(self, days: int = 30, instrument: str = "MGC") -> pd.DataFrame:
+        """Predicted (rows) x actual (columns) direction counts, with totals"""
+        counts = self._query("""
+            SELECT predicted_direction, actual_direction, SUM(n) AS n
+            FROM {confusion}
+            WHERE date_local >= ? AND instrument = ?
+            GROUP BY ALL
+            HAVING SUM(n) > 0
+        """, [self._since(days), instrument])
+        if counts.empty:
+            return counts
+        return pd.crosstab(counts['predicted_direction'], counts['actual_direction'],
+                           values=counts['n'], aggfunc='sum', margins=True).fillna(0).astype(int)
+
+    def recent_predictions(self, days: int = 30, instrument: str = "MGC", limit: int = 100) -> pd.DataFrame:
+        """Latest logged predictions (prediction log view)"""
+        return self._query("""
+            SELECT
+                timestamp_utc,
+                orb_time,
+                strategy_name,
+                predicted_direction,
+                confidence,
+                confidence_level,
+                actual_direction,
+                actual_r_multiple,
+                win,
+                orb_size,
+                rsi_14
+            FROM ml_predictions
+            WHERE instrument = ?
+              AND timestamp_utc >= ?
+            ORDER BY timestamp_utc DESC
+            LIMIT ?
+        """, [instrument, self._since(days), limit])
+
+    def close(self):
+        """No-op (connections are closed after each call); kept for callers"""
 
 
 # For testing
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
+    if "--rebuild-rollups" in sys.argv:
+        # One-shot backfill for databases logged before the rollups existed
+        args = [a for a in sys.argv[1:] if a != "--rebuild-rollups"]
+        OutcomeLogger(args[0] if args else "gold.db").rebuild_rollups()
+        print("[OK] ML rollups rebuilt from ml_predictions")
+        sys.exit(0)
+
     logger_instance = OutcomeLogger()
 
     # Example: Log a prediction
@@ -6,6 +6,7 @@ Usage:
     python ml_scripts/run_training.py --model entry_quality
     python ml_scripts/run_training.py --model r_multiple
     python ml_scripts/run_training.py --all  # Train all models
+    python ml_scripts/run_training.py --all --walkforward --workers 4  # Nightly walk-forward retrain
 """
 
 import sys
@@ -23,6 +24,9 @@ def main():
     parser.add_argument('--model', type=str, choices=['directional', 'entry_quality', 'r_multiple'])
     parser.add_argument('--all', action='store_true', help='Train all models')
     parser.add_argument('--data', type=str, default='ml_data/historical_features.parquet')
+    parser.add_argument('--walkforward', action='store_true', help='Walk-forward retraining with hyperparameter search')
+    parser.add_argument('--trials', type=int, help='Hyperparameter samples per model (walk-forward)')
+    parser.add_argument('--workers', type=int, help='Process pool size (walk-forward)')
 
     args = parser.parse_args()
 
@@ -41,7 +45,10 @@ def main():
 
         pipeline = MLTrainingPipeline(model_name)
         try:
-            pipeline.run()
+            if args.walkforward:
+                pipeline.run_walkforward(args.data, n_trials=args.trials, n_workers=args.workers)
+            else:
+                pipeline.run()
             print(f"\n[SUCCESS] {model_name} training complete!")
         except Exception as e:
             print(f"\n[FAILED] {model_name} training failed: {e}")
@@ -0,0 +1,376 @@
+"""
+Feature store - point-in-time ML features shared by training and live inference.
+
+Every feature is defined once, together with the local time it becomes known
+(see ZERO_LOOKAHEAD_RULES.md). Sessions are relative to the Asia date D:
+
+    pre_asia    D 07:00-09:00        asia    D 09:00-17:00
+    pre_london  D 17:00-18:00        london  D 18:00-23:00
+    pre_ny      D 23:00-D+1 00:30    ny      D+1 00:30-02:00
+
+A block is usable once it has closed; an ORB once its 5 minutes are over.
+Each ORB's vector is taken at its decision time (ORB close): later blocks
+are NaN, rsi_14 (RSI at the 00:30 5m bar) only exists for the 00:30 ORB, and
+day context (ATR, recent R) comes from prior days only.
+
+Two materializations feed the same feature_vector():
+- historical_frame(): daily_features_v2 + orb_facts rows, for training
+- FeatureStore.on_bar()/update(): the live 1m bar stream, O(1) per bar,
+  with day context from the same tables
+
+vector() serves the current vector from per-day running state, cached until
+new data changes it, so inference never rebuilds features from raw bars.
+
+Usage:
+    store = FeatureStore("MGC")
+    store.load_history(gold_con)
+    store.update(data_loader.bars_df)
+    features = store.vector("1000")
+"""
+
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from build_daily_features_v2 import FeatureBuilderV2
+from indicator_state import WindowMean, WindowRSI
+from orb_facts import FEATURE_TABLES, facts_source
+
+logger = logging.getLogger(__name__)
+
+TZ_LOCAL = ZoneInfo("Australia/Brisbane")
+
+DAY_START = 7 * 60  # Asia date D runs from D 07:00 to D+1 07:00 local
+
+# Blocks as minutes from D 00:00 local: (start, end); known at end
+BLOCKS = {
+    'pre_asia': (420, 540),
+    'asia': (540, 1020),
+    'pre_london': (1020, 1080),
+    'london': (1080, 1380),
+    'pre_ny': (1380, 1470),
+    'ny': (1470, 1560),
+}
+ORB_STARTS = {'0900': 540, '1000': 600, '1100': 660, '1800': 1080, '2300': 1380, '0030': 1470}
+ORB_MINUTES = 5
+ORB_HOURS = {'0900': 9, '1000': 10, '1100': 11, '1800': 18, '2300': 23, '0030': 0.5}
+
+# 0900-1100: Asia session, 1800-2300: London session, 0030: NY session
+SESSION_MAP = {
+    '0900': 'ASIA', '1000': 'ASIA', '1100': 'ASIA',
+    '1800': 'LONDON', '2300': 'LONDON', '0030': 'NY'
+}
+
+RSI_LEN = 14
+RSI_BAR = 1470  # rsi_14 = simple RSI over 5m closes up to the 00:30 bar (rsi_at_0030)
+ATR_DAYS = 20  # atr_14 = mean Asia range of the 20 prior days (atr_20)
+R_DAYS = 3  # avg_r_last_3d
+HISTORY_DAYS = 60  # Calendar days of context loaded for live use (> ATR_DAYS trading days)
+
+TYPE_CODES = {
+    'asia_type_code': ['A0_NORMAL', 'A1_TIGHT', 'A2_EXPANDED'],
+    'london_type_code': ['L1_SWEEP_HIGH', 'L2_SWEEP_LOW', 'L3_EXPANSION', 'L4_CONSOLIDATION'],
+    'pre_ny_type_code': ['N0_NORMAL', 'N1_SWEEP_HIGH', 'N2_SWEEP_LOW', 'N3_CONSOLIDATION', 'N4_EXPANSION'],
+}
+
+COMPLETE = 10 ** 6  # as_of for days loaded from the daily tables
+
+
+def asia_minute(ts) -> Tuple[date, int]:
+    """(Asia date, minutes since its 00:00 local) of a timestamp"""
+    local = pd.Timestamp(ts)
+    local = (local.tz_localize('UTC') if local.tzinfo is None else local).tz_convert(TZ_LOCAL)
+    minute = local.hour * 60 + local.minute
+    if minute < DAY_START:
+        return local.date() - timedelta(days=1), minute + 1440
+    return local.date(), minute
+
+
+@dataclass
+class DayState:
+    """Running inputs for one instrument and Asia date"""
+    instrument: str
+    date: date
+    blocks: Dict[str, List[float]] = field(default_factory=dict)  # name -> [high, low]
+    orbs: Dict[str, List[float]] = field(default_factory=dict)    # orb_time -> [high, low]
+    rsi: Optional[float] = None
+    context: Dict[str, Optional[float]] = field(default_factory=dict)
+    as_of: int = 0  # minutes since D 00:00 covered by data (bar close)
+
+    def add_bar(self, minute: int, high: float, low: float):
+        for name, (start, end) in BLOCKS.items():
+            if start <= minute < end:
+                _extend(self.blocks, name, high, low)
+        for orb_time, start in ORB_STARTS.items():
+            if start <= minute < start + ORB_MINUTES:
+                _extend(self.orbs, orb_time, high, low)
+        self.as_of = max(self.as_of, minute + 1)
+
+
+def _extend(levels: Dict[str, List[float]], key: str, high: float, low: float):
+    hl = levels.get(key)
+    if hl is None:
+        levels[key] = [high, low]
+    else:
+        hl[0], hl[1] = max(hl[0], high), min(hl[1], low)
+
+
+def _ratio(a: float, b: float) -> float:
+    return a / b if not (math.isnan(a) or math.isnan(b)) and b != 0 else math.nan
+
+
+def _mean(values: Sequence[float]) -> float:
+    return sum(values) / len(values) if values else math.nan
+
+
+def feature_vector(day: DayState, orb_time: str, at: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Feature vector for one ORB, using only what is known at its decision time
+    (ORB close) or at `at` minutes if earlier. NaN/None = not yet known.
+    """
+    cutoff = ORB_STARTS[orb_time] + ORB_MINUTES
+    cutoff = min(cutoff, day.as_of if at is None else at)
+    nan = math.nan
+
+    v: Dict[str, Any] = {'date_local': pd.Timestamp(day.date), 'instrument': day.instrument}
+    known = {}
+    for name, (_, end) in BLOCKS.items():
+        hl = day.blocks.get(name) if end <= cutoff else None
+        high, low = hl if hl else (nan, nan)
+        v[f'{name}_high'], v[f'{name}_low'], v[f'{name}_range'] = high, low, high - low
+        known[name] = hl
+
+    atr = day.context.get('atr_14')
+    atr = nan if atr is None else atr
+    v['atr_14'] = atr
+    v['rsi_14'] = day.rsi if day.rsi is not None and RSI_BAR + 5 <= cutoff else nan
+
+    asia, london, pre_ny = known['asia'], known['london'], known['pre_ny']
+    atr_or_none = None if math.isnan(atr) else atr
+    v['asia_type_code'] = FeatureBuilderV2.classify_asia_code(
+        v['asia_range'] if asia else None, atr_or_none)
+    v['london_type_code'] = FeatureBuilderV2.classify_london_code(
+        *(london or (None, None)), *(asia or (None, None)))
+    v['pre_ny_type_code'] = FeatureBuilderV2.classify_pre_ny_code(
+        *(pre_ny or (None, None)), *(london or (None, None)), *(asia or (None, None)), atr_or_none)
+
+    orb = day.orbs.get(orb_time) if ORB_STARTS[orb_time] + ORB_MINUTES <= cutoff else None
+    v['orb_time'] = orb_time
+    v['orb_high'], v['orb_low'] = orb if orb else (nan, nan)
+    v['orb_size'] = v['orb_high'] - v['orb_low']
+    v['session_context'] = SESSION_MAP[orb_time]
+
+    # Time features
+    ts = pd.Timestamp(day.date)
+    v['day_of_week'] = ts.dayofweek
+    v['day_of_month'] = ts.day
+    v['month'] = ts.month
+    v['quarter'] = ts.quarter
+    v['day_of_week_sin'] = np.sin(2 * np.pi * ts.dayofweek / 7)
+    v['day_of_week_cos'] = np.cos(2 * np.pi * ts.dayofweek / 7)
+    v['orb_hour'] = ORB_HOURS[orb_time]
+
+    # Normalized ranges, gaps, ratios
+    v['orb_size_pct_atr'] = _ratio(v['orb_size'], atr)
+    for name in ('asia', 'london', 'ny'):
+        v[f'{name}_range_pct_atr'] = _ratio(v[f'{name}_range'], atr)
+    v['asia_to_london_gap'] = v['london_low'] - v['asia_high'] if v['london_low'] > v['asia_high'] else 0.0
+    v['london_to_ny_gap'] = v['ny_low'] - v['london_high'] if v['ny_low'] > v['london_high'] else 0.0
+    v['london_asia_range_ratio'] = _ratio(v['london_range'], v['asia_range'])
+    v['ny_london_range_ratio'] = _ratio(v['ny_range'], v['london_range'])
+
+    # One-hot session and type codes (fixed category lists)
+    for session in ('ASIA', 'LONDON', 'NY'):
+        v[f'session_{session}'] = v['session_context'] == session
+    for column, codes in TYPE_CODES.items():
+        for code in codes:
+            v[f'{column}_{code}'] = v[column] == code
+
+    # Prior-day outcomes (all known by the 09:00 open)
+    v['prev_day_avg_r'] = day.context.get('prev_day_avg_r', nan)
+    v['avg_r_last_3d'] = day.context.get('avg_r_last_3d', nan)
+    return v
+
+
+FEATURE_COLUMNS = [k for k in feature_vector(DayState('MGC', date(2024, 1, 2)), '0900')]
+
+
+def day_contexts(daily: pd.DataFrame, orbs: pd.DataFrame, dates: Sequence[date]) -> Dict[date, Dict[str, Optional[float]]]:
+    """
+    Day context for each date from strictly earlier rows: atr_14 (mean Asia
+    range of the last ATR_DAYS days with an Asia session), prev_day_avg_r and
+    avg_r_last_3d (mean R of the previous day's / last R_DAYS days' ORBs).
+    """
+    asia = daily[daily['asia_high'].notna()]
+    ranges = sorted(zip(pd.to_datetime(asia['date_local']).dt.date, asia['asia_high'] - asia['asia_low']))
+    by_day = sorted(
+        (d, [float(r) for r in group.dropna()])
+        for d, group in orbs.groupby(pd.to_datetime(orbs['date_local']).dt.date)['r_multiple']
+    )
+
+    mean, recent = WindowMean(ATR_DAYS), deque(maxlen=R_DAYS)
+    i = j = 0
+    out = {}
+    for d in sorted(set(dates)):
+        while i < len(ranges) and ranges[i][0] < d:
+            mean.update(ranges[i][1])
+            i += 1
+        while j < len(by_day) and by_day[j][0] < d:
+            recent.append(by_day[j][1])
+            j += 1
+        out[d] = {
+            'atr_14': mean.value,
+            'prev_day_avg_r': _mean(recent[-1]) if recent else math.nan,
+            'avg_r_last_3d': _mean([r for day_r in recent for r in day_r]),
+        }
+    return out
+
+
+def historical_frame(daily: pd.DataFrame, orbs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Point-in-time feature vectors for every ORB row (training), built from
+    daily_features_v2-style rows and orb_facts-style rows.
+
+    Returns one row per orb row, same index, FEATURE_COLUMNS order.
+    """
+    daily = daily.assign(date_local=pd.to_datetime(daily['date_local']).dt.date)
+    dates = pd.to_datetime(orbs['date_local']).dt.date
+    contexts = day_contexts(daily, orbs, dates.unique())
+    by_key = {(row['instrument'], row['date_local']): row for row in daily.to_dict('records')}
+
+    states: Dict[Tuple[str, date], DayState] = {}
+    vectors = []
+    for (instrument, d, orb_time, high, low) in zip(orbs['instrument'], dates, orbs['orb_time'],
+                                                    orbs['orb_high'], orbs['orb_low']):
+        state = states.get((instrument, d))
+        if state is None:
+            row = by_key.get((instrument, d), {})
+            state = DayState(instrument, d, context=contexts[d], as_of=COMPLETE)
+            for name in BLOCKS:
+                if pd.notna(row.get(f'{name}_high')):
+                    state.blocks[name] = [float(row[f'{name}_high']), float(row[f'{name}_low'])]
+            rsi = row.get('rsi_at_0030')
+            state.rsi = float(rsi) if pd.notna(rsi) else None
+            states[(instrument, d)] = state
+        if pd.notna(high):
+            state.orbs[orb_time] = [float(high), float(low)]
+        vectors.append(feature_vector(state, orb_time))
+
+    return pd.DataFrame(vectors, index=orbs.index, columns=FEATURE_COLUMNS)
+
+
+def load_history(con, instrument: str = 'MGC', since: Optional[date] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(daily rows, orb rows) for an instrument from the canonical tables"""
+    table = FEATURE_TABLES[instrument]
+    where, params = ("WHERE date_local >= ?", [since]) if since else ("", [])
+    daily = con.execute(f"""
+        SELECT date_local, '{instrument}' AS instrument,
+               {', '.join(f'{name}_high, {name}_low' for name in BLOCKS)},
+               rsi_at_0030
+        FROM {table} {where}
+        ORDER BY date_local
+    """, params).fetchdf()
+    orbs = con.execute(f"""
+        SELECT date_local, instrument, orb_time, orb_high, orb_low, orb_size,
+               break_dir, outcome, r_multiple
+        FROM {facts_source(con, instrument)}
+        WHERE instrument = ? {'AND date_local >= ?' if since else ''}
+        ORDER BY date_local, list_position(?, orb_time)
+    """, [instrument] + params + [list(ORB_STARTS)]).fetchdf()
+    return daily, orbs
+
+
+class FeatureStore:
+    """Live point-in-time features from the 1m bar stream"""
+
+    def __init__(self, instrument: str = 'MGC'):
+        self.instrument = instrument
+        self.daily = pd.DataFrame(columns=['date_local', 'asia_high', 'asia_low'])
+        self.orbs = pd.DataFrame(columns=['date_local', 'r_multiple'])
+        self.days: Dict[date, DayState] = {}
+        self.last_ts: Optional[pd.Timestamp] = None
+        self._closes: deque = deque(maxlen=RSI_LEN + 3)  # [5m bar start, close]
+        self._cache: Dict[Tuple[date, str, int], Dict[str, Any]] = {}
+
+    def load_history(self, con, since: Optional[date] = None):
+        """Load prior days (ATR / recent R context) from the daily tables"""
+        since = since or datetime.now(TZ_LOCAL).date() - timedelta(days=HISTORY_DAYS)
+        self.daily, self.orbs = load_history(con, self.instrument, since)
+        for d, day in self.days.items():
+            day.context = day_contexts(self.daily, self.orbs, [d])[d]
+        self._cache.clear()
+        logger.info(f"Feature store history: {len(self.daily)} days for {self.instrument}")
+
+    def day(self, d: date) -> DayState:
+        state = self.days.get(d)
+        if state is None:
+            state = DayState(self.instrument, d, context=day_contexts(self.daily, self.orbs, [d])[d])
+            self.days = {k: v for k, v in self.days.items() if k >= d - timedelta(days=1)}
+            self.days[d] = state
+        return state
+
+    def on_bar(self, ts_utc, high: float, low: float, close: float):
+        """Fold one closed 1m bar into the running state (bars must arrive in order)"""
+        ts = pd.Timestamp(ts_utc)
+        d, minute = asia_minute(ts)
+        utc = ts.tz_localize('UTC') if ts.tzinfo is None else ts
+        state = self.day(d)
+        state.add_bar(minute, float(high), float(low))
+
+        # 5m closes for rsi_14 (bar start -> last 1m close)
+        bucket = utc.floor('5min')
+        if self._closes and self._closes[-1][0] == bucket:
+            self._closes[-1][1] = float(close)
+        else:
+            self._closes.append([bucket, float(close)])
+        if state.rsi is None and state.as_of >= RSI_BAR + 5:
+            rsi_bar = pd.Timestamp(datetime.combine(d, datetime.min.time()), tz=TZ_LOCAL) + timedelta(minutes=RSI_BAR)
+            rsi = WindowRSI(RSI_LEN)
+            for start, value in self._closes:
+                if start <= rsi_bar:
+                    rsi.update(value)
+            state.rsi = rsi.value
+
+        self.last_ts = ts
+
+    def update(self, bars: pd.DataFrame, now: Optional[datetime] = None) -> int:
+        """
+        Fold closed bars newer than the last one seen (ts_utc/high/low/close columns); returns count.
+
+        The live loader includes the forming bar; a last bar that has not closed
+        by now is left for a later update so its final high/low/close is used.
+        """
+        if bars is None or bars.empty:
+            return 0
+        new = bars if self.last_ts is None else bars[bars['ts_utc'] > self.last_ts]
+        if len(new):
+            last = pd.Timestamp(new['ts_utc'].iloc[-1])
+            last = last.tz_localize('UTC') if last.tzinfo is None else last
+            if last + timedelta(minutes=1) > pd.Timestamp(now or datetime.now(timezone.utc)):
+                new = new.iloc[:-1]
+        for ts, high, low, close in zip(new['ts_utc'], new['high'], new['low'], new['close']):
+            self.on_bar(ts, high, low, close)
+        return len(new)
+
+    def vector(self, orb_time: str, d: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """Current feature vector for an ORB of date d (default: latest day seen)"""
+        if d is None:
+            if not self.days:
+                return None
+            d = max(self.days)
+        state = self.days.get(d)
+        if state is None:
+            return None
+        key = (d, orb_time, min(state.as_of, ORB_STARTS[orb_time] + ORB_MINUTES))
+        cached = self._cache.get(key)
+        if cached is None or state.as_of < ORB_STARTS[orb_time] + ORB_MINUTES:
+            # Blocks still open can change between bars until the ORB closes
+            cached = self._cache[key] = feature_vector(state, orb_time)
+        return cached
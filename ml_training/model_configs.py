@@ -91,6 +91,17 @@ TRAINING_CONFIG = {
     'stratify': True,  # Stratify by target class
 }
 
+# Walk-forward retraining (train_pipeline.py --walkforward)
+WALKFORWARD_CONFIG = {
+    'mode': 'expanding',  # 'expanding' or 'rolling'
+    'n_folds': 5,  # Test blocks after the initial training window
+    'min_train_fraction': 0.5,  # Share of trading days before the first test block
+    'rolling_window_days': None,  # Rolling mode window (None = initial window length)
+    'n_trials': 20,  # Hyperparameter samples per run (trial 0 = base config)
+    'n_workers': None,  # Process pool size (None = all CPUs)
+    'cache_dir': 'ml_data/cache',  # Binned per-fold datasets
+}
+
 # Inference configuration
 INFERENCE_CONFIG = {
     # Confidence thresholds
@@ -234,9 +245,38 @@ OPTUNA_SEARCH_SPACES = {
         'reg_alpha': [0.0, 0.1, 0.5],
         'reg_lambda': [0.0, 0.1, 0.5],
     },
+    'entry_quality': {
+        'max_depth': [3, 4, 6, 8],
+        'learning_rate': [0.02, 0.05, 0.1],
+        'subsample': [0.7, 0.8, 0.9],
+        'colsample_bytree': [0.7, 0.8, 0.9],
+        'min_child_weight': [1, 3, 5],
+        'reg_lambda': [0.5, 1.0, 2.0],
+    },
+    'r_multiple': {
+        'max_depth': [3, 4, 5, 7],
+        'learning_rate': [0.02, 0.05, 0.1],
+        'subsample': [0.7, 0.8, 0.9],
+        'colsample_bytree': [0.7, 0.8, 0.9],
+        'min_child_weight': [3, 5, 10],
+        'reg_lambda': [0.5, 1.0, 2.0],
+    },
 }
 
 
+def get_search_space(model_name: str) -> Dict[str, Any]:
+    """
+    Get hyperparameter search grid for a model (empty if none defined).
+
+    Args:
+        model_name: Name of the model
+
+    Returns:
+        Dictionary of parameter name -> candidate values
+    """
+    return {k: list(v) for k, v in OPTUNA_SEARCH_SPACES.get(model_name, {}).items()}
+
+
 if __name__ == "__main__":
     # Test configurations
     print("Testing model configurations...\n")
@@ -7,16 +7,23 @@ Usage:
     python ml_training/train_pipeline.py --model directional
     python ml_training/train_pipeline.py --model entry_quality
     python ml_training/train_pipeline.py --model r_multiple
+    python ml_training/train_pipeline.py --model directional --walkforward --trials 20 --workers 4
 
 The trained model will be saved to ml_models/registry/{model_name}_v1/
+
+--walkforward retrains over expanding (or rolling) walk-forward folds,
+searches OPTUNA_SEARCH_SPACES across a process pool with each fold's binned
+dataset cached on disk, and records per-fold metrics in the registry.
 """
 
 import argparse
 import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, Optional
 
 import pandas as pd
 import numpy as np
@@ -31,8 +38,11 @@ from sklearn.preprocessing import LabelEncoder
 import joblib
 
 from ml_training.model_configs import (
-    get_model_config, get_target_mapping, get_feature_config,
-    TRAINING_CONFIG, MODEL_REGISTRY_CONFIG
+    get_model_config, get_target_mapping, get_feature_config, get_search_space,
+    TRAINING_CONFIG, MODEL_REGISTRY_CONFIG, WALKFORWARD_CONFIG
+)
+from ml_training.walkforward import (
+    walkforward_folds, sample_params, build_fold_cache, train_trial_fold
 )
 
 # Setup logging
@@ -130,8 +140,12 @@ class MLTrainingPipeline:
         if self.target_info['target_type'] == 'classification':
             logger.info("Encoding target labels...")
             if 'class_mapping' in self.target_info:
-                # Use predefined mapping
+                # Use predefined mapping (drop labels outside it, e.g. NO_TRADE)
                 y = y.map(self.target_info['class_mapping'])
+                mapped = y.notna()
+                if not mapped.all():
+                    logger.info(f"Dropping {(~mapped).sum()} samples with unmapped target labels")
+                    X, y = X[mapped], y[mapped].astype(int)
             else:
                 # Auto-encode
                 le = LabelEncoder()
@@ -222,25 +236,30 @@ class MLTrainingPipeline:
 
         logger.info("Training complete!")
 
+    def _class_weights(self, y_train) -> Optional[np.ndarray]:
+        """Balanced per-sample class weights (None if disabled)"""
+        if not TRAINING_CONFIG.get('use_class_weights', True):
+            return None
+
+        from sklearn.utils.class_weight import compute_class_weight
+
+        classes = np.unique(y_train)
+        weights = compute_class_weight('balanced', classes=classes, y=y_train)
+
+        # Create weight array for each sample
+        sample_weights = np.ones(len(y_train))
+        for i, cls in enumerate(classes):
+            sample_weights[np.asarray(y_train) == cls] = weights[i]
+
+        logger.info(f"Using class weights: {dict(zip(classes, weights))}")
+        return sample_weights
+
     def _train_lightgbm(
         self, X_train, y_train, X_val, y_val
     ) -> lgb.Booster:
         """Train LightGBM model."""
         # Compute class weights for balanced training
-        class_weights = None
-        if TRAINING_CONFIG.get('use_class_weights', True):
-            from sklearn.utils.class_weight import compute_class_weight
-
-            classes = np.unique(y_train)
-            weights = compute_class_weight('balanced', classes=classes, y=y_train)
-
-            # Create weight array for each sample
-            sample_weights = np.ones(len(y_train))
-            for i, cls in enumerate(classes):
-                sample_weights[y_train == cls] = weights[i]
-
-            logger.info(f"Using class weights: {dict(zip(classes, weights))}")
-            class_weights = sample_weights
+        class_weights = self._class_weights(y_train)
 
         # Prepare datasets
         train_data = lgb.Dataset(X_train, label=y_train, weight=class_weights)
@@ -455,6 +474,125 @@ class MLTrainingPipeline:
 
         return model_dir
 
+    def run_walkforward(
+        self,
+        data_path: str = "ml_data/historical_features.parquet",
+        n_folds: Optional[int] = None,
+        mode: Optional[str] = None,
+        n_trials: Optional[int] = None,
+        n_workers: Optional[int] = None,
+        save: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Walk-forward retraining with a parallel hyperparameter search.
+
+        Every sampled config is trained on every fold (one process-pool task
+        per pair, datasets loaded from the fold cache). The config with the
+        lowest mean validation loss is refit on the final window and saved
+        with its per-fold test metrics.
+
+        Returns:
+            The walk-forward summary stored under metrics['walkforward']
+        """
+        cfg = WALKFORWARD_CONFIG
+        n_folds = n_folds or cfg['n_folds']
+        mode = mode or cfg['mode']
+        n_trials = n_trials or cfg['n_trials']
+        n_workers = n_workers or cfg['n_workers'] or os.cpu_count() or 1
+        model_type = self.model_config['model_type']
+
+        logger.info("="*60)
+        logger.info(f"WALK-FORWARD TRAINING {self.model_name.upper()} ({mode}, {n_folds} folds, {n_trials} trials)")
+        logger.info("="*60)
+
+        df = self.load_data(data_path)
+        X, y = self.prepare_features(df)
+
+        # Chronological order (folds index positions)
+        dates = pd.to_datetime(df['date_local'].loc[X.index])
+        order = np.argsort(dates.to_numpy(), kind='stable')
+        X, y, dates = X.iloc[order], y.iloc[order], dates.iloc[order]
+
+        *folds, final = walkforward_folds(
+            dates, n_folds=n_folds, mode=mode,
+            min_train_fraction=cfg['min_train_fraction'],
+            val_fraction=TRAINING_CONFIG['val_split'] / (TRAINING_CONFIG['train_split'] + TRAINING_CONFIG['val_split']),
+            gap_days=TRAINING_CONFIG['gap'],
+            window_days=cfg['rolling_window_days'],
+            include_final=True,
+        )
+        if not folds:
+            raise ValueError("Not enough history for walk-forward folds")
+
+        # Binned datasets: built once per fold, shared by every trial
+        # Class weights come from each fold's own training labels (no later label frequencies)
+        weight_fn = self._class_weights if model_type == 'lightgbm' else None
+        cache_dir = Path(cfg['cache_dir']) / self.model_name
+        fold_paths = [build_fold_cache(cache_dir, model_type, X, y, fold, weight_fn) for fold in folds]
+
+        trials = sample_params(self.model_config, get_search_space(self.model_name), n_trials)
+        tasks = [
+            {'trial': t, 'fold': fold.index, 'config': config, 'paths': paths,
+             'target_type': self.target_info['target_type'], 'train_rows': len(fold.train),
+             'threads': 1 if n_workers > 1 else 0}
+            for t, config in enumerate(trials)
+            for fold, paths in zip(folds, fold_paths)
+        ]
+        logger.info(f"Running {len(tasks)} trial/fold fits on {n_workers} worker(s)...")
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = list(pool.map(train_trial_fold, tasks))
+        else:
+            results = [train_trial_fold(task) for task in tasks]
+
+        table = pd.DataFrame(results)
+        metric_cols = [c for c in ('accuracy', 'mae', 'rmse') if c in table.columns]
+        by_trial = table.groupby('trial')[['val_loss', 'best_iteration'] + metric_cols].mean()
+        best = int(by_trial['val_loss'].idxmin())
+        best_folds = table[table['trial'] == best].sort_values('fold')
+
+        for _, row in best_folds.iterrows():
+            fold = folds[[f.index for f in folds].index(row['fold'])]
+            logger.info(
+                f"Fold {int(row['fold'])}: train {dates.iloc[fold.train[0]].date()}..{dates.iloc[fold.val[-1]].date()} "
+                f"test {dates.iloc[fold.test[0]].date()}..{dates.iloc[fold.test[-1]].date()} "
+                + " ".join(f"{c}={row[c]:.4f}" for c in metric_cols)
+            )
+
+        # Refit the winning config on the latest window
+        self.model_config = dict(trials[best])
+        self.train_model(X.iloc[final.train], y.iloc[final.train], X.iloc[final.val], y.iloc[final.val])
+
+        space = get_search_space(self.model_name)
+        summary = {
+            'mode': mode,
+            'n_folds': len(folds),
+            'gap_days': TRAINING_CONFIG['gap'],
+            'n_trials': len(trials),
+            'best_trial': best,
+            'best_params': {k: trials[best][k] for k in space},
+            'folds': [
+                {**{k: (int(v) if k in ('trial', 'fold', 'best_iteration', 'train_rows', 'test_rows') else float(v))
+                    for k, v in row.items()},
+                 'train_start': str(dates.iloc[fold.train[0]].date()),
+                 'test_start': str(dates.iloc[fold.test[0]].date()),
+                 'test_end': str(dates.iloc[fold.test[-1]].date())}
+                for fold, (_, row) in zip(folds, best_folds.iterrows())
+            ],
+            'trials': by_trial.reset_index().to_dict(orient='records'),
+        }
+        # Out-of-sample estimate: mean over walk-forward test folds
+        self.metrics = {c: float(best_folds[c].mean()) for c in metric_cols}
+        self.metrics['walkforward'] = summary
+
+        logger.info(f"Best trial {best}: {summary['best_params']} "
+                    + " ".join(f"{c}={self.metrics[c]:.4f}" for c in metric_cols))
+
+        if save:
+            model_dir = self.save_model()
+            logger.info(f"Model saved to: {model_dir}")
+        return summary
+
     def run(self):
         """Run the full training pipeline."""
         logger.info("="*60)
@@ -503,12 +641,21 @@ def main():
         default='ml_data/historical_features.parquet',
         help='Path to training data'
     )
+    parser.add_argument('--walkforward', action='store_true', help='Walk-forward retraining with hyperparameter search')
+    parser.add_argument('--mode', choices=['expanding', 'rolling'], help='Walk-forward window mode')
+    parser.add_argument('--folds', type=int, help='Walk-forward test folds')
+    parser.add_argument('--trials', type=int, help='Hyperparameter samples')
+    parser.add_argument('--workers', type=int, help='Process pool size')
 
     args = parser.parse_args()
 
     # Run training pipeline
     pipeline = MLTrainingPipeline(args.model)
-    pipeline.run()
+    if args.walkforward:
+        pipeline.run_walkforward(args.data, n_folds=args.folds, mode=args.mode,
+                                 n_trials=args.trials, n_workers=args.workers)
+    else:
+        pipeline.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,238 @@
+"""
+Walk-forward training helpers.
+
+Folds, hyperparameter sampling, the on-disk dataset cache and the worker
+that trains one (params, fold) pair. MLTrainingPipeline.run_walkforward()
+ties them together.
+
+Each fold's binned training/validation data (lgb.Dataset / xgb.DMatrix
+binary) is written once under WALKFORWARD_CONFIG['cache_dir'], keyed by a
+hash of the fold's contents, and every trial loads it from disk instead of
+rebuilding it from pandas. Re-running on unchanged data reuses every fold.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, mean_absolute_error, mean_squared_error
+
+logger = logging.getLogger(__name__)
+
+TRAINING_ONLY_KEYS = ['n_estimators', 'early_stopping_rounds', 'model_type']
+
+
+@dataclass
+class Fold:
+    """Row positions (into the date-sorted frame) of one walk-forward fold"""
+    index: int
+    train: np.ndarray
+    val: np.ndarray
+    test: np.ndarray
+
+
+def walkforward_folds(
+    dates: pd.Series,
+    n_folds: int = 5,
+    mode: str = 'expanding',
+    min_train_fraction: float = 0.5,
+    val_fraction: float = 0.25,
+    gap_days: int = 0,
+    window_days: Optional[int] = None,
+    include_final: bool = False,
+) -> List[Fold]:
+    """
+    Split date-sorted rows into walk-forward folds.
+
+    The trading days after the first min_train_fraction are cut into n_folds
+    consecutive test blocks. Each fold trains on the days before its block
+    (all of them when expanding, the last window_days when rolling), less a
+    gap of gap_days; the last val_fraction of the training rows is held out
+    for early stopping.
+
+    include_final appends a fold with no test rows that trains up to the
+    last date (the model that gets deployed).
+    """
+    if mode not in ('expanding', 'rolling'):
+        raise ValueError(f"Unknown walk-forward mode: {mode}")
+
+    dates = pd.to_datetime(pd.Series(dates)).dt.normalize().to_numpy()
+    if len(dates) and (np.diff(dates) < np.timedelta64(0)).any():
+        raise ValueError("Dates must be sorted")
+
+    days = np.unique(dates)
+    first_test = int(len(days) * min_train_fraction)
+    blocks = np.array_split(days[first_test:], n_folds)
+    gap = np.timedelta64(gap_days, 'D')
+    if window_days is None:
+        window_days = int((days[first_test - 1] - days[0]) / np.timedelta64(1, 'D')) + 1 if first_test else 0
+
+    def train_val(train_start, train_end):
+        lo, hi = np.searchsorted(dates, [train_start, train_end], side='left')
+        n_val = int((hi - lo) * val_fraction)
+        return np.arange(lo, hi - n_val), np.arange(hi - n_val, hi)
+
+    def window_start(train_end):
+        return days[0] if mode == 'expanding' else train_end - np.timedelta64(window_days, 'D')
+
+    folds = []
+    for k, block in enumerate(blocks):
+        if len(block) == 0:
+            continue
+        train_end = block[0] - gap
+        train, val = train_val(window_start(train_end), train_end)
+        if len(train) == 0 or len(val) == 0:
+            continue
+        test = np.arange(np.searchsorted(dates, block[0], side='left'), np.searchsorted(dates, block[-1], side='right'))
+        folds.append(Fold(k, train, val, test))
+
+    if include_final and len(days):
+        train_end = days[-1] + np.timedelta64(1, 'D')
+        train, val = train_val(window_start(train_end), train_end)
+        folds.append(Fold(len(blocks), train, val, np.arange(0)))
+    return folds
+
+
+def sample_params(base: Dict[str, Any], space: Dict[str, List[Any]], n_trials: int,
+                  seed: int = 42) -> List[Dict[str, Any]]:
+    """Trial 0 is the base config; the rest are distinct random draws from the grid"""
+    trials = [dict(base)]
+    keys = sorted(space)
+    combos = [c for c in itertools.product(*(space[k] for k in keys))
+              if c != tuple(base.get(k) for k in keys)]
+    random.Random(seed).shuffle(combos)
+    trials += [{**base, **dict(zip(keys, c))} for c in combos[:max(n_trials - 1, 0)]]
+    return trials
+
+
+def _fingerprint(model_type: str, feature_names: List[str], *arrays) -> str:
+    digest = hashlib.sha1(json.dumps([model_type, feature_names, lgb.__version__, xgb.__version__]).encode())
+    for array in arrays:
+        if array is not None:
+            digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def build_fold_cache(
+    cache_dir: Path,
+    model_type: str,
+    X: pd.DataFrame,
+    y: pd.Series,
+    fold: Fold,
+    weight_fn: Optional[Callable[[pd.Series], Optional[np.ndarray]]] = None,
+) -> Dict[str, str]:
+    """
+    Write (or reuse) a fold's binned train/val data and raw test rows; returns file paths.
+
+    weight_fn maps the fold's training labels to sample weights, so e.g. class
+    balance is estimated from rows the fold may see (never later labels).
+    """
+    X_train, y_train = X.iloc[fold.train], y.iloc[fold.train]
+    w_train = weight_fn(y_train) if weight_fn is not None else None
+    key = _fingerprint(model_type, list(X.columns), X_train.to_numpy(), y_train.to_numpy(), w_train,
+                       X.iloc[fold.val].to_numpy(), y.iloc[fold.val].to_numpy(),
+                       X.iloc[fold.test].to_numpy(), y.iloc[fold.test].to_numpy())
+    fold_dir = Path(cache_dir) / key
+    suffix = 'bin' if model_type == 'lightgbm' else 'buffer'
+    paths = {
+        'train': str(fold_dir / f"train.{suffix}"),
+        'val': str(fold_dir / f"val.{suffix}"),
+        'test': str(fold_dir / "test.npz"),
+    }
+    if (fold_dir / "DONE").exists():
+        logger.info(f"Fold {fold.index}: using cached datasets {fold_dir}")
+        return paths
+
+    fold_dir.mkdir(parents=True, exist_ok=True)
+    names = list(X.columns)
+    if model_type == 'lightgbm':
+        train = lgb.Dataset(X_train, label=y_train, weight=w_train, feature_name=names,
+                            params={'verbose': -1, 'feature_pre_filter': False},  # trials vary min_data_in_leaf
+                            free_raw_data=False).construct()
+        val = lgb.Dataset(X.iloc[fold.val], label=y.iloc[fold.val], reference=train).construct()
+        train.save_binary(paths['train'])
+        val.save_binary(paths['val'])
+    elif model_type == 'xgboost':
+        xgb.DMatrix(X_train, label=y_train, weight=w_train, feature_names=names).save_binary(paths['train'])
+        xgb.DMatrix(X.iloc[fold.val], label=y.iloc[fold.val], feature_names=names).save_binary(paths['val'])
+    else:
+        raise ValueError(f"Unknown model type: {model_type}")
+    np.savez(paths['test'], X=X.iloc[fold.test].to_numpy(dtype=np.float64), y=y.iloc[fold.test].to_numpy())
+    (fold_dir / "DONE").touch()
+    logger.info(f"Fold {fold.index}: cached datasets in {fold_dir}")
+    return paths
+
+
+def fold_metrics(target_type: str, y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    """Test metrics for one fold"""
+    if target_type == 'classification':
+        return {'accuracy': float(accuracy_score(y_true, y_pred))}
+    return {
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+        'rmse': float(np.sqrt(mean_squared_error(y_true, y_pred))),
+    }
+
+
+def train_trial_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train one hyperparameter trial on one cached fold (process-pool worker).
+
+    Returns the early-stopping validation loss, best iteration and test
+    metrics; the booster itself is discarded.
+    """
+    config, paths, target_type = task['config'], task['paths'], task['target_type']
+    params = {k: v for k, v in config.items() if k not in TRAINING_ONLY_KEYS}
+    test = np.load(paths['test'])
+    X_test, y_test = test['X'], test['y']
+
+    if config['model_type'] == 'lightgbm':
+        params['num_threads'] = task.get('threads', 1)
+        train = lgb.Dataset(paths['train'], params={'verbose': -1})
+        val = lgb.Dataset(paths['val'], reference=train)
+        model = lgb.train(
+            params, train,
+            num_boost_round=config.get('n_estimators', 500),
+            valid_sets=[val], valid_names=['val'],
+            callbacks=[lgb.early_stopping(config.get('early_stopping_rounds', 50), verbose=False)],
+        )
+        val_loss = float(next(iter(model.best_score['val'].values())))
+        best_iteration = int(model.best_iteration)
+        raw = model.predict(X_test, num_iteration=best_iteration)
+    else:
+        params['nthread'] = task.get('threads', 1)
+        dtrain, dval = xgb.DMatrix(paths['train']), xgb.DMatrix(paths['val'])
+        model = xgb.train(
+            params, dtrain,
+            num_boost_round=config.get('n_estimators', 300),
+            evals=[(dval, 'val')],
+            early_stopping_rounds=config.get('early_stopping_rounds', 50),
+            verbose_eval=False,
+        )
+        val_loss = float(model.best_score)
+        best_iteration = int(model.best_iteration) + 1
+        raw = model.predict(xgb.DMatrix(X_test, feature_names=dtrain.feature_names),
+                            iteration_range=(0, best_iteration))
+
+    if target_type == 'classification':
+        y_pred = np.argmax(raw, axis=1) if raw.ndim == 2 else (raw > 0.5).astype(int)
+    else:
+        y_pred = raw
+
+    return {
+        'trial': task['trial'],
+        'fold': task['fold'],
+        'val_loss': val_loss,
+        'best_iteration': best_iteration,
+        'train_rows': int(task['train_rows']),
+        'test_rows': int(len(y_test)),
+        **fold_metrics(target_type, y_test, y_pred),
+    }
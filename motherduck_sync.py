@@ -0,0 +1,338 @@
+"""
+MotherDuck Sync - incremental push of persistent tables
+=======================================================
+
+Replaces the full DROP + CREATE TABLE AS copy in scripts/migrate_to_motherduck.py.
+Only rows that are new or changed since the last sync are pushed.
+
+Two sources of "what changed":
+- High-water mark per (table, partition): max ts_utc / date_local already in
+  the target. Rows above it are appended in batches of `batch_days`.
+- Changed-range log (sync_change_log in gold.db): backfill scripts and the
+  feature builder record every range they rewrite. Those ranges are
+  re-pushed with DELETE + INSERT, which is idempotent.
+
+Works against any attached DuckDB database, so the same code pushes to
+MotherDuck (md:projectx_prod) or to a second local file in tests.
+Sync bookkeeping (_sync_state, _sync_watermarks) lives in the target.
+
+Usage:
+    con = duckdb.connect('md:?motherduck_token=...')
+    con.execute("ATTACH 'gold.db' AS local_gold (READ_ONLY)")
+    syncer = MotherDuckSync(con, source="local_gold", target="projectx_prod")
+    results = syncer.sync_all()
+
+Writers record changes with:
+    log_changed_range(con, "bars_1m", start_utc, end_utc, partition="MGC")
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class SyncSpec:
+    """How a table is synced: ordered key column + partition column"""
+    key_col: Optional[str] = None        # None = small table, replaced when its content hash changes
+    key_type: Optional[str] = None
+    partition_col: Optional[str] = None
+
+
+SYNC_TABLES: Dict[str, SyncSpec] = {
+    "bars_1m": SyncSpec("ts_utc", "TIMESTAMPTZ", "symbol"),
+    "bars_5m": SyncSpec("ts_utc", "TIMESTAMPTZ", "symbol"),
+    "daily_features_v2": SyncSpec("date_local", "DATE", "instrument"),
+    "orb_facts": SyncSpec("date_local", "DATE", "instrument"),
+    "validated_setups": SyncSpec(),
+}
+
+CHANGE_LOG_TABLE = "sync_change_log"
+
+
+def init_change_log(con) -> None:
+    """Create the changed-range log in the current database (idempotent)"""
+    con.execute("CREATE SEQUENCE IF NOT EXISTS sync_change_seq")
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+            change_id BIGINT PRIMARY KEY DEFAULT nextval('sync_change_seq'),
+            table_name VARCHAR NOT NULL,
+            partition_value VARCHAR,
+            range_start VARCHAR NOT NULL,
+            range_end VARCHAR NOT NULL,
+            logged_at TIMESTAMP DEFAULT current_timestamp
+        )
+    """)
+
+
+def log_changed_range(con, table: str, range_start: Any, range_end: Any,
+                      partition: Optional[str] = None) -> None:
+    """
+    Record that rows of `table` in [range_start, range_end) were rewritten.
+
+    partition=None means the range applies to every symbol/instrument.
+    """
+    init_change_log(con)
+    con.execute(
+        f"""
+        INSERT INTO {CHANGE_LOG_TABLE} (table_name, partition_value, range_start, range_end)
+        VALUES (?, ?, ?, ?)
+        """,
+        [table, partition, str(range_start), str(range_end)],
+    )
+
+
+def _merge_ranges(ranges: List[tuple]) -> List[tuple]:
+    """Merge overlapping/adjacent [start, end) ranges"""
+    merged: List[list] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+class MotherDuckSync:
+    """Pushes new and changed rows from an attached source to an attached target"""
+
+    def __init__(self, con, source: str = "local_gold", target: str = "projectx_prod",
+                 tables: Optional[Dict[str, SyncSpec]] = None, batch_days: int = 31,
+                 log: Callable[[str], Any] = print):
+        self.con = con
+        self.source = source
+        self.target = target
+        self.tables = tables if tables is not None else SYNC_TABLES
+        self.batch = timedelta(days=batch_days)
+        self.log = log
+        self._init_state()
+
+    # ---------- bookkeeping ----------
+    def _init_state(self):
+        self.con.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.target}._sync_state (
+                table_name VARCHAR PRIMARY KEY,
+                last_change_id BIGINT,
+                content_hash VARCHAR,
+                synced_at TIMESTAMP
+            )
+        """)
+        self.con.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.target}._sync_watermarks (
+                table_name VARCHAR NOT NULL,
+                partition_value VARCHAR NOT NULL,
+                high_water VARCHAR NOT NULL,
+                PRIMARY KEY (table_name, partition_value)
+            )
+        """)
+
+    def _table_exists(self, database: str, table: str) -> bool:
+        return self.con.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE database_name = ? AND table_name = ?",
+            [database, table],
+        ).fetchone()[0] > 0
+
+    def _state(self, table: str) -> Optional[tuple]:
+        return self.con.execute(
+            f"SELECT last_change_id, content_hash FROM {self.target}._sync_state WHERE table_name = ?",
+            [table],
+        ).fetchone()
+
+    def _save_state(self, table: str, last_change_id: Optional[int], content_hash: Optional[str] = None):
+        self.con.execute(
+            f"""
+            INSERT OR REPLACE INTO {self.target}._sync_state
+            VALUES (?, ?, ?, current_timestamp)
+            """,
+            [table, last_change_id, content_hash],
+        )
+
+    def _watermarks(self, table: str, spec: SyncSpec) -> Dict[str, Any]:
+        rows = self.con.execute(
+            f"""
+            SELECT partition_value, CAST(high_water AS {spec.key_type})
+            FROM {self.target}._sync_watermarks
+            WHERE table_name = ?
+            """,
+            [table],
+        ).fetchall()
+        return dict(rows)
+
+    def _pending_changes(self, table: str, spec: SyncSpec, after_id: int) -> List[tuple]:
+        if not self._table_exists(self.source, CHANGE_LOG_TABLE):
+            return []
+        return self.con.execute(
+            f"""
+            SELECT change_id, partition_value,
+                   CAST(range_start AS {spec.key_type}), CAST(range_end AS {spec.key_type})
+            FROM {self.source}.{CHANGE_LOG_TABLE}
+            WHERE table_name = ? AND change_id > ?
+            ORDER BY change_id
+            """,
+            [table, after_id],
+        ).fetchall()
+
+    def _max_change_id(self) -> int:
+        if not self._table_exists(self.source, CHANGE_LOG_TABLE):
+            return 0
+        return self.con.execute(
+            f"SELECT COALESCE(MAX(change_id), 0) FROM {self.source}.{CHANGE_LOG_TABLE}"
+        ).fetchone()[0]
+
+    def _content_hash(self, table: str) -> str:
+        return str(self.con.execute(f"SELECT bit_xor(hash(t)) FROM {self.source}.{table} t").fetchone()[0])
+
+    # ---------- sync ----------
+    def _copy(self, table: str, where: str, params: List[Any]) -> int:
+        src, dst = f"{self.source}.{table}", f"{self.target}.{table}"
+        n = self.con.execute(f"SELECT COUNT(*) FROM {src} WHERE {where}", params).fetchone()[0]
+        if n:
+            self.con.execute(f"INSERT INTO {dst} BY NAME SELECT * FROM {src} WHERE {where}", params)
+        return n
+
+    def _sync_small(self, table: str) -> Dict[str, Any]:
+        """Replace a small, unkeyed table when its content hash changes"""
+        src, dst = f"{self.source}.{table}", f"{self.target}.{table}"
+        content_hash = self._content_hash(table)
+        state = self._state(table)
+        if state and state[1] == content_hash:
+            return {"mode": "unchanged", "rows_pushed": 0}
+
+        self.con.execute(f"DELETE FROM {dst}")
+        self.con.execute(f"INSERT INTO {dst} BY NAME SELECT * FROM {src}")
+        self._save_state(table, None, content_hash)
+        return {"mode": "replaced",
+                "rows_pushed": self.con.execute(f"SELECT COUNT(*) FROM {dst}").fetchone()[0]}
+
+    def _sync_keyed(self, table: str, spec: SyncSpec) -> Dict[str, Any]:
+        src, dst = f"{self.source}.{table}", f"{self.target}.{table}"
+        key, part = spec.key_col, spec.partition_col
+
+        state = self._state(table)
+        first_sync = state is None
+        last_change_id = self._max_change_id()
+        old_hw = self._watermarks(table, spec)
+        if first_sync:
+            # No bookkeeping yet (new target, reset, or an old full migration): start clean
+            self.con.execute(f"DELETE FROM {dst}")
+            old_hw = {}
+
+        # 1) Append rows above each partition's high-water mark, in key-range batches
+        appended = 0
+        partitions = [r[0] for r in self.con.execute(f"SELECT DISTINCT {part} FROM {src}").fetchall()]
+        for p in partitions:
+            hw = old_hw.get(p)
+            hw_filter = f" AND {key} > ?" if hw is not None else ""
+            hw_params = [hw] if hw is not None else []
+
+            lo, hi = self.con.execute(
+                f"SELECT MIN({key}), MAX({key}) FROM {src} WHERE {part} = ?{hw_filter}",
+                [p, *hw_params],
+            ).fetchone()
+            if lo is None:
+                continue
+
+            start = lo
+            while start <= hi:
+                end = start + self.batch
+                n = self._copy(table, f"{part} = ? AND {key} >= ? AND {key} < ?{hw_filter}",
+                               [p, start, end, *hw_params])
+                appended += n
+                self.log(f"    {table} [{p}] {start} -> {end}: {n:,} rows")
+                start = end
+
+            self.con.execute(
+                f"INSERT OR REPLACE INTO {self.target}._sync_watermarks VALUES (?, ?, CAST(? AS VARCHAR))",
+                [table, p, hi],
+            )
+
+        # 2) Re-push logged ranges at or below the old high-water mark
+        ranges_applied, changed_rows = 0, 0
+        if not first_sync:
+            by_partition: Dict[Optional[str], List[tuple]] = {}
+            for _, p, r_start, r_end in self._pending_changes(table, spec, state[0] or 0):
+                if p is not None and (p not in old_hw or r_start > old_hw[p]):
+                    continue  # Entirely new rows: already appended above
+                by_partition.setdefault(p, []).append((r_start, r_end))
+
+            for p, ranges in by_partition.items():
+                part_filter = f" AND {part} = ?" if p is not None else ""
+                part_params = [p] if p is not None else []
+                for r_start, r_end in _merge_ranges(ranges):
+                    where = f"{key} >= ? AND {key} < ?{part_filter}"
+                    params = [r_start, r_end, *part_params]
+                    self.con.execute(f"DELETE FROM {dst} WHERE {where}", params)
+                    changed_rows += self._copy(table, where, params)
+                    ranges_applied += 1
+
+        self._save_state(table, last_change_id)
+        return {
+            "mode": "initial" if first_sync else "incremental",
+            "rows_pushed": appended + changed_rows,
+            "rows_appended": appended,
+            "ranges_applied": ranges_applied,
+        }
+
+    def sync_table(self, table: str) -> Dict[str, Any]:
+        """Sync one table inside a single target transaction, then verify row counts"""
+        spec = self.tables[table]
+        src, dst = f"{self.source}.{table}", f"{self.target}.{table}"
+
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            if not self._table_exists(self.target, table):
+                self.con.execute(f"CREATE TABLE {dst} AS SELECT * FROM {src} LIMIT 0")
+            if spec.key_col is None:
+                result = self._sync_small(table)
+            else:
+                result = self._sync_keyed(table, spec)
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+
+        source_rows = self.con.execute(f"SELECT COUNT(*) FROM {src}").fetchone()[0]
+        target_rows = self.con.execute(f"SELECT COUNT(*) FROM {dst}").fetchone()[0]
+        result.update(source_rows=source_rows, target_rows=target_rows,
+                      verified=source_rows == target_rows)
+        return result
+
+    def sync_all(self) -> Dict[str, Dict[str, Any]]:
+        """Sync every configured table present in the source"""
+        results = {}
+        for table in self.tables:
+            if not self._table_exists(self.source, table):
+                self.log(f"  [SKIP] {table}: not in source")
+                continue
+            self.log(f"  Syncing: {table}")
+            results[table] = self.sync_table(table)
+            r = results[table]
+            self.log(f"    [{'OK' if r['verified'] else 'ERROR'}] {r['mode']}: "
+                     f"{r['rows_pushed']:,} rows pushed, target {r['target_rows']:,} / source {r['source_rows']:,}")
+        return results
+
+    def mark_synced(self, table: str) -> None:
+        """Record a table as fully synced (after a full re-upload)"""
+        spec = self.tables[table]
+        src = f"{self.source}.{table}"
+        self.reset(table)
+        if spec.key_col is None:
+            self._save_state(table, None, self._content_hash(table))
+            return
+
+        self.con.execute(
+            f"""
+            INSERT INTO {self.target}._sync_watermarks
+            SELECT ?, {spec.partition_col}, CAST(MAX({spec.key_col}) AS VARCHAR)
+            FROM {src}
+            GROUP BY {spec.partition_col}
+            """,
+            [table],
+        )
+        self._save_state(table, self._max_change_id())
+
+    def reset(self, table: Optional[str] = None) -> None:
+        """Forget sync state so the next run re-copies (one table or all)"""
+        where, params = ("WHERE table_name = ?", [table]) if table else ("", [])
+        self.con.execute(f"DELETE FROM {self.target}._sync_state {where}", params)
+        self.con.execute(f"DELETE FROM {self.target}._sync_watermarks {where}", params)
@@ -0,0 +1,211 @@
+"""
+ORB Facts - long-format ORB storage
+===================================
+
+daily_features_v2 (and _nq / _mpl) keep the six ORBs as wide columns
+(orb_0900_high ... orb_0030_risk_ticks). orb_facts stores the same data as
+one row per (instrument, orb_time, date_local), so readers scan a single
+column set across ORBs and instruments instead of pivoting with CASE blocks
+or f-string column names.
+
+The instrument of each fact comes from which wide table it was read from
+(FEATURE_TABLES), so a mislabelled instrument column cannot collide.
+
+Layout:
+- PRIMARY KEY (instrument, orb_time, date_local)
+- Rows are inserted sorted by the same key, so DuckDB zone maps prune
+  instrument/ORB/date filters
+- Maintained by the feature builders (refresh_orb_facts per built day);
+  scripts/build_orb_facts.py rebuilds it from the wide tables. The first
+  range refresh into an empty table (or for an instrument it does not hold
+  yet) seeds the full history, so readers never see a partial table
+- Readers use facts_source(), which falls back to unpivoting the wide table
+  when orb_facts is missing or has no rows for the instrument
+
+Columns: date_local, instrument, orb_time, orb_high, orb_low, orb_size,
+break_dir, outcome, r_multiple, mae, mfe, stop_price, risk_ticks
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+ORB_TIMES = ("0900", "1000", "1100", "1800", "2300", "0030")
+
+# (wide column suffix, orb_facts column)
+FACT_FIELDS = (
+    ("high", "orb_high"),
+    ("low", "orb_low"),
+    ("size", "orb_size"),
+    ("break_dir", "break_dir"),
+    ("outcome", "outcome"),
+    ("r_multiple", "r_multiple"),
+    ("mae", "mae"),
+    ("mfe", "mfe"),
+    ("stop_price", "stop_price"),
+    ("risk_ticks", "risk_ticks"),
+)
+
+# Canonical wide feature tables that feed orb_facts
+FEATURE_TABLES: Dict[str, str] = {
+    "MGC": "daily_features_v2",
+    "NQ": "daily_features_v2_nq",
+    "MPL": "daily_features_v2_mpl",
+}
+
+ORB_FACTS_DDL = """
+CREATE TABLE IF NOT EXISTS orb_facts (
+  date_local DATE NOT NULL,
+  instrument VARCHAR NOT NULL,
+  orb_time VARCHAR NOT NULL,
+  orb_high DOUBLE,
+  orb_low DOUBLE,
+  orb_size DOUBLE,
+  break_dir VARCHAR,
+  outcome VARCHAR,
+  r_multiple DOUBLE,
+  mae DOUBLE,
+  mfe DOUBLE,
+  stop_price DOUBLE,
+  risk_ticks DOUBLE,
+  PRIMARY KEY (instrument, orb_time, date_local)
+)
+"""
+
+SORT_KEY = "instrument, orb_time, date_local"
+
+
+def init_orb_facts(con) -> None:
+    """Create orb_facts if missing"""
+    con.execute(ORB_FACTS_DDL)
+
+
+def table_exists(con, table: str) -> bool:
+    return con.execute(
+        "SELECT COUNT(*) > 0 FROM information_schema.tables WHERE lower(table_name) = lower(?)", [table]
+    ).fetchone()[0]
+
+
+def has_orb_facts(con, instrument: Optional[str] = None) -> bool:
+    """orb_facts exists (and holds rows for `instrument`, if given)"""
+    if not table_exists(con, "orb_facts"):
+        return False
+    if instrument is None:
+        return True
+    return con.execute(
+        "SELECT EXISTS (SELECT 1 FROM orb_facts WHERE instrument = ?)", [instrument]
+    ).fetchone()[0]
+
+
+def facts_source(con, instrument: str = "MGC") -> str:
+    """FROM-clause source of one instrument's facts: orb_facts, or its wide table unpivoted"""
+    if has_orb_facts(con, instrument):
+        return "orb_facts"
+    return f"({long_select_sql(con, FEATURE_TABLES[instrument], instrument=instrument)})"
+
+
+def instrument_for_table(source_table: str) -> str:
+    """Instrument a canonical wide table holds (taken from the table, not its rows)"""
+    for instrument, table in FEATURE_TABLES.items():
+        if table == source_table:
+            return instrument
+    raise ValueError(f"Not a canonical feature table: {source_table}")
+
+
+def long_select_sql(con, source_table: str, where: str = "", instrument: Optional[str] = None) -> str:
+    """
+    SELECT that unpivots a wide feature table into orb_facts columns.
+
+    Wide columns missing from the source (e.g. mae/mfe in older tables) come
+    back as NULL. One scan of the source: each row fans out to six ORB rows.
+    If `instrument` is given it replaces the source's instrument column.
+    """
+    present = {
+        r[0].lower()
+        for r in con.execute(
+            "SELECT column_name FROM information_schema.columns WHERE lower(table_name) = lower(?)",
+            [source_table],
+        ).fetchall()
+    }
+
+    value_rows = []
+    for orb in ORB_TIMES:
+        cols = [f"'{orb}'"]
+        for suffix, _ in FACT_FIELDS:
+            col = f"orb_{orb}_{suffix}"
+            cols.append(f"src.{col}" if col in present else "NULL")
+        value_rows.append(f"({', '.join(cols)})")
+
+    instrument_sql = f"'{instrument}'" if instrument is not None else "src.instrument"
+    fact_cols = ", ".join(name for _, name in FACT_FIELDS)
+    return f"""
+        SELECT src.date_local, {instrument_sql} AS instrument, o.orb_time,
+               {", ".join(f"o.{name}" for _, name in FACT_FIELDS)}
+        FROM {source_table} src,
+             (VALUES {", ".join(value_rows)}) o(orb_time, {fact_cols})
+        {where}
+    """
+
+
+def refresh_orb_facts(con, source_table: str = "daily_features_v2", start_date=None, end_date=None) -> int:
+    """
+    Replace orb_facts rows from one canonical wide table (optionally a date range).
+
+    A range refresh into an empty orb_facts seeds every wide table with
+    rebuild_orb_facts first; one for an instrument the table does not hold
+    yet refreshes that instrument's full history instead of the range.
+
+    Returns number of rows written (in the requested range).
+    """
+    init_orb_facts(con)
+    instrument = instrument_for_table(source_table)
+
+    if start_date is not None or end_date is not None:
+        if not con.execute("SELECT EXISTS (SELECT 1 FROM orb_facts)").fetchone()[0]:
+            rebuild_orb_facts(con)
+        elif not has_orb_facts(con, instrument):
+            refresh_orb_facts(con, source_table)
+
+    conditions: List[str] = []
+    params: List = []
+    if start_date is not None:
+        conditions.append("date_local >= ?")
+        params.append(start_date)
+    if end_date is not None:
+        conditions.append("date_local <= ?")
+        params.append(end_date)
+    dates_sql = " AND ".join(conditions)
+
+    facts_where = f"WHERE instrument = ?{' AND ' + dates_sql if dates_sql else ''}"
+    src_where = f"WHERE {dates_sql.replace('date_local', 'src.date_local')}" if dates_sql else ""
+
+    con.execute(f"DELETE FROM orb_facts {facts_where}", [instrument, *params])
+    con.execute(
+        f"INSERT INTO orb_facts {long_select_sql(con, source_table, src_where, instrument)} ORDER BY {SORT_KEY}",
+        params,
+    )
+    return con.execute(f"SELECT COUNT(*) FROM orb_facts {facts_where}", [instrument, *params]).fetchone()[0]
+
+
+def rebuild_orb_facts(con, tables: Optional[Sequence[str]] = None) -> Dict[str, int]:
+    """
+    Rebuild orb_facts from every canonical wide table, fully sorted.
+
+    Returns rows per instrument.
+    """
+    init_orb_facts(con)
+    tables = list(tables) if tables is not None else list(FEATURE_TABLES.values())
+    existing = [t for t in tables if table_exists(con, t)]
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute("DELETE FROM orb_facts")
+        if existing:
+            union = " UNION ALL ".join(
+                long_select_sql(con, t, instrument=instrument_for_table(t)) for t in existing
+            )
+            con.execute(f"INSERT INTO orb_facts SELECT * FROM ({union}) ORDER BY {SORT_KEY}")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+    return dict(con.execute("SELECT instrument, COUNT(*) FROM orb_facts GROUP BY 1 ORDER BY 1").fetchall())
@@ -0,0 +1,449 @@
+"""
+ProjectX API - pooled, keep-alive client
+========================================
+
+One HTTP client per process (per credentials), shared by backfill_range.py,
+app/data/projectx_client.py and trading_app/data_loader.py, instead of a
+fresh httpx.Client (and TLS handshake) per request.
+
+Features:
+- Persistent connection pool (httpx keep-alive)
+- Token caching: login once, re-login before expiry or on a 401
+- Client-side rate limiting per endpoint (sliding window)
+- Retry with jittered exponential backoff on transport errors, 429 and 5xx
+  (Retry-After honoured)
+- AsyncProjectXSession for concurrent requests (e.g. many bar windows)
+
+Usage:
+    session = get_session(ProjectXSettings.from_env())
+    contract = session.active_contract("MGC")
+    bars = session.retrieve_bars(contract["id"], start_iso_z, end_iso_z)
+
+tests/utils/fake_projectx.py provides a local fake server for tests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+LOGIN_PATH = "/api/Auth/loginKey"
+CONTRACT_SEARCH_PATH = "/api/Contract/search"
+CONTRACT_AVAILABLE_PATH = "/api/Contract/available"
+RETRIEVE_BARS_PATH = "/api/History/retrieveBars"
+
+DEFAULT_BASE_URL = "https://api.topstepx.com"
+
+# ProjectX limits: history 50 requests / 30s, everything else 200 / 60s
+DEFAULT_RATE_LIMIT: Tuple[int, float] = (200, 60.0)
+RATE_LIMITS: Dict[str, Tuple[int, float]] = {
+    RETRIEVE_BARS_PATH: (50, 30.0),
+}
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ProjectXError(RuntimeError):
+    """ProjectX request failed (HTTP error after retries, or success=false)"""
+
+
+@dataclass(frozen=True)
+class ProjectXSettings:
+    base_url: str
+    username: str
+    api_key: str
+    live: bool = False
+    timeout: float = 30.0
+    token_ttl: float = 23 * 3600.0     # ProjectX tokens last 24h; refresh early
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    max_connections: int = 10
+    rate_limits: Dict[str, Tuple[int, float]] = field(default_factory=lambda: dict(RATE_LIMITS), compare=False)
+
+    def __post_init__(self):
+        if not (self.base_url or "").strip().startswith("http"):
+            raise ProjectXError(
+                f"ProjectX base URL must include https:// (got {self.base_url!r}; set PROJECTX_BASE_URL)"
+            )
+
+    @classmethod
+    def from_env(cls, **overrides) -> "ProjectXSettings":
+        """Build settings from PROJECTX_* environment variables"""
+        live_str = os.getenv("PROJECTX_LIVE", "false").strip().lower()
+        values = dict(
+            base_url=(os.getenv("PROJECTX_BASE_URL") or DEFAULT_BASE_URL).strip(),
+            username=os.getenv("PROJECTX_USERNAME", "").strip(),
+            api_key=os.getenv("PROJECTX_API_KEY", "").strip(),
+            live=live_str in ("1", "true", "yes", "y"),
+        )
+        values.update(overrides)
+        return cls(**values)
+
+    @property
+    def key(self) -> Tuple[str, str, str, bool]:
+        return (self.base_url.rstrip("/"), self.username, self.api_key, self.live)
+
+
+class RateLimiter:
+    """
+    Sliding-window limiter per endpoint: at most N requests in any `window` seconds.
+
+    Thread-safe. `clock`/`sleep` are injectable for tests.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 default: Tuple[int, float] = DEFAULT_RATE_LIMIT,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.limits = dict(limits or {})
+        self.default = default
+        self.clock = clock
+        self.sleep = sleep
+        self._sent: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, path: str) -> str:
+        return path if path in self.limits else "*"
+
+    def reserve(self, path: str) -> float:
+        """Record a request slot for `path`; return seconds to wait before sending"""
+        max_requests, window = self.limits.get(path, self.default)
+        bucket = self._bucket(path)
+        with self._lock:
+            now = self.clock()
+            sent = self._sent.setdefault(bucket, deque())
+            while sent and sent[0] <= now - window:
+                sent.popleft()
+            wait = 0.0
+            if len(sent) >= max_requests:
+                wait = sent[-max_requests] + window - now
+            sent.append(now + wait)
+            return max(wait, 0.0)
+
+    def acquire(self, path: str) -> None:
+        wait = self.reserve(path)
+        if wait > 0:
+            self.sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random = random) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))"""
+    return rng.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class _SessionBase:
+    """Shared token state and payload building for sync/async sessions"""
+
+    def __init__(self, settings: ProjectXSettings, clock: Callable[[], float] = time.monotonic,
+                 rng: Optional[random.Random] = None):
+        self.settings = settings
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.token: Optional[str] = None
+        self.token_expires_at = 0.0
+        self.stats = {"requests": 0, "retries": 0, "logins": 0}
+
+    @property
+    def base_url(self) -> str:
+        return self.settings.base_url.rstrip("/")
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.settings.max_connections,
+            max_keepalive_connections=self.settings.max_connections,
+        )
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"accept": "text/plain", "Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def _token_valid(self) -> bool:
+        return self.token is not None and self.clock() < self.token_expires_at
+
+    def _store_token(self, data: Dict[str, Any]) -> str:
+        if not data.get("success"):
+            raise ProjectXError(f"Login failed: {data}")
+        self.token = data["token"]
+        self.token_expires_at = self.clock() + self.settings.token_ttl
+        self.stats["logins"] += 1
+        return self.token
+
+    def _login_payload(self) -> Dict[str, Any]:
+        return {"userName": self.settings.username, "apiKey": self.settings.api_key}
+
+    def _bars_payload(self, contract_id: str, start_iso_z: str, end_iso_z: str, unit: int,
+                      unit_number: int, limit: int, include_partial: bool) -> Dict[str, Any]:
+        return {
+            "contractId": contract_id,
+            "live": self.settings.live,
+            "startTime": start_iso_z,
+            "endTime": end_iso_z,
+            "unit": unit,
+            "unitNumber": unit_number,
+            "limit": limit,
+            "includePartialBar": include_partial,
+        }
+
+    def _should_retry(self, attempt: int, response: Optional[httpx.Response]) -> bool:
+        if attempt >= self.settings.max_retries:
+            return False
+        return response is None or response.status_code in RETRY_STATUSES
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.settings.backoff_max)
+        return backoff_delay(attempt, self.settings.backoff_base, self.settings.backoff_max, self.rng)
+
+    @staticmethod
+    def _json(path: str, response: httpx.Response) -> Dict[str, Any]:
+        if response.status_code >= 400:
+            raise ProjectXError(f"{path} failed: HTTP {response.status_code} {response.text[:200]}")
+        return response.json()
+
+    @classmethod
+    def _checked(cls, path: str, response: httpx.Response) -> Dict[str, Any]:
+        data = cls._json(path, response)
+        if not data.get("success"):
+            raise ProjectXError(f"{path} failed: {data}")
+        return data
+
+    @staticmethod
+    def _pick_active(data: Dict[str, Any], search_text: str) -> Dict[str, Any]:
+        active = [c for c in data.get("contracts") or [] if c.get("activeContract")]
+        if not active:
+            raise ProjectXError(f"No active {search_text} contract found")
+        return active[0]
+
+
+class ProjectXSession(_SessionBase):
+    """Synchronous ProjectX session over one pooled httpx.Client"""
+
+    def __init__(self, settings: ProjectXSettings, transport: Optional[httpx.BaseTransport] = None,
+                 rate_limiter: Optional[RateLimiter] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, rng: Optional[random.Random] = None):
+        super().__init__(settings, clock=clock, rng=rng)
+        self.sleep = sleep
+        self.rate_limiter = rate_limiter or RateLimiter(settings.rate_limits, clock=clock, sleep=sleep)
+        self._client = httpx.Client(
+            base_url=self.base_url, timeout=settings.timeout, limits=self._limits(), transport=transport
+        )
+        self._login_lock = threading.Lock()
+
+    def __enter__(self) -> "ProjectXSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _send(self, path: str, payload: Dict[str, Any], timeout: Optional[float]) -> httpx.Response:
+        """POST with rate limiting and retry/backoff; returns the last response"""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(path)
+            self.stats["requests"] += 1
+            response: Optional[httpx.Response] = None
+            try:
+                response = self._client.post(
+                    path, json=payload, headers=self._headers(),
+                    timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                )
+            except httpx.TransportError:
+                if not self._should_retry(attempt, None):
+                    raise
+            if response is not None and not self._should_retry(attempt, response):
+                return response
+            self.stats["retries"] += 1
+            self.sleep(self._delay(attempt, response))
+            attempt += 1
+
+    def login(self, force: bool = False) -> str:
+        """Return a cached token, logging in if missing/expired (or forced)"""
+        with self._login_lock:
+            if self._token_valid() and not force:
+                return self.token
+            self.token = None
+            response = self._send(LOGIN_PATH, self._login_payload(), None)
+            return self._store_token(self._json(LOGIN_PATH, response))
+
+    def post(self, path: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Authenticated POST; re-logins once on 401 and checks success"""
+        self.login()
+        response = self._send(path, payload, timeout)
+        if response.status_code == 401:
+            self.login(force=True)
+            response = self._send(path, payload, timeout)
+        return self._checked(path, response)
+
+    def contract_search(self, search_text: str) -> Dict[str, Any]:
+        return self.post(CONTRACT_SEARCH_PATH, {"searchText": search_text, "live": self.settings.live})
+
+    def list_available_contracts(self) -> Dict[str, Any]:
+        return self.post(CONTRACT_AVAILABLE_PATH, {"live": self.settings.live})
+
+    def active_contract(self, search_text: str) -> Dict[str, Any]:
+        """First active contract matching search_text"""
+        return self._pick_active(self.contract_search(search_text), search_text)
+
+    def retrieve_bars(self, contract_id: str, start_iso_z: str, end_iso_z: str, unit: int = 2,
+                      unit_number: int = 1, limit: int = 20000, include_partial: bool = False,
+                      timeout: Optional[float] = 60.0) -> List[Dict[str, Any]]:
+        payload = self._bars_payload(contract_id, start_iso_z, end_iso_z, unit, unit_number, limit, include_partial)
+        return self.post(RETRIEVE_BARS_PATH, payload, timeout).get("bars") or []
+
+
+class AsyncRateLimiter(RateLimiter):
+    """RateLimiter whose acquire() awaits instead of blocking the event loop"""
+
+    @classmethod
+    def sharing(cls, limiter: RateLimiter) -> "AsyncRateLimiter":
+        """Async limiter counting against the same windows as `limiter` (one budget for sync + async)"""
+        shared = cls(limiter.limits, default=limiter.default, clock=limiter.clock)
+        shared._sent, shared._lock = limiter._sent, limiter._lock
+        return shared
+
+    async def acquire(self, path: str) -> None:  # type: ignore[override]
+        wait = self.reserve(path)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncProjectXSession(_SessionBase):
+    """Async ProjectX session over one pooled httpx.AsyncClient, for concurrent requests"""
+
+    def __init__(self, settings: ProjectXSettings, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 rate_limiter: Optional[AsyncRateLimiter] = None, clock: Callable[[], float] = time.monotonic,
+                 rng: Optional[random.Random] = None, concurrency: Optional[int] = None):
+        super().__init__(settings, clock=clock, rng=rng)
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(settings.rate_limits, clock=clock)
+        self.concurrency = concurrency or settings.max_connections
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url, timeout=settings.timeout, limits=self._limits(), transport=transport
+        )
+        self._login_lock = asyncio.Lock()
+
+    @classmethod
+    def from_session(cls, session: ProjectXSession, **kwargs) -> "AsyncProjectXSession":
+        """Async session reusing a sync session's token and rate-limit windows"""
+        async_session = cls(session.settings, rate_limiter=AsyncRateLimiter.sharing(session.rate_limiter),
+                            clock=session.clock, **kwargs)
+        async_session.token, async_session.token_expires_at = session.token, session.token_expires_at
+        return async_session
+
+    async def __aenter__(self) -> "AsyncProjectXSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _send(self, path: str, payload: Dict[str, Any], timeout: Optional[float]) -> httpx.Response:
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(path)
+            self.stats["requests"] += 1
+            response: Optional[httpx.Response] = None
+            try:
+                response = await self._client.post(
+                    path, json=payload, headers=self._headers(),
+                    timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                )
+            except httpx.TransportError:
+                if not self._should_retry(attempt, None):
+                    raise
+            if response is not None and not self._should_retry(attempt, response):
+                return response
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._delay(attempt, response))
+            attempt += 1
+
+    async def login(self, force: bool = False) -> str:
+        async with self._login_lock:
+            if self._token_valid() and not force:
+                return self.token
+            self.token = None
+            response = await self._send(LOGIN_PATH, self._login_payload(), None)
+            return self._store_token(self._json(LOGIN_PATH, response))
+
+    async def post(self, path: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        await self.login()
+        response = await self._send(path, payload, timeout)
+        if response.status_code == 401:
+            await self.login(force=True)
+            response = await self._send(path, payload, timeout)
+        return self._checked(path, response)
+
+    async def contract_search(self, search_text: str) -> Dict[str, Any]:
+        return await self.post(CONTRACT_SEARCH_PATH, {"searchText": search_text, "live": self.settings.live})
+
+    async def active_contract(self, search_text: str) -> Dict[str, Any]:
+        return self._pick_active(await self.contract_search(search_text), search_text)
+
+    async def retrieve_bars(self, contract_id: str, start_iso_z: str, end_iso_z: str, unit: int = 2,
+                            unit_number: int = 1, limit: int = 20000, include_partial: bool = False,
+                            timeout: Optional[float] = 60.0) -> List[Dict[str, Any]]:
+        payload = self._bars_payload(contract_id, start_iso_z, end_iso_z, unit, unit_number, limit, include_partial)
+        return (await self.post(RETRIEVE_BARS_PATH, payload, timeout)).get("bars") or []
+
+    async def retrieve_bars_many(self, contract_id: str, windows: Iterable[Tuple[str, str]],
+                                 **kwargs) -> List[List[Dict[str, Any]]]:
+        """Fetch several (start, end) windows concurrently; results keep window order"""
+        await self.login()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(start_iso_z: str, end_iso_z: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.retrieve_bars(contract_id, start_iso_z, end_iso_z, **kwargs)
+
+        return await asyncio.gather(*(one(s, e) for s, e in windows))
+
+
+# -----------------------------
+# Shared sessions
+# -----------------------------
+
+_SESSIONS: Dict[Tuple[str, str, str, bool], ProjectXSession] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(settings: Optional[ProjectXSettings] = None) -> ProjectXSession:
+    """Process-wide session for these credentials (created on first use)"""
+    settings = settings or ProjectXSettings.from_env()
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(settings.key)
+        if session is None:
+            session = _SESSIONS[settings.key] = ProjectXSession(settings)
+        return session
+
+
+def close_sessions() -> None:
+    """Close and forget all shared sessions"""
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
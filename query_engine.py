@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import asdict, dataclass
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import db_metrics
 import duckdb
 import numpy as np
 import pandas as pd
 
+from orb_facts import facts_source
+
 # UI helper for Streamlit dashboards
 # Keys are the internal IDs used in app_trading_hub.py dropdowns.
 ENTRY_MODELS = {
@@ -28,6 +32,11 @@ ORB_TIMES: Tuple[str, ...] = ("0900", "1000", "1100", "1800", "2300", "0030")
 OUTCOME_OPTIONS: Tuple[str, ...] = ("WIN", "LOSS", "NO_TRADE")
 BREAK_DIR_OPTIONS: Tuple[str, ...] = ("ANY", "UP", "DOWN")
 
+# Strategy datasets kept per (data version, filters_key, strategy_key); oldest evicted first
+RESULT_CACHE_SIZE = 32
+# Base frames kept, one per connection; the least recently used connection's frame is evicted first
+BASE_CACHE_SIZE = 4
+
 
 @dataclass(frozen=True)
 class Filters:
@@ -166,13 +175,13 @@ def default_strategy() -> StrategyConfig:
 
 def get_connection(db_path: str = "gold.db") -> duckdb.DuckDBPyConnection:
     """Return a DuckDB connection to the gold database."""
-    return duckdb.connect(db_path)
+    return db_metrics.connect(db_path)
 
 
 def fetch_filter_metadata(con: duckdb.DuckDBPyConnection) -> Dict[str, Any]:
     """Collect filter metadata (date bounds, numeric ranges, and type codes)."""
     min_max_row = con.execute(
-        """
+        f"""
         SELECT
           MIN(v.date_local) AS min_date,
           MAX(v.date_local) AS max_date,
@@ -180,7 +189,7 @@ def fetch_filter_metadata(con: duckdb.DuckDBPyConnection) -> Dict[str, Any]:
           MAX(df.atr_20) AS max_atr,
           MIN(df.asia_range) AS min_asia_range,
           MAX(df.asia_range) AS max_asia_range
-        FROM v_orb_trades v
+        FROM {facts_source(con, "MGC")} v
         JOIN daily_features_v2 df
           ON df.date_local = v.date_local AND df.instrument = v.instrument
         """
@@ -390,22 +399,64 @@ def _sanitize(df: pd.DataFrame) -> pd.DataFrame:
     return df.replace([np.inf, -np.inf], np.nan).where(pd.notnull(df), None)
 
 
-def _fetch_base_frame(con: duckdb.DuckDBPyConnection, filters: Filters) -> pd.DataFrame:
-    """Base frame with ORB prices and optional close confirmations."""
-    where_sql, params = _build_where_clause(filters, include_outcome_filter=True, trades_only=False, table_alias="v")
-    sql = f"""
-    WITH execs AS (
-      SELECT date_local, orb AS orb_time, MAX(close_confirmations) AS close_confirmations
-      FROM orb_trades_1m_exec
-      GROUP BY date_local, orb
-    )
-    SELECT
-      v.date_local,
-      v.instrument,
-      v.orb_time,
-      v.break_dir,
-      v.outcome,
-      v.r_multiple,
+def _filter_mask(df: pd.DataFrame, filters: Filters) -> pd.Series:
+    """In-memory equivalent of _build_where_clause (outcome filter included)."""
+    mask = pd.Series(True, index=df.index)
+    dates = pd.to_datetime(df["date_local"])
+
+    if filters.start_date:
+        mask &= dates >= pd.Timestamp(filters.start_date)
+    if filters.end_date:
+        mask &= dates <= pd.Timestamp(filters.end_date)
+    if filters.orb_times:
+        mask &= df["orb_time"].isin(filters.orb_times)
+    if filters.break_dir and filters.break_dir != "ANY":
+        mask &= df["break_dir"] == filters.break_dir
+    if filters.outcomes:
+        mask &= df["outcome"].isin(filters.outcomes)
+
+    for code, include_null, column in (
+        (filters.asia_type_code, filters.include_null_asia, "asia_type_code"),
+        (filters.london_type_code, filters.include_null_london, "london_type_code"),
+        (filters.pre_ny_type_code, filters.include_null_pre_ny, "pre_ny_type_code"),
+    ):
+        if code:
+            match = df[column] == code
+            mask &= (match | df[column].isna()) if include_null else match
+
+    # NaN comparisons are False, matching SQL NULL semantics
+    if filters.enable_atr_filter:
+        if filters.atr_min is not None:
+            mask &= df["atr_20"] >= filters.atr_min
+        if filters.atr_max is not None:
+            mask &= df["atr_20"] <= filters.atr_max
+    if filters.enable_asia_range_filter:
+        if filters.asia_range_min is not None:
+            mask &= df["asia_range"] >= filters.asia_range_min
+        if filters.asia_range_max is not None:
+            mask &= df["asia_range"] <= filters.asia_range_max
+
+    return mask
+
+
+def _fetch_base_frame(
+    con: duckdb.DuckDBPyConnection, filters: Filters, version: Optional[Tuple[Any, ...]] = None
+) -> pd.DataFrame:
+    """Base frame with ORB prices and optional close confirmations (filtered in memory)."""
+    base = _materialized_base(con, version)
+    return base[_filter_mask(base, filters)].reset_index(drop=True)
+
+
+def _query_base_frame(con: duckdb.DuckDBPyConnection) -> pd.DataFrame:
+    """Unfiltered long-format base frame: one row per (date, ORB), read from orb_facts (or its fallback)."""
+    facts = facts_source(con, "MGC")
+    columns = """
+      f.date_local,
+      f.instrument,
+      f.orb_time,
+      f.break_dir,
+      f.outcome,
+      f.r_multiple,
       df.asia_type_code,
       df.london_type_code,
       df.pre_ny_type_code,
@@ -413,91 +464,90 @@ def _fetch_base_frame(con: duckdb.DuckDBPyConnection, filters: Filters) -> pd.Da
       df.london_range,
       df.pre_ny_range,
       df.atr_20,
-      CASE v.orb_time
-        WHEN '0900' THEN df.orb_0900_high
-        WHEN '1000' THEN df.orb_1000_high
-        WHEN '1100' THEN df.orb_1100_high
-        WHEN '1800' THEN df.orb_1800_high
-        WHEN '2300' THEN df.orb_2300_high
-        WHEN '0030' THEN df.orb_0030_high
-      END AS orb_high,
-      CASE v.orb_time
-        WHEN '0900' THEN df.orb_0900_low
-        WHEN '1000' THEN df.orb_1000_low
-        WHEN '1100' THEN df.orb_1100_low
-        WHEN '1800' THEN df.orb_1800_low
-        WHEN '2300' THEN df.orb_2300_low
-        WHEN '0030' THEN df.orb_0030_low
-      END AS orb_low,
-      CASE v.orb_time
-        WHEN '0900' THEN df.orb_0900_size
-        WHEN '1000' THEN df.orb_1000_size
-        WHEN '1100' THEN df.orb_1100_size
-        WHEN '1800' THEN df.orb_1800_size
-        WHEN '2300' THEN df.orb_2300_size
-        WHEN '0030' THEN df.orb_0030_size
-      END AS orb_size,
+      f.orb_high,
+      f.orb_low,
+      f.orb_size"""
+    sql = f"""
+    WITH execs AS (
+      SELECT date_local, orb AS orb_time, MAX(close_confirmations) AS close_confirmations
+      FROM orb_trades_1m_exec
+      GROUP BY date_local, orb
+    )
+    SELECT {columns},
       ex.close_confirmations
-    FROM v_orb_trades v
+    FROM {facts} f
     JOIN daily_features_v2 df
-      ON df.date_local = v.date_local AND df.instrument = v.instrument
+      ON df.date_local = f.date_local AND df.instrument = f.instrument
     LEFT JOIN execs ex
-      ON ex.date_local = v.date_local AND ex.orb_time = v.orb_time
-    {where_sql}
+      ON ex.date_local = f.date_local AND ex.orb_time = f.orb_time
+    ORDER BY f.date_local, f.orb_time
     """
     try:
-        df = con.execute(sql, params).fetchdf()
+        df = con.execute(sql).fetchdf()
     except duckdb.Error:
         # Fallback if execs table missing
         sql_no_exec = f"""
-        SELECT
-          v.date_local,
-          v.instrument,
-          v.orb_time,
-          v.break_dir,
-          v.outcome,
-          v.r_multiple,
-          df.asia_type_code,
-          df.london_type_code,
-          df.pre_ny_type_code,
-          df.asia_range,
-          df.london_range,
-          df.pre_ny_range,
-          df.atr_20,
-          CASE v.orb_time
-            WHEN '0900' THEN df.orb_0900_high
-            WHEN '1000' THEN df.orb_1000_high
-            WHEN '1100' THEN df.orb_1100_high
-            WHEN '1800' THEN df.orb_1800_high
-            WHEN '2300' THEN df.orb_2300_high
-            WHEN '0030' THEN df.orb_0030_high
-          END AS orb_high,
-          CASE v.orb_time
-            WHEN '0900' THEN df.orb_0900_low
-            WHEN '1000' THEN df.orb_1000_low
-            WHEN '1100' THEN df.orb_1100_low
-            WHEN '1800' THEN df.orb_1800_low
-            WHEN '2300' THEN df.orb_2300_low
-            WHEN '0030' THEN df.orb_0030_low
-          END AS orb_low,
-          CASE v.orb_time
-            WHEN '0900' THEN df.orb_0900_size
-            WHEN '1000' THEN df.orb_1000_size
-            WHEN '1100' THEN df.orb_1100_size
-            WHEN '1800' THEN df.orb_1800_size
-            WHEN '2300' THEN df.orb_2300_size
-            WHEN '0030' THEN df.orb_0030_size
-          END AS orb_size,
+        SELECT {columns},
           NULL AS close_confirmations
-        FROM v_orb_trades v
+        FROM {facts} f
         JOIN daily_features_v2 df
-          ON df.date_local = v.date_local AND df.instrument = v.instrument
-        {where_sql}
+          ON df.date_local = f.date_local AND df.instrument = f.instrument
+        ORDER BY f.date_local, f.orb_time
         """
-        df = con.execute(sql_no_exec, params).fetchdf()
+        df = con.execute(sql_no_exec).fetchdf()
     return df
 
 
+# ---------- caching ----------
+# Base frames: LRU with one entry per connection, replaced when the data version changes.
+# Strategy datasets: LRU keyed by (connection, data version, filters_key, strategy_key).
+_BASE_CACHE: "OrderedDict[int, Tuple[Tuple[Any, ...], pd.DataFrame]]" = OrderedDict()
+_RESULT_CACHE: "OrderedDict[Tuple[Any, ...], pd.DataFrame]" = OrderedDict()
+
+
+def data_version(con: duckdb.DuckDBPyConnection) -> Tuple[Any, ...]:
+    """
+    Cheap fingerprint of the data behind the base frame.
+
+    Row counts and latest dates catch appends; the sync_change_log position
+    (written by the feature builder on every rebuild) catches in-place rewrites.
+    """
+    version = con.execute("SELECT COUNT(*), MAX(date_local) FROM daily_features_v2").fetchone()
+    extra: List[Any] = []
+    for sql in (
+        "SELECT COUNT(*), MAX(date_local) FROM orb_facts",
+        "SELECT COUNT(*), MAX(date_local) FROM orb_trades_1m_exec",
+        "SELECT MAX(change_id) FROM sync_change_log",
+    ):
+        try:
+            extra.append(con.execute(sql).fetchone())
+        except duckdb.Error:
+            extra.append(None)
+    return tuple(version) + tuple(extra)
+
+
+def _materialized_base(con: duckdb.DuckDBPyConnection, version: Optional[Tuple[Any, ...]] = None) -> pd.DataFrame:
+    """Base frame for the current data version (queried once, then reused)."""
+    if version is None:
+        version = data_version(con)
+    cached = _BASE_CACHE.get(id(con))
+    if cached is not None and cached[0] == version:
+        _BASE_CACHE.move_to_end(id(con))
+        return cached[1]
+    base = _query_base_frame(con)
+    _BASE_CACHE[id(con)] = (version, base)
+    _BASE_CACHE.move_to_end(id(con))
+    while len(_BASE_CACHE) > BASE_CACHE_SIZE:
+        _BASE_CACHE.popitem(last=False)
+    return base
+
+
+def clear_cache() -> None:
+    """Drop all cached base frames and strategy datasets."""
+    _BASE_CACHE.clear()
+    _RESULT_CACHE.clear()
+
+
 def _required_closes(strategy: StrategyConfig) -> int:
     if strategy.entry_model == "1m_close_break":
         return 1
@@ -538,36 +588,48 @@ def _apply_strategy(df: pd.DataFrame, strategy: StrategyConfig) -> pd.DataFrame:
     frame["retest_hit"] = np.where(frame["break_occurred"], True, False)
     frame["rejection_hit"] = np.where(frame["break_occurred"], True, False)
 
-    def _fail_reason(row: pd.Series) -> Optional[str]:
-        if not row.get("break_occurred", False):
-            return "no_break"
-        if not row.get("confirm_pass", False):
-            return "confirm_not_met"
-        if strategy.retest_required and not row.get("retest_hit", False):
-            return "retest_not_met"
-        if strategy.retest_required and strategy.entry_model == "break_retest_reject" and not row.get(
-            "rejection_hit", False
-        ):
-            return "rejection_not_met"
-        if (
-            strategy.max_stop_ticks is not None
-            and row.get("stop_ticks") is not None
-            and pd.notnull(row.get("stop_ticks"))
-            and row.get("stop_ticks") > strategy.max_stop_ticks
-        ):
-            return "stop_too_large"
-        return None
-
-    frame["filtered_out_reason"] = frame.apply(_fail_reason, axis=1)
+    conditions = [
+        ~frame["break_occurred"],
+        ~frame["confirm_pass"],
+        pd.Series(strategy.retest_required, index=frame.index) & ~frame["retest_hit"].astype(bool),
+        pd.Series(
+            strategy.retest_required and strategy.entry_model == "break_retest_reject", index=frame.index
+        ) & ~frame["rejection_hit"].astype(bool),
+        pd.Series(strategy.max_stop_ticks is not None, index=frame.index)
+        & (frame["stop_ticks"] > (strategy.max_stop_ticks if strategy.max_stop_ticks is not None else np.inf)),
+    ]
+    reasons = ["no_break", "confirm_not_met", "retest_not_met", "rejection_not_met", "stop_too_large"]
+    frame["filtered_out_reason"] = pd.Series(
+        np.select(conditions, reasons, default=None), index=frame.index, dtype=object
+    )
     frame["eligible_trade"] = frame["filtered_out_reason"].isnull() & frame["outcome"].isin(["WIN", "LOSS"])
     return frame
 
 
+def _cached_dataset(
+    con: duckdb.DuckDBPyConnection,
+    filters: Filters,
+    strategy: StrategyConfig,
+    version: Optional[Tuple[Any, ...]] = None,
+) -> pd.DataFrame:
+    """Strategy dataset from the LRU cache (shared frame - callers must not mutate it)."""
+    if version is None:
+        version = data_version(con)
+    key = (id(con), version, filters_key(filters), strategy_key(strategy))
+    if key in _RESULT_CACHE:
+        _RESULT_CACHE.move_to_end(key)
+        return _RESULT_CACHE[key]
+
+    df = _apply_strategy(_fetch_base_frame(con, filters, version), strategy)
+    _RESULT_CACHE[key] = df
+    while len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+        _RESULT_CACHE.popitem(last=False)
+    return df
+
+
 def strategy_dataset(con: duckdb.DuckDBPyConnection, filters: Filters, strategy: StrategyConfig) -> pd.DataFrame:
     """Return strategy-aware dataset."""
-    base = _fetch_base_frame(con, filters)
-    df = _apply_strategy(base, strategy)
-    return df
+    return _cached_dataset(con, filters, strategy).copy()
 
 
 def headline_stats(con: duckdb.DuckDBPyConnection, filters: Filters) -> Dict[str, Any]:
@@ -608,7 +670,8 @@ def drilldown_full(con: duckdb.DuckDBPyConnection, filters: Filters, order: str
 def headline_stats_with_strategy(
     con: duckdb.DuckDBPyConnection, filters: Filters, strategy: StrategyConfig
 ) -> Dict[str, Any]:
-    df = strategy_dataset(con, filters, strategy)
+    version = data_version(con)
+    df = _cached_dataset(con, filters, strategy, version)
     trades_df = df[df["eligible_trade"]]
     trades = len(trades_df)
     wins = len(trades_df[trades_df["outcome"] == "WIN"])
@@ -638,7 +701,7 @@ def headline_stats_with_strategy(
         asia_range_min=None,
         asia_range_max=None,
     )
-    base_df = strategy_dataset(con, base_filters, strategy)
+    base_df = _cached_dataset(con, base_filters, strategy, version)
     base_opportunities = len(base_df)
     base_trades = len(base_df[base_df["outcome"].isin(["WIN", "LOSS"])])
 
@@ -656,7 +719,7 @@ def headline_stats_with_strategy(
 def equity_curve_with_strategy(
     con: duckdb.DuckDBPyConnection, filters: Filters, strategy: StrategyConfig
 ) -> pd.DataFrame:
-    df = strategy_dataset(con, filters, strategy)
+    df = _cached_dataset(con, filters, strategy)
     trades = df[df["eligible_trade"]].copy()
     trades = trades.sort_values(["date_local", "orb_time"])
     trades["equity"] = trades["r_multiple"].cumsum()
@@ -666,7 +729,7 @@ def equity_curve_with_strategy(
 def histogram_with_strategy(
     con: duckdb.DuckDBPyConnection, filters: Filters, strategy: StrategyConfig
 ) -> pd.DataFrame:
-    df = strategy_dataset(con, filters, strategy)
+    df = _cached_dataset(con, filters, strategy)
     trades = df[df["eligible_trade"]].copy()
     return trades[["r_multiple"]].dropna()
 
@@ -674,7 +737,7 @@ def histogram_with_strategy(
 def heatmap_with_strategy(
     con: duckdb.DuckDBPyConnection, filters: Filters, strategy: StrategyConfig
 ) -> pd.DataFrame:
-    df = strategy_dataset(con, filters, strategy)
+    df = _cached_dataset(con, filters, strategy)
     trades = df[df["eligible_trade"]].copy()
     if trades.empty:
         return trades
@@ -697,7 +760,7 @@ def drilldown_with_strategy(
     limit: Optional[int] = 500,
     order: str = "chronological",
 ) -> pd.DataFrame:
-    df = strategy_dataset(con, filters, strategy)
+    df = _cached_dataset(con, filters, strategy)
     if order == "r_multiple_desc":
         df = df.sort_values(["r_multiple"], ascending=False, na_position="last")
     else:
@@ -714,7 +777,7 @@ def drilldown_full_with_strategy(
 
 
 def entry_funnel(con: duckdb.DuckDBPyConnection, filters: Filters, strategy: StrategyConfig) -> Dict[str, int]:
-    df = strategy_dataset(con, filters, strategy)
+    df = _cached_dataset(con, filters, strategy)
     total = len(df)
     break_occurred = int((df["break_occurred"]).sum())
     confirm_met = int((df["break_occurred"] & df["confirm_pass"]).sum())
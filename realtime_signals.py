@@ -23,15 +23,45 @@ from datetime import date, datetime, time
 from zoneinfo import ZoneInfo
 from typing import Dict, List, Optional
 
+from edge_stats import EdgeSpec, EdgeStatsEngine
+
 
 TZ_LOCAL = ZoneInfo("Australia/Brisbane")
 
+DIRECTIONS = ["UP", "DOWN"]
+
+# Setup filters shared by SIGNAL_SPECS and the generate_*_signal methods
+PRE_ASIA_LARGE = "(pre_asia_range / 0.1) > 50"
+PRE_ASIA_TIGHT = "(pre_asia_range / 0.1) < 30"
+LONDON_COIL = "(pre_london_range / 0.1) < 20 AND (asia_range / 0.1) > 300"
+PRE_LONDON_LARGE = "(pre_london_range / 0.1) > 40"
+
+
+def signal_spec(orb_time: str, condition: str, direction: str) -> EdgeSpec:
+    """Setup for one ORB breakout direction under a filter"""
+    return EdgeSpec(orb_time, f"orb_{orb_time}_break_dir = ? AND {condition}", (direction,))
+
+
+# Every setup the generate_*_signal methods may look up, fetched in one scan
+SIGNAL_SPECS = [
+    signal_spec(orb_time, condition, direction)
+    for orb_time, condition in [
+        ("0900", PRE_ASIA_LARGE),
+        ("1100", PRE_ASIA_LARGE),
+        ("1100", PRE_ASIA_TIGHT),
+        ("1800", LONDON_COIL),
+        ("1800", PRE_LONDON_LARGE),
+    ]
+    for direction in DIRECTIONS
+]
+
 
 class RealtimeSignalGenerator:
     """Generate trading signals with zero lookahead"""
 
     def __init__(self, db_path: str = "gold.db"):
         self.con = duckdb.connect(db_path, read_only=True)
+        self.edge_stats = EdgeStatsEngine(self.con)
 
     def get_pre_asia_context(self, trade_date: date) -> Optional[Dict]:
         """Get PRE_ASIA context (available at 09:00)"""
@@ -106,28 +136,13 @@ class RealtimeSignalGenerator:
         }
 
     def get_historical_performance(self, orb_time: str, condition: str, params: List) -> Dict:
-        """Get historical performance for a setup"""
-        query = f"""
-            SELECT
-                COUNT(*) as total,
-                SUM(CASE WHEN orb_{orb_time}_outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
-                AVG(orb_{orb_time}_r_multiple) as avg_r,
-                SUM(orb_{orb_time}_r_multiple) as total_r
-            FROM daily_features_v2
-            WHERE orb_{orb_time}_outcome IN ('WIN', 'LOSS')
-              AND {condition}
-        """
-
-        result = self.con.execute(query, params).fetchone()
-        total, wins, avg_r, total_r = result
+        """Get historical performance for a setup (memoized, see edge_stats.py)"""
+        return self.edge_stats.get(orb_time, condition, params)
 
-        return {
-            "total_trades": total or 0,
-            "wins": wins or 0,
-            "win_rate": wins / total if total else 0,
-            "avg_r": avg_r or 0,
-            "total_r": total_r or 0,
-        }
+    def signal_performance(self, orb_time: str, condition: str, direction: str) -> Dict:
+        """Historical performance of one signal_spec() setup"""
+        spec = signal_spec(orb_time, condition, direction)
+        return self.get_historical_performance(spec.orb_time, spec.condition, spec.params)
 
     def generate_0900_signal(self, trade_date: date):
         """Generate 09:00 ORB signal (at 09:00)"""
@@ -150,12 +165,8 @@ class RealtimeSignalGenerator:
         if pre_asia['range_ticks'] > 50:
             print(f"\n[SIGNAL] PRE_ASIA > 50 ticks (volatile pre-market)")
 
-            for direction in ["UP", "DOWN"]:
-                hist = self.get_historical_performance(
-                    "0900",
-                    f"orb_0900_break_dir = ? AND (pre_asia_range / 0.1) > 50",
-                    [direction]
-                )
+            for direction in DIRECTIONS:
+                hist = self.signal_performance("0900", PRE_ASIA_LARGE, direction)
 
                 if hist["total_trades"] >= 10:
                     print(f"\n  {direction} Breakout:")
@@ -188,20 +199,16 @@ class RealtimeSignalGenerator:
         conditions = []
 
         if pre_asia['range_ticks'] > 50:
-            conditions.append(("PRE_ASIA > 50 ticks", "(pre_asia_range / 0.1) > 50"))
+            conditions.append(("PRE_ASIA > 50 ticks", PRE_ASIA_LARGE))
 
         if pre_asia['range_ticks'] < 30:
-            conditions.append(("PRE_ASIA < 30 ticks (tight)", "(pre_asia_range / 0.1) < 30"))
+            conditions.append(("PRE_ASIA < 30 ticks (tight)", PRE_ASIA_TIGHT))
 
         for label, condition in conditions:
             print(f"\n[FILTER] {label}")
 
-            for direction in ["UP", "DOWN"]:
-                hist = self.get_historical_performance(
-                    "1100",
-                    f"orb_1100_break_dir = ? AND {condition}",
-                    [direction]
-                )
+            for direction in DIRECTIONS:
+                hist = self.signal_performance("1100", condition, direction)
 
                 if hist["total_trades"] >= 10:
                     print(f"\n  {direction} Breakout:")
@@ -237,12 +244,8 @@ class RealtimeSignalGenerator:
         if pre_london['range_ticks'] < 20 and asia['range_ticks'] > 300:
             print(f"\n[SIGNAL] PRE_LONDON < 20 ticks + ASIA > 300 ticks (consolidation after expansion)")
 
-            for direction in ["UP", "DOWN"]:
-                hist = self.get_historical_performance(
-                    "1800",
-                    f"orb_1800_break_dir = ? AND (pre_london_range / 0.1) < 20 AND (asia_range / 0.1) > 300",
-                    [direction]
-                )
+            for direction in DIRECTIONS:
+                hist = self.signal_performance("1800", LONDON_COIL, direction)
 
                 if hist["total_trades"] >= 5:
                     print(f"\n  {direction} Breakout:")
@@ -254,12 +257,8 @@ class RealtimeSignalGenerator:
         elif pre_london['range_ticks'] > 40:
             print(f"\n[SIGNAL] PRE_LONDON > 40 ticks (volatile positioning)")
 
-            for direction in ["UP", "DOWN"]:
-                hist = self.get_historical_performance(
-                    "1800",
-                    f"orb_1800_break_dir = ? AND (pre_london_range / 0.1) > 40",
-                    [direction]
-                )
+            for direction in DIRECTIONS:
+                hist = self.signal_performance("1800", PRE_LONDON_LARGE, direction)
 
                 if hist["total_trades"] >= 10:
                     print(f"\n  {direction} Breakout:")
@@ -272,6 +271,8 @@ class RealtimeSignalGenerator:
         print("="*80)
         print("\nZero Lookahead - Only information available at decision time")
 
+        self.edge_stats.prefetch(SIGNAL_SPECS)
+
         self.generate_0900_signal(trade_date)
         self.generate_1100_signal(trade_date)
         self.generate_1800_signal(trade_date)
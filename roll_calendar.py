@@ -0,0 +1,208 @@
+"""
+Roll Calendar - persisted contract -> active date range
+========================================================
+
+Backfills used to discover the front contract for every day: the ProjectX
+path probes contracts newest -> oldest with retrieve_bars until one returns
+bars, and the Databento path downloads every outright for the parent symbol
+and picks the highest-volume one. contract_roll_calendar records which
+contract was front on which trading days, so each day costs one targeted
+request.
+
+The calendar is learned from bars_1m.source_symbol (per trading day, the
+contract with the most volume; a roll is where that changes) and extended by
+the backfills as they confirm contracts. Ranges never overlap: the latest
+confirmation wins and neighbouring ranges are clipped (or removed when fully
+covered), so each day maps to one contract.
+
+Trading day = 09:00 local -> next 09:00 local (same as the backfills).
+
+Table: contract_roll_calendar
+- symbol, contract (e.g. MGC, MGCG6) - PRIMARY KEY
+- first_date, last_date - trading days the contract was front
+- contract_id - provider id when known (ProjectX CON.F.US.MGC.G26)
+"""
+
+import datetime as dt
+from dataclasses import dataclass, replace
+from typing import List, Optional
+
+ROLL_CALENDAR_DDL = """
+CREATE TABLE IF NOT EXISTS contract_roll_calendar (
+  symbol VARCHAR NOT NULL,
+  contract VARCHAR NOT NULL,
+  first_date DATE NOT NULL,
+  last_date DATE NOT NULL,
+  contract_id VARCHAR,
+  updated_at TIMESTAMP DEFAULT current_timestamp,
+  PRIMARY KEY (symbol, contract)
+)
+"""
+
+
+@dataclass(frozen=True)
+class RollEntry:
+    contract: str
+    first_date: dt.date
+    last_date: dt.date
+    contract_id: Optional[str] = None
+
+
+def init_roll_calendar(con) -> None:
+    """Create contract_roll_calendar if missing"""
+    con.execute(ROLL_CALENDAR_DDL)
+
+
+class RollCalendar:
+    """
+    Front-contract calendar for one logical symbol.
+
+    Entries are cached in memory; lookups do not query the database.
+    """
+
+    def __init__(self, con, symbol: str, bars_table: str = "bars_1m", tz_local: str = "Australia/Brisbane"):
+        self.con = con
+        self.symbol = symbol
+        self.bars_table = bars_table
+        self.tz_local = tz_local
+        init_roll_calendar(con)
+        self.entries: List[RollEntry] = []
+        self._dirty = set()  # contracts whose rows need writing (or deleting)
+        self.reload()
+
+    def reload(self) -> None:
+        rows = self.con.execute(
+            """
+            SELECT contract, first_date, last_date, contract_id
+            FROM contract_roll_calendar
+            WHERE symbol = ?
+            ORDER BY first_date, last_date
+            """,
+            [self.symbol],
+        ).fetchall()
+        self.entries = [RollEntry(*r) for r in rows]
+
+    def learn_from_bars(self, start_date: Optional[dt.date] = None) -> int:
+        """
+        Learn front-contract runs from stored bars (volume crossovers in source_symbol).
+
+        With no start_date, resumes from the last learned day. Returns number of
+        trading days scanned.
+        """
+        if start_date is None and self.entries:
+            start_date = max(e.last_date for e in self.entries)
+
+        params = [self.tz_local, self.symbol]
+        date_filter = ""
+        if start_date is not None:
+            date_filter = "AND trading_day >= ?"
+            params.append(start_date)
+
+        days = self.con.execute(
+            f"""
+            WITH bars AS (
+                SELECT CAST(timezone(?, ts_utc) - INTERVAL 9 HOUR AS DATE) AS trading_day,
+                       source_symbol, volume
+                FROM {self.bars_table}
+                WHERE symbol = ? AND source_symbol IS NOT NULL AND source_symbol <> ''
+            )
+            SELECT trading_day, arg_max(source_symbol, vol) AS front
+            FROM (
+                SELECT trading_day, source_symbol, SUM(volume) AS vol
+                FROM bars
+                WHERE TRUE {date_filter}
+                GROUP BY 1, 2
+            )
+            GROUP BY 1
+            ORDER BY 1
+            """,
+            params,
+        ).fetchall()
+
+        for day, front in days:
+            if not self._rolled_off(front, day):
+                self._extend(front, day, None)
+        self._flush()
+        return len(days)
+
+    def contract_for(self, day: dt.date, exact: bool = False) -> Optional[RollEntry]:
+        """
+        Front contract for a trading day.
+
+        Inside a learned range that contract wins; in gaps and past the end of
+        the calendar the latest contract started on or before `day` is the best
+        guess (callers verify it returns bars). exact=True skips the guess.
+        """
+        inside = [e for e in self.entries if e.first_date <= day <= e.last_date]
+        if inside:
+            return max(inside, key=lambda e: e.first_date)
+        if exact:
+            return None
+        earlier = [e for e in self.entries if e.first_date <= day]
+        return max(earlier, key=lambda e: e.first_date) if earlier else None
+
+    def record(self, day: dt.date, contract: str, contract_id: Optional[str] = None) -> None:
+        """Record that `contract` was front on `day` (extends its range)"""
+        if not contract:
+            return
+        self._extend(contract, day, contract_id)
+        self._flush()
+
+    def _rolled_off(self, contract: str, day: dt.date) -> bool:
+        """True when a later contract already took over before `day` (volume noise, not a roll back)"""
+        current = next((e for e in self.entries if e.contract == contract), None)
+        return current is not None and any(
+            current.first_date < e.first_date <= day for e in self.entries if e.contract != contract
+        )
+
+    def _extend(self, contract: str, day: dt.date, contract_id: Optional[str]) -> None:
+        """Give `day` to `contract`, clipping other ranges so none overlap"""
+        current = next((e for e in self.entries if e.contract == contract), None)
+        if current is None:
+            current = RollEntry(contract, day, day, contract_id)
+        else:
+            current = RollEntry(
+                contract,
+                min(current.first_date, day),
+                max(current.last_date, day),
+                contract_id or current.contract_id,
+            )
+        entries = [current]
+        for e in self.entries:
+            if e.contract == contract:
+                continue
+            if e.last_date < current.first_date or e.first_date > current.last_date:
+                entries.append(e)
+                continue
+            self._dirty.add(e.contract)
+            if e.first_date < current.first_date:
+                entries.append(replace(e, last_date=current.first_date - dt.timedelta(days=1)))
+            elif e.last_date > current.last_date:
+                entries.append(replace(e, first_date=current.last_date + dt.timedelta(days=1)))
+            # else fully covered: removed
+        self._dirty.add(contract)
+        self.entries = sorted(entries, key=lambda e: (e.first_date, e.last_date))
+
+    def _flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        kept = {e.contract for e in self.entries}
+        rows = [
+            (self.symbol, e.contract, e.first_date, e.last_date, e.contract_id)
+            for e in self.entries
+            if e.contract in dirty
+        ]
+        if rows:
+            self.con.executemany(
+                """
+                INSERT OR REPLACE INTO contract_roll_calendar
+                (symbol, contract, first_date, last_date, contract_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, current_timestamp)
+                """,
+                rows,
+            )
+        for contract in sorted(dirty - kept):
+            self.con.execute(
+                "DELETE FROM contract_roll_calendar WHERE symbol = ? AND contract = ?", [self.symbol, contract]
+            )
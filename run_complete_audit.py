@@ -1,22 +1,30 @@
 """
 COMPLETE NON-DESTRUCTIVE AUDIT - 2026-01-15
 Automated audit of all strategies, data integrity, and system configuration
-READ-ONLY - No modifications made
+READ-ONLY - No modifications made to gold.db
+
+By default per-day feature recomputation only runs for days whose fingerprint
+changed since the last clean audit (state kept in audit_reports/audit_state.db).
+Use --full to re-verify every day.
 """
 
+import argparse
 import duckdb
 from datetime import datetime
 import os
 from pathlib import Path
 
+from audits.audit_fingerprints import AuditFingerprintStore, changed_dates
+from audits.step2_feature_verification import FeatureVerificationAuditor
+
 def banner(text):
     """Print section banner"""
     print("\n" + "=" * 80)
     print(f"  {text}")
     print("=" * 80 + "\n")
 
-def run_audit():
-    """Run complete non-destructive audit"""
+def run_audit(full: bool = False):
+    """Run complete non-destructive audit (full=True re-verifies every day)"""
 
     print("\n" + "=" * 80)
     print("COMPLETE NON-DESTRUCTIVE AUDIT")
@@ -91,6 +99,35 @@ def run_audit():
     except Exception as e:
         results['errors'].append(f"[ERROR] Database integrity check failed: {str(e)}")
 
+    # ========================================================================
+    # AUDIT 1B: FEATURE RECOMPUTE (CHANGED DAYS ONLY UNLESS --full)
+    # ========================================================================
+    banner("AUDIT 1B: FEATURE RECOMPUTE")
+
+    try:
+        store = None
+        dates = None
+        if not full:
+            store = AuditFingerprintStore()
+            fingerprints = store.compute(con)
+            changed = store.changed_days(fingerprints, scope="complete")
+            dates = changed_dates(changed)
+            print(f"Changed since last clean audit: {len(changed)} instrument-days "
+                  f"({len(dates)} MGC trade dates to re-verify)")
+        else:
+            print("Full audit: re-verifying every day")
+
+        verifier = FeatureVerificationAuditor("gold.db", con=con, dates=dates)
+        if verifier.test_orb_recompute():
+            results['checks'].append(f"[OK] {verifier.results[-1]['message']}")
+            if store is not None:
+                store.save(fingerprints, scope="complete")
+        else:
+            results['errors'].append(f"[ERROR] {verifier.results[-1]['message']}")
+
+    except Exception as e:
+        results['errors'].append(f"[ERROR] Feature recompute failed: {str(e)}")
+
     # ========================================================================
     # AUDIT 2: STRATEGY VALIDATION
     # ========================================================================
@@ -264,7 +301,12 @@ def run_audit():
     return results
 
 if __name__ == "__main__":
-    results = run_audit()
+    parser = argparse.ArgumentParser(description="Complete non-destructive audit")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-verify every day instead of only days whose fingerprint changed")
+    args = parser.parse_args()
+
+    results = run_audit(full=args.full)
 
     # Write audit log
     log_file = f"AUDIT_LOG_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
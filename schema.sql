@@ -286,6 +286,50 @@ SELECT
   atr_20
 FROM daily_features_v2;
 
+-- Long-format ORB facts: one row per instrument/ORB/day (maintained by feature builders, see orb_facts.py)
+CREATE TABLE IF NOT EXISTS orb_facts (
+  date_local DATE NOT NULL,
+  instrument VARCHAR NOT NULL,
+  orb_time VARCHAR NOT NULL,        -- '0900','1000','1100','1800','2300','0030'
+  orb_high DOUBLE,
+  orb_low DOUBLE,
+  orb_size DOUBLE,
+  break_dir VARCHAR,
+  outcome VARCHAR,
+  r_multiple DOUBLE,
+  mae DOUBLE,
+  mfe DOUBLE,
+  stop_price DOUBLE,
+  risk_ticks DOUBLE,
+
+  PRIMARY KEY (instrument, orb_time, date_local)
+);
+
+-- Front contract per trading day range (learned from bars_1m.source_symbol, see roll_calendar.py)
+CREATE TABLE IF NOT EXISTS contract_roll_calendar (
+  symbol VARCHAR NOT NULL,          -- logical symbol (MGC)
+  contract VARCHAR NOT NULL,        -- e.g. MGCG6
+  first_date DATE NOT NULL,
+  last_date DATE NOT NULL,
+  contract_id VARCHAR,              -- provider id when known (ProjectX)
+  updated_at TIMESTAMP DEFAULT current_timestamp,
+
+  PRIMARY KEY (symbol, contract)
+);
+
+-- Streaming indicator snapshots (RSI/ATR state, see indicator_state.py)
+CREATE TABLE IF NOT EXISTS indicator_state (
+  instrument VARCHAR NOT NULL,
+  timeframe VARCHAR NOT NULL,       -- 5m, 1d
+  indicator VARCHAR NOT NULL,       -- e.g. rsi_wilder_14
+  as_of TIMESTAMPTZ NOT NULL,       -- last source row included
+  source_table VARCHAR NOT NULL,
+  state VARCHAR NOT NULL,           -- JSON
+  updated_at TIMESTAMP DEFAULT current_timestamp,
+
+  PRIMARY KEY (instrument, timeframe, indicator, as_of)
+);
+
 -- 1m execution backtest outputs
 CREATE TABLE IF NOT EXISTS orb_trades_1m_exec (
   date_local DATE NOT NULL,
@@ -537,7 +537,11 @@ def main():
 
         current_date += timedelta(days=1)
 
+    # Rows above are written directly (not via build_features), so refresh orb_facts once for the range
+    facts = builder.sync_orb_facts(start_date, end_date)
+
     print(f"\nProcessed {count} days")
+    print(f"orb_facts rows refreshed: {facts}")
     print(f"Features written to: {builder.table_name}")
 
     builder.con.close()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Rebuild orb_facts (long-format ORB table) from the wide feature tables.
+
+The feature builders keep orb_facts up to date day by day; run this once to
+populate it for existing history, or to re-sort it after many small updates.
+
+Usage:
+  python scripts/build_orb_facts.py
+  python scripts/build_orb_facts.py --db gold.db
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import duckdb
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from orb_facts import FEATURE_TABLES, rebuild_orb_facts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild orb_facts from daily_features_v2 tables")
+    parser.add_argument("--db", default="gold.db", help="Database path (default: gold.db)")
+    args = parser.parse_args()
+
+    print(f"Rebuilding orb_facts in {args.db} from: {', '.join(FEATURE_TABLES.values())}")
+    con = duckdb.connect(args.db)
+    try:
+        counts = rebuild_orb_facts(con)
+    finally:
+        con.close()
+
+    if not counts:
+        print("[WARN] No feature tables found - orb_facts is empty")
+        return
+    for instrument, rows in counts.items():
+        print(f"  [OK] {instrument}: {rows:,} ORB rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic gold.db (seeded bars_1m, optional bars_5m) for load testing.
+
+Same arguments -> same bars. Scale with --years and --symbols; the default
+writes about one year of MGC/NQ/MPL (~1M bars).
+
+Usage:
+  python scripts/generate_synthetic_data.py --db synthetic.db
+  python scripts/generate_synthetic_data.py --db load10x.db --years 20 --seed 7 --build-5m
+  python scripts/generate_synthetic_data.py --db synthetic.db --symbols MGC --start 2025-01-01 --end 2025-03-31 --replace
+"""
+
+import sys
+import time
+import argparse
+import datetime as dt
+from pathlib import Path
+
+import duckdb
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from synthetic_bars import PROFILES, generate_bars
+
+SCHEMA = Path(__file__).parent.parent / "schema.sql"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write seeded synthetic bars into a DuckDB file")
+    parser.add_argument("--db", required=True, help="Target database (created with schema.sql if new)")
+    parser.add_argument("--symbols", default="MGC,NQ,MPL", help=f"Comma-separated ({', '.join(PROFILES)})")
+    parser.add_argument("--start", default="2024-01-01", help="First trading day (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Last trading day (default: start + --years)")
+    parser.add_argument("--years", type=float, default=1.0, help="Span when --end is not given")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replace", action="store_true", help="Delete existing bars in the range first")
+    parser.add_argument("--build-5m", action="store_true", help="Also aggregate bars_5m")
+    args = parser.parse_args()
+
+    if Path(args.db).resolve().name == "gold.db":
+        print("[ERROR] Refusing to write synthetic bars into gold.db; pick another --db")
+        sys.exit(1)
+
+    start = dt.date.fromisoformat(args.start)
+    end = dt.date.fromisoformat(args.end) if args.end else start + dt.timedelta(days=round(365.25 * args.years) - 1)
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+
+    print(f"Generating {', '.join(symbols)} {start} -> {end} (seed {args.seed}) into {args.db}")
+    t0 = time.time()
+    con = duckdb.connect(args.db)
+    try:
+        con.execute(SCHEMA.read_text())
+        written = generate_bars(con, symbols, start, end, seed=args.seed, replace=args.replace, progress=True)
+        if args.build_5m:
+            con.execute(
+                """
+                INSERT OR REPLACE INTO bars_5m
+                (ts_utc, symbol, source_symbol, open, high, low, close, volume)
+                SELECT
+                  to_timestamp(floor(epoch(ts_utc) / 300) * 300) AS ts_5m,
+                  symbol,
+                  arg_max(source_symbol, ts_utc),
+                  arg_min(open, ts_utc),
+                  max(high),
+                  min(low),
+                  arg_max(close, ts_utc),
+                  sum(volume)
+                FROM bars_1m
+                WHERE symbol IN (SELECT unnest(?))
+                GROUP BY 1, 2
+                """,
+                [symbols],
+            )
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    finally:
+        con.close()
+
+    for symbol, rows in written.items():
+        print(f"  [OK] {symbol}: {rows:,} bars")
+    print(f"Done in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Inspect, verify or reset persisted indicator state (indicator_state table).
+
+The feature builders advance RSI/ATR from stored snapshots instead of
+recomputing from a lookback every day. --verify replays the full source
+history and checks every snapshot; --reset drops all snapshots so the next
+build recomputes from scratch.
+
+Usage:
+  python scripts/indicator_state.py
+  python scripts/indicator_state.py --verify
+  python scripts/indicator_state.py --reset --db gold.db
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import duckdb
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from indicator_state import IndicatorStore, standard_indicators, verify
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify or reset persisted indicator state")
+    parser.add_argument("--db", default="gold.db", help="Database path (default: gold.db)")
+    parser.add_argument("--symbol", default="MGC", help="Instrument (default: MGC)")
+    parser.add_argument("--verify", action="store_true", help="Replay history and check every snapshot")
+    parser.add_argument("--reset", action="store_true", help="Delete all snapshots")
+    args = parser.parse_args()
+
+    con = duckdb.connect(args.db)
+    try:
+        store = IndicatorStore(con)
+        dropped = store.sync_changes()
+        if dropped:
+            print(f"[OK] Dropped {dropped} stale snapshots from change log")
+
+        if args.reset:
+            store.reset()
+            print("[OK] All indicator snapshots deleted")
+            return
+
+        failed = False
+        for feed, factory in standard_indicators(args.symbol):
+            indicator = factory()
+            label = f"{feed.instrument} {feed.timeframe} {indicator.key}"
+            if not args.verify:
+                print(f"  {label}: {len(store.snapshots(feed, indicator))} snapshots")
+                continue
+
+            result = verify(store, feed, factory)
+            if result["mismatches"]:
+                failed = True
+                print(f"  [FAIL] {label}: {len(result['mismatches'])}/{result['checked']} snapshots differ")
+                for m in result["mismatches"][:5]:
+                    print(f"         {m['as_of']}: stored={m['stored']} recomputed={m['recomputed']}")
+            else:
+                print(f"  [OK] {label}: {result['checked']} snapshots match")
+    finally:
+        con.close()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
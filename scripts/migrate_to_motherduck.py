@@ -2,15 +2,28 @@
 """
 Migrate persistent tables from gold.db to MotherDuck.
 Safe, verified migration with row count validation.
+
+Default is an incremental sync (motherduck_sync.py): only rows above each
+table's high-water mark plus ranges recorded in sync_change_log are pushed.
+Use --full to drop and re-upload every table.
+
+Usage:
+  python scripts/migrate_to_motherduck.py          # Incremental sync
+  python scripts/migrate_to_motherduck.py --full   # Full re-upload
 """
 
 import os
 import sys
+import argparse
 import duckdb
 import json
 from datetime import datetime
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from motherduck_sync import MotherDuckSync
+
 load_dotenv()
 
 
@@ -19,6 +32,7 @@ PERSISTENT_TABLES = [
     'bars_1m',
     'bars_5m',
     'daily_features_v2',
+    'orb_facts',
     'validated_setups',
 ]
 
@@ -31,7 +45,7 @@ def log(msg, indent=0):
     return full_msg
 
 
-def migrate_to_motherduck():
+def migrate_to_motherduck(full: bool = False):
     """Migrate persistent tables to MotherDuck with verification."""
 
     # Check token
@@ -47,6 +61,7 @@ def migrate_to_motherduck():
 
     migration_report = {
         'started': datetime.now().isoformat(),
+        'mode': 'full' if full else 'incremental',
         'tables': {},
         'success': False
     }
@@ -86,12 +101,14 @@ def migrate_to_motherduck():
         log("\n[4/5] Setting up projectx_prod database...")
         md_conn.execute("CREATE DATABASE IF NOT EXISTS projectx_prod")
         md_conn.execute("USE projectx_prod")
+        syncer = MotherDuckSync(md_conn, source="local_gold", target="projectx_prod",
+                                log=lambda msg: log(msg, 1))
         log("  [OK] Database ready")
         log_lines.append("[4] Database projectx_prod ready")
         log_lines.append("")
 
         # Migrate each table
-        log("\n[4/5] Migrating tables...")
+        log(f"\n[4/5] Migrating tables ({migration_report['mode']})...")
         log_lines.append("[4] Migrating tables:")
         log_lines.append("-" * 70)
 
@@ -121,16 +138,25 @@ def migrate_to_motherduck():
             except:
                 pass
 
-            # Drop if exists in MotherDuck
-            log(f"    Dropping existing table (if any)...", 2)
-            md_conn.execute(f"DROP TABLE IF EXISTS {table}")
-
-            # Create in MotherDuck from local
-            log(f"    Creating and uploading...", 2)
-            md_conn.execute(f"""
-                CREATE TABLE {table} AS
-                SELECT * FROM local_gold.{table}
-            """)
+            sync_info = {}
+            if full:
+                # Drop if exists in MotherDuck
+                log(f"    Dropping existing table (if any)...", 2)
+                md_conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+                # Create in MotherDuck from local
+                log(f"    Creating and uploading...", 2)
+                md_conn.execute(f"""
+                    CREATE TABLE {table} AS
+                    SELECT * FROM local_gold.{table}
+                """)
+                syncer.mark_synced(table)
+            else:
+                # Push only new rows and logged changed ranges
+                log(f"    Syncing new/changed rows...", 2)
+                result = syncer.sync_table(table)
+                sync_info = {'sync_mode': result['mode'], 'rows_pushed': result['rows_pushed']}
+                log(f"    Pushed: {result['rows_pushed']:,} rows ({result['mode']})", 2)
 
             # Verify
             log(f"    Verifying...", 2)
@@ -146,6 +172,7 @@ def migrate_to_motherduck():
             migration_report['tables'][table] = {
                 'row_count': local_count,
                 **ts_info,
+                **sync_info,
                 'verified': True
             }
 
@@ -258,5 +285,10 @@ def migrate_to_motherduck():
 
 
 if __name__ == "__main__":
-    success = migrate_to_motherduck()
+    parser = argparse.ArgumentParser(description="Sync persistent gold.db tables to MotherDuck")
+    parser.add_argument("--full", action="store_true",
+                        help="Drop and re-upload every table instead of an incremental sync")
+    args = parser.parse_args()
+
+    success = migrate_to_motherduck(full=args.full)
     sys.exit(0 if success else 1)
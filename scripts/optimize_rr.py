@@ -19,9 +19,14 @@ Strategy:
 """
 
 import sys
+from pathlib import Path
+
 import duckdb
 from typing import Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from orb_facts import has_orb_facts, long_select_sql
+
 DB_PATH = "gold.db"
 
 # ORB times to test
@@ -74,20 +79,25 @@ def optimize_orb_rr(con: duckdb.DuckDBPyConnection, symbol: str, orb: str, sl_mo
     table = get_table_name(symbol)
     tick_size = get_tick_size(symbol)
 
+    # orb_facts, or the symbol's wide table unpivoted if orb_facts has not been built
+    source = "orb_facts" if has_orb_facts(con, symbol) else f"({long_select_sql(con, table, instrument=symbol)})"
+
     # Get all trades with MAE/MFE data
     query = f"""
         SELECT
-            orb_{orb}_break_dir as direction,
-            orb_{orb}_mae as mae,
-            orb_{orb}_mfe as mfe,
-            orb_{orb}_size as orb_size
-        FROM {table}
-        WHERE orb_{orb}_break_dir IN ('UP', 'DOWN')
-            AND orb_{orb}_mae IS NOT NULL
-            AND orb_{orb}_mfe IS NOT NULL
+            break_dir as direction,
+            mae,
+            mfe,
+            orb_size
+        FROM {source}
+        WHERE instrument = ?
+            AND orb_time = ?
+            AND break_dir IN ('UP', 'DOWN')
+            AND mae IS NOT NULL
+            AND mfe IS NOT NULL
     """
 
-    trades = con.execute(query).fetchall()
+    trades = con.execute(query, [symbol, orb]).fetchall()
 
     if len(trades) == 0:
         return {
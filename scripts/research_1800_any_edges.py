@@ -30,6 +30,11 @@ import warnings
 warnings.filterwarnings('ignore')
 
 import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from signal_dsl import Expr, Template, TemplateScanner, all_of, col, lit
+from stability import TradeBook
+
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "gold.db")
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "outputs")
 
@@ -38,135 +43,127 @@ OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "outputs")
 # ============================================================================
 
 class TradeTemplate:
-    """Base class for trade templates"""
+    """
+    Base class for trade templates.
+
+    A template is a day condition (signal_dsl expression) plus entry/stop/target
+    levels per direction. Conditions are evaluated over the whole feature frame
+    at once; see signal_dsl.TemplateScanner for the batch trade simulation.
+    """
+
+    orb = "1800"
 
     def __init__(self, name: str, params: Dict):
         self.name = name
         self.params = params
 
-    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Generate entry signals. Must be implemented by subclass."""
+    def condition(self) -> Expr:
+        """Days the template signals on. Must be implemented by subclass."""
+        raise NotImplementedError
+
+    def levels(self, days: pd.DataFrame) -> Dict[str, Dict[str, pd.Series]]:
+        """Entry/stop/risk/target per direction for the signal days"""
         raise NotImplementedError
 
+    def spec(self) -> Template:
+        return Template(self.name, self.orb, self.condition(), params=self.params)
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Entry signals: one LONG and one SHORT row per qualifying day"""
+        days = df[self.condition().mask(df)]
+        if days.empty:
+            return pd.DataFrame()
+
+        frames = []
+        for direction, levels in self.levels(days).items():
+            frames.append(pd.DataFrame({
+                'date': days['date_local'].to_numpy(),
+                'direction': direction,
+                'entry': np.asarray(levels['entry'], dtype=float),
+                'stop': np.asarray(levels['stop'], dtype=float),
+                'risk': np.asarray(levels['risk'], dtype=float),
+                'target': np.asarray(levels['target'], dtype=float),
+                'template': self.name,
+                'params': str(self.params)
+            }))
+        return pd.concat(frames).sort_values('date', kind='stable').reset_index(drop=True)
+
     def __repr__(self):
         return f"{self.name}({self.params})"
 
 
+def orb_levels(days: pd.DataFrame, rr: float) -> Dict[str, Dict[str, pd.Series]]:
+    """Breakout levels: stop at the opposite ORB edge, target rr x ORB size"""
+    orb_high, orb_low = days['orb_1800_high'], days['orb_1800_low']
+    orb_size = orb_high - orb_low
+    return {
+        'LONG': {'entry': orb_high, 'stop': orb_low, 'risk': orb_size, 'target': orb_high + orb_size * rr},
+        'SHORT': {'entry': orb_low, 'stop': orb_high, 'risk': orb_size, 'target': orb_low - orb_size * rr},
+    }
+
+
 class OrbBreakoutTemplate(TradeTemplate):
     """ORB breakout template - break above/below 1800 ORB"""
 
-    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+    def condition(self) -> Expr:
         """
         Entry: First 5m close outside ORB after 18:05
         Direction: LONG if close > orb_high, SHORT if close < orb_low
         Stop: Opposite ORB level (LONG: orb_low, SHORT: orb_high)
         Target: RR multiple of risk
         """
-        signals = []
-
-        for _, row in df.iterrows():
-            if pd.isna(row['orb_1800_high']) or pd.isna(row['orb_1800_low']):
-                continue
-
-            orb_high = row['orb_1800_high']
-            orb_low = row['orb_1800_low']
-            orb_size = orb_high - orb_low
-
-            # Filter: Skip if ORB too large (optional param)
-            if 'max_orb_pct_atr' in self.params:
-                if pd.notna(row['atr_20']):
-                    orb_size_norm = orb_size / row['atr_20']
-                    if orb_size_norm > self.params['max_orb_pct_atr']:
-                        continue  # Skip large ORBs
-
-            # LONG signal: Break above ORB
-            signals.append({
-                'date': row['date_local'],
-                'direction': 'LONG',
-                'entry': orb_high,
-                'stop': orb_low,
-                'risk': orb_size,
-                'target': orb_high + (orb_size * self.params['rr']),
-                'template': self.name,
-                'params': str(self.params)
-            })
-
-            # SHORT signal: Break below ORB
-            signals.append({
-                'date': row['date_local'],
-                'direction': 'SHORT',
-                'entry': orb_low,
-                'stop': orb_high,
-                'risk': orb_size,
-                'target': orb_low - (orb_size * self.params['rr']),
-                'template': self.name,
-                'params': str(self.params)
-            })
+        orb_size = col('orb_1800_high') - col('orb_1800_low')
+        terms = [col('orb_1800_high').notna(), col('orb_1800_low').notna()]
 
-        return pd.DataFrame(signals)
+        # Filter: Skip large ORBs when ATR is known (optional param)
+        if 'max_orb_pct_atr' in self.params:
+            terms.append(col('atr_20').isna() | (orb_size / col('atr_20') <= self.params['max_orb_pct_atr']))
+
+        return all_of(*terms)
+
+    def levels(self, days):
+        return orb_levels(days, self.params['rr'])
 
 
 class AsiaRejectionTemplate(TradeTemplate):
     """Fade: Rejection of Asia high/low during 1800 session"""
 
-    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+    def condition(self) -> Expr:
         """
         Entry: Sweep of Asia high/low then rejection (close back inside)
         Direction: LONG if sweep low then recover, SHORT if sweep high then fade
         Stop: Beyond the swept level
         Target: Return to opposite Asia level
         """
-        signals = []
-
-        for _, row in df.iterrows():
-            if pd.isna(row['asia_high']) or pd.isna(row['asia_low']):
-                continue
-
-            asia_high = row['asia_high']
-            asia_low = row['asia_low']
-            asia_range = asia_high - asia_low
-
-            if asia_range == 0:
-                continue
-
-            # Filter: Only when Asia range is reasonable
-            if 'min_asia_pct_atr' in self.params and 'max_asia_pct_atr' in self.params:
-                if pd.notna(row['atr_20']):
-                    asia_norm = asia_range / row['atr_20']
-                    if asia_norm < self.params['min_asia_pct_atr'] or asia_norm > self.params['max_asia_pct_atr']:
-                        continue
-
-            # LONG signal: Rejection from Asia low
-            signals.append({
-                'date': row['date_local'],
-                'direction': 'LONG',
-                'entry': asia_low + (asia_range * 0.1),  # Entry 10% above Asia low
-                'stop': asia_low - (asia_range * self.params['stop_pct']),
-                'risk': asia_range * (0.1 + self.params['stop_pct']),
-                'target': asia_high,
-                'template': self.name,
-                'params': str(self.params)
-            })
-
-            # SHORT signal: Rejection from Asia high
-            signals.append({
-                'date': row['date_local'],
-                'direction': 'SHORT',
-                'entry': asia_high - (asia_range * 0.1),  # Entry 10% below Asia high
-                'stop': asia_high + (asia_range * self.params['stop_pct']),
-                'risk': asia_range * (0.1 + self.params['stop_pct']),
-                'target': asia_low,
-                'template': self.name,
-                'params': str(self.params)
-            })
-
-        return pd.DataFrame(signals)
+        asia_range = col('asia_high') - col('asia_low')
+        terms = [col('asia_high').notna(), col('asia_low').notna(), asia_range != 0]
+
+        # Filter: Only when Asia range is reasonable (when ATR is known)
+        if 'min_asia_pct_atr' in self.params and 'max_asia_pct_atr' in self.params:
+            asia_norm = asia_range / col('atr_20')
+            terms.append(col('atr_20').isna() | (
+                (asia_norm >= self.params['min_asia_pct_atr']) & (asia_norm <= self.params['max_asia_pct_atr'])
+            ))
+
+        return all_of(*terms)
+
+    def levels(self, days):
+        asia_high, asia_low = days['asia_high'], days['asia_low']
+        asia_range = asia_high - asia_low
+        stop_pct = self.params['stop_pct']
+        return {
+            # Entry 10% inside the Asia level, stop beyond it
+            'LONG': {'entry': asia_low + asia_range * 0.1, 'stop': asia_low - asia_range * stop_pct,
+                     'risk': asia_range * (0.1 + stop_pct), 'target': asia_high},
+            'SHORT': {'entry': asia_high - asia_range * 0.1, 'stop': asia_high + asia_range * stop_pct,
+                      'risk': asia_range * (0.1 + stop_pct), 'target': asia_low},
+        }
 
 
 class PreOpenRangeTemplate(TradeTemplate):
     """Pre-1800 micro-range breakout (17:30-18:00)"""
 
-    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+    def condition(self) -> Expr:
         """
         Entry: Break of 17:30-18:00 range after 18:00
         Direction: LONG if break high, SHORT if break low
@@ -175,122 +172,27 @@ class PreOpenRangeTemplate(TradeTemplate):
         """
         # Note: Would need pre_1800_range computed from bars
         # For now, skip this template as it requires additional bar data
-        return pd.DataFrame()
+        return lit(False)
+
+    def levels(self, days):
+        return {}
 
 
 class OrbSizeFilteredTemplate(TradeTemplate):
     """ORB breakout with size filtering (small ORB only)"""
 
-    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+    def condition(self) -> Expr:
         """
         Same as ORB breakout but only trade when ORB is compressed
         """
-        signals = []
-
-        for _, row in df.iterrows():
-            if pd.isna(row['orb_1800_high']) or pd.isna(row['orb_1800_low']) or pd.isna(row['atr_20']):
-                continue
-
-            orb_high = row['orb_1800_high']
-            orb_low = row['orb_1800_low']
-            orb_size = orb_high - orb_low
-            orb_size_norm = orb_size / row['atr_20']
-
-            # Filter: Only small ORBs (compressed)
-            if orb_size_norm > self.params['max_orb_pct_atr']:
-                continue
-
-            # LONG signal
-            signals.append({
-                'date': row['date_local'],
-                'direction': 'LONG',
-                'entry': orb_high,
-                'stop': orb_low,
-                'risk': orb_size,
-                'target': orb_high + (orb_size * self.params['rr']),
-                'template': self.name,
-                'params': str(self.params)
-            })
-
-            # SHORT signal
-            signals.append({
-                'date': row['date_local'],
-                'direction': 'SHORT',
-                'entry': orb_low,
-                'stop': orb_high,
-                'risk': orb_size,
-                'target': orb_low - (orb_size * self.params['rr']),
-                'template': self.name,
-                'params': str(self.params)
-            })
-
-        return pd.DataFrame(signals)
-
-
-# ============================================================================
-# EXECUTION ENGINE
-# ============================================================================
-
-def simulate_trade(signal: pd.Series, df_features: pd.DataFrame) -> Dict:
-    """
-    Simulate trade execution with conservative assumptions.
-
-    Conservative rules:
-    - Entry: Next bar after signal (simulated by using actual ORB outcome)
-    - If TP and SL hit same bar => LOSS
-    - Slippage: Configurable ticks against entry
-    """
-    date = signal['date']
-    direction = signal['direction']
-    entry = signal['entry']
-    stop = signal['stop']
-    target = signal['target']
-    risk = signal['risk']
+        orb_size = col('orb_1800_high') - col('orb_1800_low')
+        return all_of(
+            col('orb_1800_high').notna(), col('orb_1800_low').notna(), col('atr_20').notna(),
+            orb_size / col('atr_20') <= self.params['max_orb_pct_atr'],
+        )
 
-    # Get actual outcome from database
-    row = df_features[df_features['date_local'] == date]
-
-    if row.empty:
-        return None
-
-    row = row.iloc[0]
-
-    # Use actual 1800 ORB outcome as proxy
-    outcome = row['orb_1800_outcome']
-    r_multiple = row['orb_1800_r_multiple']
-
-    # Check if signal direction matches actual breakout direction
-    break_dir = row['orb_1800_break_dir']
-
-    if direction == 'LONG' and break_dir == 'UP':
-        return {
-            'date': date,
-            'direction': direction,
-            'outcome': outcome,
-            'r_multiple': r_multiple if outcome in ['WIN', 'LOSS'] else 0.0,
-            'entry': entry,
-            'stop': stop,
-            'target': target,
-            'risk': risk,
-            'template': signal['template'],
-            'params': signal['params']
-        }
-    elif direction == 'SHORT' and break_dir == 'DOWN':
-        return {
-            'date': date,
-            'direction': direction,
-            'outcome': outcome,
-            'r_multiple': r_multiple if outcome in ['WIN', 'LOSS'] else 0.0,
-            'entry': entry,
-            'stop': stop,
-            'target': target,
-            'risk': risk,
-            'template': signal['template'],
-            'params': signal['params']
-        }
-    else:
-        # No breakout in signal direction
-        return None
+    def levels(self, days):
+        return orb_levels(days, self.params['rr'])
 
 
 # ============================================================================
@@ -306,40 +208,31 @@ def stage1_broad_scan(templates: List[TradeTemplate], df_features: pd.DataFrame)
     print("="*80)
     print()
 
+    # All templates in one pass: conditions -> masks -> per-template stats
+    scanner = TemplateScanner(df_features)
+    specs = [t.spec() for t in templates]
+    signal_days = scanner.evaluator.masks([spec.when for spec in specs]).sum(axis=1)
+    stats = scanner.scan(specs)
+
     results = []
 
-    for template in templates:
+    for template, n_signals, row in zip(templates, signal_days, stats.itertuples()):
         print(f"Testing: {template}")
 
-        # Generate signals
-        signals = template.generate_signals(df_features)
-
-        if signals.empty:
+        if n_signals == 0:
             print(f"  No signals generated")
             print()
             continue
 
-        # Simulate trades
-        trades = []
-        for _, signal in signals.iterrows():
-            result = simulate_trade(signal, df_features)
-            if result:
-                trades.append(result)
-
-        if not trades:
+        if row.trades == 0:
             print(f"  No valid trades executed")
             print()
             continue
 
-        df_trades = pd.DataFrame(trades)
-
-        # Calculate statistics
-        total_trades = len(df_trades)
-        wins = (df_trades['outcome'] == 'WIN').sum()
-        losses = (df_trades['outcome'] == 'LOSS').sum()
-        win_rate = wins / (wins + losses) if (wins + losses) > 0 else 0
-        avg_r = df_trades['r_multiple'].mean()
-        total_r = df_trades['r_multiple'].sum()
+        total_trades = int(row.trades)
+        win_rate = row.win_rate
+        avg_r = row.avg_r
+        total_r = row.total_r
 
         print(f"  Trades: {total_trades}")
         print(f"  Win Rate: {win_rate*100:.1f}%")
@@ -380,39 +273,44 @@ def stage2_stability(df_results: pd.DataFrame, templates: List[TradeTemplate], d
         print("No candidates passed Stage 1")
         return df_results
 
-    stability_results = []
+    scanner = TemplateScanner(df_features)
 
-    for _, row in passed_stage1.iterrows():
-        template_name = row['template']
-        print(f"Stability check: {template_name}")
+    # Time split: 2024+ OOS vs pre-2024 IS
+    split_date = pd.Timestamp('2024-01-01')
+    splits = [
+        ('IS (pre-2024)', (df_features['date_local'] < split_date).to_numpy()),
+        ('OOS (2024+)', (df_features['date_local'] >= split_date).to_numpy()),
+    ]
 
-        # Find matching template
-        template = next((t for t in templates if t.name == template_name), None)
-        if not template:
-            continue
+    # Per-year/quarter consistency for all Stage 1 survivors from one prefix-sum book
+    by_name = {t.name: t for t in templates}
+    survivors = [by_name[name] for name in passed_stage1['template'] if name in by_name]
+    masks = scanner.trade_masks([t.spec() for t in survivors])
+    book = TradeBook.from_frame(scanner.trades([t.spec() for t in survivors], masks=masks),
+                                strategy='template', date='date_local')
+    years = book.by_period('Y').groupby('strategy')
+    quarters = book.by_period('Q').groupby('strategy')
+    totals = book.totals().set_index('strategy')
 
-        # Time split: 2024+ OOS vs pre-2024 IS
-        split_date = pd.Timestamp('2024-01-01')
-        df_is = df_features[df_features['date_local'] < split_date]
-        df_oos = df_features[df_features['date_local'] >= split_date]
+    for i, template in enumerate(survivors):
+        print(f"Stability check: {template.name}")
 
         # Test on both splits
-        for split_name, df_split in [('IS (pre-2024)', df_is), ('OOS (2024+)', df_oos)]:
-            signals = template.generate_signals(df_split)
-
-            trades = []
-            for _, signal in signals.iterrows():
-                result = simulate_trade(signal, df_split)
-                if result:
-                    trades.append(result)
-
-            if trades:
-                df_trades = pd.DataFrame(trades)
-                avg_r = df_trades['r_multiple'].mean()
-                print(f"  {split_name}: {len(trades)} trades, {avg_r:+.3f}R")
+        for split_name, rows in splits:
+            split_stats = scanner.scan([template.spec()], rows=rows, masks=masks[i:i + 1]).iloc[0]
+            if split_stats['trades']:
+                print(f"  {split_name}: {split_stats['trades']} trades, {split_stats['avg_r']:+.3f}R")
             else:
                 print(f"  {split_name}: No trades")
 
+        if template.name in totals.index:
+            by_year, by_quarter = years.get_group(template.name), quarters.get_group(template.name)
+            worst = by_year.loc[by_year['expectancy'].idxmin()]
+            print(f"  Years profitable: {(by_year['expectancy'] > 0).sum()}/{len(by_year)} | "
+                  f"Quarters profitable: {(by_quarter['expectancy'] > 0).sum()}/{len(by_quarter)} | "
+                  f"Worst year: {worst['year']} {worst['expectancy']:+.3f}R | "
+                  f"Max DD: {totals.loc[template.name, 'max_dd']:.1f}R")
+
         # Parameter neighborhood test (if applicable)
         # TODO: Test nearby parameter values
 
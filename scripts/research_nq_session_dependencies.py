@@ -21,12 +21,16 @@ Zero-Lookahead: All features must be known before the predicted session starts
 
 import sys
 from datetime import datetime
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Union
 import duckdb
 import pandas as pd
 import numpy as np
 from scipy import stats
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from signal_dsl import Expr, coalesce, col, parse
+
 DB_PATH = "gold.db"
 
 
@@ -317,12 +321,14 @@ def test_asia_direction_continuation(df: pd.DataFrame) -> Dict:
     return results
 
 
-def test_tradeable_edge(df: pd.DataFrame, condition_fn, target_orb: str, min_improvement: float = 10.0) -> Dict:
+def test_tradeable_edge(df: pd.DataFrame, condition: Union[Expr, str, Callable], target_orb: str,
+                        min_improvement: float = 10.0) -> Dict:
     """
     Test if a discovered dependency is tradeable
 
     Args:
-        condition_fn: Function that returns True for days meeting condition
+        condition: signal_dsl expression (or condition string) selecting days;
+            a row callable is still accepted but evaluated row by row
         target_orb: ORB to trade ('1800', '0030', etc.)
         min_improvement: Minimum % improvement required to pass
 
@@ -331,8 +337,12 @@ def test_tradeable_edge(df: pd.DataFrame, condition_fn, target_orb: str, min_imp
     """
     df_valid = df.copy()
 
-    # Apply condition
-    df_valid['meets_condition'] = df_valid.apply(condition_fn, axis=1)
+    # Apply condition (whole columns at once unless given a row callable)
+    if callable(condition) and not isinstance(condition, Expr):
+        df_valid['meets_condition'] = df_valid.apply(condition, axis=1)
+    else:
+        condition = parse(condition) if isinstance(condition, str) else condition
+        df_valid['meets_condition'] = condition.mask(df_valid)
 
     filtered = df_valid[df_valid['meets_condition']].copy()
 
@@ -518,8 +528,7 @@ def main():
     print()
 
     # Edge 1: If 0900 wins, trade 1800
-    def condition_0900_win(row):
-        return row.get('orb_0900_outcome') == 'WIN'
+    condition_0900_win = parse("orb_0900_outcome == 'WIN'")
 
     edge1 = test_tradeable_edge(df, condition_0900_win, '1800', min_improvement=10.0)
     print("EDGE 1: Trade 1800 if 0900 won")
@@ -532,14 +541,9 @@ def main():
         print(f"  Pass Tests: {edge1['pass_tests']}")
     print()
 
-    # Edge 2: If Asia trend UP (2+ ORBs), trade 1800 UP
-    def condition_asia_up(row):
-        asia_up = (
-            (row.get('orb_0900_break_dir') == 'UP') +
-            (row.get('orb_1000_break_dir') == 'UP') +
-            (row.get('orb_1100_break_dir') == 'UP')
-        )
-        return asia_up >= 2 and row.get('orb_1800_break_dir') == 'UP'
+    # Edge 2: If Asia trend UP (2+ ORBs), trade 1800 UP (missing break_dir counts as not UP)
+    asia_up = sum(coalesce(col(f'orb_{orb}_break_dir') == 'UP', False) for orb in ('0900', '1000', '1100'))
+    condition_asia_up = (asia_up >= 2) & (col('orb_1800_break_dir') == 'UP')
 
     edge2 = test_tradeable_edge(df, condition_asia_up, '1800', min_improvement=10.0)
     print("EDGE 2: Trade 1800 UP if Asia trend UP")
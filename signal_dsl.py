@@ -0,0 +1,584 @@
+"""
+Signal DSL - declarative day conditions compiled to masks or SQL
+================================================================
+
+Research templates used to express "trade this ORB on days where ..." as
+Python loops over df.iterrows() (or row callables passed to DataFrame.apply),
+then simulate every signal one at a time. Conditions here are small
+expression trees instead:
+
+    from signal_dsl import col, parse
+    small_orb = (col("orb_1800_size") / col("atr_20")) <= 0.4
+    small_orb = parse("orb_1800_size / atr_20 <= 0.4")        # same thing
+
+An expression evaluates to a boolean numpy mask over a daily feature frame
+(whole columns at a time) or compiles to a DuckDB expression (to_sql). Both
+follow SQL NULL semantics, so a condition selects the same days either way:
+NaN/None is unknown, comparisons with unknown are unknown, AND/OR/NOT are
+three-valued, division by zero is NULL and only TRUE rows are selected.
+
+TemplateScanner evaluates thousands of templates in one pass (shared
+sub-expressions are computed once) and scores them all with matrix ops
+against the ORB outcome columns, replacing the per-signal simulate loop.
+
+Parser grammar (Python expression syntax, nothing is executed):
+  names -> columns; numbers, strings, True/False/None -> literals
+  + - * /   < <= > >= == !=   and or not   x in (...)   x not in (...)
+  x is None / x is not None   abs(x)  coalesce(x, default)  notna(x)  isna(x)
+"""
+
+import ast
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+ARITHMETIC = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv}
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+               "==": operator.eq, "!=": operator.ne}
+SQL_COMPARISONS = {"==": "=", "!=": "<>"}
+
+# Evaluated values are (values, known) pairs; known=False is SQL NULL
+
+
+class Expr:
+    """Base expression node; operators build larger expressions"""
+
+    boolean = False
+
+    def to_sql(self) -> str:
+        raise NotImplementedError
+
+    def _eval(self, ev: "Evaluator") -> Tuple[Any, Any]:
+        raise NotImplementedError
+
+    def columns(self) -> set:
+        return set().union(*(c.columns() for c in self.children()))
+
+    def children(self) -> Sequence["Expr"]:
+        return ()
+
+    def mask(self, frame: pd.DataFrame) -> np.ndarray:
+        """Rows where the condition is TRUE"""
+        return Evaluator(frame).mask(self)
+
+    def __repr__(self):
+        return self.to_sql()
+
+    def __hash__(self):
+        return hash(self.to_sql())
+
+    # Arithmetic
+    def __add__(self, other): return BinOp("+", self, wrap(other))
+    def __radd__(self, other): return BinOp("+", wrap(other), self)
+    def __sub__(self, other): return BinOp("-", self, wrap(other))
+    def __rsub__(self, other): return BinOp("-", wrap(other), self)
+    def __mul__(self, other): return BinOp("*", self, wrap(other))
+    def __rmul__(self, other): return BinOp("*", wrap(other), self)
+    def __truediv__(self, other): return BinOp("/", self, wrap(other))
+    def __rtruediv__(self, other): return BinOp("/", wrap(other), self)
+    def __neg__(self): return BinOp("-", Lit(0), self)
+    def __abs__(self): return Func("abs", (self,))
+
+    # Comparisons (== builds an expression; nodes compare by SQL text via same())
+    def __lt__(self, other): return Compare("<", self, wrap(other))
+    def __le__(self, other): return Compare("<=", self, wrap(other))
+    def __gt__(self, other): return Compare(">", self, wrap(other))
+    def __ge__(self, other): return Compare(">=", self, wrap(other))
+    def __eq__(self, other): return Compare("==", self, wrap(other))
+    def __ne__(self, other): return Compare("!=", self, wrap(other))
+
+    # Boolean logic
+    def __and__(self, other): return And(self, wrap(other))
+    def __rand__(self, other): return And(wrap(other), self)
+    def __or__(self, other): return Or(self, wrap(other))
+    def __ror__(self, other): return Or(wrap(other), self)
+    def __invert__(self): return Not(self)
+
+    def isin(self, values: Iterable) -> "Expr":
+        return IsIn(self, tuple(values))
+
+    def notna(self) -> "Expr":
+        return IsNull(self, negate=True)
+
+    def isna(self) -> "Expr":
+        return IsNull(self)
+
+    def same(self, other: "Expr") -> bool:
+        """Structural equality (== is overloaded to build comparisons)"""
+        return isinstance(other, Expr) and self.to_sql() == other.to_sql()
+
+
+class Col(Expr):
+    def __init__(self, name: str):
+        if not name.replace("_", "").isalnum():
+            raise ValueError(f"Invalid column name: {name!r}")
+        self.name = name
+
+    def to_sql(self):
+        return f'"{self.name}"'
+
+    def columns(self):
+        return {self.name}
+
+    def _eval(self, ev):
+        values = ev.column(self.name)
+        return values, ~pd.isna(values)
+
+
+class Lit(Expr):
+    def __init__(self, value):
+        self.value = value
+        self.boolean = isinstance(value, bool)
+
+    def to_sql(self):
+        v = self.value
+        if v is None:
+            return "NULL"
+        if isinstance(v, bool):
+            return "TRUE" if v else "FALSE"
+        if isinstance(v, str):
+            return "'" + v.replace("'", "''") + "'"
+        return repr(float(v)) if isinstance(v, float) else str(int(v))
+
+    def _eval(self, ev):
+        return self.value, self.value is not None
+
+
+class BinOp(Expr):
+    def __init__(self, op: str, left: Expr, right: Expr):
+        self.op, self.left, self.right = op, left, right
+
+    def children(self):
+        return (self.left, self.right)
+
+    def to_sql(self):
+        left, right = (f"CAST({e.to_sql()} AS INTEGER)" if e.boolean else e.to_sql() for e in self.children())
+        if self.op == "/":
+            return f"({left} / NULLIF({right}, 0))"
+        return f"({left} {self.op} {right})"
+
+    def _eval(self, ev):
+        (a, ka), (b, kb) = ev.value(self.left), ev.value(self.right)
+        a, b = _numeric(a), _numeric(b)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            values = ARITHMETIC[self.op](a, b)
+        return values, ka & kb & np.isfinite(values)
+
+
+class Compare(Expr):
+    boolean = True
+
+    def __init__(self, op: str, left: Expr, right: Expr):
+        self.op, self.left, self.right = op, left, right
+
+    def children(self):
+        return (self.left, self.right)
+
+    def to_sql(self):
+        return f"({self.left.to_sql()} {SQL_COMPARISONS.get(self.op, self.op)} {self.right.to_sql()})"
+
+    def _eval(self, ev):
+        (a, ka), (b, kb) = ev.value(self.left), ev.value(self.right)
+        known = np.broadcast_to(ka & kb, (ev.n,))
+        result = np.zeros(ev.n, dtype=bool)
+        if known.any():
+            a = a[known] if np.ndim(a) else a
+            b = b[known] if np.ndim(b) else b
+            result[known] = COMPARISONS[self.op](a, b)
+        return result, known
+
+
+class IsIn(Expr):
+    boolean = True
+
+    def __init__(self, expr: Expr, values: tuple):
+        self.expr, self.values = expr, values
+
+    def children(self):
+        return (self.expr,)
+
+    def to_sql(self):
+        return f"({self.expr.to_sql()} IN ({', '.join(Lit(v).to_sql() for v in self.values)}))"
+
+    def _eval(self, ev):
+        values, known = ev.value(self.expr)
+        if not np.ndim(values):
+            return np.full(ev.n, values in self.values), np.broadcast_to(known, (ev.n,))
+        return pd.Series(values).isin(self.values).to_numpy() & known, known
+
+
+class IsNull(Expr):
+    boolean = True
+
+    def __init__(self, expr: Expr, negate: bool = False):
+        self.expr, self.negate = expr, negate
+
+    def children(self):
+        return (self.expr,)
+
+    def to_sql(self):
+        return f"({self.expr.to_sql()} IS {'NOT ' if self.negate else ''}NULL)"
+
+    def _eval(self, ev):
+        _, known = ev.value(self.expr)
+        known = np.broadcast_to(known, (ev.n,))
+        return (known if self.negate else ~known), np.ones(ev.n, dtype=bool)
+
+
+class And(Expr):
+    boolean = True
+
+    def __init__(self, left: Expr, right: Expr):
+        self.left, self.right = left, right
+
+    def children(self):
+        return (self.left, self.right)
+
+    def to_sql(self):
+        return f"({self.left.to_sql()} AND {self.right.to_sql()})"
+
+    def _eval(self, ev):
+        (a, ka), (b, kb) = ev.boolean(self.left), ev.boolean(self.right)
+        false = (ka & ~a) | (kb & ~b)
+        true = ka & a & kb & b
+        return true, true | false
+
+
+class Or(Expr):
+    boolean = True
+
+    def __init__(self, left: Expr, right: Expr):
+        self.left, self.right = left, right
+
+    def children(self):
+        return (self.left, self.right)
+
+    def to_sql(self):
+        return f"({self.left.to_sql()} OR {self.right.to_sql()})"
+
+    def _eval(self, ev):
+        (a, ka), (b, kb) = ev.boolean(self.left), ev.boolean(self.right)
+        true = (ka & a) | (kb & b)
+        return true, true | (ka & kb)
+
+
+class Not(Expr):
+    boolean = True
+
+    def __init__(self, expr: Expr):
+        self.expr = expr
+
+    def children(self):
+        return (self.expr,)
+
+    def to_sql(self):
+        return f"(NOT {self.expr.to_sql()})"
+
+    def _eval(self, ev):
+        values, known = ev.boolean(self.expr)
+        return known & ~values, known
+
+
+class Func(Expr):
+    NAMES = ("abs", "coalesce")
+
+    def __init__(self, name: str, args: Tuple[Expr, ...]):
+        if name not in self.NAMES:
+            raise ValueError(f"Unknown function {name}(); available: {', '.join(self.NAMES)}, notna, isna")
+        if len(args) != (2 if name == "coalesce" else 1):
+            raise ValueError(f"Wrong number of arguments to {name}()")
+        self.name, self.args = name, args
+        self.boolean = name == "coalesce" and all(a.boolean for a in args)
+
+    def children(self):
+        return self.args
+
+    def to_sql(self):
+        name = self.name.upper()
+        return f"{name}({', '.join(a.to_sql() for a in self.args)})"
+
+    def _eval(self, ev):
+        if self.name == "abs":
+            values, known = ev.value(self.args[0])
+            return np.abs(_numeric(values)), known
+        (a, ka), (b, kb) = ev.value(self.args[0]), ev.value(self.args[1])
+        ka, kb = np.broadcast_to(ka, (ev.n,)), np.broadcast_to(kb, (ev.n,))
+        a, b = np.broadcast_to(a, (ev.n,)), np.broadcast_to(b, (ev.n,))
+        return np.where(ka, a, b), ka | kb
+
+
+def _numeric(values):
+    if isinstance(values, np.ndarray) and values.dtype == bool:
+        return values.astype(np.int64)
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    return values
+
+
+def wrap(value) -> Expr:
+    return value if isinstance(value, Expr) else Lit(value)
+
+
+def col(name: str) -> Col:
+    return Col(name)
+
+
+def lit(value) -> Lit:
+    return Lit(value)
+
+
+def coalesce(expr, default) -> Expr:
+    return Func("coalesce", (wrap(expr), wrap(default)))
+
+
+def all_of(*conditions) -> Expr:
+    """AND of conditions (TRUE when empty)"""
+    result = None
+    for c in conditions:
+        result = wrap(c) if result is None else And(result, wrap(c))
+    return result if result is not None else Lit(True)
+
+
+# ============================================================================
+# PARSER
+# ============================================================================
+
+_AST_ARITHMETIC = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+_AST_COMPARE = {ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=", ast.Eq: "==", ast.NotEq: "!="}
+
+
+def parse(text: str) -> Expr:
+    """Parse a condition string (see module docstring for the grammar)"""
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition {text!r}: {e.msg}") from None
+    return _convert(tree.body, text)
+
+
+def _constant_list(node, text) -> tuple:
+    if not isinstance(node, (ast.Tuple, ast.List, ast.Set)) or \
+            not all(isinstance(e, ast.Constant) for e in node.elts):
+        raise ValueError(f"'in' needs a literal tuple/list in {text!r}")
+    return tuple(e.value for e in node.elts)
+
+
+def _convert(node, text) -> Expr:
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (int, float, str, bool, type(None))):
+            raise ValueError(f"Unsupported literal {node.value!r} in {text!r}")
+        return Lit(node.value)
+    if isinstance(node, ast.Name):
+        return Col(node.id)
+    if isinstance(node, ast.BoolOp):
+        parts = [_convert(v, text) for v in node.values]
+        combine = And if isinstance(node.op, ast.And) else Or
+        result = parts[0]
+        for part in parts[1:]:
+            result = combine(result, part)
+        return result
+    if isinstance(node, ast.UnaryOp):
+        operand = _convert(node.operand, text)
+        if isinstance(node.op, ast.Not):
+            return Not(operand)
+        if isinstance(node.op, ast.USub):
+            return -operand
+        if isinstance(node.op, ast.UAdd):
+            return operand
+    if isinstance(node, ast.BinOp) and type(node.op) in _AST_ARITHMETIC:
+        return BinOp(_AST_ARITHMETIC[type(node.op)], _convert(node.left, text), _convert(node.right, text))
+    if isinstance(node, ast.Compare):
+        parts, left = [], node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                part = IsIn(_convert(left, text), _constant_list(right, text))
+                parts.append(Not(part) if isinstance(op, ast.NotIn) else part)
+            elif isinstance(op, (ast.Is, ast.IsNot)):
+                if not (isinstance(right, ast.Constant) and right.value is None):
+                    raise ValueError(f"'is' only supports None in {text!r}")
+                parts.append(IsNull(_convert(left, text), negate=isinstance(op, ast.IsNot)))
+            elif type(op) in _AST_COMPARE:
+                parts.append(Compare(_AST_COMPARE[type(op)], _convert(left, text), _convert(right, text)))
+            else:
+                break
+            left = right
+        else:
+            return all_of(*parts)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        args = tuple(_convert(a, text) for a in node.args)
+        if node.func.id in ("notna", "isna") and len(args) == 1:
+            return IsNull(args[0], negate=node.func.id == "notna")
+        return Func(node.func.id, args)
+    raise ValueError(f"Unsupported syntax {ast.dump(node)[:60]} in {text!r}")
+
+
+def condition(value: Union[str, Expr, bool, None]) -> Expr:
+    """Accept a parsed Expr, a condition string, or None/True (all rows)"""
+    if value is None:
+        return Lit(True)
+    return parse(value) if isinstance(value, str) else wrap(value)
+
+
+# ============================================================================
+# EVALUATION
+# ============================================================================
+
+class Evaluator:
+    """
+    Evaluates expressions over one frame, memoizing every sub-expression by
+    its SQL text so templates sharing terms (orb_size / atr_20, ...) compute
+    them once.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.n = len(frame)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._values: Dict[str, Tuple[Any, Any]] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            if name not in self.frame.columns:
+                raise KeyError(f"Column {name!r} not in frame")
+            self._columns[name] = self.frame[name].to_numpy()
+        return self._columns[name]
+
+    def value(self, expr: Expr):
+        key = expr.to_sql()
+        if key not in self._values:
+            self._values[key] = expr._eval(self)
+        return self._values[key]
+
+    def boolean(self, expr: Expr) -> Tuple[np.ndarray, np.ndarray]:
+        """(values, known) of a boolean expression as full-length bool arrays"""
+        if not expr.boolean:
+            raise ValueError(f"Condition is not boolean: {expr.to_sql()}")
+        values, known = self.value(expr)
+        known = np.broadcast_to(np.asarray(known, dtype=bool), (self.n,))
+        return np.broadcast_to(np.asarray(values, dtype=bool), (self.n,)) & known, known
+
+    def mask(self, expr: Expr) -> np.ndarray:
+        values, _ = self.boolean(expr)
+        return values.copy()
+
+    def masks(self, exprs: Sequence[Expr]) -> np.ndarray:
+        """(len(exprs), n) boolean matrix"""
+        out = np.zeros((len(exprs), self.n), dtype=bool)
+        for i, expr in enumerate(exprs):
+            out[i] = self.mask(expr)
+        return out
+
+
+def mask_query(exprs: Sequence[Expr], source: str, keys: Sequence[str] = ("date_local",)) -> str:
+    """One-scan DuckDB query returning key columns plus one boolean column m{i} per condition"""
+    selected = [f'"{k}"' for k in keys]
+    selected += [f"COALESCE({e.to_sql()}, FALSE) AS m{i}" for i, e in enumerate(exprs)]
+    return f"SELECT {', '.join(selected)} FROM {source}"
+
+
+# ============================================================================
+# BATCH TEMPLATE SCAN
+# ============================================================================
+
+DIRECTION_BREAK = {"LONG": "UP", "SHORT": "DOWN"}
+STAT_COLUMNS = ["trades", "wins", "losses", "win_rate", "avg_r", "total_r"]
+
+
+@dataclass(eq=False)
+class Template:
+    """Trade orb on days matching when, in the given directions"""
+
+    name: str
+    orb: str
+    when: Expr = field(default_factory=lambda: Lit(True))
+    directions: Tuple[str, ...] = ("LONG", "SHORT")
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.when = condition(self.when)
+        unknown = set(self.directions) - set(DIRECTION_BREAK)
+        if unknown:
+            raise ValueError(f"Unknown direction(s) {unknown} in template {self.name}")
+
+
+class TemplateScanner:
+    """
+    Scores templates against realized ORB outcomes of a daily feature frame.
+
+    A trade is taken on a day when the template's condition holds and the
+    ORB broke in one of its directions; its result is orb_<orb>_r_multiple
+    for WIN/LOSS outcomes and 0 otherwise (the research scripts' proxy
+    execution). Conditions are evaluated once per scanner; scan() can then
+    be repeated over row subsets (IS/OOS splits) for free.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.evaluator = Evaluator(frame)
+
+    def trade_masks(self, templates: Sequence[Template]) -> np.ndarray:
+        """(len(templates), n) boolean matrix of days each template trades"""
+        conditions = self.evaluator.masks([t.when for t in templates])
+        for i, t in enumerate(templates):
+            breaks = self.evaluator.column(f"orb_{t.orb}_break_dir")
+            taken = np.zeros(self.evaluator.n, dtype=bool)
+            for direction in t.directions:
+                taken |= breaks == DIRECTION_BREAK[direction]
+            conditions[i] &= taken
+        return conditions
+
+    def _outcomes(self, orb: str):
+        outcome = self.evaluator.column(f"orb_{orb}_outcome")
+        r = pd.to_numeric(pd.Series(self.evaluator.column(f"orb_{orb}_r_multiple")), errors="coerce").to_numpy()
+        win, loss = outcome == "WIN", outcome == "LOSS"
+        r = np.where(win | loss, r, 0.0)
+        counted = ~np.isnan(r)
+        return win, loss, np.nan_to_num(r), counted
+
+    def scan(self, templates: Sequence[Template], rows: Optional[np.ndarray] = None,
+             masks: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Per-template trades, wins, losses, win_rate, avg_r, total_r (rows = optional day filter)"""
+        masks = self.trade_masks(templates) if masks is None else masks
+        if rows is not None:
+            masks = masks & np.asarray(rows, dtype=bool)
+
+        stats = np.zeros((len(templates), 5))
+        by_orb: Dict[str, List[int]] = {}
+        for i, t in enumerate(templates):
+            by_orb.setdefault(t.orb, []).append(i)
+        for orb, idx in by_orb.items():
+            win, loss, r, counted = self._outcomes(orb)
+            m = masks[idx].astype(np.float64)
+            stats[idx] = m @ np.column_stack([np.ones(len(r)), win, loss, r, counted])
+
+        trades, wins, losses, total_r, counted = stats.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            win_rate = np.where(wins + losses > 0, wins / (wins + losses), 0.0)
+            avg_r = np.where(counted > 0, total_r / counted, np.nan)
+        return pd.DataFrame({
+            "template": [t.name for t in templates],
+            "params": [str(t.params) for t in templates],
+            "trades": trades.astype(np.int64),
+            "wins": wins.astype(np.int64),
+            "losses": losses.astype(np.int64),
+            "win_rate": win_rate,
+            "avg_r": avg_r,
+            "total_r": total_r,
+        })
+
+    def trades(self, templates: Sequence[Template], masks: Optional[np.ndarray] = None,
+               date_column: str = "date_local") -> pd.DataFrame:
+        """Long frame of individual trades (template, date, r) for per-period analysis"""
+        masks = self.trade_masks(templates) if masks is None else masks
+        dates = self.evaluator.column(date_column)
+        parts = []
+        for i, t in enumerate(templates):
+            _, _, r, counted = self._outcomes(t.orb)
+            days = np.flatnonzero(masks[i] & counted)
+            parts.append(pd.DataFrame({"template": t.name, date_column: dates[days], "r": r[days]}))
+        if not parts:
+            return pd.DataFrame(columns=["template", date_column, "r"])
+        return pd.concat(parts, ignore_index=True)
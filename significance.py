@@ -0,0 +1,147 @@
+"""
+Significance - batched resampling tests with false-discovery-rate control
+==========================================================================
+
+Brute-force generation can emit hundreds of thousands of candidates; with
+that many looks at the same history, positive point estimates are expected
+by chance alone. SignificanceTester asks, for every candidate at once,
+whether its mean R could plausibly be zero:
+
+- Bootstrap: Poisson(1) weights per trade (a Poisson bootstrap), mean
+  re-centred under the null; also gives a percentile CI for expectancy
+- Permutation: random sign flips of each trade's R (a randomization test of
+  a zero-mean, symmetric null)
+
+Both run as matrix products against resample matrices drawn once per run
+and shared by every candidate: candidate c uses the first n_c columns. The
+matrices are drawn in fixed blocks of trades, so a candidate's p-values do
+not depend on which other candidates are in the batch.
+
+benjamini_hochberg() then controls the false discovery rate over the whole
+family of candidates tested in a run.
+
+A resampled p-value cannot go below 1 / (n_resamples + 1), which is too
+coarse for FDR over thousands of candidates. When fewer than TAIL_MIN
+resamples are at least as extreme as the observed mean, the p-value comes
+from a normal tail fitted to the resampled null distribution instead.
+
+Trades are treated as exchangeable (no serial dependence), the same
+assumption the single shuffle attack made.
+
+    tester = SignificanceTester(n_resamples=2000, seed=0)
+    stats = tester.test({"idea_a": r_a, "idea_b": r_b, ...})
+    stats["q_value"], stats["significant"] = benjamini_hochberg(stats["p_value"], alpha=0.10)
+"""
+
+import math
+import warnings
+from typing import Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+FDR_ALPHA = 0.10
+BLOCK = 256  # trades per resample-matrix block
+TAIL_MIN = 10  # exceedances needed to trust the empirical p-value
+
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+def _p_value(exceed: np.ndarray, total: np.ndarray, observed: np.ndarray, null_sd: np.ndarray) -> np.ndarray:
+    """Empirical (1 + k) / (1 + B); normal upper tail of the null where k < TAIL_MIN"""
+    empirical = (1 + exceed) / (1 + total)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tail = 0.5 * _erfc(observed / null_sd / math.sqrt(2))
+    return np.where((exceed < TAIL_MIN) & (null_sd > 0), tail, empirical)
+
+
+def benjamini_hochberg(p_values: Sequence[float], alpha: float = FDR_ALPHA,
+                       family_size: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Benjamini-Hochberg q-values and rejections at FDR alpha.
+
+    family_size counts hypotheses looked at but not passed in (treated as
+    p = 1), e.g. every candidate of a generation run. NaN p-values count
+    toward the family and are never rejected.
+    """
+    p = np.asarray(p_values, dtype=float)
+    m = max(len(p), family_size or 0)
+    q = np.full(len(p), np.nan)
+    known = np.flatnonzero(~np.isnan(p))
+    if len(known):
+        order = known[np.argsort(p[known], kind="stable")]
+        ranked = p[order] * m / np.arange(1, len(order) + 1)
+        q[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return q, np.nan_to_num(q, nan=np.inf) <= alpha
+
+
+class SignificanceTester:
+    """Bootstrap and sign-flip p-values for many trade series in one pass"""
+
+    def __init__(self, n_resamples: int = 2000, seed: int = 0, confidence: float = 0.95,
+                 chunk: int = 512):
+        self.n_resamples = n_resamples
+        self.seed = seed
+        self.confidence = confidence
+        self.chunk = chunk
+        self._weights = np.zeros((n_resamples, 0))
+        self._signs = np.zeros((n_resamples, 0))
+
+    def resamples(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(bootstrap weights, sign flips), each (n_resamples, n); column j depends only on (seed, j)"""
+        while self._weights.shape[1] < n:
+            # Blocks of trades drawn from their own generator, so growing n never changes earlier columns
+            rng = np.random.default_rng([self.seed, self._weights.shape[1] // BLOCK])
+            weights = rng.poisson(1.0, (self.n_resamples, BLOCK)).astype(np.float64)
+            signs = (rng.integers(0, 2, (self.n_resamples, BLOCK)) * 2 - 1).astype(np.float64)
+            self._weights = np.hstack([self._weights, weights])
+            self._signs = np.hstack([self._signs, signs])
+        return self._weights[:, :n], self._signs[:, :n]
+
+    def test(self, trades: Mapping[str, Sequence[float]]) -> pd.DataFrame:
+        """Per-candidate trades, expectancy, bootstrap CI, p_bootstrap, p_permutation and p_value"""
+        names = list(trades)
+        series = [np.nan_to_num(np.asarray(trades[k], dtype=float)) for k in names]
+        counts = np.array([len(s) for s in series], dtype=np.int64)
+        longest = int(counts.max()) if len(counts) else 0
+        weights, signs = self.resamples(longest)
+
+        columns = {k: np.full(len(names), np.nan) for k in
+                   ("expectancy", "ci_low", "ci_high", "p_bootstrap", "p_permutation")}
+        tail = (1 - self.confidence) / 2 * 100
+
+        for lo in range(0, len(names), self.chunk):
+            hi = min(lo + self.chunk, len(names))
+            # (trades, candidates) padded with zeros; mask marks real trades
+            r = np.zeros((longest, hi - lo))
+            mask = np.zeros((longest, hi - lo))
+            for j, s in enumerate(series[lo:hi]):
+                r[:len(s), j] = s
+                mask[:len(s), j] = 1.0
+            n = counts[lo:hi]
+            observed = np.divide(r.sum(axis=0), n, out=np.full(hi - lo, np.nan), where=n > 0)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                boot = (weights @ r) / (weights @ mask)            # (resamples, candidates); NaN if no trade drawn
+                flipped = (signs @ r) / n
+            valid = ~np.isnan(boot)
+            extreme = valid & (boot - observed >= observed)     # null: bootstrap mean shifted to zero
+
+            columns["expectancy"][lo:hi] = observed
+            flip_sd = np.sqrt((r ** 2).sum(axis=0)) / np.maximum(n, 1)   # exact sd of the sign-flip mean
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)   # candidates with no trades: all-NaN columns
+                boot_sd = np.nanstd(boot, axis=0)
+                ci = np.nanpercentile(boot, [tail, 100 - tail], axis=0)
+            columns["p_bootstrap"][lo:hi] = _p_value(
+                extreme.sum(axis=0), valid.sum(axis=0), observed, boot_sd)
+            columns["p_permutation"][lo:hi] = _p_value(
+                (flipped >= observed).sum(axis=0), np.full(hi - lo, self.n_resamples), observed, flip_sd)
+            columns["ci_low"][lo:hi], columns["ci_high"][lo:hi] = ci
+
+        frame = pd.DataFrame({"idea_id": names, "trades": counts, **columns})
+        empty = frame["trades"] == 0
+        frame.loc[empty, ["p_bootstrap", "p_permutation", "ci_low", "ci_high"]] = np.nan
+        # Both resampling schemes must reject: report the larger p-value
+        frame["p_value"] = frame[["p_bootstrap", "p_permutation"]].max(axis=1, skipna=False)
+        return frame
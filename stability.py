@@ -0,0 +1,230 @@
+"""
+Stability - prefix-sum performance over sub-periods of trade series
+====================================================================
+
+Robustness checks (EDE regime splits, research stage 2) used to re-filter
+and re-aggregate the trade list once per year / split / regime. TradeBook
+sorts all strategies' trades once (strategy, date) and keeps cumulative sums
+of R, wins and losses, so any contiguous slice's trade count, expectancy,
+win rate and total R is two subtractions:
+
+    book = TradeBook.from_frame(trades, strategy="idea_id", date="date_local", r="r_multiple")
+    book.by_period("Y")          # every strategy x year in one pass
+    book.by_period("Q")
+    book.by_regime(labels)       # e.g. volatility_regimes(atr) per trade
+    book.rolling(50, step=10)    # every 50-trade window
+    book.expanding()             # stats after every trade
+    book.totals()
+
+Max drawdown (R, measured from the window's starting equity, the same
+definition as BacktestEngine) uses a segmented running maximum: O(n) for
+partitions (periods, regimes, expanding) and one vectorized sliding view
+(O(n * window)) for overlapping rolling windows.
+
+Wins are trades with R > 0 and losses R < 0 (breakevens count as trades
+only), matching BacktestEngine._calculate_metrics.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+STAT_COLUMNS = ["trades", "wins", "losses", "win_rate", "expectancy", "total_r", "max_dd"]
+PERIODS = {"Y": "year", "Q": "quarter", "M": "month"}
+VOLATILITY_LABELS = ("LOW", "MID", "HIGH")
+
+
+def volatility_regimes(values: Iterable[float], labels: Sequence[str] = VOLATILITY_LABELS) -> np.ndarray:
+    """Quantile bucket of each value (terciles by default); NaN -> None"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), None, dtype=object)
+    known = ~np.isnan(values)
+    if known.any():
+        edges = np.quantile(values[known], np.linspace(0, 1, len(labels) + 1)[1:-1])
+        out[known] = np.asarray(labels, dtype=object)[np.searchsorted(edges, values[known], side="right")]
+    return out
+
+
+def _segmented_cummax(values: np.ndarray, segment: np.ndarray) -> np.ndarray:
+    """Running max restarting at each segment (segment ids non-decreasing)"""
+    if not len(values):
+        return values
+    span = float(values.max() - values.min()) + 1.0
+    offset = (segment - segment[0]) * span
+    return np.maximum.accumulate(values + offset) - offset
+
+
+class TradeBook:
+    """Date-ordered trades of many strategies with prefix sums"""
+
+    def __init__(self, strategies: Sequence, dates: Sequence, r: Sequence, regimes: Optional[Sequence] = None):
+        strategies = np.asarray(strategies, dtype=object)
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[D]")
+        r = np.nan_to_num(np.asarray(r, dtype=float))
+
+        self.names, codes = np.unique(strategies, return_inverse=True)
+        order = np.lexsort((dates, codes))
+        self.sid = codes[order]
+        self.dates = dates[order]
+        self.r = r[order]
+        self.regimes = None if regimes is None else np.asarray(regimes, dtype=object)[order]
+        self.n = len(self.r)
+
+        # Strategy i occupies [bounds[i], bounds[i + 1])
+        self.bounds = np.searchsorted(self.sid, np.arange(len(self.names) + 1))
+        self.cum_r, self.cum_win, self.cum_loss = self._prefix(self.r)
+
+    @classmethod
+    def from_frame(cls, trades: pd.DataFrame, strategy: str = "strategy", date: str = "date",
+                   r: str = "r", regime: Optional[str] = None) -> "TradeBook":
+        return cls(trades[strategy], trades[date], trades[r], None if regime is None else trades[regime])
+
+    @staticmethod
+    def _prefix(r: np.ndarray):
+        zero = np.zeros(1)
+        return (np.concatenate([zero, np.cumsum(r)]),
+                np.concatenate([zero, np.cumsum(r > 0)]),
+                np.concatenate([zero, np.cumsum(r < 0)]))
+
+    # ------------------------------------------------------------------
+    # Core: stats for [starts, ends) ranges of one trade ordering
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _range_stats(prefix, starts: np.ndarray, ends: np.ndarray, max_dd: np.ndarray) -> Dict[str, np.ndarray]:
+        cum_r, cum_win, cum_loss = prefix
+        trades = ends - starts
+        total_r = cum_r[ends] - cum_r[starts]
+        wins = (cum_win[ends] - cum_win[starts]).astype(np.int64)
+        losses = (cum_loss[ends] - cum_loss[starts]).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "trades": trades,
+                "wins": wins,
+                "losses": losses,
+                "win_rate": np.where(trades > 0, wins / np.maximum(trades, 1), np.nan),
+                "expectancy": np.where(trades > 0, total_r / np.maximum(trades, 1), np.nan),
+                "total_r": total_r,
+                "max_dd": max_dd,
+            }
+
+    @staticmethod
+    def _partition_drawdown(r: np.ndarray, segment: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """Max drawdown of each contiguous segment (segments must cover r in order)"""
+        if not len(r):
+            return np.zeros(0)
+        equity = np.cumsum(r)
+        base = np.repeat(equity[starts] - r[starts], np.diff(np.append(starts, len(r))))
+        local = equity - base
+        peak = np.maximum(_segmented_cummax(local, segment), 0.0)  # starting equity counts as a peak
+        return np.maximum.reduceat(peak - local, starts)
+
+    def _partition(self, keys: np.ndarray, order: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Stats per run of equal (strategy, key) in the given trade order"""
+        r, sid = (self.r, self.sid) if order is None else (self.r[order], self.sid[order])
+        if not len(r):
+            return pd.DataFrame(columns=["strategy", "key"] + STAT_COLUMNS)
+        change = np.ones(len(r), dtype=bool)
+        change[1:] = (sid[1:] != sid[:-1]) | (keys[1:] != keys[:-1])
+        starts = np.flatnonzero(change)
+        ends = np.append(starts[1:], len(r))
+        segment = np.cumsum(change) - 1
+
+        prefix = self._prefix(r) if order is not None else (self.cum_r, self.cum_win, self.cum_loss)
+        stats = self._range_stats(prefix, starts, ends, self._partition_drawdown(r, segment, starts))
+        frame = pd.DataFrame({"strategy": self.names[sid[starts]], "key": keys[starts], **stats})
+        return frame
+
+    # ------------------------------------------------------------------
+    # Public views
+    # ------------------------------------------------------------------
+
+    def totals(self) -> pd.DataFrame:
+        """Whole-series stats per strategy"""
+        frame = self._partition(np.zeros(self.n, dtype=np.int8))
+        return frame.drop(columns="key").reset_index(drop=True)
+
+    def by_period(self, freq: str = "Y") -> pd.DataFrame:
+        """Stats per strategy and calendar year ('Y'), quarter ('Q') or month ('M')"""
+        if freq not in PERIODS:
+            raise ValueError(f"freq must be one of {', '.join(PERIODS)}")
+        months = self.dates.astype("datetime64[M]").astype(np.int64)
+        if freq == "Y":
+            keys = months // 12
+        elif freq == "Q":
+            keys = months // 3
+        else:
+            keys = months
+        frame = self._partition(keys)
+        year = 1970 + frame["key"].to_numpy() * {"Y": 12, "Q": 3, "M": 1}[freq] // 12
+        if freq == "Y":
+            labels = year.astype(str)
+        elif freq == "Q":
+            labels = [f"{y}Q{k % 4 + 1}" for y, k in zip(year, frame["key"])]
+        else:
+            labels = [f"{y}-{k % 12 + 1:02d}" for y, k in zip(year, frame["key"])]
+        return frame.drop(columns="key").assign(**{PERIODS[freq]: labels})[["strategy", PERIODS[freq]] + STAT_COLUMNS]
+
+    def by_regime(self, regimes: Optional[Sequence] = None) -> pd.DataFrame:
+        """Stats per strategy and regime label (trades without a label are skipped)"""
+        labels = self.regimes if regimes is None else np.asarray(regimes, dtype=object)
+        if labels is None:
+            raise ValueError("No regime labels (pass regimes= here or to TradeBook)")
+        known = np.flatnonzero(pd.notna(labels))
+        codes, names = pd.factorize(labels[known], sort=True)
+        order = known[np.lexsort((codes, self.sid[known]))]  # stable: date order kept within a regime
+        code_of = np.empty(self.n, dtype=np.int64)
+        code_of[known] = codes
+        frame = self._partition(code_of[order], order)
+        frame["regime"] = np.asarray(names, dtype=object)[frame.pop("key").to_numpy(dtype=np.int64)]
+        return frame[["strategy", "regime"] + STAT_COLUMNS]
+
+    def expanding(self) -> pd.DataFrame:
+        """Cumulative stats after each trade, per strategy"""
+        idx = np.arange(self.n)
+        starts = self.bounds[self.sid]
+        equity = self.cum_r[idx + 1] - self.cum_r[starts]
+        peak = np.maximum(_segmented_cummax(equity, self.sid), 0.0)
+        max_dd = _segmented_cummax(peak - equity, self.sid)
+        stats = self._range_stats((self.cum_r, self.cum_win, self.cum_loss), starts, idx + 1, max_dd)
+        return pd.DataFrame({"strategy": self.names[self.sid], "date": self.dates, **stats})
+
+    def rolling(self, window: int, step: int = 1) -> pd.DataFrame:
+        """Stats for every window of `window` consecutive trades (stepping by `step`) per strategy"""
+        if window < 1 or step < 1:
+            raise ValueError("window and step must be >= 1")
+        lengths = np.diff(self.bounds)
+        per_strategy = np.where(lengths >= window, (lengths - window) // step + 1, 0)
+        total = int(per_strategy.sum())
+        first = np.repeat(self.bounds[:-1], per_strategy)
+        within = np.arange(total) - np.repeat(np.cumsum(per_strategy) - per_strategy, per_strategy)
+        starts = first + within * step
+        ends = starts + window
+
+        max_dd = np.zeros(total)
+        if total:
+            equity = np.lib.stride_tricks.sliding_window_view(self.cum_r, window + 1)[starts]
+            max_dd = (np.maximum.accumulate(equity, axis=1) - equity).max(axis=1)
+        stats = self._range_stats((self.cum_r, self.cum_win, self.cum_loss), starts, ends, max_dd)
+        return pd.DataFrame({
+            "strategy": self.names[self.sid[starts]] if total else np.array([], dtype=object),
+            "start": self.dates[starts],
+            "end": self.dates[ends - 1] if total else self.dates[:0],
+            **stats,
+        })
+
+    def report(self, regimes: Optional[Sequence] = None, window: Optional[int] = None,
+               step: int = 1) -> Dict[str, pd.DataFrame]:
+        """All stability views at once"""
+        out = {
+            "totals": self.totals(),
+            "year": self.by_period("Y"),
+            "quarter": self.by_period("Q"),
+            "expanding": self.expanding(),
+        }
+        if regimes is not None or self.regimes is not None:
+            out["regime"] = self.by_regime(regimes)
+        if window:
+            out["rolling"] = self.rolling(window, step)
+        return out
@@ -0,0 +1,271 @@
+"""
+Synthetic Bars - deterministic bars_1m generator for scale and load testing
+============================================================================
+
+Writes seeded 1-minute bars shaped like the Databento/ProjectX ingest into
+bars_1m, so ingest, feature building, EDE and the live loop can be exercised
+at any data size without network access. The same arguments always produce
+the same rows.
+
+What the bars reproduce:
+- CME Globex hours (Sunday 18:00 -> Friday 17:00 ET, daily 17:00-18:00 ET
+  break, closed on Jan 1 / Jul 4 / Dec 25), so weekend and holiday gaps exist
+- Intraday volatility/volume profile with Asia, London and NY opens
+- Volatility regimes (calm / normal / volatile) switching between trading days
+- Contract rolls: source_symbol follows the instrument's contract months and
+  price jumps by the carry at each roll, as in the raw front-month series
+- Fat-tailed returns, session-open gaps, occasional missing minutes and
+  multi-hour feed outages
+
+Trading day = the session that opens 18:00 ET (09:00 Brisbane), same as the
+backfills and contract_roll_calendar.
+
+Bars are generated one calendar month per instrument at a time, so memory
+stays flat at 100x today's history.
+"""
+
+import datetime as dt
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+MONTH_CODES = "FGHJKMNQUVXZ"
+HOLIDAYS = ((1, 1), (7, 4), (12, 25))
+BAR_COLUMNS = ["ts_utc", "symbol", "source_symbol", "open", "high", "low", "close", "volume"]
+MINUTES_PER_SESSION = 23 * 60
+
+# (name, volatility multiplier); rows of REGIME_TRANSITIONS are per-trading-day switch probabilities
+REGIMES = (("calm", 0.6), ("normal", 1.0), ("volatile", 1.9))
+REGIME_TRANSITIONS = np.array([
+    [0.95, 0.05, 0.00],
+    [0.03, 0.94, 0.03],
+    [0.00, 0.08, 0.92],
+])
+
+
+@dataclass(frozen=True)
+class InstrumentProfile:
+    symbol: str
+    price: float               # starting price
+    tick_size: float
+    contract_months: str       # month codes traded as front month, e.g. "GJMQVZ"
+    daily_vol: float           # daily log-return stdev in the normal regime
+    base_volume: int           # mean contracts per minute
+    roll_day: int = 25         # day of the month before delivery when the front rolls
+    carry: float = 0.002       # price step into the next contract at a roll
+
+
+PROFILES: Dict[str, InstrumentProfile] = {
+    "MGC": InstrumentProfile("MGC", 2050.0, 0.1, "GJMQVZ", 0.010, 150),
+    "NQ": InstrumentProfile("NQ", 16500.0, 0.25, "HMUZ", 0.013, 600, roll_day=10, carry=0.004),
+    "MPL": InstrumentProfile("MPL", 950.0, 0.1, "FJNV", 0.015, 40, carry=0.001),
+}
+
+
+def _bump(minutes: np.ndarray, center: float, width: float) -> np.ndarray:
+    """Circular gaussian bump over minute-of-day"""
+    d = np.abs(minutes - center)
+    d = np.minimum(d, 1440 - d)
+    return np.exp(-0.5 * (d / width) ** 2)
+
+
+def _intraday_profile() -> np.ndarray:
+    """Relative activity by UTC minute of day (mean 1): Asia 23:00, London 08:00, NY 13:30"""
+    m = np.arange(1440, dtype=float)
+    profile = 0.45 + 0.5 * _bump(m, 23 * 60, 60) + 0.8 * _bump(m, 8 * 60, 75) + 1.5 * _bump(m, 13 * 60 + 30, 60)
+    return profile / profile.mean()
+
+
+INTRADAY = _intraday_profile()
+
+
+def _to_tick(prices: np.ndarray, tick: float) -> np.ndarray:
+    return np.round(np.round(prices / tick) * tick, 8)
+
+
+def trading_day(ts_utc: pd.DatetimeIndex) -> np.ndarray:
+    """Trading day (session opening 18:00 ET) for UTC timestamps, as datetime64[D]"""
+    ny = ts_utc.tz_convert("America/New_York").tz_localize(None)
+    return (ny + pd.Timedelta(hours=6)).values.astype("datetime64[D]")
+
+
+def session_minutes(start: dt.date, end: dt.date) -> pd.DatetimeIndex:
+    """UTC minute timestamps Globex is open for trading days start..end (inclusive)"""
+    first = pd.Timestamp(start - dt.timedelta(days=1), tz="America/New_York") + pd.Timedelta(hours=18)
+    last = pd.Timestamp(end, tz="America/New_York") + pd.Timedelta(hours=17)
+    ts = pd.date_range(first.tz_convert("UTC"), last.tz_convert("UTC"), freq="1min", inclusive="left")
+
+    ny = ts.tz_convert("America/New_York")
+    day = pd.DatetimeIndex(trading_day(ts))
+    open_ = (ny.hour != 17) & (day.weekday < 5)
+    for month, dom in HOLIDAYS:
+        open_ &= ~((day.month == month) & (day.day == dom))
+    return ts[open_]
+
+
+def contract_month(profile: InstrumentProfile, day: dt.date) -> tuple:
+    """(year, month) of the front contract on a trading day"""
+    months = [MONTH_CODES.index(c) + 1 for c in profile.contract_months]
+    for year in (day.year, day.year + 1):
+        for month in months:
+            roll_year, roll_month = (year, month - 1) if month > 1 else (year - 1, 12)
+            if day < dt.date(roll_year, roll_month, profile.roll_day):
+                return year, month
+    raise ValueError(f"No contract month for {profile.symbol} on {day}")
+
+
+def contract_symbol(profile: InstrumentProfile, year: int, month: int) -> str:
+    """Databento-style outright, e.g. MGCG5"""
+    return f"{profile.symbol}{MONTH_CODES[month - 1]}{year % 10}"
+
+
+class SyntheticBarGenerator:
+    """
+    Seeded bar stream for one instrument.
+
+    Price, regime and front contract carry across months; each month draws
+    from its own generator keyed by (seed, symbol, year, month).
+    """
+
+    def __init__(self, profile: InstrumentProfile, seed: int = 0, missing_rate: float = 0.0005,
+                 outages_per_month: float = 0.3):
+        self.profile = profile
+        self.seed = seed
+        self.missing_rate = missing_rate
+        self.outages_per_month = outages_per_month
+        self.log_price = np.log(profile.price)
+        self.regime = 1
+        self.contract = None
+        self.last_ts = None
+
+    def _rng(self, year: int, month: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32(self.profile.symbol.encode()), year, month])
+
+    def frames(self, start: dt.date, end: dt.date) -> Iterator[pd.DataFrame]:
+        """bars_1m-shaped DataFrames, one per calendar month of trading days"""
+        month_start = start
+        while month_start <= end:
+            next_month = (month_start.replace(day=1) + dt.timedelta(days=32)).replace(day=1)
+            month_end = min(end, next_month - dt.timedelta(days=1))
+            frame = self._month(month_start, month_end)
+            if len(frame):
+                yield frame
+            month_start = next_month
+
+    def _month(self, start: dt.date, end: dt.date) -> pd.DataFrame:
+        p = self.profile
+        rng = self._rng(start.year, start.month)
+        ts = session_minutes(start, end)
+        if not len(ts):
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        n = len(ts)
+
+        # Regime per trading day (Markov chain carried over from the previous month)
+        days, day_idx = np.unique(trading_day(ts), return_inverse=True)
+        regimes = np.empty(len(days), dtype=np.int64)
+        for i in range(len(days)):
+            self.regime = rng.choice(len(REGIMES), p=REGIME_TRANSITIONS[self.regime])
+            regimes[i] = self.regime
+        regime_vol = np.array([v for _, v in REGIMES])[regimes][day_idx]
+
+        # Front contract per trading day; a roll steps the price by the carry
+        contracts = [contract_symbol(p, *contract_month(p, pd.Timestamp(d).date())) for d in days]
+        day_contract = np.array(contracts, dtype=object)
+        source = day_contract[day_idx]
+
+        minute_of_day = (ts.hour * 60 + ts.minute).to_numpy()
+        activity = INTRADAY[minute_of_day]
+        sigma = p.daily_vol / np.sqrt(MINUTES_PER_SESSION) * np.sqrt(activity) * regime_vol
+
+        epoch_min = ts.as_unit("ns").asi8 // 60_000_000_000
+        prev = np.empty(n, dtype=np.int64)
+        prev[1:] = epoch_min[:-1]
+        prev[0] = epoch_min[0] - 1 if self.last_ts is None else self.last_ts
+        gap = np.maximum(epoch_min - prev, 1)
+
+        # Fat-tailed intrabar move (t with 4 dof, unit variance) and a gap move at session opens
+        move = sigma * rng.standard_t(4, n) / np.sqrt(2.0)
+        jump = np.where(gap > 1, sigma * np.sqrt(np.minimum(gap, 3 * 1440)) * 0.3 * rng.standard_normal(n), 0.0)
+        rolled = np.zeros(n, dtype=bool)
+        rolled[1:] = source[1:] != source[:-1]
+        rolled[0] = self.contract is not None and source[0] != self.contract
+        jump += np.log1p(p.carry) * rolled
+
+        log_close = self.log_price + np.cumsum(jump + move)
+        log_open = log_close - move
+        wick = sigma * np.abs(rng.standard_normal((2, n))) * 0.6
+
+        open_ = _to_tick(np.exp(log_open), p.tick_size)
+        close = _to_tick(np.exp(log_close), p.tick_size)
+        high = np.maximum(_to_tick(np.exp(np.maximum(log_open, log_close) + wick[0]), p.tick_size),
+                          np.maximum(open_, close))
+        low = np.minimum(_to_tick(np.exp(np.minimum(log_open, log_close) - wick[1]), p.tick_size),
+                         np.minimum(open_, close))
+        volume = np.maximum(1, np.round(
+            p.base_volume * activity * np.sqrt(regime_vol) * rng.lognormal(-0.125, 0.5, n)
+        )).astype(np.int64)
+
+        self.log_price = log_close[-1]
+        self.contract = source[-1]
+        self.last_ts = epoch_min[-1]
+
+        # Feed gaps: scattered missing minutes plus multi-hour outages (price path is unaffected)
+        keep = rng.random(n) >= self.missing_rate
+        for _ in range(rng.poisson(self.outages_per_month)):
+            at = rng.integers(n)
+            keep[at:at + rng.integers(30, 240)] = False
+
+        frame = pd.DataFrame({
+            "ts_utc": ts,
+            "symbol": p.symbol,
+            "source_symbol": source,
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        })
+        return frame[keep].reset_index(drop=True)
+
+
+def generate_bars(
+    con,
+    symbols: List[str],
+    start: dt.date,
+    end: dt.date,
+    seed: int = 0,
+    replace: bool = False,
+    profiles: Optional[Dict[str, InstrumentProfile]] = None,
+    progress: bool = False,
+) -> Dict[str, int]:
+    """
+    Insert synthetic bars_1m rows for symbols over trading days start..end.
+
+    bars_1m must exist (schema.sql). replace=True deletes each symbol's rows
+    in the range first. Returns rows written per symbol.
+    """
+    profiles = profiles or PROFILES
+    lo = pd.Timestamp(start - dt.timedelta(days=1), tz="America/New_York") + pd.Timedelta(hours=18)
+    hi = pd.Timestamp(end, tz="America/New_York") + pd.Timedelta(hours=17)
+    written = {}
+    for symbol in symbols:
+        if symbol not in profiles:
+            raise ValueError(f"Unknown instrument {symbol}; known: {', '.join(sorted(profiles))}")
+        if replace:
+            con.execute("DELETE FROM bars_1m WHERE symbol = ? AND ts_utc >= ? AND ts_utc < ?",
+                        [symbol, lo.to_pydatetime(), hi.to_pydatetime()])
+        generator = SyntheticBarGenerator(profiles[symbol], seed=seed)
+        written[symbol] = 0
+        for frame in generator.frames(start, end):
+            con.register("synthetic_bars", frame)
+            try:
+                con.execute(f"INSERT INTO bars_1m ({', '.join(BAR_COLUMNS)}) SELECT * FROM synthetic_bars")
+            finally:
+                con.unregister("synthetic_bars")
+            written[symbol] += len(frame)
+            if progress:
+                print(f"  {symbol} {frame['ts_utc'].iloc[-1]:%Y-%m}: {written[symbol]:,} bars")
+    return written
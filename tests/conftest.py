@@ -4,12 +4,17 @@ Pytest configuration and shared fixtures for testing framework.
 This file provides reusable test fixtures for all test modules.
 """
 
+import os
 import pytest
 import sys
+import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta
 import pytz
 
+# Query metrics recorded during the suite go to a scratch file, not <repo>/db_metrics.db
+os.environ.setdefault("DB_METRICS_PATH", str(Path(tempfile.gettempdir()) / "db_metrics_pytest.db"))
+
 # Add project root and trading_app to Python path
 PROJECT_ROOT = Path(__file__).parent.parent
 TRADING_APP_PATH = PROJECT_ROOT / "trading_app"
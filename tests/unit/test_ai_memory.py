@@ -0,0 +1,142 @@
+"""
+test_ai_memory.py
+
+Unit tests for the BM25 chat memory index in trading_app/ai_memory.py.
+
+Tests:
+- Scores match a brute-force BM25 over the whole history
+- Rare-term candidate pruning returns the same top results as a full scan
+- save_message is searchable immediately; managers on one file share the index
+- Instrument filter and clear_session
+- Messages saved after clear_session get fresh ids and are indexed
+"""
+
+import math
+import random
+import pytest
+import numpy as np
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "trading_app"))
+from ai_memory import AIMemoryManager, ChatSearchIndex, tokenize
+
+WORDS = ["orb", "stop", "target", "asia", "london", "breakout", "atr", "filter", "entry", "risk"]
+
+
+def _reference(corpus, query, k1=ChatSearchIndex.K1, b=ChatSearchIndex.B):
+    """Brute-force BM25 over {id: text}"""
+    docs = {i: tokenize(text) for i, text in corpus.items()}
+    n = len(docs)
+    avg = sum(len(d) for d in docs.values()) / n
+    scores = {}
+    for term in dict.fromkeys(tokenize(query)):
+        df = sum(term in d for d in docs.values())
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for i, d in docs.items():
+            tf = d.count(term)
+            if tf:
+                scores[i] = scores.get(i, 0.0) + idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(d) / avg))
+    return scores
+
+
+def _corpus(n, seed=3):
+    rng = random.Random(seed)
+    return {i + 1: " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20))) for i in range(n)}
+
+
+def _index(corpus):
+    ids = np.array(sorted(corpus), dtype=np.int64)
+    postings = sorted(
+        (term, i, tokenize(text).count(term))
+        for i, text in corpus.items() for term in set(tokenize(text))
+    )
+    vocab = {}
+    for term, _, _ in postings:
+        vocab[term] = vocab.get(term, 0) + 1
+    index = ChatSearchIndex()
+    index.add(ids, ["MGC"] * len(ids), list(vocab.items()),
+              np.array([p[1] for p in postings], dtype=np.int64), np.array([p[2] for p in postings], dtype=np.int64))
+    return index
+
+
+@pytest.fixture
+def memory(tmp_path):
+    manager = AIMemoryManager(str(tmp_path / "trading_app.db"))
+    yield manager
+    manager.close()
+
+
+def test_scores_match_brute_force_bm25():
+    corpus = _corpus(300)
+    index = _index(corpus)
+
+    for query in ["orb stop", "asia breakout filter", "risk"]:
+        expected = _reference(corpus, query)
+        hits = index.search(query, limit=20)
+        top = sorted(expected.items(), key=lambda kv: (-kv[1], -kv[0]))[:20]
+        assert [i for i, _ in hits] == [i for i, _ in top]
+        for (_, got), (_, want) in zip(hits, top):
+            assert got == pytest.approx(want, rel=1e-5)
+
+
+def test_rare_term_pruning_matches_full_scan():
+    corpus = _corpus(3000, seed=9)
+    for i in range(1, 3001, 97):
+        corpus[i] += " fomc"
+    index = _index(corpus)
+
+    expected = _reference(corpus, "fomc orb stop")
+    top = sorted(expected.items(), key=lambda kv: (-kv[1], -kv[0]))[:5]
+    hits = index.search("fomc orb stop", limit=5)
+
+    assert [i for i, _ in hits] == [i for i, _ in top]
+
+
+def test_save_is_searchable_and_index_is_shared(memory, tmp_path):
+    memory.save_message("s1", "user", "What stop do I use on the 0900 ORB?", tags=["trade"])
+    memory.save_message("s1", "assistant", "Use the ORB midpoint as the stop.")
+    memory.save_message("s2", "user", "London session breakout looked strong")
+
+    hits = memory.search_history("0900 orb stop")
+    assert [h["content"] for h in hits][:2] == ["What stop do I use on the 0900 ORB?",
+                                               "Use the ORB midpoint as the stop."]
+    assert hits[0]["score"] > hits[1]["score"]
+    assert [m["role"] for m in memory.load_session_history("s1")] == ["user", "assistant"]
+
+    other = AIMemoryManager(str(tmp_path / "trading_app.db"))
+    assert other.index is memory.index
+    other.save_message("s3", "user", "FOMC day, skip the 2300 ORB")
+    assert memory.search_history("fomc")[0]["session_id"] == "s3"
+
+
+def test_instrument_filter_and_clear_session(memory):
+    memory.save_message("s1", "user", "asia range filter", instrument="MGC")
+    memory.save_message("s2", "user", "asia range filter", instrument="NQ")
+
+    assert [h["session_id"] for h in memory.search_history("asia", instrument="NQ")] == ["s2"]
+    assert memory.search_history("asia", instrument="MPL") == []
+
+    memory.clear_session("s2")
+    assert [h["session_id"] for h in memory.search_history("asia range")] == ["s1"]
+    assert memory.search_history("the") == []
+
+
+def test_save_after_clear_session_is_indexed(memory, tmp_path):
+    memory.save_message("s1", "user", "asia range filter")
+    memory.save_message("s2", "user", "london breakout")
+    memory.clear_session("s2")
+
+    memory.save_message("s3", "user", "zebra unique term")
+    assert [h["session_id"] for h in memory.search_history("zebra")] == ["s3"]
+    assert memory.search_history("london") == []
+
+    # A manager opened on the file later keeps counting past deleted ids
+    memory.clear_session("s3")
+    other = AIMemoryManager(str(tmp_path / "trading_app.db"))
+    other.save_message("s4", "user", "okapi rare word")
+    assert [h["session_id"] for h in memory.search_history("okapi")] == ["s4"]
+    ids = [row[0] for row in memory.con.execute("SELECT id FROM ai_chat_history ORDER BY id").fetchall()]
+    assert ids == [1, 4]
@@ -0,0 +1,100 @@
+"""
+test_alert_system.py
+
+Unit tests for bar-based price alerts in alert_system.py.
+
+Tests:
+- PriceLevelIndex hits match a linear scan of every alert for random bars
+- check_bars catches levels touched intrabar, skips the forming bar and never re-reads bars
+- Cooldown keeps a hit armed; disable/reset/remove keep the index in sync
+"""
+
+import random
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "trading_app"))
+from alert_system import AlertSystem, AlertType, PriceAlert, PriceLevelIndex
+
+
+def _linear(alert, reference, high, low, close):
+    p = alert.price
+    return {
+        "above": high > p,
+        "below": low < p,
+        "cross_above": reference <= p < high or low <= p < close,
+        "cross_below": low < p <= reference or close < p <= high,
+    }[alert.condition]
+
+
+def test_index_matches_linear_scan():
+    rng = random.Random(2)
+    index, alerts = PriceLevelIndex(), []
+    for i in range(400):
+        alert = PriceAlert(f"a{i:03d}", f"level {i}", round(rng.uniform(2000, 2100), 1),
+                           rng.choice(PriceLevelIndex.CONDITIONS), instrument=rng.choice(["MGC", "NQ"]))
+        alerts.append(alert)
+        index.add(alert)
+    index.add(alerts[0])
+    assert len(index) == 400
+
+    for _ in range(300):
+        o, c = (round(rng.uniform(2000, 2100), 1) for _ in range(2))
+        high, low = max(o, c) + round(rng.uniform(0, 5), 1), min(o, c) - round(rng.uniform(0, 5), 1)
+        reference = rng.choice([o, round(rng.uniform(2000, 2100), 1)])
+        got = index.hits("MGC", reference, high, low, c)
+        want = [a for a in alerts if a.instrument == "MGC" and _linear(a, reference, high, low, c)]
+        assert sorted(a.alert_id for a in got) == sorted(a.alert_id for a in want)
+        assert len(got) == len(set(a.alert_id for a in got))
+
+
+def test_check_bars_catches_intrabar_touches():
+    system = AlertSystem()
+    above = system.add_price_alert("Wick high", 2055.0, "above")
+    cross = system.add_price_alert("Reclaim", 2050.0, "cross_above")
+    below = system.add_price_alert("Far below", 2000.0, "below")
+
+    bars = pd.DataFrame({
+        "ts_utc": pd.date_range("2025-01-06 14:00", periods=4, freq="1min", tz="UTC"),
+        "open": [2049.0, 2048.0, 2049.5, 2051.0],
+        "high": [2049.5, 2056.0, 2051.0, 2060.0],
+        "low": [2047.0, 2046.0, 2047.0, 1990.0],
+        "close": [2048.0, 2049.5, 2051.0, 2058.0],
+    })
+
+    # Closes never exceed 2055: the old close-only check misses the wick
+    assert AlertSystem().check_price_alerts("MGC", 2049.5) == []
+
+    fired = system.check_bars("MGC", bars)
+    assert [a["alert_id"] for a in fired] == [above.alert_id, cross.alert_id]
+    assert above.triggered and cross.triggered and not below.triggered  # last bar still forming
+    assert system.last_bar_ts["MGC"] == bars["ts_utc"].iloc[2]
+
+    assert system.check_bars("MGC", bars) == []
+    fired = system.check_bars("MGC", bars, include_last=True)
+    assert [a["alert_id"] for a in fired] == [below.alert_id]
+    assert len(system.level_index) == 0
+
+
+def test_cooldown_and_alert_management():
+    system = AlertSystem()
+    level = system.add_price_alert("Level", 2050.0, "above")
+    system.last_alert_time[f"{AlertType.PRICE_LEVEL}_{level.alert_id}"] = pd.Timestamp.now().to_pydatetime()
+
+    assert system.check_bar("MGC", 2049.0, 2052.0, 2048.0, 2051.0) == []
+    assert not level.triggered and len(system.level_index) == 1
+
+    system.last_alert_time.clear()
+    assert len(system.check_bar("MGC", 2051.0, 2053.0, 2050.5, 2052.0)) == 1
+    assert level.triggered and len(system.level_index) == 0
+
+    system.reset_price_alert(level.alert_id)
+    system.set_price_alert_enabled(level.alert_id, False)
+    system.last_alert_time.clear()
+    assert system.check_bar("MGC", 2051.0, 2053.0, 2050.5, 2052.0) == []
+    system.set_price_alert_enabled(level.alert_id, True)
+    assert len(system.check_price_alerts("MGC", 2054.0)) == 1
+
+    system.remove_price_alert(level.alert_id)
+    assert system.price_alerts == [] and len(system.level_index) == 0
@@ -0,0 +1,172 @@
+"""
+test_audit_engine.py
+
+Unit tests for audits/audit_engine.py - shared-scan data quality checks.
+
+Tests:
+- Clean synthetic database produces no CRITICAL/WARNING findings
+- Injected anomalies (inverted bar, 5m mismatch, missing weekday) are caught
+- Per-scan and per-check timings are recorded
+- Step auditors and DataValidator checks reuse one engine run (each scan runs once)
+- A failing scan is reported only under the checks that depend on it
+"""
+
+import pytest
+import duckdb
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from audits.audit_engine import AuditEngine
+from audits.step1_data_integrity import DataIntegrityAuditor
+from audits.step1a_gaps_transitions import GapTransitionAuditor
+from audits.step2_feature_verification import FeatureVerificationAuditor
+from audits.step2a_time_assertions import TimeSafetyAuditor
+from validate_data import DataValidator
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+
+
+def _build_db(path: Path, days):
+    con = duckdb.connect(str(path))
+    con.execute(SCHEMA.read_text())
+
+    rows = []
+    for d in days:
+        # Asia session 09:00-11:00 Brisbane = 23:00-01:00 UTC previous day
+        start = datetime(d.year, d.month, d.day, 9, 0, tzinfo=timezone(timedelta(hours=10)))
+        for i in range(120):
+            ts = start + timedelta(minutes=i)
+            px = 2650.0 + (i % 7) * 0.1
+            rows.append((ts, "MGC", "MGCG5", px, px + 0.5, px - 0.5, px + 0.1, 10))
+    con.executemany("INSERT INTO bars_1m VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    con.execute("""
+        INSERT INTO bars_5m
+        SELECT
+          to_timestamp(floor(epoch(ts_utc) / 300) * 300), symbol,
+          arg_max(source_symbol, ts_utc), arg_min(open, ts_utc),
+          max(high), min(low), arg_max(close, ts_utc), sum(volume)
+        FROM bars_1m GROUP BY 1, 2
+    """)
+
+    for d in days:
+        con.execute(
+            """
+            INSERT INTO daily_features_v2 (date_local, instrument, asia_high, asia_low,
+                orb_0900_high, orb_0900_low, orb_0900_size, orb_0900_break_dir, orb_0900_outcome)
+            VALUES (?, 'MGC', 2651.0, 2649.5, 2651.0, 2649.5, 1.5, 'UP', 'WIN')
+            """,
+            [d],
+        )
+    con.close()
+
+
+@pytest.fixture
+def clean_db(tmp_path):
+    days = [datetime(2025, 1, 13).date() + timedelta(days=i) for i in range(5)]
+    path = tmp_path / "gold.db"
+    _build_db(path, days)
+    return path
+
+
+def _by_severity(findings, severity):
+    return [f for f in findings if f.severity == severity]
+
+
+def test_clean_database_has_no_problems(clean_db):
+    engine = AuditEngine(str(clean_db))
+    findings = engine.run()
+    engine.close()
+
+    assert _by_severity(findings, "CRITICAL") == []
+    assert _by_severity(findings, "WARNING") == []
+    assert {f.check for f in findings} >= {"date_gaps", "duplicates", "price_anomalies", "5m_aggregation"}
+
+
+def test_injected_anomalies_are_reported(clean_db):
+    con = duckdb.connect(str(clean_db))
+    con.execute("UPDATE bars_1m SET low = high + 1 WHERE ts_utc = (SELECT MIN(ts_utc) FROM bars_1m)")
+    con.execute("UPDATE bars_5m SET volume = volume + 1 WHERE ts_utc = (SELECT MAX(ts_utc) FROM bars_5m)")
+    con.execute("DELETE FROM daily_features_v2 WHERE date_local = DATE '2025-01-15'")
+    con.close()
+
+    engine = AuditEngine(str(clean_db))
+    findings = engine.run()
+    engine.close()
+
+    messages = {f.check: f.description for f in findings if f.severity != "INFO"}
+    assert "low > high" in messages["price_anomalies"]
+    assert "disagree" in messages["5m_aggregation"]
+    assert "1 days" in messages["date_gaps"]
+
+    summary = engine.summary()
+    assert summary["verdict"] == "FAIL"
+
+
+def test_timings_recorded_per_scan_and_check(clean_db):
+    engine = AuditEngine(str(clean_db))
+    engine.run(["gaps", "5m"])
+    engine.close()
+
+    assert set(engine.frames) == {"features_daily", "bars_5m_parity"}
+    assert {"scan:features_daily", "scan:bars_5m_parity", "check:gaps", "check:5m", "total"} <= set(engine.timings)
+
+
+def test_steps_and_validator_share_one_scan_per_table(clean_db, monkeypatch):
+    scans = []
+    run_scan = AuditEngine._run_scan
+    monkeypatch.setattr(AuditEngine, "_run_scan",
+                        lambda self, name, sql: scans.append(name) or run_scan(self, name, sql))
+
+    engine = AuditEngine(str(clean_db))
+    engine.run_scans(AuditEngine.SCANS)
+    engine.run()
+    step1 = DataIntegrityAuditor(engine=engine)
+    for auditor in (step1, GapTransitionAuditor(engine=engine), TimeSafetyAuditor(engine=engine)):
+        auditor.run_all_tests()
+    features = FeatureVerificationAuditor(engine=engine, dates=[])
+    assert features.test_orb_size_calculation() and features.test_session_range_calculation()
+    features.test_feature_distributions()
+    engine.close()
+
+    assert sorted(scans) == sorted(AuditEngine.SCANS)
+    results = {r["test"]: r for r in step1.results}
+    assert results["Duplicate Timestamps"]["passed"] and results["ORB Construction (1000)"]["passed"]
+    assert results["ORB 09:00 Window"]["message"] == "Found 5 valid 09:00 ORBs in daily_features_v2"
+
+    scans.clear()
+    validator = DataValidator(str(clean_db), features_table="daily_features_v2")
+    validator.check_date_gaps()
+    validator.check_orb_integrity()
+    validator.check_duplicates()
+    validator.close()
+    assert scans == ["features_daily", "bars_daily"]
+    assert [i.check for i in validator.issues] == ["date_gaps", "orb_integrity", "duplicates"]
+
+
+def test_failed_check_reports_label(clean_db, monkeypatch):
+    monkeypatch.setattr(AuditEngine, "check_volume", lambda self: 1 / 0)
+    engine = AuditEngine(str(clean_db))
+    findings = engine.run(["volume"])
+    engine.close()
+
+    assert [(f.severity, f.check) for f in findings] == [("CRITICAL", "volume_anomalies")]
+
+
+def test_failed_scan_only_fails_dependent_checks(clean_db):
+    con = duckdb.connect(str(clean_db))
+    con.execute("DROP TABLE bars_5m")
+    con.close()
+
+    engine = AuditEngine(str(clean_db))
+    findings = engine.run()
+    engine.close()
+
+    critical = _by_severity(findings, "CRITICAL")
+    assert [f.check for f in critical] == ["5m_aggregation"]
+    assert "bars_5m_parity" in critical[0].description
+    assert {"date_gaps", "duplicates", "price_anomalies"} <= {f.check for f in findings}
+    with pytest.raises(duckdb.CatalogException):
+        engine.frame("bars_5m_parity")
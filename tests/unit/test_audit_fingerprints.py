@@ -0,0 +1,95 @@
+"""
+test_audit_fingerprints.py
+
+Unit tests for incremental audits (audits/audit_fingerprints.py).
+
+Tests:
+- First run treats every day as changed
+- After saving, only days whose bars or features change are reported
+- ORB recompute restricted to changed days catches a corrupted stored ORB
+"""
+
+import pytest
+import duckdb
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from audits.audit_fingerprints import AuditFingerprintStore, changed_dates
+from audits.step2_feature_verification import FeatureVerificationAuditor
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+DAYS = [date(2025, 1, 13) + timedelta(days=i) for i in range(3)]
+
+
+@pytest.fixture
+def gold(tmp_path):
+    path = tmp_path / "gold.db"
+    con = duckdb.connect(str(path))
+    con.execute(SCHEMA.read_text())
+
+    for d in DAYS:
+        start = datetime(d.year, d.month, d.day, 9, 0, tzinfo=timezone(timedelta(hours=10)))
+        rows = [
+            (start + timedelta(minutes=i), "MGC", "MGCG5", 2650.0 + i, 2651.0 + i, 2649.0 + i, 2650.5 + i, 5)
+            for i in range(10)
+        ]
+        con.executemany("INSERT INTO bars_1m VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        # ORB 0900 = first 5 bars: high 2655.0, low 2649.0
+        con.execute(
+            """
+            INSERT INTO daily_features_v2 (date_local, instrument, orb_0900_high, orb_0900_low, orb_0900_size)
+            VALUES (?, 'MGC', 2655.0, 2649.0, 6.0)
+            """,
+            [d],
+        )
+    yield con
+    con.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AuditFingerprintStore(state_path=str(tmp_path / "state" / "audit_state.db"))
+
+
+def test_first_run_reports_every_day(gold, store):
+    current = store.compute(gold)
+    changed = store.changed_days(current, scope="master")
+
+    assert len(changed) == len(DAYS)
+
+
+def test_only_modified_days_reported_after_save(gold, store):
+    store.save(store.compute(gold), scope="master")
+    assert store.changed_days(store.compute(gold), scope="master").empty
+
+    gold.execute("UPDATE bars_1m SET close = close + 0.1 WHERE ts_utc = (SELECT MAX(ts_utc) FROM bars_1m)")
+    gold.execute("UPDATE daily_features_v2 SET atr_20 = 12.5 WHERE date_local = ?", [DAYS[0]])
+
+    changed = store.changed_days(store.compute(gold), scope="master")
+    assert sorted(changed["date_local"].dt.date) == [DAYS[0], DAYS[-1]]
+
+    # Scopes are independent
+    assert len(store.changed_days(store.compute(gold), scope="complete")) == len(DAYS)
+
+
+def test_changed_dates_include_previous_trade_date():
+    import pandas as pd
+
+    changed = pd.DataFrame({"instrument": ["MGC"], "date_local": [pd.Timestamp("2025-01-15")]})
+    assert changed_dates(changed) == [date(2025, 1, 14), date(2025, 1, 15)]
+
+
+def test_orb_recompute_only_checks_given_days(gold):
+    gold.execute("UPDATE daily_features_v2 SET orb_0900_high = 2700.0 WHERE date_local = ?", [DAYS[1]])
+
+    clean = FeatureVerificationAuditor(con=gold, dates=[DAYS[0]])
+    assert clean.test_orb_recompute()
+
+    dirty = FeatureVerificationAuditor(con=gold, dates=[DAYS[1]])
+    assert not dirty.test_orb_recompute()
+
+    full = FeatureVerificationAuditor(con=gold)
+    assert not full.test_orb_recompute()
+    assert full.results[-1]["details"]["mismatches"] == [{"date": str(DAYS[1]), "orb": "0900"}]
@@ -0,0 +1,74 @@
+"""
+test_benchmarks.py
+
+Unit tests for the benchmark runner in benchmarks/.
+
+Tests:
+- Seeded live bars are reproducible, gap-free and well-formed OHLC
+- Result JSON carries machine metadata and per-benchmark timings; failures are recorded
+- compare() flags regressions beyond threshold and min_delta only
+"""
+
+import json
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from benchmarks import run as bench_run
+from benchmarks.datasets import DATASETS, live_bars
+from benchmarks.suite import Benchmark
+
+
+def test_live_bars_are_seeded():
+    spec, end = DATASETS["tiny"], pd.Timestamp("2025-03-03 12:00", tz="UTC")
+    first, second = live_bars(spec, end, 600), live_bars(spec, end, 600)
+
+    assert first.equals(second)
+    assert first["ts_utc"].iloc[-1] == end and first["ts_utc"].diff().dropna().eq(pd.Timedelta(minutes=1)).all()
+    assert (first["high"] >= first[["open", "close"]].max(axis=1)).all()
+    assert (first["low"] <= first[["open", "close"]].min(axis=1)).all()
+
+
+def test_run_suite_writes_metadata_and_timings(monkeypatch, tmp_path):
+    calls = []
+
+    def fake(ctx):
+        assert ctx.gold == tmp_path / "gold.db" and ctx.scratch.is_dir()
+        return lambda: calls.append(1)
+
+    def broken(ctx):
+        raise RuntimeError("no table")
+
+    monkeypatch.setattr(bench_run, "gold_db", lambda name: tmp_path / "gold.db")
+    monkeypatch.setattr(bench_run, "BENCHMARKS", {
+        "fake": Benchmark("fake", fake, 3, ""),
+        "broken": Benchmark("broken", broken, 1, ""),
+    })
+
+    report = json.loads(json.dumps(bench_run.run_suite("tiny", ["fake", "broken"])))
+
+    assert len(calls) == 4  # warm-up + 3 timed
+    assert report["results"]["fake"]["repeat"] == 3
+    assert len(report["results"]["fake"]["times"]) == 3
+    assert report["results"]["broken"] == {"error": "RuntimeError: no table"}
+    for key in ("git_commit", "platform", "cpu_count", "python", "duckdb", "dataset", "dataset_version"):
+        assert key in report["metadata"]
+
+
+def test_compare_flags_regressions(capsys):
+    meta = {"dataset": "small", "dataset_version": 1}
+    baseline = {"metadata": meta, "results": {
+        "a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 0.001}, "d": {"median": 1.0},
+    }}
+    current = {"metadata": meta, "results": {
+        "a": {"median": 1.1},       # within threshold
+        "b": {"median": 1.5},       # regression
+        "c": {"median": 0.002},     # 2x but below min_delta
+        "d": {"error": "boom"},     # failures count
+        "e": {"median": 1.0},       # new benchmark, no baseline
+    }}
+
+    assert bench_run.compare(current, baseline, threshold=0.2, min_delta=0.005) == ["b", "d"]
+    out = capsys.readouterr().out
+    assert "[WARN] e" in out and "different dataset" not in out
@@ -0,0 +1,109 @@
+"""
+test_chart_indicator_engine.py
+
+Unit tests for IndicatorEngine in trading_app/enhanced_charting.py.
+
+Tests:
+- Incremental resample + indicators match resample_bars + Indicator.* (full recompute)
+- Each refresh reads only bars from the forming bucket onwards
+- Forming bar revisions are picked up; peeking does not change committed state
+- Engines are cached per timeframe by chart_bars; indicators only when requested
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "trading_app"))
+from enhanced_charting import (
+    DEFAULT_CHART_INDICATORS, ChartTimeframe, Indicator, IndicatorEngine, chart_bars, resample_bars,
+)
+
+SPECS = dict(ema=(9,), sma=(20,), rsi=(14,), atr=(14,), vwap=True, bollinger=((20, 2.0),))
+
+
+def _bars_1m(n=600, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 2650 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "ts_local": pd.date_range("2025-01-14 08:00", periods=n, freq="1min", tz="Australia/Brisbane"),
+        "open": close + rng.normal(0, 0.2, n),
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+        "volume": rng.integers(1, 100, n),
+    })
+
+
+@pytest.mark.parametrize("timeframe", [ChartTimeframe.M1, ChartTimeframe.M5, ChartTimeframe.H1])
+def test_incremental_matches_full_recompute(timeframe):
+    bars = _bars_1m()
+    engine = IndicatorEngine(timeframe, **SPECS)
+    for end in range(30, len(bars) + 1, 7):
+        engine.update(bars.iloc[max(0, end - 240):end])
+    out = engine.update(bars)
+
+    ref = resample_bars(bars, timeframe)
+    middle, upper, lower = Indicator.bollinger_bands(ref["close"], 20, 2.0)
+    expected = {
+        "ema_9": Indicator.ema(ref["close"], 9),
+        "sma_20": Indicator.sma(ref["close"], 20),
+        "rsi_14": Indicator.rsi(ref["close"], 14),
+        "atr_14": Indicator.atr(ref["high"], ref["low"], ref["close"], 14),
+        "vwap": Indicator.vwap(ref["high"], ref["low"], ref["close"], ref["volume"]),
+        "bb_upper_20_2": upper,
+        "bb_lower_20_2": lower,
+    }
+
+    assert list(out["ts_local"]) == list(ref["ts_local"])
+    ohlcv = ["open", "high", "low", "close", "volume"]
+    np.testing.assert_array_equal(out[ohlcv].to_numpy(float), ref[ohlcv].to_numpy(float))
+    for column, series in expected.items():
+        np.testing.assert_allclose(out[column].to_numpy(float), series.to_numpy(float), rtol=1e-9, err_msg=column)
+
+
+def test_refresh_reads_only_new_bars():
+    bars = _bars_1m(300)
+    engine = IndicatorEngine(ChartTimeframe.M5, **SPECS)
+    engine.update(bars.iloc[:200])
+    read = engine.stats["rows_read"]
+
+    engine.update(bars.iloc[:201])
+
+    # Re-reads the forming bucket (bars 195-199) plus the new bar, which closes it
+    assert engine.stats["rows_read"] - read == 6
+    assert engine.stats["closed_bars"] == 40
+
+
+def test_forming_bar_revision_and_peek():
+    bars = _bars_1m(52)
+    engine = IndicatorEngine(ChartTimeframe.M5, ema=(9,))
+    engine.update(bars)
+    committed = engine._indicators[0].value
+
+    revised = bars.copy()
+    revised.loc[51, ["high", "close"]] = [3000.0, 2999.0]
+    latest = engine.update(revised).iloc[-1]
+
+    assert latest["high"] == 3000.0 and latest["close"] == 2999.0
+    assert latest["ema_9"] == pytest.approx(0.2 * 2999.0 + 0.8 * committed)
+    assert engine._indicators[0].value == committed
+
+
+def test_chart_bars_caches_engine_per_timeframe():
+    bars = _bars_1m(60).assign(symbol="MGC")
+    engines = {}
+    chart_bars(engines, bars, ChartTimeframe.M5)
+    engine = engines[ChartTimeframe.M5]
+    out = chart_bars(engines, bars, ChartTimeframe.M5)
+
+    assert engines[ChartTimeframe.M5] is engine
+    assert list(out.columns) == ["ts_local", "open", "high", "low", "close", "volume"]  # live chart: no indicators
+    assert len(out) == 12
+    assert "symbol" in bars.columns and len(bars) == 60  # caller's frame untouched
+
+    full = chart_bars(engines, bars, ChartTimeframe.M5, DEFAULT_CHART_INDICATORS)
+    assert {"ema_9", "ema_20", "vwap"} <= set(full.columns) and len(full) == 12
+    assert len(engines) == 2 and engines[ChartTimeframe.M5] is engine
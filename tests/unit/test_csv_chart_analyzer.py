@@ -0,0 +1,91 @@
+"""
+test_csv_chart_analyzer.py
+
+Unit tests for the array-based CSV analysis in trading_app/csv_chart_analyzer.py.
+
+Tests:
+- Chunked and single-shot parsing give identical analysis
+- Indicators match the full-series pandas formulas
+- Multi-day exports: ORB levels come from the latest day's window only
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from io import BytesIO
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "trading_app"))
+from csv_chart_analyzer import CSVChartAnalyzer
+
+
+def _csv(df: pd.DataFrame) -> bytes:
+    buf = BytesIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue()
+
+
+def _export(days=3, seed=5):
+    """1m bars (UTC, naive) from 08:00 Brisbane on 2026-01-18 for `days` days"""
+    n = days * 24 * 60
+    rng = np.random.default_rng(seed)
+    close = 2650 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "time": pd.date_range("2026-01-17 22:00", periods=n, freq="1min").strftime("%Y-%m-%d %H:%M:%S"),
+        "open": close,
+        "high": close + rng.random(n),
+        "low": close - rng.random(n),
+        "close": close,
+        "volume": 100,
+    })
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return CSVChartAnalyzer(instrument="MGC")
+
+
+def test_chunked_matches_single_pass(analyzer):
+    data = _csv(_export())
+    whole = analyzer.analyze_csv(data)
+    chunked = analyzer.analyze_csv(data, chunksize=1000)
+
+    assert whole["orb_analysis"] == chunked["orb_analysis"]
+    assert whole["indicators"] == chunked["indicators"]
+    assert whole["data_summary"]["total_bars"] == 3 * 24 * 60
+
+
+def test_indicators_match_pandas(analyzer):
+    df = _export(days=1)
+    result = analyzer.analyze_csv(_csv(df))["indicators"]
+
+    high, low, close = df["high"], df["low"], df["close"]
+    tr = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+
+    assert result["atr_14"] == pytest.approx(tr.rolling(14).mean().iloc[-1], rel=1e-9)
+    assert result["atr_20"] == pytest.approx(tr.rolling(20).mean().iloc[-1], rel=1e-9)
+    assert result["rsi_14"] == pytest.approx((100 - 100 / (1 + gain / loss)).iloc[-1], rel=1e-9)
+
+    short = analyzer.analyze_csv(_csv(df.head(14)))["indicators"]
+    assert short["atr_14"] == pytest.approx(tr.head(14).mean(), rel=1e-9)
+    assert short["atr_20"] is None
+
+
+def test_multi_day_export_uses_latest_orb_window(analyzer):
+    df = _export()
+    # Export ends 12:00 Brisbane on 2026-01-20 (02:00 UTC)
+    df = df[pd.to_datetime(df["time"]) < pd.Timestamp("2026-01-20 02:00")].copy()
+    times = pd.to_datetime(df["time"])
+    # Spike in the 09:00 window two days earlier must not leak into today's ORB
+    df.loc[times == pd.Timestamp("2026-01-17 23:02"), "high"] = 9999.0
+
+    orb = analyzer.analyze_csv(_csv(df))["orb_analysis"]["0900"]
+
+    today = (times >= pd.Timestamp("2026-01-19 23:00")) & (times < pd.Timestamp("2026-01-19 23:05"))
+    assert orb["detected"] and orb["bars_count"] == 5
+    assert orb["high"] == df.loc[today, "high"].max()
+    assert orb["low"] == df.loc[today, "low"].min()
@@ -0,0 +1,118 @@
+"""
+test_db_metrics.py
+
+Unit tests for the instrumented DuckDB connection factory (db_metrics.py).
+
+Tests:
+- Each statement is recorded once with latency, rows returned, call site and a literal-free fingerprint;
+  statements that raise are recorded with the error flag
+- Slow read statements get one EXPLAIN ANALYZE profile per fingerprint, run off the caller's thread;
+  writes are never re-run
+- The report ranks hot queries; DB_METRICS=0 returns plain connections
+"""
+
+from pathlib import Path
+import sys
+import threading
+
+import duckdb
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import db_metrics
+
+
+@pytest.fixture
+def metrics(tmp_path, monkeypatch):
+    path = tmp_path / "db_metrics.db"
+    monkeypatch.setenv("DB_METRICS_PATH", str(path))
+    monkeypatch.setenv("DB_METRICS", "1")
+    monkeypatch.setattr(db_metrics, "RECORDER", db_metrics.MetricsRecorder())
+    yield path
+
+
+def _read(path, sql):
+    con = duckdb.connect(str(path), read_only=True)
+    try:
+        return con.execute(sql).fetchall()
+    finally:
+        con.close()
+
+
+def test_statements_recorded_with_rows_and_call_site(metrics, tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "60000")
+    con = db_metrics.connect(str(tmp_path / "gold.db"))
+    con.execute("CREATE TABLE t AS SELECT range AS i FROM range(100)")
+    assert len(con.execute("SELECT * FROM t WHERE i < 7").fetchall()) == 7
+    assert len(con.execute("SELECT * FROM t WHERE i < 40").fetchdf()) == 40
+    assert con.execute("SELECT count(*) FROM t").fetchone() == (100,)
+    con.executemany("INSERT INTO t VALUES (?)", [[1], [2], [3]])
+    assert isinstance(con.raw, duckdb.DuckDBPyConnection) and con.description is not None
+    with pytest.raises(duckdb.CatalogException):
+        con.execute("SELECT * FROM missing WHERE i = 3")
+    con.close()
+    assert db_metrics.RECORDER.flush()
+
+    rows = _read(metrics, """
+        SELECT l.fingerprint, database, call_site, rows, slow, statement, error FROM query_log l
+        JOIN query_statements USING (fingerprint) ORDER BY ts
+    """)
+    assert [r[5] for r in rows] == [
+        "CREATE TABLE t AS SELECT range AS i FROM range(?)",
+        "SELECT * FROM t WHERE i < ?",
+        "SELECT * FROM t WHERE i < ?",
+        "SELECT count(*) FROM t",
+        "INSERT INTO t VALUES (?)",
+        "SELECT * FROM missing WHERE i = ?",
+    ]
+    assert [r[3] for r in rows] == [None, 7, 40, 1, 0, None]
+    assert [r[6] for r in rows] == [False] * 5 + [True]
+    assert rows[1][0] == rows[2][0] == db_metrics.fingerprint("select *  from t where i < 99")
+    assert all(r[1] == "gold.db" and not r[4] for r in rows)
+    assert all(r[2].startswith("tests/unit/test_db_metrics.py:") for r in rows)
+
+
+def test_slow_reads_get_one_profile(metrics, tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "0")
+    threads = []
+    add_profile = db_metrics.RECORDER.add_profile
+    monkeypatch.setattr(db_metrics.RECORDER, "add_profile",
+                        lambda *a: threads.append(threading.current_thread()) or add_profile(*a))
+    con = db_metrics.connect(str(tmp_path / "gold.db"))
+    con.execute("CREATE TABLE t AS SELECT range AS i FROM range(1000)")
+    for limit in (10, 20, 30):
+        con.execute("SELECT sum(i) FROM t WHERE i < ?", [limit]).fetchall()
+    cursor = con.execute("SELECT i FROM t ORDER BY i")
+    assert cursor.fetchone() == (0,)  # partially read - profiled when the next statement starts
+    con.execute("DELETE FROM t WHERE i > 500")
+    assert con.execute("SELECT count(*) FROM t").fetchone() == (501,)  # DELETE was not re-run
+    con.close()
+    db_metrics.RECORDER.flush()
+
+    assert len(threads) == 3 and threading.current_thread() not in threads
+    profiles = _read(metrics, "SELECT fingerprint, statement, plan FROM query_profiles ORDER BY ts")
+    assert [p[1] for p in profiles] == [
+        "SELECT sum(i) FROM t WHERE i < ?", "SELECT i FROM t ORDER BY i", "SELECT count(*) FROM t",
+    ]
+    assert all("Total Time" in p[2] for p in profiles)
+    assert _read(metrics, "SELECT count(*) FROM query_log WHERE slow") == [(7,)]
+
+
+def test_report_ranks_hot_queries(metrics, tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "60000")
+    con = db_metrics.connect(str(tmp_path / "gold.db"))
+    con.execute("CREATE TABLE t AS SELECT range AS i FROM range(100)")
+    for i in range(5):
+        con.execute(f"SELECT * FROM t WHERE i = {i}").fetchall()
+    con.close()
+    db_metrics.RECORDER.flush()
+
+    hot = db_metrics.hot_queries(duckdb.connect(str(metrics), read_only=True), sort="calls")
+    assert hot[0]["calls"] == 5 and hot[0]["statement"] == "SELECT * FROM t WHERE i = ?"
+    assert db_metrics.main(["report", "--sort", "calls"]) == 0
+    out = capsys.readouterr().out
+    assert hot[0]["fingerprint"] in out and "test_report_ranks_hot_queries" in out
+    assert db_metrics.main(["profile", hot[0]["fingerprint"]]) == 1
+
+    monkeypatch.setenv("DB_METRICS", "0")
+    assert isinstance(db_metrics.connect(":memory:"), duckdb.DuckDBPyConnection)
@@ -0,0 +1,157 @@
+"""
+test_edge_stats.py
+
+Unit tests for edge_stats.py (batched conditional ORB statistics).
+
+Tests:
+- Batched stats match the original one-query-per-setup SQL
+- Memo is reused until daily_features_v2 changes (appends and logged rewrites)
+- Morning prep, realtime signals and the full edge export each run one scan
+"""
+
+import pytest
+import duckdb
+import random
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from daily_alerts import DailyAlertSystemV2
+from edge_stats import EdgeSpec, EdgeStatsEngine
+from export_v2_edges import V2EdgeExporter
+from motherduck_sync import init_change_log, log_changed_range
+from realtime_signals import RealtimeSignalGenerator
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+ORBS = ("0900", "1000", "1100", "1800", "2300", "0030")
+D0 = date(2024, 1, 1)
+
+
+def _row(i, rng):
+    row = {
+        "date_local": D0 + timedelta(days=i),
+        "instrument": "MGC",
+        "pre_asia_high": 2650.0,
+        "pre_asia_low": 2645.0,
+        "pre_asia_range": rng.uniform(1.0, 8.0),
+        "pre_london_high": 2655.0,
+        "pre_london_low": 2652.0,
+        "pre_london_range": rng.uniform(0.5, 6.0),
+        "pre_ny_range": rng.uniform(0.5, 6.0),
+        "asia_high": 2660.0,
+        "asia_low": 2640.0,
+        "asia_range": rng.uniform(10.0, 40.0),
+    }
+    for orb in ORBS:
+        outcome = rng.choice(["WIN", "LOSS", "LOSS", "WIN", "NO_TRADE", None])
+        row[f"orb_{orb}_outcome"] = outcome
+        row[f"orb_{orb}_break_dir"] = None if outcome in (None, "NO_TRADE") else rng.choice(["UP", "DOWN"])
+        row[f"orb_{orb}_r_multiple"] = {"WIN": rng.uniform(0.5, 2.0), "LOSS": -1.0}.get(outcome)
+    return row
+
+
+def _insert(con, rows):
+    cols = list(rows[0])
+    con.executemany(
+        f"INSERT INTO daily_features_v2 ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+        [[r[c] for c in cols] for r in rows],
+    )
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "gold.db")
+    con = duckdb.connect(path)
+    con.execute(SCHEMA.read_text())
+    rng = random.Random(7)
+    _insert(con, [_row(i, rng) for i in range(400)])
+    con.close()
+    return path
+
+
+def _per_query(con, spec):
+    """The query daily_alerts / export_v2_edges used to run per setup"""
+    o, r = f"orb_{spec.orb_time}_outcome", f"orb_{spec.orb_time}_r_multiple"
+    total, wins, losses, avg_r, total_r, median_r, best_r, worst_r = con.execute(f"""
+        SELECT COUNT(*), SUM(CASE WHEN {o} = 'WIN' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN {o} = 'LOSS' THEN 1 ELSE 0 END), AVG({r}), SUM({r}),
+               PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY {r}), MAX({r}), MIN({r})
+        FROM daily_features_v2
+        WHERE {o} IN ('WIN', 'LOSS') AND {spec.condition}
+    """, list(spec.params)).fetchone()
+    return total, wins or 0, losses or 0, avg_r or 0, total_r or 0, median_r or 0, best_r or 0, worst_r or 0
+
+
+def test_batch_matches_per_query_sql(db_path):
+    con = duckdb.connect(db_path, read_only=True)
+    specs = [
+        EdgeSpec("1000"),
+        EdgeSpec("1000", "orb_1000_break_dir = ?", ("UP",)),
+        EdgeSpec("0900", "(pre_asia_range / 0.1) > ?", (50,)),
+        EdgeSpec("1100", "orb_1100_break_dir = ? AND orb_0900_outcome = ? AND orb_1000_outcome = ?",
+                 ("DOWN", "LOSS", "WIN")),
+        EdgeSpec("1800", "orb_1800_break_dir = 'DOWN' AND (pre_london_range / 0.1) > 40"),
+        EdgeSpec("0030", "(pre_ny_range / 0.1) > 1000"),
+    ]
+    results = EdgeStatsEngine(con).compute(specs)
+
+    for spec, stats in zip(specs, results):
+        expected = _per_query(con, spec)
+        got = tuple(stats[k] for k in ("total_trades", "wins", "losses", "avg_r", "total_r",
+                                        "median_r", "best_r", "worst_r"))
+        assert got == pytest.approx(expected, rel=1e-12), spec
+        assert stats["win_rate"] == (expected[1] / expected[0] if expected[0] else 0)
+    assert results[-1]["total_trades"] == 0
+
+
+def test_memo_invalidated_by_data_version(db_path):
+    con = duckdb.connect(db_path)
+    init_change_log(con)
+    engine = EdgeStatsEngine(con)
+    spec = EdgeSpec("1000", "orb_1000_break_dir = ?", ("UP",))
+
+    first = engine.get("1000", "orb_1000_break_dir = ?", ["UP"])
+    assert engine.compute([spec]) == [first]
+    assert engine.stats == {"scans": 1, "hits": 1}
+
+    # In-place rewrite: counts/dates unchanged, caught through sync_change_log
+    con.execute("UPDATE daily_features_v2 SET orb_1000_outcome = 'WIN', orb_1000_r_multiple = 1.0 "
+                "WHERE orb_1000_break_dir = 'UP' AND date_local < ?", [D0 + timedelta(days=100)])
+    log_changed_range(con, "daily_features_v2", D0, D0 + timedelta(days=100), partition="MGC")
+    rewritten = engine.compute([spec])[0]
+    assert engine.stats["scans"] == 2
+    assert rewritten["wins"] > first["wins"]
+
+    _insert(con, [_row(400, random.Random(1))])
+    engine.compute([spec])
+    assert engine.stats["scans"] == 3
+
+
+def test_callers_run_one_scan(db_path, capsys):
+    alerts = DailyAlertSystemV2(db_path)
+    alerts.generate_morning_prep(D0 + timedelta(days=10))
+    assert alerts.edge_stats.stats["scans"] == 1
+    alerts.close()
+
+    signals = RealtimeSignalGenerator(db_path)
+    signals.generate_all_signals(D0 + timedelta(days=10))
+    assert signals.edge_stats.stats["scans"] == 1
+    signals.close()
+
+    exporter = V2EdgeExporter(db_path)
+    exporter.export_baseline_edges()
+    exporter.export_pre_block_edges()
+    exporter.export_correlation_edges()
+    exporter.resolve_edges()
+    assert exporter.edge_stats.stats["scans"] == 1
+    assert not exporter.pending
+
+    baseline = next(e for e in exporter.edges if e.setup == "1000 UP")
+    total, wins = exporter.con.execute("""
+        SELECT COUNT(*), COUNT(*) FILTER (WHERE orb_1000_outcome = 'WIN') FROM daily_features_v2
+        WHERE orb_1000_outcome IN ('WIN', 'LOSS') AND orb_1000_break_dir = 'UP'
+    """).fetchone()
+    assert (baseline.total_trades, baseline.wins, baseline.orb_time) == (total, wins, "1000")
+    assert all(e.total_trades >= 10 for e in exporter.edges)
+    exporter.close()
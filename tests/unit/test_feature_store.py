@@ -0,0 +1,168 @@
+"""
+test_feature_store.py
+
+Unit tests for ml_training/feature_store.py (point-in-time ML features).
+
+Tests:
+- Vectors streamed live from bars_1m equal the training vectors built from
+  daily_features_v2 / orb_facts (FeatureBuilderV2 on synthetic bars)
+- Each ORB only sees sessions closed by its decision time; day context excludes the day itself
+- prepare_training_data uses the store; MLInferenceEngine takes store vectors as-is
+- update leaves a still-forming last bar for the next update
+"""
+
+import math
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+
+import duckdb
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import build_daily_features_v2
+from ml_training.feature_store import (
+    FEATURE_COLUMNS, ORB_MINUTES, ORB_STARTS, FeatureStore, historical_frame, load_history,
+)
+from synthetic_bars import generate_bars
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+START, END = date(2025, 1, 6), date(2025, 2, 6)
+LIVE_FROM = date(2025, 2, 3)
+
+
+@pytest.fixture(scope="module")
+def gold_db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("store") / "gold.db")
+    con = duckdb.connect(path)
+    con.execute(SCHEMA.read_text())
+    con.execute("DROP VIEW IF EXISTS v_orb_trades")
+    con.execute("DROP TABLE daily_features_v2")  # builder creates the full table
+    generate_bars(con, ["MGC"], START, END + timedelta(days=1))
+    con.execute("""
+        INSERT INTO bars_5m
+        SELECT to_timestamp(floor(epoch(ts_utc) / 300) * 300), symbol, arg_max(source_symbol, ts_utc),
+               arg_min(open, ts_utc), max(high), min(low), arg_max(close, ts_utc), sum(volume)
+        FROM bars_1m GROUP BY 1, 2
+    """)
+    con.close()
+
+    builder = build_daily_features_v2.FeatureBuilderV2(path)
+    builder.init_schema_v2()
+    d = START
+    while d <= END:
+        if d.weekday() < 5:
+            builder.build_features(d)
+        d += timedelta(days=1)
+    builder.close()
+    return path
+
+
+def _same(a, b):
+    return (pd.isna(a) and pd.isna(b)) or a == b
+
+
+def test_live_stream_matches_training_vectors(gold_db):
+    con = duckdb.connect(gold_db, read_only=True)
+    daily, orbs = load_history(con)
+    expected = historical_frame(daily, orbs)
+
+    store = FeatureStore("MGC")
+    store.load_history(con, since=START)
+    bars = con.execute("""
+        SELECT ts_utc, high, low, close FROM bars_1m
+        WHERE ts_utc >= ? ORDER BY ts_utc
+    """, [pd.Timestamp(LIVE_FROM - timedelta(days=1), tz="UTC")]).fetchdf()
+    con.close()
+
+    # Capture each ORB's vector the moment its 5 minutes close
+    live = {}
+    for ts, high, low, close in zip(bars["ts_utc"], bars["high"], bars["low"], bars["close"]):
+        store.on_bar(ts, high, low, close)
+        day = max(store.days)
+        for orb_time, start in ORB_STARTS.items():
+            if (day, orb_time) not in live and store.days[day].as_of >= start + ORB_MINUTES:
+                live[(day, orb_time)] = store.vector(orb_time)
+    assert store.update(bars) == 0  # already seen
+
+    checked = 0
+    for i, row in expected.iterrows():
+        key = (row["date_local"].date(), row["orb_time"])
+        if key[0] < LIVE_FROM or key not in live:
+            continue
+        for col in FEATURE_COLUMNS:
+            assert _same(live[key][col], row[col]), (key, col, live[key][col], row[col])
+        checked += 1
+    assert checked == 4 * len(ORB_STARTS)
+    assert expected["rsi_14"].notna().any() and expected["asia_type_code"].notna().any()
+
+
+def test_features_are_point_in_time(gold_db):
+    con = duckdb.connect(gold_db, read_only=True)
+    daily, orbs = load_history(con)
+    con.close()
+    frame = historical_frame(daily, orbs).set_index(["date_local", "orb_time"])
+    day = pd.Timestamp(END)
+
+    early, late = frame.loc[(day, "0900")], frame.loc[(day, "0030")]
+    for col in ("asia_range", "london_high", "pre_london_range", "pre_ny_low", "ny_range", "rsi_14"):
+        assert math.isnan(early[col])
+    assert pd.isna(early["asia_type_code"]) and not early["asia_type_code_A0_NORMAL"]
+    assert not math.isnan(early["pre_asia_range"]) and not math.isnan(early["orb_size"])
+    assert not math.isnan(late["pre_ny_range"]) and not math.isnan(late["rsi_14"])
+    assert math.isnan(late["ny_range"])
+    assert math.isnan(frame.loc[(day, "1800"), "london_range"])
+    assert not math.isnan(frame.loc[(day, "1800"), "asia_range"])
+
+    # Later sessions and the day's own results never reach earlier vectors
+    changed_daily = daily.copy()
+    changed_daily.loc[pd.to_datetime(changed_daily["date_local"]) == day, ["london_high", "ny_high"]] = 1e6
+    changed_orbs = orbs.copy()
+    changed_orbs.loc[pd.to_datetime(changed_orbs["date_local"]) == day, "r_multiple"] = 99.0
+    changed = historical_frame(changed_daily, changed_orbs).set_index(["date_local", "orb_time"])
+    for col in FEATURE_COLUMNS[2:]:
+        if col != "orb_time":
+            assert _same(changed.loc[(day, "1800"), col], frame.loc[(day, "1800"), col]), col
+
+    # Day context: previous trading day's R, 20-day mean Asia range of prior days only
+    prev = pd.Timestamp(END - timedelta(days=1))
+    prev_r = orbs.loc[pd.to_datetime(orbs["date_local"]) == prev, "r_multiple"].dropna()
+    assert early["prev_day_avg_r"] == pytest.approx(prev_r.mean())
+    prior = daily[pd.to_datetime(daily["date_local"]) < day].tail(20)
+    assert early["atr_14"] == pytest.approx((prior["asia_high"] - prior["asia_low"]).mean())
+
+
+def test_training_and_inference_use_store_vectors(gold_db):
+    from ml_training.prepare_training_data import load_orb_rows
+    from ml_inference.inference_engine import MLInferenceEngine
+
+    con = duckdb.connect(gold_db, read_only=True)
+    df = load_orb_rows(con)
+    daily, orbs = load_history(con)
+    con.close()
+
+    expected = historical_frame(daily, orbs[orbs["orb_size"].notna()]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(df[FEATURE_COLUMNS], expected)
+    assert df["orb_r_multiple"].notna().all() and set(df["orb_break_dir"]) <= {"UP", "DOWN", "NONE"}
+
+    engine = MLInferenceEngine.__new__(MLInferenceEngine)
+    engine.directional_metadata = {"label_encoders": {}}
+    names = ["orb_size", "london_range", "atr_14", "session_ASIA", "prev_day_avg_r"]
+    vector = df.iloc[0][FEATURE_COLUMNS].to_dict()
+    X = engine._prepare_features(vector, names)
+    assert list(X.columns) == names
+    assert math.isnan(X.loc[0, "london_range"])  # unknown stays NaN, as in training
+    assert X.loc[0, "orb_size"] == vector["orb_size"]
+
+
+def test_update_skips_forming_bar():
+    ts = pd.date_range("2025-02-03 00:00", periods=3, freq="1min", tz="UTC")
+    bars = pd.DataFrame({"ts_utc": ts, "high": [2.0, 3.0, 4.0], "low": [1.0, 1.0, 1.0], "close": [1.5, 2.5, 3.5]})
+    store = FeatureStore("MGC")
+
+    assert store.update(bars, now=ts[2] + pd.Timedelta(seconds=30)) == 2
+    assert store.last_ts == ts[1]
+    bars.loc[2, ["high", "close"]] = [5.0, 4.5]  # forming bar moved before it closed
+    assert store.update(bars, now=ts[2] + pd.Timedelta(minutes=1)) == 1
+    assert store.last_ts == ts[2] and store._closes[-1][1] == 4.5
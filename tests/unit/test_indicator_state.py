@@ -0,0 +1,158 @@
+"""
+test_indicator_state.py
+
+Unit tests for indicator_state.py (persisted streaming RSI/ATR).
+
+Tests:
+- Wilder indicators match rsi_wilder / atr_wilder from build_daily_features.py
+- Advancing from a snapshot equals a cold recompute
+- Window indicators match FeatureBuilderV2's original lookback math
+- Logged source rewrites invalidate later snapshots
+- verify() flags a corrupted snapshot; save=False does not persist
+"""
+
+import json
+import math
+import pytest
+import duckdb
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from build_daily_features import atr_wilder, rsi_wilder
+from indicator_state import (
+    STATE_TABLE, IndicatorStore, WilderATR, WilderRSI, WindowMean, WindowRSI,
+    advance, asia_range_feed, bars_feed, verify,
+)
+from motherduck_sync import log_changed_range
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+T0 = datetime(2025, 1, 13, 23, 0, tzinfo=timezone.utc)
+
+
+def _bars(n):
+    rows = []
+    for i in range(n):
+        close = 2650.0 + 5.0 * math.sin(i / 7.0) + 0.1 * i
+        rows.append((T0 + timedelta(minutes=5 * i), "MGC", None, close - 0.3, close + 1.0 + (i % 3) * 0.2,
+                     close - 1.1, close, 100))
+    return rows
+
+
+@pytest.fixture
+def con(tmp_path):
+    con = duckdb.connect(str(tmp_path / "gold.db"))
+    con.execute(SCHEMA.read_text())
+    con.executemany("INSERT INTO bars_5m VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _bars(120))
+    yield con
+    con.close()
+
+
+def _ts(i):
+    return T0 + timedelta(minutes=5 * i)
+
+
+def _fresh_copy(con):
+    """Same data without any stored snapshots"""
+    other = duckdb.connect()
+    other.execute(SCHEMA.read_text())
+    other.executemany("INSERT INTO bars_5m VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                      con.execute("SELECT * FROM bars_5m").fetchall())
+    return other
+
+
+def test_wilder_matches_reference_series():
+    bars = _bars(80)
+    closes = [b[6] for b in bars]
+    highs = [b[4] for b in bars]
+    lows = [b[5] for b in bars]
+
+    rsi, atr = WilderRSI(14), WilderATR(20)
+    streamed_rsi = [rsi.update(c) for c in closes]
+    streamed_atr = [atr.update(h, l, c) for h, l, c in zip(highs, lows, closes)]
+
+    for got, want in zip(streamed_rsi, rsi_wilder(closes, 14)):
+        assert (got is None and want is None) or got == pytest.approx(want, rel=1e-12)
+    for got, want in zip(streamed_atr, atr_wilder(highs, lows, closes, 20)):
+        assert (got is None and want is None) or got == pytest.approx(want, rel=1e-12)
+
+
+def test_advance_from_snapshot_equals_cold_recompute(con):
+    store = IndicatorStore(con)
+    feed = bars_feed("MGC", ("close",))
+
+    for i in (30, 60, 90, 119):
+        warm = advance(store, feed, lambda: WilderRSI(14), _ts(i))
+    cold = advance(IndicatorStore(_fresh_copy(con)), feed, lambda: WilderRSI(14), _ts(119), save=False)
+
+    assert warm.last_ts == _ts(119)
+    assert warm.value == pytest.approx(cold.value, rel=1e-12)
+    assert len(store.snapshots(feed, WilderRSI(14))) == 4
+
+
+def test_window_indicators_match_lookback_math(con):
+    store = IndicatorStore(con)
+    at = _ts(70)
+    closes = [r[0] for r in con.execute(
+        "SELECT close FROM bars_5m WHERE ts_utc <= ? ORDER BY ts_utc DESC LIMIT 15", [at]
+    ).fetchall()][::-1]
+    gains = [max(b - a, 0.0) for a, b in zip(closes, closes[1:])]
+    losses = [max(a - b, 0.0) for a, b in zip(closes, closes[1:])]
+    expected_rsi = 100.0 - 100.0 / (1.0 + (sum(gains) / 14) / (sum(losses) / 14))
+
+    advance(store, bars_feed("MGC", ("close",)), lambda: WindowRSI(14), _ts(60))
+    rsi = advance(store, bars_feed("MGC", ("close",)), lambda: WindowRSI(14), at)
+    assert rsi.value == expected_rsi
+
+    con.execute("""
+        INSERT INTO daily_features_v2 (date_local, instrument, asia_high, asia_low)
+        SELECT DATE '2025-01-01' + CAST(i AS INTEGER), 'MGC', 2660.0 + i * 0.37, 2650.0 - (i % 4)
+        FROM range(30) t(i)
+    """)
+    feed = asia_range_feed("MGC")
+    factory = lambda: WindowMean(20, "asia_range_mean")
+    trade_date = datetime(2025, 1, 25).date()
+    rows = con.execute(
+        "SELECT asia_high, asia_low FROM daily_features_v2 WHERE date_local < ? "
+        "AND asia_high IS NOT NULL ORDER BY date_local DESC LIMIT 20", [trade_date]
+    ).fetchall()
+    expected_atr = sum(h - l for h, l in rows) / 20
+
+    assert advance(store, feed, factory, trade_date - timedelta(days=7)).value is None
+    assert advance(store, feed, factory, trade_date - timedelta(days=1)).value == expected_atr
+
+
+def test_logged_rewrite_invalidates_later_snapshots(con):
+    store = IndicatorStore(con)
+    feed = bars_feed("MGC", ("close",))
+    for i in (40, 80, 119):
+        advance(store, feed, lambda: WilderRSI(14), _ts(i))
+
+    con.execute("UPDATE bars_5m SET close = close + 3 WHERE ts_utc >= ? AND ts_utc < ?", [_ts(60), _ts(65)])
+    log_changed_range(con, "bars_5m", _ts(60), _ts(65), partition="MGC")
+
+    assert store.sync_changes() == 2
+    assert [as_of for as_of, _ in store.snapshots(feed, WilderRSI(14))] == [_ts(40)]
+
+    rebuilt = advance(store, feed, lambda: WilderRSI(14), _ts(119))
+    cold = advance(IndicatorStore(_fresh_copy(con)), feed, lambda: WilderRSI(14), _ts(119), save=False)
+    assert rebuilt.value == pytest.approx(cold.value, rel=1e-12)
+
+
+def test_verify_and_live_mode(con):
+    store = IndicatorStore(con)
+    feed = bars_feed("MGC", ("high", "low", "close"))
+    for i in (50, 100):
+        advance(store, feed, lambda: WilderATR(20), _ts(i))
+    assert verify(store, feed, lambda: WilderATR(20)) == {"checked": 2, "mismatches": []}
+
+    state = json.loads(con.execute(f"SELECT state FROM {STATE_TABLE} WHERE as_of = ?", [_ts(100)]).fetchone()[0])
+    state["atr"] += 1.0
+    con.execute(f"UPDATE {STATE_TABLE} SET state = ? WHERE as_of = ?", [json.dumps(state), _ts(100)])
+    result = verify(store, feed, lambda: WilderATR(20))
+    assert [m["as_of"] for m in result["mismatches"]] == [_ts(100)]
+
+    live = advance(store, feed, lambda: WilderATR(20), _ts(110), save=False)
+    assert live.last_ts == _ts(110)
+    assert len(store.snapshots(feed, WilderATR(20))) == 2
@@ -0,0 +1,125 @@
+"""
+test_latency_tracing.py
+
+Unit tests for decision-loop latency tracing (trading_app/latency_tracing.py).
+
+Tests:
+- The ring is bounded; summary() percentiles match numpy; regressions() flags a slowed stage
+- Spans inside a trace share its id; bar-to-decision age ignores stale bars
+- Live stages (ML insights, setup scan) are traced; spans persist to DuckDB when configured
+- The loader's last closed bar skips the bar still forming at fetch time
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+import duckdb
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "trading_app"))
+import latency_tracing
+from latency_tracing import Tracer, bar_to_decision_seconds
+
+
+def test_ring_summary_and_regressions():
+    tracer = Tracer(capacity=100)
+    values = np.linspace(0.001, 0.1, 150)
+    for v in values:
+        tracer.record("evaluate_all", v)
+    with pytest.raises(RuntimeError):
+        with tracer.span("chart_render"):
+            raise RuntimeError("render failed")
+
+    assert len(tracer.spans) == 100
+    row = tracer.summary().set_index("stage").loc["evaluate_all"]
+    kept = values[-99:] * 1000  # oldest dropped by the ring (one slot went to chart_render)
+    assert row["count"] == 99
+    assert row["p50_ms"] == pytest.approx(np.percentile(kept, 50))
+    assert row["p99_ms"] == pytest.approx(np.percentile(kept, 99))
+    assert row["last_ms"] == pytest.approx(100.0)
+    assert tracer.summary().set_index("stage").loc["chart_render", "errors"] == 1
+    assert list(tracer.summary()["stage"]) == ["evaluate_all", "chart_render"]  # pipeline order
+
+    steady = Tracer()
+    for _ in range(60):
+        steady.record("ml_insights", 0.010)
+    assert steady.regressions() == []
+    for _ in range(30):
+        steady.record("ml_insights", 0.040)
+    assert [r["stage"] for r in steady.regressions()] == ["ml_insights"]
+    assert steady.regressions()[0]["ratio"] == pytest.approx(4.0)
+
+
+def test_trace_ids_and_bar_to_decision():
+    tracer = Tracer()
+    with tracer.trace() as trace_id:
+        with tracer.span("evaluate_all"):
+            pass
+    loop = tracer.begin_trace()
+    tracer.record("bar_to_decision", 2.5)
+    loop.end()
+    tracer.record("fetch_latest_bars", 0.2)  # outside any trace
+
+    spans = list(tracer.spans)
+    assert [s[2] for s in spans] == ["evaluate_all", "decision_loop", "bar_to_decision", "decision_loop",
+                                     "fetch_latest_bars"]
+    assert spans[0][1] == spans[1][1] == trace_id
+    assert spans[2][1] == spans[3][1] == loop.trace_id != trace_id
+    assert spans[4][1] is None
+    assert loop.end() == spans[3][3]  # ending twice records once
+
+    now = datetime(2025, 3, 3, 0, 31, 4, tzinfo=timezone.utc)
+    assert bar_to_decision_seconds(datetime(2025, 3, 3, 0, 30, tzinfo=timezone.utc), now=now) == pytest.approx(4.0)
+    assert bar_to_decision_seconds(datetime(2025, 3, 3, 0, 30), now=now) == pytest.approx(4.0)  # naive = UTC
+    assert bar_to_decision_seconds(now - timedelta(hours=3), now=now) is None  # market closed
+    tracer.record("bar_to_decision", None)
+    assert len(tracer.spans) == 5
+
+
+def test_live_stages_traced_and_persisted(tmp_path, monkeypatch):
+    from setup_scanner import SetupScanner
+    from strategy_engine import ActionType, StrategyEngine, StrategyEvaluation, StrategyState
+
+    tracer = Tracer(persist_path=str(tmp_path / "db_metrics.db"))
+    monkeypatch.setattr(latency_tracing, "TRACER", tracer)
+
+    engine = StrategyEngine.__new__(StrategyEngine)
+    engine.ml_engine = None
+    evaluation = StrategyEvaluation(strategy_name="DAY_ORB", priority=0, state=StrategyState.READY,
+                                    action=ActionType.PREPARE, reasons=[], next_instruction="Wait")
+    scanner = SetupScanner.__new__(SetupScanner)
+    scanner.tz = latency_tracing.timezone.utc
+    scanner.detector = type("Detector", (), {"get_all_validated_setups": lambda self, instrument: []})()
+
+    with tracer.trace() as trace_id:
+        assert engine._enhance_with_ml_insights(evaluation) is evaluation
+        assert scanner.scan_all_setups({}, {}).empty
+    assert [(s[1], s[2]) for s in tracer.spans] == [
+        (trace_id, "ml_insights"), (trace_id, "scan_setups"), (trace_id, "decision_loop"),
+    ]
+    assert StrategyEngine.evaluate_all.__wrapped__ is not None
+
+    assert tracer.flush()
+    con = duckdb.connect(str(tmp_path / "db_metrics.db"), read_only=True)
+    rows = con.execute("SELECT trace_id, stage, ok FROM latency_spans ORDER BY ts").fetchall()
+    con.close()
+    assert rows == [(trace_id, "ml_insights", True), (trace_id, "scan_setups", True),
+                    (trace_id, "decision_loop", True)]
+
+
+def test_last_closed_bar_skips_forming_bar():
+    import pandas as pd
+    from data_loader import LiveDataLoader
+
+    loader = LiveDataLoader.__new__(LiveDataLoader)
+    loader.bars_df = pd.DataFrame({"ts_utc": pd.date_range("2025-03-03 00:28", periods=3, freq="1min", tz="UTC")})
+    loader.bars_fetched_utc = None
+    assert loader.last_closed_bar_ts() is None
+
+    loader.bars_fetched_utc = datetime(2025, 3, 3, 0, 30, 20, tzinfo=timezone.utc)  # 00:30 bar still forming
+    closed = loader.last_closed_bar_ts()
+    assert closed == pd.Timestamp("2025-03-03 00:29", tz="UTC")
+    now = datetime(2025, 3, 3, 0, 30, 21, tzinfo=timezone.utc)
+    assert bar_to_decision_seconds(closed, now=now) == pytest.approx(21.0)
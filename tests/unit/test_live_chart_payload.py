@@ -0,0 +1,107 @@
+"""
+test_live_chart_payload.py
+
+Unit tests for the chart data layer in trading_app/live_chart_builder.py.
+
+Tests:
+- Decimation keeps every high/low extreme and caps the candle count
+- A full-day window payload shrinks by well over 5x
+- Reruns reuse the figure (only candles and current-price line change)
+- Overlay changes rebuild the figure
+- Indicator columns from chart_bars are drawn and refreshed on reruns
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "trading_app"))
+from live_chart_builder import CURRENT_PRICE, LiveChartCache, build_live_trading_chart, decimate_ohlc
+
+
+def _bars_1m(n=1440, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 2650 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "ts_local": pd.date_range("2025-01-14 08:00", periods=n, freq="1min", tz="Australia/Brisbane"),
+        "open": close + rng.normal(0, 0.2, n),
+        "high": close + 1 + rng.random(n),
+        "low": close - 1 - rng.random(n),
+        "close": close,
+        "volume": rng.integers(1, 100, n),
+    })
+
+
+def _builder(bars_1m, orb_high=2660.0):
+    ts = bars_1m["ts_local"]
+    return lambda bars: build_live_trading_chart(
+        bars, orb_high=orb_high, orb_low=2650.0, orb_start=ts[60], orb_end=ts[65], current_price=2655.0
+    )
+
+
+def test_decimation_preserves_extremes():
+    bars = _bars_1m()
+    out = decimate_ohlc(bars, 150)
+
+    assert len(out) <= 150
+    assert out["high"].max() == bars["high"].max()
+    assert out["low"].min() == bars["low"].min()
+    assert out["volume"].sum() == bars["volume"].sum()
+    assert out["open"].iloc[0] == bars["open"].iloc[0]
+    assert out["close"].iloc[-1] == bars["close"].iloc[-1]
+    assert len(decimate_ohlc(bars.iloc[:100], 150)) == 100
+
+
+def test_payload_shrinks():
+    bars = _bars_1m()
+    full = len(_builder(bars)(bars).to_json())
+
+    fig = LiveChartCache(max_candles=150).render(bars, "overlays", _builder(bars), current_price=2655.0)
+
+    assert full / len(fig.to_json()) > 5
+
+
+def test_rerun_reuses_figure():
+    bars = _bars_1m()
+    cache = LiveChartCache(max_candles=150)
+    first = cache.render(bars.iloc[:1000], "overlays", _builder(bars), current_price=2655.0)
+    shapes = len(first.layout.shapes)
+
+    second = cache.render(bars, "overlays", _builder(bars), current_price=2657.5)
+
+    assert second is first
+    assert cache.stats == {"builds": 1, "updates": 1}
+    assert len(second.layout.shapes) == shapes
+    candles = next(t for t in second.data if t.type == "candlestick")
+    assert pd.Timestamp(candles.x[-1]) == bars["ts_local"].iloc[-1].floor("10min").tz_localize(None)
+    assert {s.y0 for s in second.layout.shapes if s.name == CURRENT_PRICE} == {2657.5}
+    assert {a.text for a in second.layout.annotations if a.name == CURRENT_PRICE} == {"Current: $2657.50"}
+
+
+def test_overlay_change_rebuilds():
+    bars = _bars_1m(120)
+    cache = LiveChartCache()
+    first = cache.render(bars, ("orb", 2660.0), _builder(bars), current_price=2655.0)
+    second = cache.render(bars, ("orb", 2661.0), _builder(bars, orb_high=2661.0), current_price=2655.0)
+
+    assert second is not first
+    assert cache.stats["builds"] == 2
+
+
+def test_indicator_lines_drawn_and_refreshed():
+    from enhanced_charting import DEFAULT_CHART_INDICATORS, ChartTimeframe, chart_bars
+
+    bars = _bars_1m(300)
+    engines = {}
+    cache = LiveChartCache(max_candles=150)
+    first = cache.render(chart_bars(engines, bars.iloc[:200], ChartTimeframe.M1, DEFAULT_CHART_INDICATORS),
+                         "overlays", _builder(bars), current_price=2655.0)
+    assert {t.meta for t in first.data if t.type == "scatter"} == {"ema_9", "ema_20", "vwap"}
+
+    chart_df = chart_bars(engines, bars, ChartTimeframe.M1, DEFAULT_CHART_INDICATORS)
+    second = cache.render(chart_df, "overlays", _builder(bars), current_price=2656.0)
+    assert second is first
+    ema = next(t for t in second.data if t.meta == "ema_9")
+    assert len(ema.y) == len(next(t for t in second.data if t.type == "candlestick").x)
+    assert ema.y[-1] == round(chart_df["ema_9"].iloc[-1], 2)
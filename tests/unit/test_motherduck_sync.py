@@ -0,0 +1,136 @@
+"""
+test_motherduck_sync.py
+
+Unit tests for motherduck_sync.py - incremental push to an attached target.
+A second local DuckDB file stands in for MotherDuck.
+
+Tests:
+- First sync copies everything and verifies row counts
+- Second sync with no changes pushes nothing
+- New bars are appended above the high-water mark
+- Logged changed ranges are re-pushed (DELETE + INSERT)
+- Small unkeyed tables are replaced only when their content changes
+- A full re-upload can be marked as synced
+"""
+
+import pytest
+import duckdb
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from motherduck_sync import MotherDuckSync, log_changed_range
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+START = datetime(2025, 1, 13, 9, 0, tzinfo=timezone(timedelta(hours=10)))
+
+
+def _bars(start, n):
+    return [
+        (start + timedelta(minutes=i), "MGC", "MGCG5", 2650.0, 2651.0, 2649.0, 2650.5, 5)
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def dbs(tmp_path):
+    src_path, dst_path = tmp_path / "gold.db", tmp_path / "remote.db"
+
+    src = duckdb.connect(str(src_path))
+    src.execute(SCHEMA.read_text())
+    src.executemany("INSERT INTO bars_1m VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _bars(START, 100))
+    for i in range(3):
+        src.execute("INSERT INTO daily_features_v2 (date_local, instrument, atr_20) VALUES (?, 'MGC', 10.0)",
+                    [date(2025, 1, 13) + timedelta(days=i)])
+    src.execute("CREATE TABLE validated_setups (setup_id VARCHAR, rr DOUBLE)")
+    src.execute("INSERT INTO validated_setups VALUES ('MGC_0900', 1.0)")
+    src.close()
+    duckdb.connect(str(dst_path)).close()
+
+    def open_sync():
+        con = duckdb.connect()
+        con.execute(f"ATTACH '{src_path}' AS local_gold")
+        con.execute(f"ATTACH '{dst_path}' AS remote")
+        return con, MotherDuckSync(con, source="local_gold", target="remote", batch_days=1, log=lambda m: None)
+
+    return open_sync
+
+
+def test_first_sync_copies_everything(dbs):
+    con, syncer = dbs()
+    results = syncer.sync_all()
+
+    assert results["bars_1m"]["mode"] == "initial"
+    assert results["bars_1m"]["rows_pushed"] == 100
+    assert results["daily_features_v2"]["rows_pushed"] == 3
+    assert results["validated_setups"]["rows_pushed"] == 1
+    assert all(r["verified"] for r in results.values())
+
+
+def test_second_sync_without_changes_pushes_nothing(dbs):
+    con, syncer = dbs()
+    syncer.sync_all()
+
+    results = syncer.sync_all()
+    assert {t: r["rows_pushed"] for t, r in results.items()} == {
+        "bars_1m": 0, "bars_5m": 0, "daily_features_v2": 0, "orb_facts": 0, "validated_setups": 0,
+    }
+
+
+def test_new_rows_appended_above_high_water(dbs):
+    con, syncer = dbs()
+    syncer.sync_all()
+
+    con.executemany("INSERT INTO local_gold.bars_1m VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    _bars(START + timedelta(days=2), 30))
+    result = syncer.sync_table("bars_1m")
+
+    assert result["mode"] == "incremental"
+    assert result["rows_appended"] == 30
+    assert result["target_rows"] == 130 and result["verified"]
+
+
+def test_logged_ranges_are_repushed(dbs):
+    con, syncer = dbs()
+    syncer.sync_all()
+
+    con.execute("USE local_gold")
+    con.execute("UPDATE bars_1m SET close = 9999.0 WHERE ts_utc < ?", [START + timedelta(minutes=10)])
+    con.execute("UPDATE daily_features_v2 SET atr_20 = 42.0 WHERE date_local = DATE '2025-01-14'")
+    log_changed_range(con, "bars_1m", START, START + timedelta(minutes=10), partition="MGC")
+    log_changed_range(con, "daily_features_v2", date(2025, 1, 14), date(2025, 1, 15), partition="MGC")
+    con.execute("USE memory")
+
+    bars = syncer.sync_table("bars_1m")
+    feats = syncer.sync_table("daily_features_v2")
+
+    assert bars["rows_pushed"] == 10 and bars["ranges_applied"] == 1
+    assert feats["rows_pushed"] == 1
+    assert con.execute("SELECT COUNT(*) FROM remote.bars_1m WHERE close = 9999.0").fetchone()[0] == 10
+    assert con.execute(
+        "SELECT atr_20 FROM remote.daily_features_v2 WHERE date_local = DATE '2025-01-14'"
+    ).fetchone()[0] == 42.0
+
+    # Change log is consumed: nothing left to push
+    assert syncer.sync_table("bars_1m")["rows_pushed"] == 0
+
+
+def test_small_table_replaced_only_on_change(dbs):
+    con, syncer = dbs()
+    syncer.sync_all()
+    assert syncer.sync_table("validated_setups")["mode"] == "unchanged"
+
+    con.execute("INSERT INTO local_gold.validated_setups VALUES ('MGC_1000', 2.0)")
+    result = syncer.sync_table("validated_setups")
+    assert result["mode"] == "replaced" and result["target_rows"] == 2
+
+
+def test_mark_synced_after_full_upload(dbs):
+    con, syncer = dbs()
+    con.execute("CREATE TABLE remote.bars_1m AS SELECT * FROM local_gold.bars_1m")
+    syncer.mark_synced("bars_1m")
+
+    result = syncer.sync_table("bars_1m")
+    assert result["mode"] == "incremental"
+    assert result["rows_pushed"] == 0 and result["verified"]
@@ -0,0 +1,143 @@
+"""
+test_orb_facts.py
+
+Unit tests for orb_facts.py - long-format ORB storage.
+
+Tests:
+- refresh_orb_facts matches the v_orb_trades unpivot of daily_features_v2
+- Date-range refresh only replaces the given days; the first one seeds the full history
+- facts_source falls back to the wide table until orb_facts holds the instrument
+- Columns missing from a wide table come back NULL
+- Instrument is taken from the source table (MPL rows labelled MGC)
+- ai_query handlers read ORB stats through orb_facts
+"""
+
+import pytest
+import duckdb
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from orb_facts import ORB_TIMES, facts_source, rebuild_orb_facts, refresh_orb_facts
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+DAYS = [date(2025, 1, 13) + timedelta(days=i) for i in range(4)]
+
+
+@pytest.fixture
+def con(tmp_path):
+    con = duckdb.connect(str(tmp_path / "gold.db"))
+    con.execute(SCHEMA.read_text())
+    for i, d in enumerate(DAYS):
+        outcome = ["WIN", "LOSS"][i % 2]
+        con.execute(
+            """
+            INSERT INTO daily_features_v2 (date_local, instrument, asia_range,
+                orb_0900_high, orb_0900_low, orb_0900_size, orb_0900_break_dir,
+                orb_0900_outcome, orb_0900_r_multiple,
+                orb_1800_high, orb_1800_low, orb_1800_size, orb_1800_break_dir, orb_1800_outcome,
+                orb_1800_r_multiple)
+            VALUES (?, 'MGC', 5.0, 2651, 2649, 2.0, 'UP', ?, ?, 2660, 2655, 5.0, 'DOWN', 'LOSS', -1.0)
+            """,
+            [d, outcome, 1.0 if outcome == "WIN" else -1.0],
+        )
+    yield con
+    con.close()
+
+
+def _facts(con, instrument="MGC"):
+    return con.execute(
+        """
+        SELECT date_local, orb_time, break_dir, outcome, r_multiple
+        FROM orb_facts WHERE instrument = ? ORDER BY 1, 2
+        """,
+        [instrument],
+    ).fetchall()
+
+
+def test_refresh_matches_v_orb_trades(con):
+    written = refresh_orb_facts(con)
+
+    expected = con.execute(
+        """
+        SELECT date_local, orb_time, break_dir, outcome, r_multiple
+        FROM v_orb_trades ORDER BY 1, 2
+        """
+    ).fetchall()
+    assert written == len(DAYS) * len(ORB_TIMES)
+    assert _facts(con) == expected
+
+
+def test_range_refresh_only_touches_given_days(con):
+    refresh_orb_facts(con)
+    con.execute("UPDATE daily_features_v2 SET orb_0900_high = 2700 WHERE date_local IN (?, ?)", DAYS[:2])
+
+    refresh_orb_facts(con, start_date=DAYS[1], end_date=DAYS[1])
+
+    highs = dict(con.execute(
+        "SELECT date_local, orb_high FROM orb_facts WHERE orb_time = '0900'"
+    ).fetchall())
+    assert highs[DAYS[0]] == 2651
+    assert highs[DAYS[1]] == 2700
+    assert con.execute("SELECT COUNT(*) FROM orb_facts").fetchone()[0] == len(DAYS) * len(ORB_TIMES)
+
+
+def test_first_range_refresh_seeds_history(con):
+    con.execute("CREATE TABLE daily_features_v2_nq AS SELECT * FROM daily_features_v2")
+    fallback = con.execute(f"SELECT * FROM {facts_source(con)} ORDER BY date_local, orb_time").fetchall()
+    assert facts_source(con, "NQ") != "orb_facts"
+
+    assert refresh_orb_facts(con, start_date=DAYS[-1], end_date=DAYS[-1]) == len(ORB_TIMES)
+    assert facts_source(con) == "orb_facts"
+    assert con.execute("SELECT * FROM orb_facts WHERE instrument = 'MGC' "
+                       "ORDER BY date_local, orb_time").fetchall() == fallback
+    assert len(_facts(con, "NQ")) == len(DAYS) * len(ORB_TIMES)  # every wide table seeded
+
+    con.execute("DELETE FROM orb_facts WHERE instrument = 'NQ'")
+    refresh_orb_facts(con, "daily_features_v2_nq", start_date=DAYS[0], end_date=DAYS[0])
+    assert len(_facts(con, "NQ")) == len(DAYS) * len(ORB_TIMES)
+
+
+def test_missing_wide_columns_are_null(con):
+    con.execute("""
+        CREATE TABLE daily_features_v2_nq AS
+        SELECT date_local, instrument, orb_0900_high, orb_0900_low, orb_0900_size, orb_0900_break_dir
+        FROM daily_features_v2
+    """)
+    refresh_orb_facts(con, "daily_features_v2_nq")
+
+    rows = con.execute(
+        "SELECT orb_high, break_dir, outcome, mae FROM orb_facts WHERE instrument = 'NQ' AND orb_time = '0900'"
+    ).fetchall()
+    assert rows == [(2651.0, "UP", None, None)] * len(DAYS)
+
+
+def test_instrument_comes_from_source_table(con):
+    # The MPL builder subclass writes instrument 'MGC' into its own table
+    con.execute("CREATE TABLE daily_features_v2_mpl AS SELECT * FROM daily_features_v2")
+
+    counts = rebuild_orb_facts(con)
+
+    assert counts == {"MGC": len(DAYS) * len(ORB_TIMES), "MPL": len(DAYS) * len(ORB_TIMES)}
+    assert _facts(con, "MPL") == _facts(con, "MGC")
+
+    with pytest.raises(ValueError):
+        refresh_orb_facts(con, "daily_features")
+
+
+def test_ai_query_reads_orb_facts(con, tmp_path):
+    from ai_query import AIQueryEngine
+
+    refresh_orb_facts(con)
+    con.close()
+    engine = AIQueryEngine(mgc_db_path=str(tmp_path / "gold.db"))
+
+    answer = engine.query("what is the win rate for 0900 up")
+    assert "Win Rate: 50.0%" in answer and "Total Trades: 4" in answer
+
+    day = engine.query(f"what happened on {DAYS[0]}")
+    assert "09:00" in day and "WIN" in day
+
+    comparison = engine.query("compare 0900 vs 1800")
+    assert "0900" in comparison and "1800" in comparison
@@ -0,0 +1,194 @@
+"""
+test_outcome_rollups.py
+
+Unit tests for the incremental ML monitoring rollups (ml_monitoring/outcome_logger.py).
+
+Tests:
+- Rollups maintained by log_prediction / log_outcome (incl. corrected outcomes) equal a full rebuild
+- Rolling accuracy / win rate / calibration windows match the raw rows
+- Dashboard queries read only the rollups (unchanged after raw rows are deleted)
+- No connection outlives a call: gold.db stays openable read-only; read_only loggers never write
+- Read-only readers aggregate ml_predictions when the rollups were never built
+"""
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+import duckdb
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from ml_monitoring import outcome_logger
+from ml_monitoring.outcome_logger import OutcomeLogger
+
+NOW = datetime(2025, 3, 14, 12, 0)
+
+
+class _Clock(datetime):
+    now_utc = NOW
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now_utc
+
+
+@pytest.fixture
+def ml_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(outcome_logger, "datetime", _Clock)
+    log = OutcomeLogger(str(tmp_path / "gold.db"))
+    yield log
+    log.close()
+
+
+def _simulate(log, days=6, per_day=6, seed=3):
+    rng = random.Random(seed)
+    ids = []
+    for day in range(days):
+        for i in range(per_day):
+            _Clock.now_utc = NOW - timedelta(days=days - 1 - day, hours=i)
+            confidence = rng.uniform(0.3, 0.95)
+            ids.append(log.log_prediction(
+                {"instrument": rng.choice(["MGC", "NQ"]), "orb_time": rng.choice(["0900", "1800", "0030"])},
+                {"predicted_direction": rng.choice(["UP", "DOWN"]), "confidence": confidence,
+                 "prob_up": confidence, "prob_down": 1 - confidence, "prob_none": 0.0},
+                None,
+            ))
+            if rng.random() < 0.8:
+                log.log_outcome(ids[-1], rng.choice(["UP", "DOWN", "NONE"]), rng.uniform(-1, 2), rng.random() < 0.5)
+    for pid in rng.sample(ids, 6):  # corrected outcomes replace the old contribution
+        log.log_outcome(pid, "UP", 1.5, True)
+    _Clock.now_utc = NOW
+    return ids
+
+
+def _sql(log, sql):
+    con = duckdb.connect(log.db_path)
+    try:
+        return con.execute(sql).fetchall()
+    finally:
+        con.close()
+
+
+def _rollups(log):
+    return _sql(log, "SELECT * FROM ml_rollups WHERE predictions > 0 ORDER BY ALL")
+
+
+def _raw(log):
+    con = duckdb.connect(log.db_path, read_only=True)
+    df = con.execute("SELECT * FROM ml_predictions").fetchdf()
+    con.close()
+    df["date_local"] = df["timestamp_utc"].dt.date
+    return df[df["actual_direction"].notna()]
+
+
+def test_incremental_rollups_equal_rebuild(ml_log):
+    _simulate(ml_log)
+    incremental = _rollups(ml_log)
+    confusion = _sql(ml_log, "SELECT * FROM ml_confusion WHERE n > 0 ORDER BY ALL")
+
+    ml_log.rebuild_rollups()
+    rebuilt = _rollups(ml_log)
+    assert [r[:4] for r in rebuilt] == [r[:4] for r in incremental]
+    assert [r[4:] for r in rebuilt] == [pytest.approx(r[4:]) for r in incremental]
+    assert _sql(ml_log, "SELECT * FROM ml_confusion WHERE n > 0 ORDER BY ALL") == confusion
+
+    raw = _raw(ml_log)
+    totals = _sql(ml_log, "SELECT SUM(predictions), SUM(outcomes), SUM(correct), SUM(wins) FROM ml_rollups")[0]
+    assert totals == (36, len(raw), (raw["predicted_direction"] == raw["actual_direction"]).sum(), raw["win"].sum())
+
+    # A logger opened on a DB that predates the rollups backfills them once
+    _sql(ml_log, "DROP TABLE ml_rollups")
+    _sql(ml_log, "DROP TABLE ml_confusion")
+    OutcomeLogger(ml_log.db_path)
+    assert _rollups(ml_log) == rebuilt
+
+
+def test_rolling_windows_match_raw_rows(ml_log):
+    _simulate(ml_log)
+    raw = _raw(ml_log)
+    raw = raw[raw["instrument"] == "MGC"]
+
+    daily = ml_log.daily_performance(days=30, instrument="MGC", window=3).set_index("date_local")
+    for day, row in daily.iterrows():
+        window = raw[(raw["date_local"] <= day.date()) & (raw["date_local"] > day.date() - timedelta(days=3))]
+        correct = (window["predicted_direction"] == window["actual_direction"])
+        assert row["rolling_accuracy"] == pytest.approx(correct.mean())
+        assert row["rolling_win_rate"] == pytest.approx(window["win"].mean())
+        assert row["rolling_calibration_gap"] == pytest.approx(window["confidence"].mean() - correct.mean(), abs=1e-6)
+
+        same_day = raw[raw["date_local"] == day.date()]
+        assert row["directional_accuracy"] == pytest.approx(
+            (same_day["predicted_direction"] == same_day["actual_direction"]).mean(), nan_ok=True)
+        assert row["avg_r_multiple"] == pytest.approx(same_day["actual_r_multiple"].mean(), abs=1e-6, nan_ok=True)
+    assert len(daily) == 6
+
+    by_bucket = ml_log.performance_by("conf_bucket", days=30, instrument="MGC")
+    assert by_bucket["outcomes"].sum() == len(raw)
+    assert by_bucket["conf_bucket"].between(3, 9).all()
+    with pytest.raises(ValueError):
+        ml_log.performance_by("strategy_name")
+
+
+def test_dashboard_reads_only_rollups(ml_log):
+    _simulate(ml_log)
+    raw = _raw(ml_log)
+    recent = raw[(raw["instrument"] == "NQ") & (raw["date_local"] >= (NOW - timedelta(days=5)).date())]
+
+    performance = ml_log.get_recent_performance(days=5, instrument="NQ")
+    assert performance["avg_accuracy"] == pytest.approx(
+        (recent["predicted_direction"] == recent["actual_direction"]).mean())
+    assert performance["completed_predictions"] == len(recent)
+    confusion = ml_log.confusion_matrix(days=5, instrument="NQ")
+    expected = pd.crosstab(recent["predicted_direction"], recent["actual_direction"], margins=True)
+    assert (confusion.values == expected.values).all()
+
+    _sql(ml_log, "DELETE FROM ml_predictions")
+    assert ml_log.get_recent_performance(days=5, instrument="NQ") == performance
+    assert (ml_log.confusion_matrix(days=5, instrument="NQ").values == expected.values).all()
+
+    ml_log.compute_daily_performance(str(NOW.date()), "NQ")
+    today = recent[recent["date_local"] == NOW.date()]
+    row = _sql(ml_log, "SELECT total_predictions, correct_predictions FROM ml_performance WHERE instrument = 'NQ'")[0]
+    assert row == (len(today), (today["predicted_direction"] == today["actual_direction"]).sum())
+
+
+def test_no_connection_held_between_calls(ml_log):
+    ids = _simulate(ml_log, days=3)
+
+    # A read-only open in this process would fail if the logger still held gold.db read-write
+    con = duckdb.connect(ml_log.db_path, read_only=True)
+    try:
+        reader = OutcomeLogger(ml_log.db_path, read_only=True)
+        assert reader.get_recent_performance(days=5, instrument="MGC") == \
+            ml_log.get_recent_performance(days=5, instrument="MGC")
+        assert len(reader.recent_predictions(days=5, instrument="NQ")) > 0
+    finally:
+        con.close()
+
+    reader.log_outcome(ids[0], "UP", 1.0, True)  # refused (logged), nothing written
+    assert reader.log_prediction({}, {"predicted_direction": "UP", "confidence": 0.5, "prob_up": 0.5,
+                                      "prob_down": 0.5, "prob_none": 0.0}, None) is None
+    assert _sql(ml_log, "SELECT count(*) FROM ml_predictions")[0][0] == len(ids)
+
+    missing = OutcomeLogger(str(Path(ml_log.db_path).with_name("absent.db")), read_only=True)
+    assert missing.daily_performance().empty and not Path(missing.db_path).exists()
+
+
+def test_reader_falls_back_to_predictions_without_rollups(ml_log):
+    _simulate(ml_log)
+    performance = ml_log.get_recent_performance(days=5, instrument="MGC")
+    daily = ml_log.daily_performance(days=30, instrument="MGC", window=3)
+    confusion = ml_log.confusion_matrix(days=5, instrument="MGC")
+    assert performance["total_predictions"] > 0
+
+    _sql(ml_log, "DROP TABLE ml_rollups")
+    _sql(ml_log, "DROP TABLE ml_confusion")
+    reader = OutcomeLogger(ml_log.db_path, read_only=True)
+    assert reader.get_recent_performance(days=5, instrument="MGC") == pytest.approx(performance)
+    pd.testing.assert_frame_equal(reader.daily_performance(days=30, instrument="MGC", window=3), daily,
+                                  check_dtype=False)
+    assert (reader.confusion_matrix(days=5, instrument="MGC").values == confusion.values).all()
+    assert _sql(ml_log, "SELECT count(*) FROM information_schema.tables WHERE table_name = 'ml_rollups'") == [(0,)]
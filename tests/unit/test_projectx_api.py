@@ -0,0 +1,173 @@
+"""
+test_projectx_api.py
+
+Unit tests for projectx_api.py against the local fake ProjectX server
+(tests/utils/fake_projectx.py).
+
+Tests:
+- Many requests reuse one keep-alive connection and one login
+- Expired token (401) triggers a single re-login
+- 429/503 are retried with backoff; Retry-After is honoured
+- Retries give up after max_retries
+- Rate limiter spaces requests beyond the per-endpoint window
+- Async session fetches windows concurrently over a shared pool, reusing the sync token
+- Settings without a base URL fail clearly; the default URL is used when unset
+- Sessions are shared per credentials, including the API key
+- backfill_range.ProjectX and ProjectXClient share one session
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from projectx_api import (
+    AsyncProjectXSession, ProjectXError, ProjectXSession, ProjectXSettings, RateLimiter,
+    DEFAULT_BASE_URL, get_session, close_sessions,
+)
+from tests.utils.fake_projectx import FakeProjectXServer
+
+WINDOW = ("2025-01-13T23:00:00Z", "2025-01-14T00:00:00Z")
+
+
+@pytest.fixture
+def server():
+    with FakeProjectXServer() as server:
+        yield server
+
+
+def _settings(server, **overrides):
+    return ProjectXSettings(base_url=server.url, username="user", api_key="key", **overrides)
+
+
+def _session(server, sleeps=None, **overrides):
+    sleeps = sleeps if sleeps is not None else []
+    return ProjectXSession(_settings(server, **overrides), sleep=sleeps.append)
+
+
+def test_requests_reuse_connection_and_token(server):
+    with _session(server) as session:
+        contract = session.active_contract("MGC")
+        for _ in range(5):
+            bars = session.retrieve_bars(contract["id"], *WINDOW)
+
+    assert contract["name"] == "MGCG6"
+    assert len(bars) == 60
+    assert server.logins == 1
+    assert server.connections == 1
+    assert session.stats["requests"] == 7
+
+
+def test_expired_token_relogins_once(server):
+    with _session(server) as session:
+        session.contract_search("MGC")
+        server.expire_tokens()
+        session.contract_search("MGC")
+
+    assert server.logins == 2
+    assert server.requests["/api/Contract/search"] == 3  # 200, 401, 200
+
+
+def test_retry_with_backoff_and_retry_after(server):
+    sleeps = []
+    server.fail_next("/api/History/retrieveBars", 503, times=1)
+    server.fail_next("/api/History/retrieveBars", 429, times=1, retry_after=2)
+
+    with _session(server, sleeps) as session:
+        bars = session.retrieve_bars("CON.F.US.MGC.G26", *WINDOW)
+
+    assert len(bars) == 60
+    assert session.stats["retries"] == 2
+    assert 0 <= sleeps[0] <= session.settings.backoff_base
+    assert sleeps[1] == 2.0
+
+
+def test_retries_give_up(server):
+    server.fail_next("/api/Contract/available", 500, times=10)
+
+    with _session(server, max_retries=2) as session:
+        with pytest.raises(ProjectXError, match="HTTP 500"):
+            session.list_available_contracts()
+
+    assert server.requests["/api/Contract/available"] == 3
+
+
+def test_bad_credentials_raise(server):
+    session = ProjectXSession(ProjectXSettings(base_url=server.url, username="user", api_key="wrong"))
+    with session, pytest.raises(ProjectXError, match="Login failed"):
+        session.login()
+
+
+def test_rate_limiter_spaces_requests():
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter({"/bars": (2, 10.0)}, default=(100, 1.0), clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.acquire("/bars")
+    limiter.acquire("/other")
+
+    assert waits == [10.0]
+
+
+def test_async_session_fetches_concurrently(server):
+    async def run(session):
+        async with AsyncProjectXSession.from_session(session, concurrency=4) as async_session:
+            windows = [(f"2025-01-{d:02d}T23:00:00Z", f"2025-01-{d + 1:02d}T00:00:00Z") for d in range(6, 14)]
+            return await async_session.retrieve_bars_many(contract["id"], windows)
+
+    with _session(server) as session:
+        contract = session.active_contract("MGC")
+        results = asyncio.run(run(session))
+        history = len(session.rate_limiter._sent["/api/History/retrieveBars"])
+
+    assert [len(bars) for bars in results] == [60] * 8
+    assert results[0][0]["t"] == "2025-01-06T23:00:00Z"
+    assert server.logins == 1
+    assert server.connections <= 1 + 4
+    assert history == 8  # async requests count against the sync session's window
+
+
+def test_settings_validation_and_session_key(server, monkeypatch):
+    from app.data import projectx_client
+
+    with pytest.raises(ProjectXError, match="PROJECTX_BASE_URL"):
+        ProjectXSettings(base_url=None, username="user", api_key="key")
+    monkeypatch.delenv("PROJECTX_BASE_URL", raising=False)
+    assert ProjectXSettings.from_env().base_url == "https://api.topstepx.com"
+
+    close_sessions()
+    try:
+        monkeypatch.setattr(projectx_client, "BASE_URL", DEFAULT_BASE_URL)
+        client = projectx_client.ProjectXClient(username="user", api_key="key")
+        assert client.session.settings.base_url == DEFAULT_BASE_URL
+        assert get_session(_settings(server)) is not get_session(
+            ProjectXSettings(base_url=server.url, username="user", api_key="other")
+        )
+    finally:
+        close_sessions()
+
+
+def test_call_sites_share_one_session(server):
+    from app.data.projectx_client import ProjectXClient
+    from backfill_range import Cfg, ProjectX
+
+    close_sessions()
+    try:
+        px = ProjectX(Cfg(base_url=server.url, username="user", api_key="key"))
+        client = ProjectXClient(base_url=server.url, username="user", api_key="key", live=False)
+        assert px.session is client.session is get_session(_settings(server))
+
+        px.login_key()
+        client.login()
+        info = client.get_active_mgc_contract_info()
+        assert info == {"contract_id": "CON.F.US.MGC.G26", "source_symbol": "MGCG6"}
+        assert len(px.retrieve_bars(info["contract_id"], *WINDOW)) == 60
+        assert server.logins == 1
+    finally:
+        close_sessions()
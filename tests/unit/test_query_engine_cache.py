@@ -0,0 +1,144 @@
+"""
+test_query_engine_cache.py
+
+Unit tests for query_engine.py result caching.
+
+Tests:
+- In-memory filtering of orb_facts matches the SQL WHERE clause on v_orb_trades
+- A dashboard (stats, equity, histogram, heatmap, drilldown) runs one base query and one version check per call
+- Base frames are bounded across connections
+- Writing to daily_features_v2 invalidates the cache
+- Without orb_facts the base frame is unpivoted from daily_features_v2
+- Vectorized filtered_out_reason
+"""
+
+import pytest
+import duckdb
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import query_engine as qe
+from orb_facts import refresh_orb_facts
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+
+
+def _filters(**overrides):
+    base = dict(
+        start_date=None, end_date=None, orb_times=(), break_dir="ANY", outcomes=(),
+        asia_type_code=None, include_null_asia=True, london_type_code=None, include_null_london=True,
+        pre_ny_type_code=None, include_null_pre_ny=True, enable_atr_filter=False, atr_min=None,
+        atr_max=None, enable_asia_range_filter=False, asia_range_min=None, asia_range_max=None,
+    )
+    base.update(overrides)
+    return qe.Filters(**base)
+
+
+@pytest.fixture
+def con(tmp_path):
+    con = duckdb.connect(str(tmp_path / "gold.db"))
+    con.execute(SCHEMA.read_text())
+    for i in range(20):
+        d = date(2025, 1, 1) + timedelta(days=i)
+        outcome = ["WIN", "LOSS", "NO_TRADE"][i % 3]
+        con.execute(
+            """
+            INSERT INTO daily_features_v2 (date_local, instrument, asia_type_code, london_type_code,
+                asia_range, atr_20, orb_0900_high, orb_0900_low, orb_0900_size,
+                orb_0900_break_dir, orb_0900_outcome, orb_0900_r_multiple,
+                orb_1000_high, orb_1000_low, orb_1000_size,
+                orb_1000_break_dir, orb_1000_outcome, orb_1000_r_multiple)
+            VALUES (?, 'MGC', ?, ?, ?, ?, 2651, 2649, ?, ?, ?, ?, 2652, 2650, 2.0, 'DOWN', 'WIN', 1.0)
+            """,
+            [d, "A1" if i % 2 else None, "L1" if i % 4 else "L2", 5.0 + i, 10.0 + i,
+             1.0 + i, "UP" if outcome != "NO_TRADE" else "NONE", outcome,
+             {"WIN": 1.0, "LOSS": -1.0}.get(outcome)],
+        )
+    refresh_orb_facts(con)
+    qe.clear_cache()
+    yield con
+    con.close()
+    qe.clear_cache()
+
+
+@pytest.mark.parametrize("filters", [
+    _filters(),
+    _filters(start_date="2025-01-05", end_date="2025-01-12", orb_times=("0900",)),
+    _filters(break_dir="UP", outcomes=("WIN", "LOSS")),
+    _filters(asia_type_code="A1", include_null_asia=False, london_type_code="L1"),
+    _filters(asia_type_code="A1", enable_atr_filter=True, atr_min=12.0, atr_max=25.0),
+    _filters(enable_asia_range_filter=True, asia_range_min=8.0),
+])
+def test_memory_filter_matches_sql(con, filters):
+    where_sql, params = qe._build_where_clause(filters, table_alias="v")
+    expected = con.execute(
+        f"SELECT v.date_local, v.orb_time FROM v_orb_trades v {where_sql} ORDER BY 1, 2", params
+    ).fetchall()
+
+    got = qe._fetch_base_frame(con, filters)
+    assert [(r.date_local.date(), r.orb_time) for r in got.itertuples()] == [(d, o) for d, o in expected]
+
+
+def test_dashboard_runs_one_base_query(con, monkeypatch):
+    calls = []
+    original = qe._query_base_frame
+    monkeypatch.setattr(qe, "_query_base_frame", lambda c: calls.append(1) or original(c))
+
+    filters = _filters(orb_times=("0900", "1000"))
+    qe.headline_stats(con, filters)
+    qe.equity_curve(con, filters)
+    qe.histogram(con, filters)
+    qe.heatmap(con, filters)
+    qe.drilldown(con, filters)
+
+    assert len(calls) == 1
+
+    versions = []
+    original_version = qe.data_version
+    monkeypatch.setattr(qe, "data_version", lambda c: versions.append(1) or original_version(c))
+    qe.headline_stats(con, _filters(orb_times=("1000",)))
+    assert len(versions) == 1
+
+
+def test_base_cache_is_bounded(con, monkeypatch):
+    monkeypatch.setattr(qe, "BASE_CACHE_SIZE", 2)
+    cursors = [con.cursor() for _ in range(3)]
+    for cursor in cursors:
+        qe._materialized_base(cursor)
+    assert list(qe._BASE_CACHE) == [id(c) for c in cursors[1:]]
+
+
+def test_data_change_invalidates_cache(con):
+    filters = _filters()
+    before = qe.headline_stats(con, filters)["opportunities"]
+
+    con.execute("""
+        INSERT INTO daily_features_v2 (date_local, instrument, orb_0900_outcome)
+        VALUES (DATE '2025-02-01', 'MGC', 'WIN')
+    """)
+    refresh_orb_facts(con, start_date=date(2025, 2, 1))
+    after = qe.headline_stats(con, filters)["opportunities"]
+
+    assert after == before + 6
+
+
+def test_base_frame_without_orb_facts(con):
+    expected = qe._query_base_frame(con)
+    con.execute("DROP TABLE orb_facts")
+
+    got = qe._query_base_frame(con)
+    assert got.equals(expected)
+
+
+def test_vectorized_fail_reasons(con):
+    strategy = qe.StrategyConfig(**{**qe.serialize_strategy(qe.default_strategy()), "max_stop_ticks": 10})
+    df = qe.strategy_dataset(con, _filters(orb_times=("0900",)), strategy)
+
+    no_trade = df["outcome"] == "NO_TRADE"
+    assert (df.loc[no_trade, "filtered_out_reason"] == "no_break").all()
+    too_large = ~no_trade & (df["orb_size"] > 10)
+    assert (df.loc[too_large, "filtered_out_reason"] == "stop_too_large").all()
+    assert df.loc[~no_trade & ~too_large, "filtered_out_reason"].isna().all()
+    assert df["eligible_trade"].sum() == (~no_trade & ~too_large).sum()
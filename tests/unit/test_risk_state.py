@@ -0,0 +1,140 @@
+"""
+test_risk_state.py
+
+Unit tests for event-sourced risk state (risk_state.py, RiskManager, PositionTracker).
+
+Tests:
+- A restarted RiskManager keeps open positions, realized P&L and the daily loss lock
+- Snapshot + tail recovery equals full replay; compact keeps recovery intact
+- Vectorized mark_to_market matches per-position update_position_pnl; marks logged once per bar
+"""
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "trading_app"))
+from risk_manager import Position, RiskLimits, RiskManager
+from position_tracker import PositionTracker
+from risk_state import RiskStateStore
+
+TZ = ZoneInfo("Australia/Brisbane")
+
+
+def _limits():
+    return RiskLimits(daily_loss_dollars=1000.0, daily_loss_r=10.0, weekly_loss_dollars=3000.0,
+                      weekly_loss_r=30.0, max_concurrent_positions=3, max_position_size_pct=2.0,
+                      max_correlated_positions=3)
+
+
+def _position(pid, instrument="MGC", direction="LONG", entry=2050.0, size=1):
+    stop = entry - 5.0 if direction == "LONG" else entry + 5.0
+    return Position(pid, instrument, direction, entry, stop, entry + 10.0, size,
+                    datetime.now(TZ), risk_dollars=50.0 * size, risk_r=1.0)
+
+
+def _state(manager):
+    return (
+        {k: (p.entry_price, p.current_pnl_dollars) for k, p in manager.active_positions.items()},
+        [(p.position_id, p.exit_price, p.current_pnl_dollars) for p in manager.closed_positions],
+        manager.daily_pnl, manager.weekly_pnl, manager.emergency_stop,
+    )
+
+
+def test_restart_keeps_loss_limits(tmp_path):
+    db = str(tmp_path / "state.db")
+    store = RiskStateStore(db)
+    manager = RiskManager(10000.0, _limits(), TZ, store=store)
+
+    assert manager.add_position(_position("p1", size=3))[0]
+    assert manager.add_position(_position("p2"))[0]
+    manager.remove_position("p1", 2010.0, datetime.now(TZ))  # -40 pts x 3 x $10 = -$1200
+    assert manager.is_trading_allowed()[0] is False
+
+    tracker = PositionTracker(TZ, store=store)
+    tracker.check_position_alerts({"id": "p2", "entry_price": 2050.0, "stop_price": 2045.0,
+                                   "direction": "LONG"}, 2056.0)
+    tracker.acknowledge_alert("p2", "BE_REMINDER")
+    store.close()
+
+    store = RiskStateStore(db)
+    restarted = RiskManager(10000.0, _limits(), TZ, store=store)
+    assert _state(restarted) == _state(manager)
+    assert restarted.get_daily_pnl()[0] == -1200.0
+    allowed, reason = restarted.is_trading_allowed()
+    assert not allowed and "Daily loss limit" in reason
+
+    alerts = PositionTracker(TZ, store=store).position_alerts
+    assert [(a.position_id, a.alert_type, a.acknowledged) for a in alerts] == [("p2", "BE_REMINDER", True)]
+    store.close()
+
+
+def _trade_session(manager, start, seed=5):
+    rng = random.Random(seed)
+    for i in range(60):
+        bar = start + timedelta(minutes=i)
+        open_ids = list(manager.active_positions)
+        if open_ids and rng.random() < 0.4:
+            manager.remove_position(open_ids[0], 2050.0 + rng.uniform(-4, 4), bar)
+        elif len(open_ids) < 3:
+            manager.add_position(_position(f"p{i}", direction=rng.choice(["LONG", "SHORT"])))
+        manager.mark_to_market({"MGC": 2050.0 + rng.uniform(-3, 3)}, bar_ts=bar)
+        if i == 30:
+            manager.emergency_stop_all()
+            manager.reset_emergency_stop()
+
+
+def test_snapshot_plus_tail_equals_full_replay(tmp_path):
+    snap = RiskStateStore(str(tmp_path / "snap.db"), snapshot_every=7)
+    full = RiskStateStore(str(tmp_path / "full.db"), snapshot_every=10 ** 9)
+    managers = [RiskManager(100000.0, _limits(), TZ, store=s) for s in (snap, full)]
+    start = datetime.now(TZ) - timedelta(hours=2)
+    for m in managers:
+        _trade_session(m, start)
+
+    assert snap.con.execute("SELECT count(*) FROM risk_snapshots").fetchone()[0] > 1
+    state, tail = snap.load("risk")
+    assert state is not None and len(tail) < 7
+
+    assert _state(RiskManager(100000.0, _limits(), TZ, store=snap)) == _state(managers[0])
+    assert _state(RiskManager(100000.0, _limits(), TZ, store=full)) == _state(managers[1])
+    assert _state(managers[0]) == _state(managers[1])
+
+    assert snap.compact("risk", keep_days=0) > 0
+    assert snap.con.execute("SELECT count(*) FROM risk_snapshots").fetchone()[0] == 1
+    assert _state(RiskManager(100000.0, _limits(), TZ, store=snap)) == _state(managers[0])
+
+
+def test_vectorized_mark_matches_update_pnl(tmp_path):
+    store = RiskStateStore(str(tmp_path / "state.db"))
+    limits = _limits()
+    limits.max_concurrent_positions = 10
+    vectorized = RiskManager(100000.0, limits, TZ, store=store)
+    looped = RiskManager(100000.0, limits, TZ)
+
+    specs = [("MGC", "LONG", 2050.0, 2), ("MGC", "SHORT", 2048.0, 1), ("NQ", "LONG", 21000.0, 1),
+             ("MPL", "SHORT", 980.0, 1), ("ES", "LONG", 6000.0, 1)]
+    for i, (instrument, direction, entry, size) in enumerate(specs):
+        for m in (vectorized, looped):
+            m.add_position(_position(f"p{i}", instrument, direction, entry, size))
+
+    prices = {"MGC": 2053.5, "NQ": 20990.0, "MPL": 975.5}
+    vectorized.mark_to_market(prices, bar_ts=datetime(2025, 1, 6, 14, 0, tzinfo=TZ))
+    for pid, p in looped.active_positions.items():
+        if p.instrument in prices:
+            looped.update_position_pnl(pid, prices[p.instrument])
+
+    for pid, p in looped.active_positions.items():
+        assert vectorized.active_positions[pid].current_pnl_dollars == p.current_pnl_dollars
+        assert vectorized.active_positions[pid].current_pnl_r == p.current_pnl_r
+    assert vectorized.active_positions["p4"].current_pnl_dollars == 0.0
+
+    # Same bar refreshed again: memory only; next bar: one more event
+    count = lambda: store.con.execute("SELECT count(*) FROM risk_events WHERE event = 'MARKED'").fetchone()[0]
+    vectorized.mark_to_market({"MGC": 2060.0}, bar_ts=datetime(2025, 1, 6, 14, 0, tzinfo=TZ))
+    assert count() == 1 and vectorized.active_positions["p0"].current_pnl_dollars == 200.0
+    vectorized.mark_to_market({"MGC": 2061.0}, bar_ts=datetime(2025, 1, 6, 14, 1, tzinfo=TZ))
+    assert count() == 2
+    store.close()
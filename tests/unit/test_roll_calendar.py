@@ -0,0 +1,148 @@
+"""
+test_roll_calendar.py
+
+Unit tests for roll_calendar.py and its use in backfill_range.py.
+
+Tests:
+- Front contract per day is learned from bars_1m volume (roll on crossover)
+- Lookups inside ranges, in gaps and past the end of the calendar
+- Recorded days persist and extend ranges; ranges never overlap (newer confirmations clip older ones)
+- With a calendar hint, a backfill day costs one retrieveBars request
+- Calendar days are prefetched concurrently, one request per day
+"""
+
+import pytest
+import duckdb
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from roll_calendar import RollCalendar
+from tests.utils.fake_projectx import FakeProjectXServer
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+BRISBANE = timezone(timedelta(hours=10))
+
+
+def _day_bars(day, volumes):
+    """Bars at 10:00 local on `day` for each (contract, volume)"""
+    start = datetime(day.year, day.month, day.day, 10, 0, tzinfo=BRISBANE)
+    return [
+        (start + timedelta(minutes=i), "MGC", contract, 2650.0, 2651.0, 2649.0, 2650.5, volume)
+        for i, (contract, volume) in enumerate(volumes)
+    ]
+
+
+@pytest.fixture
+def con(tmp_path):
+    con = duckdb.connect(str(tmp_path / "gold.db"))
+    con.execute(SCHEMA.read_text())
+    rows = []
+    for i in range(6):
+        day = date(2025, 2, 3) + timedelta(days=i)
+        # MGCG5 front until Feb 4, MGCJ5 volume overtakes from Feb 5
+        rows += _day_bars(day, [("MGCG5", 100 - 15 * i), ("MGCJ5", 20 + 30 * i)])
+    con.executemany("INSERT INTO bars_1m VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    yield con
+    con.close()
+
+
+def test_learns_roll_from_volume_crossover(con):
+    calendar = RollCalendar(con, "MGC")
+    assert calendar.learn_from_bars() == 6
+
+    assert [(e.contract, e.first_date, e.last_date) for e in calendar.entries] == [
+        ("MGCG5", date(2025, 2, 3), date(2025, 2, 4)),
+        ("MGCJ5", date(2025, 2, 5), date(2025, 2, 8)),
+    ]
+    # Persisted
+    assert RollCalendar(con, "MGC").entries == calendar.entries
+
+
+def test_contract_lookup(con):
+    calendar = RollCalendar(con, "MGC")
+    calendar.learn_from_bars()
+
+    assert calendar.contract_for(date(2025, 2, 4)).contract == "MGCG5"
+    assert calendar.contract_for(date(2025, 2, 7)).contract == "MGCJ5"
+    assert calendar.contract_for(date(2025, 3, 1)).contract == "MGCJ5"
+    assert calendar.contract_for(date(2025, 3, 1), exact=True) is None
+    assert calendar.contract_for(date(2025, 1, 1)) is None
+
+
+def test_record_extends_range(con):
+    calendar = RollCalendar(con, "MGC")
+    calendar.learn_from_bars()
+    calendar.record(date(2025, 2, 10), "MGCJ5", "CON.F.US.MGC.J25")
+
+    entry = RollCalendar(con, "MGC").contract_for(date(2025, 2, 10), exact=True)
+    assert (entry.contract, entry.last_date, entry.contract_id) == ("MGCJ5", date(2025, 2, 10), "CON.F.US.MGC.J25")
+
+    # Learning resumes from the last known day without shrinking ranges
+    assert calendar.learn_from_bars() == 0
+
+
+def test_confirmations_clip_overlapping_ranges(con):
+    calendar = RollCalendar(con, "MGC")
+    calendar.learn_from_bars()
+    calendar.record(date(2025, 2, 6), "MGCG5")   # old contract still returned bars after the roll
+    calendar.record(date(2025, 2, 2), "MGCZ4")
+
+    expected = [
+        ("MGCZ4", date(2025, 2, 2), date(2025, 2, 2)),
+        ("MGCG5", date(2025, 2, 3), date(2025, 2, 6)),
+        ("MGCJ5", date(2025, 2, 7), date(2025, 2, 8)),
+    ]
+    assert [(e.contract, e.first_date, e.last_date) for e in calendar.entries] == expected
+    assert [(e.contract, e.first_date, e.last_date) for e in RollCalendar(con, "MGC").entries] == expected
+
+    calendar.record(date(2025, 2, 8), "MGCG5")   # covers MGCJ5 entirely
+    assert [e.contract for e in RollCalendar(con, "MGC").entries] == ["MGCZ4", "MGCG5"]
+
+
+def test_hint_costs_one_request(con):
+    from backfill_range import Cfg, ProjectX, pick_contract_for_day
+    from projectx_api import close_sessions
+
+    contracts = [
+        {"id": f"CON.F.US.MGC.{c}", "name": f"MGC{c}", "activeContract": c == "M6"}
+        for c in ("M6", "J6", "G6", "Z5", "V5")
+    ]
+    with FakeProjectXServer(contracts=contracts) as server:
+        close_sessions()
+        try:
+            px = ProjectX(Cfg(base_url=server.url, username="user", api_key="key"))
+            px.login_key()
+            window = ("2025-02-03T23:00:00Z", "2025-02-04T23:00:00Z")
+
+            hint = contracts[3]
+            picked, bars = pick_contract_for_day(px, contracts, *window, preferred=None, hint=hint)
+
+            assert picked is hint and len(bars) > 0
+            assert server.requests["/api/History/retrieveBars"] == px.bar_requests == 1
+        finally:
+            close_sessions()
+
+
+def test_hinted_days_prefetched_concurrently():
+    from backfill_range import Cfg, ProjectX, prefetch_hinted_days
+    from projectx_api import close_sessions
+
+    contracts = [{"id": f"CON.F.US.MGC.{c}", "name": f"MGC{c}", "activeContract": c == "J5"} for c in ("J5", "G5")]
+    days = [date(2025, 2, 3) + timedelta(days=i) for i in range(4)]
+    windows = {d: (f"{d}T00:00:00Z", f"{d}T01:00:00Z") for d in days}
+    hints = {d: contracts[i % 2] for i, d in enumerate(days)}
+    with FakeProjectXServer(contracts=contracts) as server:
+        close_sessions()
+        try:
+            px = ProjectX(Cfg(base_url=server.url, username="user", api_key="key"))
+            px.login_key()
+            bars = prefetch_hinted_days(px, hints, windows)
+
+            assert sorted(bars) == days and all(len(b) == 60 for b in bars.values())
+            assert bars[days[2]][0]["t"] == "2025-02-05T00:00:00Z"
+            assert server.requests["/api/History/retrieveBars"] == px.bar_requests == 4
+            assert server.logins == 1
+        finally:
+            close_sessions()
@@ -0,0 +1,114 @@
+"""
+test_signal_dsl.py
+
+Unit tests for signal_dsl.py (declarative conditions and batch template scan).
+
+Tests:
+- Numpy masks match the compiled DuckDB expressions, NULLs and division by zero included
+- Parser builds the same trees as the operator API and rejects anything else
+- TemplateScanner stats match a per-row simulation of the same templates
+"""
+
+import random
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from signal_dsl import Evaluator, Template, TemplateScanner, coalesce, col, mask_query, parse
+
+
+@pytest.fixture
+def frame():
+    rng = random.Random(11)
+    n = 400
+    df = pd.DataFrame({
+        "date_local": pd.date_range("2024-01-01", periods=n),
+        "orb_1800_size": [rng.choice([None, 0.0, rng.uniform(0.5, 8.0)]) for _ in range(n)],
+        "atr_20": [rng.choice([None, 0.0, rng.uniform(5.0, 30.0), rng.uniform(5.0, 30.0)]) for _ in range(n)],
+        "orb_1800_break_dir": [rng.choice([None, "UP", "DOWN", "NONE"]) for _ in range(n)],
+        "orb_1800_outcome": [rng.choice([None, "WIN", "LOSS", "NO_TRADE"]) for _ in range(n)],
+        "orb_1800_r_multiple": [rng.choice([None, -1.0, rng.uniform(0.5, 3.0)]) for _ in range(n)],
+        "orb_0900_break_dir": [rng.choice([None, "UP", "DOWN"]) for _ in range(n)],
+    })
+    for c in ("orb_1800_size", "atr_20", "orb_1800_r_multiple"):
+        df[c] = df[c].astype(float)
+    return df
+
+
+CONDITIONS = [
+    "orb_1800_size / atr_20 <= 0.3",
+    "not (orb_1800_size / atr_20 > 0.3)",
+    "atr_20 is None or orb_1800_size / atr_20 < 0.5",
+    "orb_1800_outcome in ('WIN', 'LOSS') and orb_1800_break_dir != 'NONE'",
+    "orb_1800_outcome not in ('WIN',) or -orb_1800_size < -4",
+    "coalesce(orb_0900_break_dir == 'UP', False) + (orb_1800_break_dir == 'UP') >= 1",
+    "0.1 < orb_1800_size / atr_20 <= 0.5 and notna(orb_0900_break_dir)",
+    "abs(orb_1800_r_multiple) * 2 - 1 > 0",
+]
+
+
+def test_masks_match_duckdb(frame):
+    exprs = [parse(c) for c in CONDITIONS]
+    got = Evaluator(frame).masks(exprs)
+
+    con = duckdb.connect()
+    con.register("features", frame)
+    rows = con.execute(mask_query(exprs, "features")).fetchall()
+    want = np.array([r[1:] for r in rows], dtype=bool).T
+
+    for text, g, w in zip(CONDITIONS, got, want):
+        assert (g == w).all(), text
+    assert 0 < got[0].sum() < len(frame)
+
+
+def test_parser_matches_operator_api_and_is_restricted():
+    built = (col("orb_1800_size") / col("atr_20") <= 0.3) & col("orb_1800_outcome").isin(["WIN", "LOSS"])
+    assert parse("orb_1800_size / atr_20 <= 0.3 and orb_1800_outcome in ('WIN', 'LOSS')").same(built)
+    assert parse("coalesce(orb_0900_break_dir == 'UP', False)").same(coalesce(col("orb_0900_break_dir") == "UP", False))
+
+    for bad in ["__import__('os').system('x')", "atr_20.real > 1", "atr_20[0] > 1", "lambda: 1",
+                "max(atr_20) > 1", "atr_20 in other_col", "atr_20 >"]:
+        with pytest.raises(ValueError):
+            parse(bad)
+
+
+def test_scan_matches_row_by_row_simulation(frame):
+    templates = [
+        Template("all", "1800"),
+        Template("small_long", "1800", "orb_1800_size / atr_20 <= 0.3", directions=("LONG",)),
+        Template("small_short", "1800", col("orb_1800_size") / col("atr_20") <= 0.3, directions=("SHORT",)),
+        Template("asia_up", "1800", "orb_0900_break_dir == 'UP'"),
+        Template("none", "1800", "atr_20 < 0"),
+    ]
+    stats = TemplateScanner(frame).scan(templates)
+
+    for template, row in zip(templates, stats.itertuples()):
+        trades = []
+        for i, day in frame.iterrows():
+            if not template.when.mask(frame)[i]:
+                continue
+            wanted = {"LONG": "UP", "SHORT": "DOWN"}
+            if day["orb_1800_break_dir"] not in [wanted[d] for d in template.directions]:
+                continue
+            outcome = day["orb_1800_outcome"]
+            trades.append((outcome, day["orb_1800_r_multiple"] if outcome in ("WIN", "LOSS") else 0.0))
+
+        assert row.trades == len(trades), template.name
+        if not trades:
+            assert np.isnan(row.avg_r)
+            continue
+        df = pd.DataFrame(trades, columns=["outcome", "r"])
+        wins, losses = (df["outcome"] == "WIN").sum(), (df["outcome"] == "LOSS").sum()
+        assert (row.wins, row.losses) == (wins, losses)
+        assert row.win_rate == pytest.approx(wins / (wins + losses) if wins + losses else 0)
+        assert row.avg_r == pytest.approx(df["r"].mean())
+        assert row.total_r == pytest.approx(df["r"].sum())
+
+    first_half = np.arange(len(frame)) < len(frame) // 2
+    split = TemplateScanner(frame).scan(templates, rows=first_half)
+    rest = TemplateScanner(frame).scan(templates, rows=~first_half)
+    assert (split["trades"] + rest["trades"]).tolist() == stats["trades"].tolist()
@@ -0,0 +1,172 @@
+"""
+test_significance.py
+
+Unit tests for significance.py (batched resampling tests and FDR control).
+
+Tests:
+- Benjamini-Hochberg q-values match a direct step-up implementation, family_size included
+- Batched p-values equal one-candidate-at-a-time runs and a per-resample loop; null calibration
+- ValidationPipeline.apply_significance fails survivors that do not pass FDR
+- The FDR family is the whole generation run a validation batch came from, not the batch
+- submit_survivor adds the significance columns to a survivors table created before them
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "ede"))
+from significance import SignificanceTester, benjamini_hochberg
+
+
+def test_benjamini_hochberg_matches_step_up():
+    rng = np.random.default_rng(3)
+    p = np.concatenate([rng.uniform(0, 0.002, 15), rng.uniform(0, 1, 185)])
+    rng.shuffle(p)
+
+    for m in (len(p), 1000):
+        q, reject = benjamini_hochberg(p, alpha=0.05, family_size=m)
+        ranked = np.sort(p)
+        passing = [k for k in range(1, len(p) + 1) if ranked[k - 1] <= 0.05 * k / m]
+        threshold = ranked[max(passing) - 1] if passing else -1
+        assert (reject == (p <= threshold)).all()
+        for i in range(len(p)):
+            assert q[i] == pytest.approx(min(1.0, min(p[j] * m / (np.sum(p <= p[j])) for j in range(len(p)) if p[j] >= p[i])))
+
+    q, reject = benjamini_hochberg([0.001, np.nan, 0.5])
+    assert np.isnan(q[1]) and list(reject) == [True, False, False]
+
+
+def test_batched_p_values_match_single_runs():
+    rng = np.random.default_rng(8)
+    trades = {f"null_{i}": rng.choice([-1.0, 2.0], rng.integers(20, 600), p=[2 / 3, 1 / 3]) for i in range(300)}
+    trades["edge"] = rng.choice([-1.0, 2.0], 400, p=[0.5, 0.5])
+    trades["empty"] = []
+
+    stats = SignificanceTester(n_resamples=1000, seed=4, chunk=64).test(trades).set_index("idea_id")
+    for name in ("null_0", "null_7", "edge"):
+        alone = SignificanceTester(n_resamples=1000, seed=4).test({name: trades[name]}).iloc[0]
+        for column in ("p_bootstrap", "p_permutation", "ci_low", "ci_high"):
+            assert stats.loc[name, column] == pytest.approx(alone[column])
+
+    # Per-resample loop over the tester's own matrices (empirical p, no tail fit needed for a null)
+    tester = SignificanceTester(n_resamples=1000, seed=4)
+    weights, signs = tester.resamples(len(trades["null_7"]))
+    r = trades["null_7"]
+    flips = np.array([(signs[b] * r).sum() / len(r) for b in range(1000)])
+    boots = np.array([(weights[b] * r).sum() / weights[b].sum() for b in range(1000)])
+    assert stats.loc["null_7", "p_permutation"] == pytest.approx((1 + (flips >= r.mean()).sum()) / 1001)
+    assert stats.loc["null_7", "p_bootstrap"] == pytest.approx((1 + (boots - r.mean() >= r.mean()).sum()) / 1001)
+
+    nulls = stats.filter(like="null_", axis=0)["p_value"]
+    assert 0.01 < (nulls < 0.1).mean() < 0.2
+    assert stats.loc["edge", "p_value"] < 1e-4 and stats.loc["edge", "ci_low"] > 0
+    assert np.isnan(stats.loc["empty", "p_value"])
+
+    q, reject = benjamini_hochberg(stats["p_value"], alpha=0.1)
+    assert stats.index[reject].tolist() == ["edge"]
+
+
+def test_apply_significance_fails_insignificant_survivors():
+    from backtest_engine import BacktestResult, Trade
+    from validation_pipeline import ValidationPipeline, ValidationResult
+
+    rng = np.random.default_rng(1)
+
+    def result(idea_id, r, passed):
+        baseline = BacktestResult.__new__(BacktestResult)
+        baseline.trades = []
+        for value in r:
+            trade = Trade.__new__(Trade)
+            trade.r_multiple = value
+            baseline.trades.append(trade)
+        res = ValidationResult.__new__(ValidationResult)
+        res.idea_id, res.passed, res.failure_reason, res.baseline_result = idea_id, passed, None, baseline
+        res.p_value = res.q_value = None
+        return res
+
+    results = [
+        result("edge", rng.choice([-1.0, 2.0], 300, p=[0.45, 0.55]), True),
+        result("lucky", np.r_[rng.choice([-1.0, 2.0], 60, p=[2 / 3, 1 / 3]), 2.0, 2.0], True),
+        result("failed_costs", rng.choice([-1.0, 2.0], 100, p=[2 / 3, 1 / 3]), False),
+    ]
+    statuses = []
+    pipeline = ValidationPipeline.__new__(ValidationPipeline)
+    pipeline.significance = SignificanceTester(n_resamples=500)
+    pipeline.lifecycle_manager = type("Manager", (), {
+        "update_candidate_status": lambda self, idea_id, status: statuses.append((idea_id, status.value)),
+    })()
+
+    stats = pipeline.apply_significance(results, family_size=5000, alpha=0.1)
+
+    assert len(stats) == 3 and all(r.q_value is not None for r in results)
+    assert results[0].passed and results[0].q_value <= 0.1
+    assert not results[1].passed and results[1].failure_reason.startswith("Not significant")
+    assert statuses == [("lucky", "VALIDATION_FAILED")]
+    assert results[2].failure_reason is None
+
+
+def test_family_size_spans_generation_run(tmp_path):
+    import duckdb
+    from lifecycle_manager import LifecycleManager
+
+    db_path = str(tmp_path / "gold.db")
+    con = duckdb.connect(db_path)
+    con.execute("CREATE TABLE edge_candidates_raw (idea_id VARCHAR, generation_timestamp TIMESTAMPTZ, "
+                "generator_mode VARCHAR)")
+    con.execute("CREATE TABLE edge_generation_log (log_id VARCHAR, run_timestamp TIMESTAMPTZ, "
+                "generator_mode VARCHAR, candidates_accepted INTEGER)")
+    con.executemany("INSERT INTO edge_candidates_raw VALUES (?, ?::TIMESTAMPTZ, 'brute')", [
+        (f"A{i}", f"2026-01-01 10:00:{i:02d}+00") for i in range(40)
+    ] + [(f"B{i}", f"2026-01-02 10:00:{i:02d}+00") for i in range(30)])
+    con.executemany("INSERT INTO edge_generation_log VALUES (?, ?::TIMESTAMPTZ, 'brute', ?)", [
+        ("GEN_A", "2026-01-01 10:01:00+00", 40), ("GEN_B", "2026-01-02 10:01:00+00", 30),
+    ])
+    con.close()
+
+    manager = LifecycleManager(db_path)
+    assert manager.generation_family_size([f"A{i}" for i in range(5)]) == 40
+    assert manager.generation_family_size(["A39", "B0"]) == 70
+    assert manager.generation_family_size(["missing"]) == 0
+    assert manager.generation_family_size([]) == 0
+
+
+def test_submit_survivor_migrates_old_survivor_table(tmp_path):
+    import duckdb
+    from lifecycle_manager import LifecycleManager
+
+    counts = ["regime_year_count", "regime_year_profitable", "regime_volatility_count",
+              "regime_volatility_profitable", "regime_session_count", "regime_session_profitable",
+              "walkforward_windows", "walkforward_profitable", "baseline_trades"]
+    metrics = ["baseline_win_rate", "baseline_avg_r", "baseline_expectancy", "baseline_max_dd",
+               "baseline_profit_factor", "baseline_sharpe", "cost_1tick_expectancy",
+               "cost_2tick_expectancy", "cost_3tick_expectancy", "cost_atr_expectancy",
+               "cost_missedfill_expectancy", "attack_stopfirst_expectancy",
+               "attack_entrydelay_expectancy", "attack_exitdelay_expectancy",
+               "attack_noise_expectancy", "attack_shuffle_expectancy",
+               "regime_max_profit_concentration", "walkforward_avg_expectancy"]
+
+    db_path = str(tmp_path / "gold.db")
+    con = duckdb.connect(db_path)
+    con.execute("CREATE TABLE edge_candidates_raw (idea_id VARCHAR, status VARCHAR)")
+    con.execute("INSERT INTO edge_candidates_raw VALUES ('E1', 'VALIDATING')")
+    columns = ", ".join([f"{c} INTEGER" for c in counts] + [f"{c} DOUBLE" for c in metrics])
+    con.execute(f"CREATE TABLE edge_candidates_survivors (survivor_id VARCHAR, idea_id VARCHAR, "
+                f"survival_timestamp TIMESTAMP, {columns}, survival_score DOUBLE, "
+                f"confidence_level VARCHAR, status VARCHAR, results_hash VARCHAR)")
+    con.close()
+
+    data = {"idea_id": "E1", **{c: 4 for c in counts}, **{c: 0.3 for c in metrics},
+            "baseline_trades": 120, "significance_p_value": 0.001, "significance_q_value": 0.02}
+    ok, message = LifecycleManager(db_path).submit_survivor(data)
+    assert ok, message
+
+    con = duckdb.connect(db_path)
+    row = con.execute("SELECT significance_p_value, significance_q_value FROM edge_candidates_survivors").fetchone()
+    status = con.execute("SELECT status FROM edge_candidates_raw").fetchone()[0]
+    con.close()
+    assert row == (0.001, 0.02)
+    assert status == "SURVIVOR"
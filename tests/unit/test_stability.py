@@ -0,0 +1,132 @@
+"""
+test_stability.py
+
+Unit tests for stability.py (prefix-sum TradeBook).
+
+Tests:
+- Year / quarter / regime stats match a brute-force groupby per strategy
+- Rolling and expanding windows match slicing the trade list directly
+- ValidationPipeline regime tests use the book (years, ATR terciles, per-quarter stability)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "ede"))
+from stability import TradeBook, volatility_regimes
+
+
+def _max_dd(r):
+    equity = np.cumsum(np.concatenate([[0.0], r]))
+    return float((np.maximum.accumulate(equity) - equity).max())
+
+
+def _expected(group):
+    r = group["r"].to_numpy()
+    return {
+        "trades": len(r),
+        "wins": int((r > 0).sum()),
+        "losses": int((r < 0).sum()),
+        "expectancy": r.mean(),
+        "total_r": r.sum(),
+        "max_dd": _max_dd(r),
+    }
+
+
+@pytest.fixture
+def trades():
+    rng = np.random.default_rng(5)
+    n = 900
+    df = pd.DataFrame({
+        "strategy": rng.choice(["a", "b", "c"], n),
+        "date": pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.choice(1500, n, replace=False), unit="D"),
+        "r": rng.choice([-1.0, 0.0, 1.5, 2.0, -0.5], n),
+        "regime": rng.choice(["LOW", "MID", "HIGH", None], n),
+    })
+    return df.sort_values(["strategy", "date"], kind="stable").reset_index(drop=True)
+
+
+def test_periods_and_regimes_match_groupby(trades):
+    book = TradeBook.from_frame(trades.sample(frac=1, random_state=1), regime="regime")
+
+    for freq, label in (("Y", "year"), ("Q", "quarter")):
+        got = book.by_period(freq).set_index(["strategy", label])
+        keys = trades["date"].dt.year.astype(str) if freq == "Y" else trades["date"].dt.to_period("Q").astype(str)
+        for (strategy, key), group in trades.groupby(["strategy", keys]):
+            row = got.loc[(strategy, key)]
+            for stat, value in _expected(group).items():
+                assert row[stat] == pytest.approx(value), (freq, strategy, key, stat)
+        assert len(got) == trades.groupby(["strategy", keys]).ngroups
+
+    got = book.by_regime().set_index(["strategy", "regime"])
+    for (strategy, regime), group in trades.dropna(subset=["regime"]).groupby(["strategy", "regime"]):
+        for stat, value in _expected(group).items():
+            assert got.loc[(strategy, regime), stat] == pytest.approx(value)
+
+    totals = book.totals().set_index("strategy")
+    for strategy, group in trades.groupby("strategy"):
+        assert totals.loc[strategy, "max_dd"] == pytest.approx(_max_dd(group["r"].to_numpy()))
+
+
+def test_rolling_and_expanding_match_slices(trades):
+    book = TradeBook.from_frame(trades)
+    rolling = book.rolling(40, step=7)
+    expanding = book.expanding()
+
+    for strategy, group in trades.groupby("strategy"):
+        r = group["r"].to_numpy()
+        windows = rolling[rolling["strategy"] == strategy]
+        assert len(windows) == (len(r) - 40) // 7 + 1
+        for k, row in enumerate(windows.itertuples()):
+            chunk = r[k * 7:k * 7 + 40]
+            assert row.trades == 40 and row.expectancy == pytest.approx(chunk.mean())
+            assert row.max_dd == pytest.approx(_max_dd(chunk))
+
+        steps = expanding[expanding["strategy"] == strategy]
+        for k in (0, 10, len(r) - 1):
+            assert steps["total_r"].iloc[k] == pytest.approx(r[:k + 1].sum())
+            assert steps["max_dd"].iloc[k] == pytest.approx(_max_dd(r[:k + 1]))
+
+    assert book.rolling(10_000).empty
+    labels = volatility_regimes([1.0, 2.0, 3.0, np.nan, 4.0, 5.0, 6.0])
+    assert list(labels) == ["LOW", "LOW", "MID", None, "MID", "HIGH", "HIGH"]
+
+
+def test_validation_pipeline_regime_tests():
+    from backtest_engine import BacktestResult, Trade
+    from validation_pipeline import ValidationPipeline
+
+    days = pd.bdate_range("2023-01-02", "2024-12-31")
+    r = [2.0 if i % 3 else -1.0 for i in range(len(days))]
+    baseline = BacktestResult.__new__(BacktestResult)
+    baseline.instrument, baseline.start_date, baseline.end_date = "MGC", "2023-01-01", "2024-12-31"
+    baseline.trades = []
+    for day, value in zip(days, r):
+        trade = Trade.__new__(Trade)
+        trade.date_local, trade.r_multiple = day.strftime("%Y-%m-%d"), value
+        baseline.trades.append(trade)
+
+    pipeline = ValidationPipeline.__new__(ValidationPipeline)
+    pipeline.engine = type("Engine", (), {})()
+    pipeline.engine.load_daily_features = lambda *a: pd.DataFrame({
+        "date_local": days, "atr_20": np.arange(len(days), dtype=float),
+    })
+
+    results, passed = pipeline._run_regime_tests(baseline)
+    assert passed
+    assert (results["year_count"], results["year_profitable"]) == (2, 2)
+    assert (results["volatility_count"], results["volatility_profitable"]) == (3, 3)
+    assert (results["quarter_count"], results["quarter_profitable"]) == (8, 8)
+    assert not any(key.startswith("walkforward") for key in results)
+    by_year = pd.Series(r).groupby(days.year).sum()
+    assert results["max_concentration"] == pytest.approx(by_year.max() / by_year.sum())
+
+    def unavailable(*a):
+        raise RuntimeError("no db")
+    pipeline.engine.load_daily_features = unavailable
+    results, _ = pipeline._run_regime_tests(baseline)
+    assert (results["volatility_count"], results["volatility_profitable"]) == (3, 2)
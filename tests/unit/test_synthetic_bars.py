@@ -0,0 +1,83 @@
+"""
+test_synthetic_bars.py
+
+Unit tests for synthetic_bars.py (seeded bars_1m generator).
+
+Tests:
+- Same seed -> identical bars; different seed -> different bars
+- Bars respect Globex hours, ticks and OHLC ordering
+- source_symbol follows the contract calendar and rolls are learnable by RollCalendar
+- generate_bars writes into the schema.sql tables and replace=True is idempotent
+"""
+
+import datetime as dt
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from roll_calendar import RollCalendar
+from synthetic_bars import PROFILES, SyntheticBarGenerator, contract_month, contract_symbol, generate_bars
+
+SCHEMA = Path(__file__).parent.parent.parent / "schema.sql"
+START, END = dt.date(2024, 1, 1), dt.date(2024, 4, 30)
+
+
+def _bars(symbol="MGC", seed=3, start=START, end=END):
+    return pd.concat(SyntheticBarGenerator(PROFILES[symbol], seed=seed).frames(start, end), ignore_index=True)
+
+
+def test_seeded_output_is_deterministic():
+    first, second = _bars(), _bars()
+    assert first.equals(second)
+    assert not first["close"].equals(_bars(seed=4)["close"])
+
+
+def test_sessions_ticks_and_ohlc():
+    bars = _bars("NQ")
+    ny = bars["ts_utc"].dt.tz_convert("America/New_York")
+
+    assert bars["ts_utc"].is_monotonic_increasing and bars["ts_utc"].is_unique
+    assert not (ny.dt.hour == 17).any()                       # daily maintenance break
+    assert not (ny.dt.weekday == 5).any()                     # Saturday closed
+    assert not ((ny.dt.weekday == 6) & (ny.dt.hour < 18)).any()
+    assert not ((ny.dt.weekday == 4) & (ny.dt.hour >= 17)).any()
+    assert not ((ny.dt.month == 1) & (ny.dt.day == 1) & (ny.dt.hour < 17)).any()  # Jan 1
+
+    ticks = bars[["open", "high", "low", "close"]].to_numpy() / PROFILES["NQ"].tick_size
+    assert np.allclose(ticks, np.round(ticks))
+    assert (bars["high"] >= bars[["open", "close"]].max(axis=1)).all()
+    assert (bars["low"] <= bars[["open", "close"]].min(axis=1)).all()
+    assert (bars["volume"] >= 1).all()
+
+
+def test_contract_rolls():
+    mgc = PROFILES["MGC"]
+    assert contract_symbol(mgc, *contract_month(mgc, dt.date(2024, 1, 10))) == "MGCG4"
+    assert contract_symbol(mgc, *contract_month(mgc, dt.date(2024, 1, 26))) == "MGCJ4"
+    assert contract_symbol(mgc, *contract_month(mgc, dt.date(2024, 12, 30))) == "MGCG5"
+
+    con = duckdb.connect()
+    con.execute(SCHEMA.read_text())
+    generate_bars(con, ["MGC"], START, END, seed=3)
+    calendar = RollCalendar(con, "MGC")
+    calendar.learn_from_bars()
+    assert [e.contract for e in calendar.entries] == ["MGCG4", "MGCJ4", "MGCM4"]
+
+
+def test_generate_bars_replace_is_idempotent():
+    con = duckdb.connect()
+    con.execute(SCHEMA.read_text())
+    written = generate_bars(con, ["MGC", "MPL"], dt.date(2024, 3, 1), dt.date(2024, 3, 31), seed=1)
+    counts = dict(con.execute("SELECT symbol, COUNT(*) FROM bars_1m GROUP BY 1").fetchall())
+    assert counts == written and min(written.values()) > 20 * 1200
+
+    again = generate_bars(con, ["MGC"], dt.date(2024, 3, 1), dt.date(2024, 3, 31), seed=1, replace=True)
+    assert again["MGC"] == written["MGC"]
+    assert con.execute("SELECT COUNT(*) FROM bars_1m WHERE symbol = 'MGC'").fetchone()[0] == written["MGC"]
+
+    with pytest.raises(ValueError):
+        generate_bars(con, ["ES"], START, END)
@@ -0,0 +1,129 @@
+"""
+test_walkforward.py
+
+Unit tests for walk-forward training (ml_training/walkforward.py, MLTrainingPipeline.run_walkforward).
+
+Tests:
+- Folds are chronological with the gap respected; expanding vs rolling windows; final fold covers the tail
+- Fold datasets are built once and reused; cached-dataset training matches training from pandas
+- run_walkforward gives the same result pooled or serial and writes per-fold metrics to the registry
+- Fold sample weights are computed from that fold's training labels only
+"""
+
+import json
+from pathlib import Path
+import sys
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from ml_training.model_configs import MODEL_REGISTRY_CONFIG, WALKFORWARD_CONFIG
+from ml_training.walkforward import build_fold_cache, sample_params, train_trial_fold, walkforward_folds
+
+
+def _frame(n_days=240, per_day=3, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2024-01-01", periods=n_days)
+    df = pd.DataFrame({"date_local": np.repeat(days, per_day)})
+    df["atr_14"] = rng.normal(10, 2, len(df))
+    df["orb_size"] = rng.normal(3, 1, len(df))
+    df["rsi_14"] = rng.uniform(20, 80, len(df))
+    df["orb_r_multiple"] = 0.3 * df["orb_size"] - 0.1 * df["atr_14"] + rng.normal(0, 0.5, len(df))
+    return df
+
+
+def test_folds_are_chronological():
+    dates = _frame()["date_local"]
+    for mode in ("expanding", "rolling"):
+        *folds, final = walkforward_folds(dates, n_folds=4, mode=mode, gap_days=10, include_final=True)
+        assert [f.index for f in folds] == [0, 1, 2, 3]
+        tested = np.concatenate([f.test for f in folds])
+        assert (np.diff(tested) == 1).all() and tested[-1] == len(dates) - 1
+        for fold in folds:
+            assert fold.train[-1] + 1 == fold.val[0]
+            assert dates.iloc[fold.test[0]] - dates.iloc[fold.val[-1]] > pd.Timedelta(days=10)
+        assert final.val[-1] == len(dates) - 1 and len(final.test) == 0
+
+        starts = [f.train[0] for f in folds]
+        if mode == "expanding":
+            assert starts == [0] * 4
+        else:
+            assert starts == sorted(starts) and starts[-1] > 0
+
+    with pytest.raises(ValueError):
+        walkforward_folds(dates.iloc[::-1])
+
+    trials = sample_params({"a": 1, "b": 2, "c": 0}, {"a": [1, 2, 3], "b": [2, 4]}, 10)
+    assert trials[0] == {"a": 1, "b": 2, "c": 0} and len(trials) == 6
+    assert len({(t["a"], t["b"]) for t in trials}) == 6
+
+
+def test_fold_cache_built_once(tmp_path):
+    df = _frame()
+    X, y = df[["atr_14", "orb_size", "rsi_14"]], df["orb_r_multiple"]
+    fold = walkforward_folds(df["date_local"], n_folds=3)[1]
+
+    paths = build_fold_cache(tmp_path, "lightgbm", X, y, fold)
+    stamp = Path(paths["train"]).stat().st_mtime_ns
+    assert build_fold_cache(tmp_path, "lightgbm", X, y, fold) == paths
+    assert Path(paths["train"]).stat().st_mtime_ns == stamp
+    assert len(list(tmp_path.iterdir())) == 1
+
+    config = {"model_type": "lightgbm", "objective": "regression", "metric": "l1", "num_leaves": 7,
+              "min_child_samples": 5, "learning_rate": 0.1, "verbose": -1, "n_estimators": 200,
+              "early_stopping_rounds": 20, "seed": 1}
+    result = train_trial_fold({"trial": 0, "fold": fold.index, "config": config, "paths": paths,
+                               "target_type": "regression", "train_rows": len(fold.train)})
+
+    params = {k: v for k, v in config.items() if k not in ("model_type", "n_estimators", "early_stopping_rounds")}
+    train = lgb.Dataset(X.iloc[fold.train], label=y.iloc[fold.train], params={"feature_pre_filter": False})
+    val = lgb.Dataset(X.iloc[fold.val], label=y.iloc[fold.val], reference=train)
+    direct = lgb.train({**params, "num_threads": 1}, train, 200, valid_sets=[val], valid_names=["val"],
+                       callbacks=[lgb.early_stopping(20, verbose=False)])
+    assert result["best_iteration"] == direct.best_iteration
+    assert result["val_loss"] == pytest.approx(direct.best_score["val"]["l1"])
+    pred = direct.predict(X.iloc[fold.test], num_iteration=direct.best_iteration)
+    assert result["mae"] == pytest.approx(np.abs(pred - y.iloc[fold.test]).mean())
+
+
+def test_run_walkforward_saves_fold_metrics(tmp_path, monkeypatch):
+    from ml_training.train_pipeline import MLTrainingPipeline
+
+    data_path = tmp_path / "features.parquet"
+    _frame(n_days=160).to_parquet(data_path)
+    monkeypatch.setitem(WALKFORWARD_CONFIG, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setitem(MODEL_REGISTRY_CONFIG, "base_path", str(tmp_path / "registry"))
+
+    serial = MLTrainingPipeline("r_multiple").run_walkforward(str(data_path), n_folds=3, n_trials=3,
+                                                              n_workers=1, save=False)
+    pipeline = MLTrainingPipeline("r_multiple")
+    pooled = pipeline.run_walkforward(str(data_path), n_folds=3, n_trials=3, n_workers=2)
+
+    assert pooled == serial
+    assert len(pooled["folds"]) == 3 and len(pooled["trials"]) == 3
+    assert pipeline.model_config["max_depth"] == pooled["best_params"]["max_depth"]
+
+    version_dir = next((tmp_path / "registry" / "r_multiple_v1").glob("v_*"))
+    metrics = json.loads((version_dir / "metrics.json").read_text())
+    assert [f["fold"] for f in metrics["walkforward"]["folds"]] == [0, 1, 2]
+    assert metrics["mae"] == pytest.approx(np.mean([f["mae"] for f in pooled["folds"]]))
+    assert (version_dir / "model.txt").exists()
+
+
+def test_fold_weights_use_training_labels_only(tmp_path):
+    df = _frame()
+    X, y = df[["atr_14", "orb_size", "rsi_14"]], (df["orb_r_multiple"] > 0).astype(int)
+    fold = walkforward_folds(df["date_local"], n_folds=3)[0]
+    seen = []
+
+    def weight_fn(y_train):
+        seen.append(y_train.index)
+        return np.where(y_train == 1, 2.0, 1.0)
+
+    paths = build_fold_cache(tmp_path, "lightgbm", X, y, fold, weight_fn)
+    assert len(seen) == 1 and list(seen[0]) == list(y.index[fold.train])
+    train = lgb.Dataset(paths["train"]).construct()
+    assert list(train.get_weight()) == list(np.where(y.iloc[fold.train] == 1, 2.0, 1.0))
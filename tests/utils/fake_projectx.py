@@ -0,0 +1,158 @@
+"""
+fake_projectx.py
+
+Local fake ProjectX server for tests (real HTTP over 127.0.0.1, keep-alive on).
+
+Implements the endpoints the app uses:
+- /api/Auth/loginKey          -> issues a token
+- /api/Contract/search        -> contracts whose name contains searchText
+- /api/Contract/available     -> all contracts
+- /api/History/retrieveBars   -> synthetic 1-minute bars for the window
+
+Test hooks:
+- connections / requests / logins counters
+- fail_next(path, status, times, retry_after=None) to inject 429/5xx
+- expire_tokens() so the next authenticated call gets a 401
+
+Usage:
+    with FakeProjectXServer() as server:
+        settings = ProjectXSettings(base_url=server.url, username="u", api_key="k")
+"""
+
+import json
+import threading
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CONTRACTS = [
+    {"id": "CON.F.US.MGC.G26", "name": "MGCG6", "activeContract": True},
+    {"id": "CON.F.US.MGC.Z25", "name": "MGCZ5", "activeContract": False},
+    {"id": "CON.F.US.MNQ.H26", "name": "MNQH6", "activeContract": True},
+]
+
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def synthetic_bars(start_iso_z: str, end_iso_z: str, limit: int = 20000):
+    """Deterministic 1-minute bars in [start, end)"""
+    start, end = _parse_iso(start_iso_z), _parse_iso(end_iso_z)
+    bars = []
+    ts = start
+    while ts < end and len(bars) < limit:
+        base = 2650.0 + (int(ts.timestamp()) // 60) % 50 * 0.1
+        bars.append({
+            "t": ts.astimezone(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "o": base, "h": base + 0.5, "l": base - 0.5, "c": base + 0.2, "v": 10,
+        })
+        ts += timedelta(minutes=1)
+    return bars
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.fake.lock:
+            self.server.fake.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body: dict, headers: dict = None):
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self._reply(*fake.handle(self.path, payload, self.headers.get("Authorization")))
+
+
+class FakeProjectXServer:
+    """Threaded fake ProjectX API bound to an ephemeral localhost port"""
+
+    def __init__(self, contracts=None, username="user", api_key="key"):
+        self.contracts = contracts if contracts is not None else DEFAULT_CONTRACTS
+        self.username = username
+        self.api_key = api_key
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = Counter()
+        self.logins = 0
+        self.tokens = set()
+        self.failures = defaultdict(deque)
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeProjectXServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeProjectXServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def fail_next(self, path: str, status: int, times: int = 1, retry_after: float = None) -> None:
+        """Answer the next `times` calls to `path` with `status`"""
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        with self.lock:
+            self.failures[path].extend([(status, headers)] * times)
+
+    def expire_tokens(self) -> None:
+        with self.lock:
+            self.tokens.clear()
+
+    def handle(self, path: str, payload: dict, authorization: str):
+        """Return (status, body, headers) for one request"""
+        with self.lock:
+            self.requests[path] += 1
+            if self.failures[path]:
+                status, headers = self.failures[path].popleft()
+                return status, {"success": False, "errorMessage": "injected"}, headers
+
+            if path == "/api/Auth/loginKey":
+                if payload.get("userName") != self.username or payload.get("apiKey") != self.api_key:
+                    return 200, {"success": False, "errorCode": 3, "token": None}, None
+                self.logins += 1
+                token = f"token-{self.logins}"
+                self.tokens.add(token)
+                return 200, {"success": True, "token": token}, None
+
+            token = (authorization or "").removeprefix("Bearer ")
+            if token not in self.tokens:
+                return 401, {"success": False, "errorMessage": "unauthorized"}, None
+
+        if path == "/api/Contract/search":
+            text = (payload.get("searchText") or "").upper()
+            matches = [c for c in self.contracts if text in c["name"].upper()]
+            return 200, {"success": True, "contracts": matches}, None
+        if path == "/api/Contract/available":
+            return 200, {"success": True, "contracts": list(self.contracts)}, None
+        if path == "/api/History/retrieveBars":
+            bars = synthetic_bars(payload["startTime"], payload["endTime"], payload.get("limit", 20000))
+            return 200, {"success": True, "bars": bars}, None
+        return 404, {"success": False, "errorMessage": f"unknown path {path}"}, None
@@ -251,6 +251,24 @@ Be the trading assistant they can trust in live market conditions.
 
         return system_prompt
 
+    def get_memory_context(self, user_message: str, session_id: str, instrument: str, limit: int = 3) -> str:
+        """Most relevant messages from earlier sessions (BM25 search over AI memory)"""
+        if not self.memory:
+            return ""
+
+        hits = [
+            hit for hit in self.memory.search_history(user_message, instrument=instrument, limit=limit + 5)
+            if hit["session_id"] != session_id
+        ][:limit]
+        if not hits:
+            return ""
+
+        lines = ["", "**RELEVANT PAST CONVERSATIONS:**"]
+        for hit in hits:
+            content = " ".join(hit["content"].split())
+            lines.append(f"- [{hit['timestamp']:%Y-%m-%d}] {hit['role']}: {content[:300]}")
+        return "\n".join(lines) + "\n"
+
     def chat(
         self,
         user_message: str,
@@ -280,7 +298,7 @@ Be the trading assistant they can trust in live market conditions.
                 session_levels=session_levels or {},
                 orb_data=orb_data or {},
                 backtest_stats=backtest_stats or {}
-            )
+            ) + self.get_memory_context(user_message, session_id, instrument)
 
             # Call Claude API
             response = self.client.messages.create(
@@ -1,28 +1,204 @@
 """
 AI Memory Manager - Persistent conversation history in DuckDB
+
+Search is served by an in-memory BM25 inverted index (ChatSearchIndex) built
+once from ai_chat_history and extended on every save_message, instead of a
+LIKE '%query%' scan. One long-lived DuckDB connection is kept per manager.
 """
 
 import duckdb
+import math
+import os
+import re
+import threading
+from array import array
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 import json
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Same tokenizer on both sides: regexp_extract_all in SQL, re.findall for queries
+TOKEN_PATTERN = "[a-z0-9]+"
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+# Dropped from queries (kept in the index); a query of only stopwords uses them as-is
+STOPWORDS = frozenset("""
+    a an and are as at be but by can do for from how i if in is it me my of on or so
+    that the this to was we what when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms"""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class ChatSearchIndex:
+    """
+    In-memory BM25 inverted index over ai_chat_history.
+
+    Postings hold doc numbers (ascending) and precomputed BM25 term weights
+    (length-normalised with the average length at indexing time), so a query
+    is idf * weight summed per term. Rare query terms pick the candidates;
+    common terms are only looked up for those candidates unless their upper
+    bound could still push another message into the top results (MaxScore).
+    Deletes are tombstones.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, list] = {}    # term -> [doc numbers, weights, max weight]
+        self._ids = array("q")                  # doc number -> message id
+        self._instruments = array("i")
+        self._instrument_codes: Dict[Optional[str], int] = {}
+        self._alive = bytearray()
+        self._doc_of: Dict[int, int] = {}
+        self._total_length = 0
+        self.max_id = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, ids: np.ndarray, instruments: Sequence[Optional[str]], vocab: Sequence[tuple],
+            doc_ids: np.ndarray, tfs: np.ndarray) -> None:
+        """
+        Add messages (ascending ids) and their postings: vocab is [(term, n_postings)]
+        in term order, doc_ids/tfs are the postings sorted by (term, id).
+        """
+        base = len(self._ids)
+        for offset, (msg_id, instrument) in enumerate(zip(ids.tolist(), instruments)):
+            self._doc_of[msg_id] = base + offset
+            self._instruments.append(self._instrument_codes.setdefault(instrument, len(self._instrument_codes)))
+        self._ids.extend(ids.tolist())
+        self._alive.extend(b"\x01" * len(ids))
+        if len(ids):
+            self.max_id = max(self.max_id, int(ids[-1]))
+
+        positions = np.searchsorted(ids, doc_ids)
+        lengths = np.bincount(positions, weights=tfs, minlength=len(ids))
+        self._total_length += int(lengths.sum())
+        if not len(doc_ids):
+            return
+        avg_length = self._total_length / len(self._ids)
+        tfs = tfs.astype(np.float64)
+        norm = self.K1 * (1 - self.B + self.B * lengths[positions] / avg_length)
+        weights = (tfs * (self.K1 + 1) / (tfs + norm)).astype(np.float32)
+        docs = (positions + base).astype(np.int32)
+
+        start = 0
+        for term, count in vocab:
+            end = start + count
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = [array("i"), array("f"), 0.0]
+            posting[0].frombytes(docs[start:end].tobytes())
+            posting[1].frombytes(weights[start:end].tobytes())
+            posting[2] = max(posting[2], float(weights[start:end].max()))
+            start = end
+
+    def remove(self, message_ids: Sequence[int]) -> None:
+        """Mask messages out of future results"""
+        for msg_id in message_ids:
+            doc = self._doc_of.get(msg_id)
+            if doc is not None:
+                self._alive[doc] = 0
+
+    def _eligible(self, docs: np.ndarray, instrument_code: Optional[int]) -> np.ndarray:
+        keep = np.frombuffer(self._alive, dtype=np.uint8)[docs].astype(bool)
+        if instrument_code is not None:
+            keep &= np.frombuffer(self._instruments, dtype=np.int32)[docs] == instrument_code
+        return docs[keep]
+
+    def search(self, query: str, instrument: Optional[str] = None, limit: int = 10) -> List[tuple]:
+        """Top (message id, score) pairs by BM25, newest first on ties"""
+        n = len(self._ids)
+        tokens = list(dict.fromkeys(tokenize(query)))
+        terms = [t for t in tokens if t not in STOPWORDS] or tokens
+        code = self._instrument_codes.get(instrument) if instrument is not None else None
+        if not n or not terms or limit <= 0 or (instrument is not None and code is None):
+            return []
+
+        postings = []
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                df = len(posting[0])
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                postings.append((idf, np.frombuffer(posting[0], dtype=np.int32),
+                                 np.frombuffer(posting[1], dtype=np.float32), idf * posting[2]))
+        if not postings:
+            return []
+        postings.sort(key=lambda p: len(p[1]))
+
+        # Candidates from the rare terms, scored on every term
+        rare_limit = max(1024, n // 64)
+        rare = [p for p in postings if len(p[1]) <= rare_limit]
+        common_bound = sum(p[3] for p in postings if len(p[1]) > rare_limit)
+        if rare:
+            docs = self._eligible(np.unique(np.concatenate([p[1] for p in rare])), code)
+            scores = np.zeros(len(docs))
+            for idf, term_docs, weights, _ in postings:
+                pos = np.minimum(np.searchsorted(term_docs, docs), len(term_docs) - 1)
+                hit = term_docs[pos] == docs
+                scores[hit] += idf * weights[pos[hit]]
+            # A message with none of the rare terms scores at most common_bound
+            if len(docs) >= limit and np.partition(scores, len(docs) - limit)[len(docs) - limit] > common_bound:
+                return self._top(docs, scores, limit)
+
+        # Exhaustive: every posting of every term
+        dense = np.zeros(n)
+        for idf, term_docs, weights, _ in postings:
+            dense[term_docs] += idf * weights
+        docs = self._eligible(np.flatnonzero(dense > 0).astype(np.int32), code)
+        return self._top(docs, dense[docs], limit)
+
+    def _top(self, docs: np.ndarray, scores: np.ndarray, limit: int) -> List[tuple]:
+        if len(docs) > limit:
+            # Keep every tie with the last place so the newest of them wins
+            keep = scores >= np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            docs, scores = docs[keep], scores[keep]
+        # Doc numbers follow message ids, so the higher doc number is the newer message
+        order = np.lexsort((-docs.astype(np.int64), -scores))[:limit]
+        return [(self._ids[int(docs[i])], float(scores[i])) for i in order]
+
+
+# One index per database file, shared by every manager in the process
+# (Streamlit creates a manager per browser session)
+_SHARED_INDEXES: Dict[str, tuple] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def _shared_index(db_path: str) -> tuple:
+    """(ChatSearchIndex, lock) for a database file"""
+    if db_path == ":memory:":
+        return ChatSearchIndex(), threading.Lock()
+    with _SHARED_LOCK:
+        key = os.path.abspath(db_path)
+        if key not in _SHARED_INDEXES:
+            _SHARED_INDEXES[key] = (ChatSearchIndex(), threading.Lock())
+        return _SHARED_INDEXES[key]
+
 
 class AIMemoryManager:
     """Manages persistent AI conversation history in DuckDB"""
 
     def __init__(self, db_path: str = "trading_app.db"):
         self.db_path = db_path
+        self.con = duckdb.connect(db_path)
+        self.index, self._lock = _shared_index(db_path)
         self._init_schema()
+        self._sync_index()
 
     def _init_schema(self):
         """Create ai_chat_history table if not exists"""
         try:
-            conn = duckdb.connect(self.db_path)
-            conn.execute("""
+            self.con.execute("""
                 CREATE TABLE IF NOT EXISTS ai_chat_history (
                     id INTEGER PRIMARY KEY,
                     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -34,38 +210,78 @@ class AIMemoryManager:
                     tags VARCHAR[]
                 )
             """)
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON ai_chat_history(timestamp)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_session ON ai_chat_history(session_id)")
-            conn.close()
+            self.con.execute("CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON ai_chat_history(timestamp)")
+            self.con.execute("CREATE INDEX IF NOT EXISTS idx_chat_session ON ai_chat_history(session_id)")
+            # Ids are never reused: the search index only picks up ids above its watermark
+            start = self.con.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM ai_chat_history").fetchone()[0]
+            self.con.execute(f"CREATE SEQUENCE IF NOT EXISTS ai_chat_history_id_seq START {int(start)}")
             logger.info("AI memory schema initialized")
         except Exception as e:
             logger.error(f"Error initializing AI memory schema: {e}")
 
+    def _sync_index(self):
+        """Index messages written since the last sync (by this or any other manager)"""
+        try:
+            with self._lock:
+                max_id = self.con.execute("SELECT COALESCE(MAX(id), 0) FROM ai_chat_history").fetchone()[0]
+                if max_id <= self.index.max_id:
+                    return
+                bounds = [self.index.max_id, max_id]
+                self.con.execute(f"""
+                    CREATE OR REPLACE TEMP TABLE _chat_postings AS
+                    SELECT id, term, COUNT(*)::INTEGER AS tf
+                    FROM (
+                        SELECT id, unnest(regexp_extract_all(lower(content), '{TOKEN_PATTERN}')) AS term
+                        FROM ai_chat_history
+                        WHERE id > $1 AND id <= $2
+                    )
+                    GROUP BY id, term
+                """, bounds)
+                messages = self.con.execute("""
+                    SELECT id, instrument FROM ai_chat_history
+                    WHERE id > $1 AND id <= $2 ORDER BY id
+                """, bounds).fetchall()
+                vocab = self.con.execute(
+                    "SELECT term, COUNT(*) FROM _chat_postings GROUP BY term ORDER BY term"
+                ).fetchall()
+                postings = self.con.execute("SELECT id, tf FROM _chat_postings ORDER BY term, id").fetchnumpy()
+                self.con.execute("DROP TABLE _chat_postings")
+                self.index.add(
+                    np.array([row[0] for row in messages], dtype=np.int64),
+                    [row[1] for row in messages],
+                    vocab,
+                    np.asarray(postings["id"], dtype=np.int64),
+                    np.asarray(postings["tf"], dtype=np.int64),
+                )
+                self.index.max_id = max_id
+        except Exception as e:
+            logger.error(f"Error indexing AI memory: {e}")
+
     def save_message(self, session_id: str, role: str, content: str,
                      context_data: Dict = None, instrument: str = "MGC", tags: List[str] = None):
         """Save a single message to history"""
         try:
-            conn = duckdb.connect(self.db_path)
-            conn.execute("""
-                INSERT INTO ai_chat_history (session_id, role, content, context_data, instrument, tags)
-                VALUES ($1, $2, $3, $4, $5, $6)
-            """, [session_id, role, content, json.dumps(context_data or {}), instrument, tags or []])
-            conn.close()
+            with self._lock:
+                self.con.execute("""
+                    INSERT INTO ai_chat_history (id, session_id, role, content, context_data, instrument, tags)
+                    VALUES (nextval('ai_chat_history_id_seq'), $1, $2, $3, $4, $5, $6)
+                """, [session_id, role, content, json.dumps(context_data or {}), instrument, tags or []])
         except Exception as e:
             logger.error(f"Error saving message to memory: {e}")
+            return
+        self._sync_index()
 
     def load_session_history(self, session_id: str, limit: int = 50) -> List[Dict]:
         """Load conversation history for a session"""
         try:
-            conn = duckdb.connect(self.db_path, read_only=True)
-            result = conn.execute("""
-                SELECT role, content, timestamp, context_data, tags
-                FROM ai_chat_history
-                WHERE session_id = $1
-                ORDER BY timestamp DESC
-                LIMIT $2
-            """, [session_id, limit]).fetchall()
-            conn.close()
+            with self._lock:
+                result = self.con.execute("""
+                    SELECT role, content, timestamp, context_data, tags
+                    FROM ai_chat_history
+                    WHERE session_id = $1
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT $2
+                """, [session_id, limit]).fetchall()
 
             # Reverse to get chronological order
             return [
@@ -83,51 +299,40 @@ class AIMemoryManager:
             return []
 
     def search_history(self, query: str, instrument: str = None, limit: int = 10) -> List[Dict]:
-        """Search conversation history by content"""
+        """Search conversation history by content (BM25 ranked, best match first)"""
+        self._sync_index()
         try:
-            conn = duckdb.connect(self.db_path, read_only=True)
-
-            # Use DuckDB parameter syntax ($1, $2, etc.)
-            if instrument:
-                sql = """
-                    SELECT session_id, role, content, timestamp, instrument, tags
+            with self._lock:
+                hits = self.index.search(query, instrument, limit)
+                if not hits:
+                    return []
+                rows = self.con.execute(f"""
+                    SELECT id, session_id, role, content, timestamp, instrument, tags
                     FROM ai_chat_history
-                    WHERE content LIKE $1
-                      AND instrument = $2
-                    ORDER BY timestamp DESC LIMIT $3
-                """
-                result = conn.execute(sql, [f"%{query}%", instrument, limit]).fetchall()
-            else:
-                sql = """
-                    SELECT session_id, role, content, timestamp, instrument, tags
-                    FROM ai_chat_history
-                    WHERE content LIKE $1
-                    ORDER BY timestamp DESC LIMIT $2
-                """
-                result = conn.execute(sql, [f"%{query}%", limit]).fetchall()
-
-            conn.close()
-
-            return [
-                {
-                    "session_id": row[0],
-                    "role": row[1],
-                    "content": row[2],
-                    "timestamp": row[3],
-                    "instrument": row[4],
-                    "tags": row[5]
-                }
-                for row in result
-            ]
+                    WHERE id IN ({", ".join("?" * len(hits))})
+                """, [msg_id for msg_id, _ in hits]).fetchall()
         except Exception as e:
             logger.error(f"Error searching history: {e}")
             return []
 
+        by_id = {row[0]: row for row in rows}
+        return [
+            {
+                "session_id": row[1],
+                "role": row[2],
+                "content": row[3],
+                "timestamp": row[4],
+                "instrument": row[5],
+                "tags": row[6],
+                "score": score,
+            }
+            for msg_id, score in hits
+            if (row := by_id.get(msg_id)) is not None
+        ]
+
     def get_recent_trades(self, session_id: str = None, days: int = 7) -> List[Dict]:
         """Get recent trade-related conversations"""
         try:
-            conn = duckdb.connect(self.db_path, read_only=True)
-
             # Use DuckDB parameter syntax ($1, $2, etc.)
             if session_id:
                 sql = """
@@ -138,7 +343,7 @@ class AIMemoryManager:
                       AND session_id = $2
                     ORDER BY timestamp DESC LIMIT 20
                 """
-                result = conn.execute(sql, [days, session_id]).fetchall()
+                params = [days, session_id]
             else:
                 sql = """
                     SELECT role, content, timestamp, context_data
@@ -147,9 +352,10 @@ class AIMemoryManager:
                       AND list_has(tags, 'trade')
                     ORDER BY timestamp DESC LIMIT 20
                 """
-                result = conn.execute(sql, [days]).fetchall()
+                params = [days]
 
-            conn.close()
+            with self._lock:
+                result = self.con.execute(sql, params).fetchall()
 
             return [
                 {
@@ -167,9 +373,15 @@ class AIMemoryManager:
     def clear_session(self, session_id: str):
         """Clear all messages for a session"""
         try:
-            conn = duckdb.connect(self.db_path)
-            conn.execute("DELETE FROM ai_chat_history WHERE session_id = $1", [session_id])
-            conn.close()
+            with self._lock:
+                ids = [row[0] for row in self.con.execute(
+                    "SELECT id FROM ai_chat_history WHERE session_id = $1", [session_id]
+                ).fetchall()]
+                self.con.execute("DELETE FROM ai_chat_history WHERE session_id = $1", [session_id])
+                self.index.remove(ids)
             logger.info(f"Cleared session: {session_id}")
         except Exception as e:
             logger.error(f"Error clearing session: {e}")
+
+    def close(self):
+        self.con.close()
@@ -4,8 +4,9 @@ Provides audio alerts, desktop notifications, and price level monitoring.
 """
 
 import streamlit as st
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 import logging
 
@@ -81,6 +82,67 @@ class PriceAlert:
         return alert
 
 
+class PriceLevelIndex:
+    """
+    Armed price alerts in sorted (price, alert_id) lists per instrument and condition.
+
+    A bar's range is matched by bisection, so each bar costs O(log n + hits)
+    however many alerts are armed. Only armed alerts (enabled, not yet
+    triggered) belong in the index.
+    """
+
+    CONDITIONS = ("above", "below", "cross_above", "cross_below")
+
+    def __init__(self):
+        self.levels: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+        self.alerts: Dict[str, PriceAlert] = {}
+
+    def add(self, alert: PriceAlert):
+        if alert.alert_id in self.alerts:
+            return
+        insort(self.levels.setdefault((alert.instrument, alert.condition), []), (alert.price, alert.alert_id))
+        self.alerts[alert.alert_id] = alert
+
+    def discard(self, alert: PriceAlert):
+        levels = self.levels.get((alert.instrument, alert.condition), [])
+        i = bisect_left(levels, (alert.price, alert.alert_id))
+        if i < len(levels) and levels[i] == (alert.price, alert.alert_id):
+            del levels[i]
+        self.alerts.pop(alert.alert_id, None)
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def _range(self, instrument: str, condition: str, lo: float, hi: float,
+               lo_inclusive: bool, hi_inclusive: bool) -> List[str]:
+        """Alert ids with lo < price < hi (bounds optionally inclusive)"""
+        levels = self.levels.get((instrument, condition))
+        if not levels or lo > hi:
+            return []
+        start = bisect_left(levels, (lo,)) if lo_inclusive else bisect_right(levels, (lo, "\uffff"))
+        end = bisect_right(levels, (hi, "\uffff")) if hi_inclusive else bisect_left(levels, (hi,))
+        return [alert_id for _, alert_id in levels[start:end]]
+
+    def hits(self, instrument: str, reference: float, high: float, low: float, close: float) -> List[PriceAlert]:
+        """
+        Alerts whose level the bar touched, given the last price before it.
+
+        above: high > level; below: low < level.
+        cross_above: price went from <= level to > level, i.e. reference <= level < high,
+        or low <= level < close (dipped through the level and closed back above).
+        cross_below mirrors it.
+        """
+        inf = float("inf")
+        found = []
+        found += self._range(instrument, "above", -inf, high, True, False)
+        found += self._range(instrument, "below", low, inf, False, True)
+        crossed_up = set(self._range(instrument, "cross_above", reference, high, True, False))
+        crossed_up.update(self._range(instrument, "cross_above", low, close, True, False))
+        crossed_down = set(self._range(instrument, "cross_below", low, reference, False, True))
+        crossed_down.update(self._range(instrument, "cross_below", close, high, False, True))
+        return [self.alerts[alert_id] for alert_id in found + sorted(crossed_up) + sorted(crossed_down)]
+
+
 class AlertSystem:
     """
     Comprehensive alert system for trading application.
@@ -90,7 +152,9 @@ class AlertSystem:
     def __init__(self):
         self.alerts_triggered = []  # Recently triggered alerts
         self.price_alerts: List[PriceAlert] = []
+        self.level_index = PriceLevelIndex()  # Armed price alerts, sorted by level
         self.last_price = {}  # Track last price per instrument for crossing detection
+        self.last_bar_ts = {}  # Last bar evaluated per instrument (check_bars)
 
         # Alert cooldowns (prevent spam)
         self.cooldowns = {
@@ -275,21 +339,40 @@ class AlertSystem:
     def add_price_alert(self, name: str, price: float, condition: str, instrument: str = "MGC") -> PriceAlert:
         """Add a new price level alert"""
         import uuid
+        if condition not in PriceLevelIndex.CONDITIONS:
+            raise ValueError(f"Unknown price alert condition: {condition}")
         alert_id = str(uuid.uuid4())
         alert = PriceAlert(alert_id, name, price, condition, enabled=True, instrument=instrument)
         self.price_alerts.append(alert)
+        self.level_index.add(alert)
         logger.info(f"Price alert added: {name} @ {price} ({condition})")
         return alert
 
     def remove_price_alert(self, alert_id: str):
         """Remove a price alert"""
+        for alert in self.price_alerts:
+            if alert.alert_id == alert_id:
+                self.level_index.discard(alert)
         self.price_alerts = [a for a in self.price_alerts if a.alert_id != alert_id]
         logger.info(f"Price alert removed: {alert_id}")
 
+    def set_price_alert_enabled(self, alert_id: str, enabled: bool):
+        """Enable or disable a price alert"""
+        for alert in self.price_alerts:
+            if alert.alert_id == alert_id and alert.enabled != enabled:
+                alert.enabled = enabled
+                if enabled and not alert.triggered:
+                    self.level_index.add(alert)
+                else:
+                    self.level_index.discard(alert)
+
     def check_price_alerts(self, instrument: str, current_price: float) -> List[dict]:
         """
         Check if any price alerts should trigger.
 
+        A single price is a zero-range bar; prefer check_bar/check_bars with
+        closed bars so levels touched between refreshes are not missed.
+
         Args:
             instrument: Instrument symbol
             current_price: Current price
@@ -297,51 +380,77 @@ class AlertSystem:
         Returns:
             List of triggered alerts
         """
+        return self.check_bar(instrument, current_price, current_price, current_price, current_price)
+
+    def check_bar(self, instrument: str, open_: float, high: float, low: float, close: float) -> List[dict]:
+        """
+        Trigger price alerts whose level lies in a closed bar's range.
+
+        Crossings are measured from the previous bar's close (this bar's open
+        for the first bar seen). Each hit also passes the PRICE_LEVEL cooldown;
+        an alert in cooldown stays armed for the next bar.
+
+        Returns:
+            List of triggered alerts
+        """
+        reference = self.last_price.get(instrument, open_)
         triggered = []
-        last_price = self.last_price.get(instrument)
 
-        for alert in self.price_alerts:
-            if not alert.enabled or alert.triggered or alert.instrument != instrument:
+        for alert in self.level_index.hits(instrument, reference, high, low, close):
+            if not self.should_trigger_alert(AlertType.PRICE_LEVEL, alert.alert_id):
                 continue
 
-            should_trigger = False
-
-            if alert.condition == "above" and current_price > alert.price:
-                should_trigger = True
-            elif alert.condition == "below" and current_price < alert.price:
-                should_trigger = True
-            elif alert.condition == "cross_above" and last_price is not None:
-                if last_price <= alert.price < current_price:
-                    should_trigger = True
-            elif alert.condition == "cross_below" and last_price is not None:
-                if last_price >= alert.price > current_price:
-                    should_trigger = True
-
-            if should_trigger:
-                alert.triggered = True
-                notification = {
-                    "type": AlertType.PRICE_LEVEL,
-                    "priority": AlertPriority.HIGH,
-                    "title": f"Price Alert: {alert.name}",
-                    "message": f"{instrument} {current_price:.1f} {alert.condition} {alert.price:.1f}",
-                    "sound": "notification",
-                    "timestamp": datetime.now().isoformat(),
-                    "instrument": instrument,
-                    "alert_id": alert.alert_id
-                }
-                triggered.append(notification)
-                self.alerts_triggered.append(notification)
-                logger.info(f"Price alert triggered: {alert.name}")
+            alert.triggered = True
+            self.level_index.discard(alert)
+            price = high if alert.condition in ("above", "cross_above") else low
+            notification = {
+                "type": AlertType.PRICE_LEVEL,
+                "priority": AlertPriority.HIGH,
+                "title": f"Price Alert: {alert.name}",
+                "message": f"{instrument} {price:.1f} {alert.condition} {alert.price:.1f}",
+                "sound": "notification",
+                "timestamp": datetime.now().isoformat(),
+                "instrument": instrument,
+                "alert_id": alert.alert_id
+            }
+            triggered.append(notification)
+            self.alerts_triggered.append(notification)
+            logger.info(f"Price alert triggered: {alert.name}")
 
         # Update last price
-        self.last_price[instrument] = current_price
+        self.last_price[instrument] = close
+
+        return triggered
 
+    def check_bars(self, instrument: str, bars, include_last: bool = False) -> List[dict]:
+        """
+        Run check_bar over bars (ts_utc/open/high/low/close DataFrame) not seen before.
+
+        The last row is treated as still forming and skipped unless
+        include_last=True; it is picked up on a later call once closed.
+
+        Returns:
+            List of triggered alerts
+        """
+        if bars is None or len(bars) == 0:
+            return []
+        last_seen = self.last_bar_ts.get(instrument)
+        closed = bars if include_last else bars.iloc[:-1]
+        if last_seen is not None:
+            closed = closed[closed["ts_utc"] > last_seen]
+
+        triggered = []
+        for ts, o, h, l, c in zip(closed["ts_utc"], closed["open"], closed["high"], closed["low"], closed["close"]):
+            triggered += self.check_bar(instrument, float(o), float(h), float(l), float(c))
+            self.last_bar_ts[instrument] = ts
         return triggered
 
     def reset_price_alert(self, alert_id: str):
         """Reset a triggered price alert so it can trigger again"""
         for alert in self.price_alerts:
             if alert.alert_id == alert_id:
+                if alert.triggered and alert.enabled:
+                    self.level_index.add(alert)
                 alert.triggered = False
                 logger.info(f"Price alert reset: {alert.name}")
                 break
@@ -36,6 +36,7 @@ from data_quality_monitor import DataQualityMonitor, render_data_quality_panel
 from market_hours_monitor import MarketHoursMonitor, render_market_hours_indicator
 from risk_manager import RiskManager, RiskLimits, render_risk_dashboard
 from position_tracker import PositionTracker, render_position_panel, render_empty_position_panel
+from risk_state import RiskStateStore
 from directional_bias import DirectionalBiasDetector, render_directional_bias_indicator
 from strategy_discovery import StrategyDiscovery, DiscoveryConfig, add_setup_to_production, generate_config_snippet
 # Removed MarketIntelligence - not used in mobile app (skeleton code)
@@ -124,6 +125,9 @@ if "data_quality_monitor" not in st.session_state:
     st.session_state.data_quality_monitor = DataQualityMonitor()
 if "market_hours_monitor" not in st.session_state:
     st.session_state.market_hours_monitor = MarketHoursMonitor()
+if "risk_state_store" not in st.session_state:
+    # Event log + snapshots so loss limits survive reloads/restarts
+    st.session_state.risk_state_store = RiskStateStore()
 if "risk_manager" not in st.session_state:
     limits = RiskLimits(
         daily_loss_dollars=1000.0,
@@ -133,9 +137,10 @@ if "risk_manager" not in st.session_state:
         max_concurrent_positions=3,
         max_position_size_pct=2.0
     )
-    st.session_state.risk_manager = RiskManager(DEFAULT_ACCOUNT_SIZE, limits)
+    st.session_state.risk_manager = RiskManager(DEFAULT_ACCOUNT_SIZE, limits,
+                                                store=st.session_state.risk_state_store)
 if "position_tracker" not in st.session_state:
-    st.session_state.position_tracker = PositionTracker()
+    st.session_state.position_tracker = PositionTracker(store=st.session_state.risk_state_store)
 if "setup_scanner" not in st.session_state:
     # Use cloud-aware path (None = auto-detect)
     st.session_state.setup_scanner = SetupScanner(None)
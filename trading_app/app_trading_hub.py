@@ -22,15 +22,19 @@ from ai_memory import AIMemoryManager
 from ai_assistant import TradingAIAssistant
 from cloud_mode import is_cloud_deployment, show_cloud_setup_instructions
 from setup_scanner import SetupScanner, render_setup_scanner_tab
-from enhanced_charting import EnhancedChart, ORBOverlay, TradeMarker, ChartTimeframe, resample_bars
-from live_chart_builder import build_live_trading_chart, calculate_trade_levels
+from enhanced_charting import (
+    DEFAULT_CHART_INDICATORS, EnhancedChart, ORBOverlay, TradeMarker, ChartTimeframe, resample_bars, chart_bars,
+)
+from live_chart_builder import LiveChartCache, build_live_trading_chart, calculate_trade_levels
 from data_quality_monitor import DataQualityMonitor, render_data_quality_panel
 from market_hours_monitor import MarketHoursMonitor, render_market_hours_indicator
 from risk_manager import RiskManager, RiskLimits, render_risk_dashboard
 from position_tracker import PositionTracker, render_position_panel, render_empty_position_panel
+from risk_state import RiskStateStore
 from strategy_discovery import StrategyDiscovery, DiscoveryConfig, add_setup_to_production, generate_config_snippet
 from market_intelligence import MarketIntelligence
 from render_intelligence import render_intelligence_panel
+from latency_tracing import TRACER, bar_to_decision_seconds, span
 from professional_ui import (
     inject_professional_css,
     render_pro_metric,
@@ -137,6 +141,10 @@ if "setup_scanner" not in st.session_state:
     st.session_state.setup_scanner = SetupScanner(db_path)
 if "chart_timeframe" not in st.session_state:
     st.session_state.chart_timeframe = ChartTimeframe.M1
+if "chart_engines" not in st.session_state:
+    st.session_state.chart_engines = {}  # timeframe -> IndicatorEngine (incremental resample)
+if "chart_cache" not in st.session_state:
+    st.session_state.chart_cache = LiveChartCache(max_candles=400)
 if "indicators_enabled" not in st.session_state:
     st.session_state.indicators_enabled = {
         "ema_9": False,
@@ -149,6 +157,9 @@ if "data_quality_monitor" not in st.session_state:
     st.session_state.data_quality_monitor = DataQualityMonitor()
 if "market_hours_monitor" not in st.session_state:
     st.session_state.market_hours_monitor = MarketHoursMonitor()
+if "risk_state_store" not in st.session_state:
+    # Event log + snapshots so loss limits survive reloads/restarts
+    st.session_state.risk_state_store = RiskStateStore()
 if "risk_manager" not in st.session_state:
     # Initialize with default limits
     limits = RiskLimits(
@@ -159,9 +170,10 @@ if "risk_manager" not in st.session_state:
         max_concurrent_positions=3,
         max_position_size_pct=2.0
     )
-    st.session_state.risk_manager = RiskManager(DEFAULT_ACCOUNT_SIZE, limits)
+    st.session_state.risk_manager = RiskManager(DEFAULT_ACCOUNT_SIZE, limits,
+                                                store=st.session_state.risk_state_store)
 if "position_tracker" not in st.session_state:
-    st.session_state.position_tracker = PositionTracker()
+    st.session_state.position_tracker = PositionTracker(store=st.session_state.risk_state_store)
 if "strategy_discovery" not in st.session_state:
     # Use cloud-aware path (None = auto-detect)
     st.session_state.strategy_discovery = StrategyDiscovery(None)
@@ -375,6 +387,24 @@ with st.sidebar:
             height=250
         )
 
+    # Decision-loop latency (bar close -> decision banner), per stage
+    with st.expander("Latency", expanded=False):
+        latency = TRACER.summary()
+        if latency.empty:
+            st.caption("No decision loops timed yet")
+        else:
+            for regression in TRACER.regressions():
+                st.warning(
+                    f"{regression['stage']}: p95 {regression['recent_p95_ms']:.0f}ms "
+                    f"(was {regression['baseline_p95_ms']:.0f}ms)"
+                )
+            st.dataframe(
+                latency[["stage", "count", "p50_ms", "p95_ms", "p99_ms", "last_ms"]].round(1),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.caption(f"Last {len(TRACER.spans)} spans (updates each refresh)")
+
 # ============================================================================
 # SINGLE PAGE - NO TABS (User requested streamlined view)
 # ============================================================================
@@ -498,6 +528,7 @@ st.divider()
 # ========================================================================
 # STRATEGY EVALUATION (Must run FIRST to get trading decision)
 # ========================================================================
+decision_trace = TRACER.begin_trace()  # timed until the decision banner is rendered
 try:
     evaluation = st.session_state.strategy_engine.evaluate_all()
     st.session_state.last_evaluation = evaluation
@@ -506,6 +537,7 @@ try:
     log_to_journal(evaluation)
 
 except Exception as e:
+    decision_trace.end(ok=False)
     st.error(f"Strategy evaluation error: {e}")
     logger.error(f"Evaluation error: {e}", exc_info=True)
     st.stop()
@@ -578,6 +610,15 @@ with col2:
 
 st.markdown('</div>', unsafe_allow_html=True)  # Close decision panel container
 
+# Latest bar is still forming; time the first decision on each newly closed bar
+closed_bar_ts = st.session_state.data_loader.last_closed_bar_ts()
+if closed_bar_ts is not None and closed_bar_ts != st.session_state.get("last_traced_bar"):
+    st.session_state.last_traced_bar = closed_bar_ts
+    fetched_utc = st.session_state.data_loader.bars_fetched_utc
+    TRACER.record("bar_to_decision", bar_to_decision_seconds(closed_bar_ts))
+    TRACER.record("fetch_to_decision", (datetime.now(fetched_utc.tzinfo) - fetched_utc).total_seconds())
+decision_trace.end()
+
 st.divider()
 
 # ========================================================================
@@ -794,13 +835,16 @@ st.subheader("📈 Live Trading Chart")
 
 try:
     # Get recent bars
-    bars_df = st.session_state.data_loader.fetch_latest_bars(
+    bars_df = st.session_state.data_loader.get_recent_bars(
         lookback_minutes=CHART_LOOKBACK_BARS
     )
 
     if bars_df.empty:
         st.warning("⏳ No bar data available - click 'Initialize/Refresh Data' in sidebar")
     else:
+        chart_df = chart_bars(st.session_state.chart_engines, bars_df, st.session_state.chart_timeframe,
+                              DEFAULT_CHART_INDICATORS)
+
         # Get current price
         latest_bar = st.session_state.data_loader.get_latest_bar()
         current_price = latest_bar['close'] if latest_bar else None
@@ -874,29 +918,37 @@ try:
             )
             filter_passed = filter_result.get('pass', True)
 
-        # Build the live trading chart with trade zones
-        fig = build_live_trading_chart(
-            bars_df=bars_df,
-            orb_high=orb_high,
-            orb_low=orb_low,
-            orb_name=orb_name,
-            orb_start=orb_start,
-            orb_end=orb_end,
-            current_price=current_price,
-            filter_passed=filter_passed,
-            tier=tier,
-            entry_price=entry_price,
-            stop_price=stop_price,
-            target_price=target_price,
-            direction=direction,
-            height=CHART_HEIGHT
-        )
+        with span("chart_render"):
+            # Build the live trading chart with trade zones
+            overlay_key = (orb_high, orb_low, orb_name, orb_start, orb_end, filter_passed, tier,
+                           entry_price, stop_price, target_price, direction)
+            fig = st.session_state.chart_cache.render(
+                chart_df,
+                overlay_key,
+                lambda bars: build_live_trading_chart(
+                    bars_df=bars,
+                    orb_high=orb_high,
+                    orb_low=orb_low,
+                    orb_name=orb_name,
+                    orb_start=orb_start,
+                    orb_end=orb_end,
+                    current_price=current_price,
+                    filter_passed=filter_passed,
+                    tier=tier,
+                    entry_price=entry_price,
+                    stop_price=stop_price,
+                    target_price=target_price,
+                    direction=direction,
+                    height=CHART_HEIGHT
+                ),
+                current_price=current_price,
+            )
 
-        # Display chart with ORB status card on the right
-        chart_col, orb_status_col = st.columns([3, 1])
+            # Display chart with ORB status card on the right
+            chart_col, orb_status_col = st.columns([3, 1])
 
-        with chart_col:
-            st.plotly_chart(fig, use_container_width=True)
+            with chart_col:
+                st.plotly_chart(fig, use_container_width=True)
 
         with orb_status_col:
             st.markdown("### 📊 ORB Status")
@@ -1153,9 +1205,18 @@ if active_positions:
     # Get current price
     latest_bar = st.session_state.data_loader.get_latest_bar()
     current_price = latest_bar['close'] if latest_bar else 0
+    loaded_symbol = st.session_state.current_symbol
+    if latest_bar:
+        # Mark open positions in the loaded instrument (logged once per new bar)
+        st.session_state.risk_manager.mark_to_market(
+            {loaded_symbol: current_price}, bar_ts=latest_bar['ts_utc'])
 
-    # Render each position
+    # Render each position (only the loaded instrument has a live price)
     for position in active_positions:
+        if position['instrument'] != loaded_symbol:
+            st.info(f"{position['instrument']} {position['direction']} @ {position['entry_price']:.2f} - "
+                    f"select {position['instrument']} in Settings to see live P&L")
+            continue
         st.components.v1.html(
             render_position_panel(
                 position,
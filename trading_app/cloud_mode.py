@@ -3,10 +3,13 @@ Cloud Mode Handler - Uses MotherDuck for Streamlit Cloud deployment
 """
 
 import os
+import sys
 from pathlib import Path
-import duckdb
 import logging
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import db_metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,7 +47,7 @@ def get_motherduck_connection():
 
     # Connect to MotherDuck projectx_prod database
     try:
-        conn = duckdb.connect(f'md:projectx_prod?motherduck_token={token}')
+        conn = db_metrics.connect(f'md:projectx_prod?motherduck_token={token}')
         logger.info("Connected to MotherDuck: md:projectx_prod")
         return conn
     except Exception as e:
@@ -66,7 +69,7 @@ def get_database_connection():
         # Local mode - use gold.db
         app_dir = Path(__file__).parent
         db_path = app_dir.parent / "gold.db"
-        return duckdb.connect(str(db_path), read_only=True)
+        return db_metrics.connect(str(db_path), read_only=True)
 
 
 def get_database_path() -> str:
@@ -3,11 +3,17 @@ CSV Chart Analyzer - FREE chart analysis from TradingView CSV exports
 
 Analyzes OHLCV CSV data to detect ORBs, calculate indicators, and recommend strategies.
 NO API COSTS - Pure Python analysis.
+
+Large uploads: the CSV is parsed once (only time/OHLCV columns, optionally in
+chunks), timestamps are converted to UTC once, and ORBs/indicators work on
+the sorted numpy arrays (binary search for windows, tail slices for
+indicators), so analysis time grows with the data, not data x ORBs.
 """
 
 import pandas as pd
 import numpy as np
 import logging
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import pytz
@@ -18,6 +24,37 @@ from setup_detector import SetupDetector
 
 logger = logging.getLogger(__name__)
 
+CSV_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+REQUIRED_COLUMNS = ['time', 'open', 'high', 'low', 'close']
+CHUNKED_READ_BYTES = 20 * 1024 * 1024  # uploads above this are parsed in chunks
+CHUNK_ROWS = 250_000
+
+
+@dataclass
+class _BarArrays:
+    """Sorted bars as arrays, timestamps converted to UTC once"""
+    time_utc: pd.DatetimeIndex
+    ns: np.ndarray  # UTC epoch nanoseconds (int64)
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "_BarArrays":
+        time_utc = pd.DatetimeIndex(df['time'])
+        time_utc = time_utc.tz_localize('UTC') if time_utc.tz is None else time_utc.tz_convert('UTC')
+        return cls(
+            time_utc=time_utc,
+            ns=time_utc.as_unit('ns').asi8,
+            high=df['high'].to_numpy(dtype=float),
+            low=df['low'].to_numpy(dtype=float),
+            close=df['close'].to_numpy(dtype=float),
+        )
+
+    def index_at(self, ts) -> int:
+        """First bar with time >= ts"""
+        return int(np.searchsorted(self.ns, pd.Timestamp(ts).as_unit('ns').value, side='left'))
+
 
 class CSVChartAnalyzer:
     """Analyzes trading charts from CSV data exports (TradingView format)."""
@@ -32,7 +69,7 @@ class CSVChartAnalyzer:
         self.instrument = instrument
         self.setup_detector = SetupDetector()
 
-    def analyze_csv(self, csv_data: bytes) -> Optional[Dict]:
+    def analyze_csv(self, csv_data: bytes, chunksize: Optional[int] = None) -> Optional[Dict]:
         """
         Analyze chart data from CSV file.
 
@@ -42,32 +79,28 @@ class CSVChartAnalyzer:
 
         Args:
             csv_data: CSV file bytes
+            chunksize: Rows per chunk when parsing (default: chunked only for large uploads)
 
         Returns:
             Dictionary with analysis results or None if error
         """
         try:
-            # Read CSV
-            df = pd.read_csv(BytesIO(csv_data))
-
-            # Validate columns
-            required_cols = ['time', 'open', 'high', 'low', 'close']
-            if not all(col in df.columns for col in required_cols):
-                logger.error(f"CSV missing required columns. Got: {df.columns.tolist()}")
+            df = self._read_csv(csv_data, chunksize)
+            if df is None:
                 return None
 
-            # Parse timestamps
-            df['time'] = pd.to_datetime(df['time'])
-
-            # Sort by time
-            df = df.sort_values('time')
+            # Sort by time (exports are normally sorted already)
+            if not df['time'].is_monotonic_increasing:
+                df = df.sort_values('time', kind='stable').reset_index(drop=True)
 
             if df.empty:
                 logger.error("CSV is empty")
                 return None
 
+            bars = _BarArrays.from_frame(df)
+
             # Perform analysis
-            orb_analysis = self._detect_orbs(df)
+            orb_analysis = self._detect_orbs(df, bars)
 
             # Validate ORB states (raises ValueError if invalid)
             self._validate_orb_states(orb_analysis)
@@ -77,7 +110,7 @@ class CSVChartAnalyzer:
                 "data_summary": self._analyze_data_summary(df),
                 "current_state": self._analyze_current_state(df),
                 "orb_analysis": orb_analysis,
-                "indicators": self._calculate_indicators(df),
+                "indicators": self._calculate_indicators(df, bars),
                 "market_structure": self._analyze_structure(df),
                 "session_context": self._determine_session(df),
                 "raw_data": df
@@ -89,6 +122,29 @@ class CSVChartAnalyzer:
             logger.error(f"CSV analysis failed: {e}")
             return None
 
+    def _read_csv(self, csv_data: bytes, chunksize: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Parse time/OHLCV columns only; large files are read in chunks"""
+        header = pd.read_csv(BytesIO(csv_data), nrows=0).columns
+        if not all(col in header for col in REQUIRED_COLUMNS):
+            logger.error(f"CSV missing required columns. Got: {header.tolist()}")
+            return None
+
+        usecols = [col for col in CSV_COLUMNS if col in header]
+        dtypes = {col: 'float64' for col in usecols if col != 'time'}
+        if chunksize is None and len(csv_data) > CHUNKED_READ_BYTES:
+            chunksize = CHUNK_ROWS
+
+        if not chunksize:
+            df = pd.read_csv(BytesIO(csv_data), usecols=usecols, dtype=dtypes)
+            df['time'] = pd.to_datetime(df['time'])
+            return df
+
+        chunks = []
+        for chunk in pd.read_csv(BytesIO(csv_data), usecols=usecols, dtype=dtypes, chunksize=chunksize):
+            chunk['time'] = pd.to_datetime(chunk['time'])
+            chunks.append(chunk)
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=usecols)
+
     def _analyze_data_summary(self, df: pd.DataFrame) -> Dict:
         """Analyze basic data summary."""
         return {
@@ -116,7 +172,7 @@ class CSVChartAnalyzer:
             "volume": latest.get('volume', None)
         }
 
-    def _detect_orbs(self, df: pd.DataFrame) -> Dict:
+    def _detect_orbs(self, df: pd.DataFrame, bars: Optional[_BarArrays] = None) -> Dict:
         """
         Detect Opening Range Breakouts with stateful, time-aware logic.
 
@@ -128,15 +184,18 @@ class CSVChartAnalyzer:
         - BROKEN_DOWN: First close below ORB (LOCKED)
 
         Once BROKEN, state is IMMUTABLE - never reverts.
+
+        ORB windows are on the latest local date in the data; bars are located
+        by binary search on the UTC arrays, so each ORB only scans bars from
+        its window onwards.
         """
         orb_results = {}
+        if bars is None:
+            bars = _BarArrays.from_frame(df)
 
-        # Get latest timestamp in data
-        latest_time = df['time'].iloc[-1]
-
-        # Ensure latest_time is timezone-aware
-        if latest_time.tzinfo is None:
-            latest_time = latest_time.tz_localize('UTC')
+        # Latest timestamp in data (UTC)
+        latest_time = bars.time_utc[-1]
+        current_price = bars.close[-1]
 
         # Convert to local time for ORB comparison
         local_time = latest_time.astimezone(TZ_LOCAL)
@@ -174,20 +233,11 @@ class CSVChartAnalyzer:
                 continue
 
             # STATE 3+: ORB window complete - evaluate break
-            # Find bars in the ORB window (5 minutes)
-            # Convert times to local timezone for filtering
-            df_local = df.copy()
-            if df_local['time'].dt.tz is None:
-                df_local['time'] = pd.to_datetime(df_local['time']).dt.tz_localize('UTC')
-            df_local['time_local'] = df_local['time'].dt.tz_convert(TZ_LOCAL)
-
-            orb_bars = df_local[
-                (df_local['time_local'].dt.hour == orb_hour) &
-                (df_local['time_local'].dt.minute >= orb_min) &
-                (df_local['time_local'].dt.minute < orb_min + 5)
-            ]
-
-            if orb_bars.empty:
+            # Bars in the ORB window (5 minutes)
+            i_start = bars.index_at(orb_start_utc)
+            i_end = bars.index_at(orb_end_utc)
+
+            if i_end <= i_start:
                 orb_results[orb_name] = {
                     "state": "NOT_DETECTED",
                     "detected": False,
@@ -196,26 +246,16 @@ class CSVChartAnalyzer:
                 continue
 
             # Calculate ORB levels
-            orb_high = orb_bars['high'].max()
-            orb_low = orb_bars['low'].min()
+            orb_high = bars.high[i_start:i_end].max()
+            orb_low = bars.low[i_start:i_end].min()
             orb_size = orb_high - orb_low
 
-            # Find FIRST close outside ORB after window closed
-            # This is the ONLY way to determine break - use first break, then LOCK
-            # Ensure proper timezone comparison
-            df_times_utc = df['time']
-            if df_times_utc.dt.tz is None:
-                df_times_utc = pd.to_datetime(df_times_utc).dt.tz_localize('UTC')
-
-            bars_after_orb = df[df_times_utc >= orb_end_utc]
-
             break_time = None
             break_price = None
             state = "ACTIVE"  # Default: ORB formed but not broken
             potential_direction = "WAIT"
 
             # Get current price position for display (not for state decision)
-            current_price = df['close'].iloc[-1]
             if current_price > orb_high:
                 current_position = "ABOVE"
             elif current_price < orb_low:
@@ -223,24 +263,20 @@ class CSVChartAnalyzer:
             else:
                 current_position = "INSIDE"
 
-            # Search for FIRST break
-            if not bars_after_orb.empty:
-                for idx, row in bars_after_orb.iterrows():
-                    close = row['close']
-
-                    # Check for break (FIRST close outside range)
-                    if close > orb_high:
-                        state = "BROKEN_UP"
-                        potential_direction = "LONG"
-                        break_time = row['time']
-                        break_price = close
-                        break  # LOCK STATE - stop searching
-                    elif close < orb_low:
-                        state = "BROKEN_DOWN"
-                        potential_direction = "SHORT"
-                        break_time = row['time']
-                        break_price = close
-                        break  # LOCK STATE - stop searching
+            # Find FIRST close outside ORB after window closed
+            # This is the ONLY way to determine break - use first break, then LOCK
+            after = bars.close[i_end:]
+            outside = np.flatnonzero((after > orb_high) | (after < orb_low))
+            if outside.size:
+                i_break = i_end + int(outside[0])
+                break_price = bars.close[i_break]
+                break_time = df['time'].iloc[i_break]
+                if break_price > orb_high:
+                    state = "BROKEN_UP"
+                    potential_direction = "LONG"
+                else:
+                    state = "BROKEN_DOWN"
+                    potential_direction = "SHORT"
 
             # Build result
             result = {
@@ -251,7 +287,7 @@ class CSVChartAnalyzer:
                 "size": orb_size,
                 "midpoint": (orb_high + orb_low) / 2,
                 "orb_window_end": orb_end_local,
-                "bars_count": len(orb_bars),
+                "bars_count": i_end - i_start,
                 "current_price_position": current_position,  # For display only
                 "potential_direction": potential_direction
             }
@@ -313,48 +349,18 @@ class CSVChartAnalyzer:
 
         return True
 
-    def _calculate_indicators(self, df: pd.DataFrame) -> Dict:
-        """Calculate technical indicators."""
+    def _calculate_indicators(self, df: pd.DataFrame, bars: Optional[_BarArrays] = None) -> Dict:
+        """Calculate technical indicators (latest values, from tail slices only)."""
+        if bars is None:
+            bars = _BarArrays.from_frame(df)
         indicators = {}
 
-        # ATR (14-period on close prices as approximation)
-        if len(df) >= 14:
-            high_low = df['high'] - df['low']
-            high_close = abs(df['high'] - df['close'].shift())
-            low_close = abs(df['low'] - df['close'].shift())
-
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-
-            atr_14 = true_range.rolling(window=14).mean().iloc[-1]
-            indicators['atr_14'] = atr_14
-        else:
-            indicators['atr_14'] = None
-
-        # ATR (20-period - our standard)
-        if len(df) >= 20:
-            high_low = df['high'] - df['low']
-            high_close = abs(df['high'] - df['close'].shift())
-            low_close = abs(df['low'] - df['close'].shift())
-
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-
-            atr_20 = true_range.rolling(window=20).mean().iloc[-1]
-            indicators['atr_20'] = atr_20
-        else:
-            indicators['atr_20'] = None
+        # ATR (14-period; 20-period is our standard)
+        for period in (14, 20):
+            indicators[f'atr_{period}'] = self._atr_last(bars, period) if len(bars.close) >= period else None
 
         # RSI (14-period)
-        if len(df) >= 14:
-            close_delta = df['close'].diff()
-            gain = (close_delta.where(close_delta > 0, 0)).rolling(window=14).mean()
-            loss = (-close_delta.where(close_delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            indicators['rsi_14'] = rsi.iloc[-1]
-        else:
-            indicators['rsi_14'] = None
+        indicators['rsi_14'] = self._rsi_last(bars.close, 14) if len(bars.close) >= 14 else None
 
         # Recent volatility (last 20 bars)
         if len(df) >= 20:
@@ -365,6 +371,30 @@ class CSVChartAnalyzer:
 
         return indicators
 
+    @staticmethod
+    def _atr_last(bars: _BarArrays, period: int) -> float:
+        """Mean true range of the last `period` bars (first bar of the data: high - low)"""
+        start = max(len(bars.close) - period, 0)
+        high, low = bars.high[start:], bars.low[start:]
+        tr = high - low
+        prev_close = bars.close[start - 1:-1] if start > 0 else np.r_[np.nan, bars.close[:-1]]
+        with np.errstate(invalid='ignore'):
+            tr = np.fmax(tr, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return tr.mean()
+
+    @staticmethod
+    def _rsi_last(close: np.ndarray, period: int) -> float:
+        """RSI from simple averages of the last `period` changes (first bar counts as no change)"""
+        window = close[-(period + 1):]
+        delta = np.diff(window)
+        if len(window) == period:
+            delta = np.r_[0.0, delta]
+        gain = np.where(delta > 0, delta, 0.0).mean()
+        loss = np.where(delta < 0, -delta, 0.0).mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(gain) / np.float64(loss)
+        return 100 - (100 / (1 + rs))
+
     def _analyze_structure(self, df: pd.DataFrame) -> Dict:
         """Analyze market structure."""
         if len(df) < 10:
@@ -4,12 +4,11 @@ Handles real-time 1-minute bar ingestion and rolling window management.
 """
 
 import pandas as pd
-import duckdb
-import httpx
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import logging
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -27,6 +26,9 @@ from config import (
     TZ_LOCAL,
     TZ_UTC,
 )
+from projectx_api import ProjectXSettings, get_session
+from latency_tracing import traced
+import db_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -54,13 +56,17 @@ class LiveDataLoader:
             logger.info(f"Cloud mode: Connected to MotherDuck for {symbol}")
         else:
             # Local mode - use gold.db
-            self.con = duckdb.connect(DB_PATH, read_only=False)
+            self.con = db_metrics.connect(DB_PATH, read_only=False)
             logger.info(f"Local mode: Connected to {DB_PATH} for {symbol}")
 
         self._setup_tables()
         self.bars_df = pd.DataFrame()  # In-memory cache
+        self._bars_fetched = (0.0, 0)  # (monotonic time, lookback_minutes) of last fetch
+        self._fetch_started_utc: Optional[datetime] = None
+        self.bars_fetched_utc: Optional[datetime] = None  # when the fetch behind bars_df started
 
-        # ProjectX API client
+        # ProjectX API client (shared pooled session, see projectx_api)
+        self.projectx = None
         self.projectx_token: Optional[str] = None
         self.projectx_contract_id: Optional[str] = None
         self.projectx_source_symbol: Optional[str] = None
@@ -96,51 +102,24 @@ class LiveDataLoader:
             logger.info(f"Could not create live_bars table (cloud mode): {e}")
 
     def _login_projectx(self):
-        """Login to ProjectX API and get auth token."""
-        url = f"{PROJECTX_BASE_URL}/api/Auth/loginKey"
-        payload = {
-            "userName": PROJECTX_USERNAME,
-            "apiKey": PROJECTX_API_KEY,
-        }
-        headers = {"Accept": "text/plain", "Content-Type": "application/json"}
-
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(url, json=payload, headers=headers)
-            r.raise_for_status()
-            data = r.json()
-
-        if not data.get("success"):
-            raise RuntimeError(f"ProjectX login failed: {data}")
-
-        self.projectx_token = data["token"]
+        """Login to ProjectX API and get auth token (cached by the shared session)."""
+        self.projectx = get_session(ProjectXSettings(
+            base_url=PROJECTX_BASE_URL,
+            username=PROJECTX_USERNAME,
+            api_key=PROJECTX_API_KEY,
+            live=PROJECTX_LIVE,
+        ))
+        self.projectx_token = self.projectx.login()
         logger.info("ProjectX authentication successful")
 
     def _get_active_contract(self):
         """Get active contract ID for the symbol."""
-        url = f"{PROJECTX_BASE_URL}/api/Contract/search"
-        payload = {"searchText": self.symbol, "live": PROJECTX_LIVE}
-        headers = {
-            "Accept": "text/plain",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.projectx_token}"
-        }
-
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(url, json=payload, headers=headers)
-            r.raise_for_status()
-            data = r.json()
-
-        contracts = data.get("contracts", [])
-        active = [c for c in contracts if c.get("activeContract")]
-
-        if not active:
-            raise RuntimeError(f"No active {self.symbol} contract found")
-
-        contract = active[0]
+        contract = self.projectx.active_contract(self.symbol)
         self.projectx_contract_id = contract["id"]
         self.projectx_source_symbol = contract.get("name", self.symbol)
         logger.info(f"Active contract: {self.projectx_source_symbol} (ID: {self.projectx_contract_id})")
 
+    @traced("fetch_latest_bars")
     def fetch_latest_bars(self, lookback_minutes: int = None) -> pd.DataFrame:
         """
         Fetch latest bars from ProjectX API or database.
@@ -153,6 +132,7 @@ class LiveDataLoader:
         """
         if lookback_minutes is None:
             lookback_minutes = DATA_WINDOW_HOURS * 60
+        self._fetch_started_utc = datetime.now(TZ_UTC)
 
         # Try ProjectX API first if available
         if self.projectx_token and self.projectx_contract_id:
@@ -197,7 +177,7 @@ class LiveDataLoader:
         # Convert to local timezone for display
         result["ts_local"] = pd.to_datetime(result["ts_utc"]).dt.tz_convert(TZ_LOCAL)
 
-        self.bars_df = result
+        self._set_bars(result, lookback_minutes)
         return result
 
     def _fetch_from_projectx(self, lookback_minutes: int) -> pd.DataFrame:
@@ -209,32 +189,15 @@ class LiveDataLoader:
         start_iso = start_utc.isoformat().replace("+00:00", "Z")
         end_iso = end_utc.isoformat().replace("+00:00", "Z")
 
-        url = f"{PROJECTX_BASE_URL}/api/History/retrieveBars"
-        payload = {
-            "contractId": self.projectx_contract_id,
-            "live": PROJECTX_LIVE,
-            "startTime": start_iso,
-            "endTime": end_iso,
-            "unit": 2,  # Minutes
-            "unitNumber": 1,  # 1-minute bars
-            "limit": 20000,
-            "includePartialBar": True,  # Include current forming bar
-        }
-        headers = {
-            "Accept": "text/plain",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.projectx_token}"
-        }
-
-        with httpx.Client(timeout=60.0) as client:
-            r = client.post(url, json=payload, headers=headers)
-            r.raise_for_status()
-            data = r.json()
-
-        if not data.get("success"):
-            raise RuntimeError(f"retrieveBars failed: {data}")
-
-        bars = data.get("bars") or []
+        bars = self.projectx.retrieve_bars(
+            self.projectx_contract_id,
+            start_iso,
+            end_iso,
+            unit=2,  # Minutes
+            unit_number=1,  # 1-minute bars
+            limit=20000,
+            include_partial=True,  # Include current forming bar
+        )
 
         if not bars:
             logger.warning(f"No bars returned from ProjectX for {self.symbol}")
@@ -259,7 +222,7 @@ class LiveDataLoader:
             result = pd.DataFrame(rows)
             result["ts_local"] = result["ts_utc"].dt.tz_convert(TZ_LOCAL)
 
-            self.bars_df = result
+            self._set_bars(result, lookback_minutes)
             logger.info(f"Fetched {len(bars)} bars from ProjectX for {self.symbol} (cloud mode)")
             return result
 
@@ -287,10 +250,36 @@ class LiveDataLoader:
             # Convert to local timezone for display
             result["ts_local"] = pd.to_datetime(result["ts_utc"]).dt.tz_convert(TZ_LOCAL)
 
-            self.bars_df = result
+            self._set_bars(result, lookback_minutes)
             logger.info(f"Fetched {len(bars)} bars from ProjectX for {self.symbol}")
             return result
 
+    def _set_bars(self, bars: pd.DataFrame, lookback_minutes: int):
+        self.bars_df = bars
+        self._bars_fetched = (time.monotonic(), lookback_minutes)
+        self.bars_fetched_utc = self._fetch_started_utc
+
+    def last_closed_bar_ts(self) -> Optional[pd.Timestamp]:
+        """Start time of the newest cached bar that had already closed when it was fetched"""
+        if self.bars_df.empty or self.bars_fetched_utc is None:
+            return None
+        starts = pd.to_datetime(self.bars_df["ts_utc"], utc=True)
+        closed = starts[starts + pd.Timedelta(minutes=1) <= self.bars_fetched_utc]
+        return closed.iloc[-1] if len(closed) else None
+
+    def get_recent_bars(self, lookback_minutes: int, max_age_seconds: float = 5.0) -> pd.DataFrame:
+        """
+        Bars for the last lookback_minutes, reusing the cached fetch when it is
+        recent and covers the window (chart cards run right after the strategy
+        engine's fetch in the same rerun).
+        """
+        fetched_at, fetched_lookback = self._bars_fetched
+        fresh = time.monotonic() - fetched_at <= max_age_seconds
+        if not self.bars_df.empty and fresh and fetched_lookback >= lookback_minutes:
+            cutoff = datetime.now(TZ_UTC) - timedelta(minutes=lookback_minutes)
+            return self.bars_df[self.bars_df["ts_utc"] >= cutoff].reset_index(drop=True)
+        return self.fetch_latest_bars(lookback_minutes=lookback_minutes)
+
     def get_bars_in_range(self, start_local: datetime, end_local: datetime) -> pd.DataFrame:
         """
         Get bars within a time range (local timezone).
@@ -427,7 +416,7 @@ class LiveDataLoader:
             gold_con = self.con
             close_con = False
         else:
-            gold_con = duckdb.connect(gold_db_path, read_only=True)
+            gold_con = db_metrics.connect(gold_db_path, read_only=True)
             close_con = True
         cutoff = datetime.now(TZ_UTC) - timedelta(days=days)
 
@@ -506,7 +495,7 @@ class LiveDataLoader:
         try:
             # Use absolute path to avoid working directory issues
             gold_db_path = os.getenv("GOLD_DB_PATH", str(Path(__file__).parent.parent / "gold.db"))
-            gold_con = duckdb.connect(gold_db_path, read_only=True)
+            gold_con = db_metrics.connect(gold_db_path, read_only=True)
             result = gold_con.execute(f"""
                 SELECT atr_20
                 FROM {features_table}
@@ -1,13 +1,23 @@
 """
 ENHANCED CHARTING - Multi-timeframe charts with indicators and ORB overlays
 Professional-grade charting for trading application.
+
+Live charts should go through IndicatorEngine: it keeps resampled bars and
+indicator state per timeframe and only processes newly closed bars on each
+refresh (the forming bar is computed separately). Indicator/resample_bars
+recompute the whole series and remain for one-off charts.
 """
 
+import copy
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple
 from zoneinfo import ZoneInfo
 import numpy as np
 
@@ -73,6 +83,11 @@ class Indicator:
         return middle, upper, lower
 
 
+def _column_or(bars_df: pd.DataFrame, column: str, compute) -> pd.Series:
+    """Indicator column precomputed by IndicatorEngine, else compute over the whole frame"""
+    return bars_df[column] if column in bars_df else compute()
+
+
 class ORBOverlay:
     """ORB visualization overlay for charts"""
 
@@ -228,7 +243,7 @@ class EnhancedChart:
         if self.fig is None:
             raise ValueError("Create chart first")
 
-        ema = Indicator.ema(bars_df["close"], period)
+        ema = _column_or(bars_df, f"ema_{period}", lambda: Indicator.ema(bars_df["close"], period))
         name = name or f"EMA({period})"
 
         self.fig.add_trace(go.Scatter(
@@ -236,7 +251,8 @@ class EnhancedChart:
             y=ema,
             name=name,
             line=dict(color=color or 'blue', width=1),
-            mode='lines'
+            mode='lines',
+            meta=f"ema_{period}"  # source column (LiveChartCache refreshes y from it)
         ))
 
     def add_sma(self, bars_df: pd.DataFrame, period: int, name: str = None, color: str = None):
@@ -244,7 +260,7 @@ class EnhancedChart:
         if self.fig is None:
             raise ValueError("Create chart first")
 
-        sma = Indicator.sma(bars_df["close"], period)
+        sma = _column_or(bars_df, f"sma_{period}", lambda: Indicator.sma(bars_df["close"], period))
         name = name or f"SMA({period})"
 
         self.fig.add_trace(go.Scatter(
@@ -252,7 +268,8 @@ class EnhancedChart:
             y=sma,
             name=name,
             line=dict(color=color or 'purple', width=1),
-            mode='lines'
+            mode='lines',
+            meta=f"sma_{period}"
         ))
 
     def add_vwap(self, bars_df: pd.DataFrame):
@@ -260,19 +277,20 @@ class EnhancedChart:
         if self.fig is None:
             raise ValueError("Create chart first")
 
-        vwap = Indicator.vwap(
+        vwap = _column_or(bars_df, "vwap", lambda: Indicator.vwap(
             bars_df["high"],
             bars_df["low"],
             bars_df["close"],
             bars_df["volume"]
-        )
+        ))
 
         self.fig.add_trace(go.Scatter(
             x=bars_df["ts_local"],
             y=vwap,
             name="VWAP",
             line=dict(color='orange', width=2, dash='dash'),
-            mode='lines'
+            mode='lines',
+            meta="vwap"
         ))
 
     def add_bollinger_bands(self, bars_df: pd.DataFrame, period: int = 20, std_dev: float = 2.0):
@@ -280,7 +298,11 @@ class EnhancedChart:
         if self.fig is None:
             raise ValueError("Create chart first")
 
-        middle, upper, lower = Indicator.bollinger_bands(bars_df["close"], period, std_dev)
+        suffix = f"{period}_{std_dev:g}"
+        if f"bb_mid_{suffix}" in bars_df:
+            middle, upper, lower = (bars_df[f"bb_{band}_{suffix}"] for band in ("mid", "upper", "lower"))
+        else:
+            middle, upper, lower = Indicator.bollinger_bands(bars_df["close"], period, std_dev)
 
         # Upper band
         self.fig.add_trace(go.Scatter(
@@ -316,7 +338,8 @@ class EnhancedChart:
         if self.fig is None:
             raise ValueError("Create chart first")
 
-        atr = Indicator.atr(bars_df["high"], bars_df["low"], bars_df["close"], period)
+        atr = _column_or(bars_df, f"atr_{period}",
+                         lambda: Indicator.atr(bars_df["high"], bars_df["low"], bars_df["close"], period))
         close = bars_df["close"]
 
         upper = close + (atr * multiplier)
@@ -568,6 +591,15 @@ class EnhancedChart:
         return self.fig
 
 
+# Resample rules (1m bars -> timeframe)
+RESAMPLE_RULES = {
+    ChartTimeframe.M5: '5min',
+    ChartTimeframe.M15: '15min',
+    ChartTimeframe.H1: '1h',
+    ChartTimeframe.D1: '1D'
+}
+
+
 def resample_bars(bars_df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
     """
     Resample 1-minute bars to different timeframe.
@@ -583,15 +615,7 @@ def resample_bars(bars_df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
     df = bars_df.copy()
     df.set_index('ts_local', inplace=True)
 
-    # Resample rules
-    resample_map = {
-        ChartTimeframe.M5: '5min',
-        ChartTimeframe.M15: '15min',
-        ChartTimeframe.H1: '1H',
-        ChartTimeframe.D1: '1D'
-    }
-
-    rule = resample_map.get(timeframe)
+    rule = RESAMPLE_RULES.get(timeframe)
     if not rule:
         return bars_df
 
@@ -607,3 +631,262 @@ def resample_bars(bars_df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
     resampled.reset_index(inplace=True)
 
     return resampled
+
+
+# ============================================================================
+# INCREMENTAL INDICATOR ENGINE
+# ============================================================================
+# Streaming versions of the Indicator methods above (same pandas semantics).
+# update() commits a closed bar; peek() gives the value for the forming bar
+# without changing state. State is O(period), so a refresh costs the same
+# regardless of how much history the chart shows.
+
+NAN = float("nan")
+
+
+class _StreamingIndicator(ABC):
+    @abstractmethod
+    def columns(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def update(self, o: float, h: float, l: float, c: float, v: float) -> List[float]:
+        ...
+
+    def peek(self, o: float, h: float, l: float, c: float, v: float) -> List[float]:
+        return copy.deepcopy(self).update(o, h, l, c, v)
+
+
+class _EMA(_StreamingIndicator):
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value: Optional[float] = None
+
+    def columns(self):
+        return [f"ema_{self.period}"]
+
+    def update(self, o, h, l, c, v):
+        self.value = c if self.value is None else self.alpha * c + (1 - self.alpha) * self.value
+        return [self.value]
+
+
+class _SMA(_StreamingIndicator):
+    def __init__(self, period: int):
+        self.period = period
+        self.window: deque = deque(maxlen=period)
+
+    def columns(self):
+        return [f"sma_{self.period}"]
+
+    def update(self, o, h, l, c, v):
+        self.window.append(c)
+        return [sum(self.window) / self.period if len(self.window) == self.period else NAN]
+
+
+class _RSI(_StreamingIndicator):
+    """Rolling-mean RSI (Indicator.rsi: the first bar counts as a zero change)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.gains: deque = deque(maxlen=period)
+        self.losses: deque = deque(maxlen=period)
+
+    def columns(self):
+        return [f"rsi_{self.period}"]
+
+    def update(self, o, h, l, c, v):
+        delta = 0.0 if self.prev_close is None else c - self.prev_close
+        self.prev_close = c
+        self.gains.append(max(delta, 0.0))
+        self.losses.append(max(-delta, 0.0))
+        if len(self.gains) < self.period:
+            return [NAN]
+        gain, loss = sum(self.gains) / self.period, sum(self.losses) / self.period
+        if loss == 0.0:
+            return [100.0 if gain > 0.0 else NAN]
+        return [100 - (100 / (1 + gain / loss))]
+
+
+class _ATR(_StreamingIndicator):
+    def __init__(self, period: int):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.ranges: deque = deque(maxlen=period)
+
+    def columns(self):
+        return [f"atr_{self.period}"]
+
+    def update(self, o, h, l, c, v):
+        tr = h - l
+        if self.prev_close is not None:
+            tr = max(tr, abs(h - self.prev_close), abs(l - self.prev_close))
+        self.prev_close = c
+        self.ranges.append(tr)
+        return [sum(self.ranges) / self.period if len(self.ranges) == self.period else NAN]
+
+
+class _VWAP(_StreamingIndicator):
+    """Cumulative VWAP from the first bar the engine saw"""
+
+    def __init__(self):
+        self.pv = 0.0
+        self.volume = 0.0
+
+    def columns(self):
+        return ["vwap"]
+
+    def update(self, o, h, l, c, v):
+        self.pv += (h + l + c) / 3 * v
+        self.volume += v
+        return [self.pv / self.volume if self.volume else NAN]
+
+
+class _Bollinger(_StreamingIndicator):
+    def __init__(self, period: int, std_dev: float):
+        self.period = period
+        self.std_dev = std_dev
+        self.window: deque = deque(maxlen=period)
+
+    def columns(self):
+        suffix = f"{self.period}_{self.std_dev:g}"
+        return [f"bb_mid_{suffix}", f"bb_upper_{suffix}", f"bb_lower_{suffix}"]
+
+    def update(self, o, h, l, c, v):
+        self.window.append(c)
+        if len(self.window) < self.period:
+            return [NAN, NAN, NAN]
+        mean = sum(self.window) / self.period
+        std = math.sqrt(sum((x - mean) ** 2 for x in self.window) / (self.period - 1))
+        return [mean, mean + std * self.std_dev, mean - std * self.std_dev]
+
+
+class IndicatorEngine:
+    """
+    Resampled bars + indicator state for one chart timeframe.
+
+    Feed it the latest 1-minute bars on every refresh (overlapping windows are
+    fine). Only bars newer than the forming bucket are read; a bucket is
+    committed to the indicators once a later bucket starts. The forming bar is
+    re-aggregated from its own 1m bars and its indicator values are peeked.
+
+    Example:
+        engine = IndicatorEngine(ChartTimeframe.M5, ema=(9, 20), rsi=(14,), vwap=True)
+        bars_5m = engine.update(bars_1m)   # ts_local, OHLCV, ema_9, ema_20, rsi_14, vwap
+        chart.add_ema(bars_5m, 9)          # uses the precomputed column
+    """
+
+    def __init__(self, timeframe: str = ChartTimeframe.M1, ema: Tuple[int, ...] = (),
+                 sma: Tuple[int, ...] = (), rsi: Tuple[int, ...] = (), atr: Tuple[int, ...] = (),
+                 vwap: bool = False, bollinger: Tuple[Tuple[int, float], ...] = (),
+                 max_bars: int = 5000):
+        self.timeframe = timeframe
+        self.rule = RESAMPLE_RULES.get(timeframe, '1min')
+        self.max_bars = max_bars
+        self._specs = (tuple(ema), tuple(sma), tuple(rsi), tuple(atr), vwap, tuple(bollinger))
+        self.stats = {"closed_bars": 0, "rows_read": 0, "resets": 0}
+        self.reset()
+
+    def reset(self):
+        """Drop all bars and indicator state"""
+        ema, sma, rsi, atr, vwap, bollinger = self._specs
+        self._indicators: List[_StreamingIndicator] = (
+            [_EMA(p) for p in ema] + [_SMA(p) for p in sma] + [_RSI(p) for p in rsi]
+            + [_ATR(p) for p in atr] + ([_VWAP()] if vwap else [])
+            + [_Bollinger(p, k) for p, k in bollinger]
+        )
+        self.columns = ["ts_local", "open", "high", "low", "close", "volume"] + [
+            col for ind in self._indicators for col in ind.columns()
+        ]
+        self._closed: deque = deque(maxlen=self.max_bars)
+        self._closed_df: Optional[pd.DataFrame] = None
+        self._forming_start: Optional[pd.Timestamp] = None
+        self._forming_1m: Dict[pd.Timestamp, Tuple[float, float, float, float, float]] = {}
+
+    def update(self, bars_1m: pd.DataFrame) -> pd.DataFrame:
+        """Ingest new 1m bars; returns resampled bars + indicators for the input window"""
+        if bars_1m.empty:
+            return self.frame()
+
+        ts = pd.DatetimeIndex(bars_1m["ts_local"])
+        start = 0
+        if self._forming_start is not None:
+            if ts[-1] < self._forming_start:
+                # Data went backwards (instrument switch, DB reload): start over
+                self.stats["resets"] += 1
+                self.reset()
+            else:
+                start = ts.searchsorted(self._forming_start)
+
+        cols = [bars_1m[c].to_numpy()[start:] for c in ("open", "high", "low", "close", "volume")]
+        for t, o, h, l, c, v in zip(ts[start:], *cols):
+            bucket = t.floor(self.rule)
+            if self._forming_start is None:
+                self._forming_start = bucket
+            elif bucket > self._forming_start:
+                self._close_forming()
+                self._forming_start = bucket
+            elif bucket < self._forming_start:
+                continue
+            self._forming_1m[t] = (float(o), float(h), float(l), float(c), float(v))
+        self.stats["rows_read"] += int(len(ts) - start)
+
+        return self.frame(since=ts[0].floor(self.rule))
+
+    def _forming_bar(self) -> Optional[Tuple[float, float, float, float, float]]:
+        if not self._forming_1m:
+            return None
+        bars = [self._forming_1m[t] for t in sorted(self._forming_1m)]
+        return (bars[0][0], max(b[1] for b in bars), min(b[2] for b in bars), bars[-1][3], sum(b[4] for b in bars))
+
+    def _close_forming(self):
+        bar = self._forming_bar()
+        if bar is not None:
+            values = [x for ind in self._indicators for x in ind.update(*bar)]
+            self._closed.append((self._forming_start, *bar, *values))
+            self._closed_df = None
+            self.stats["closed_bars"] += 1
+        self._forming_1m = {}
+
+    def latest(self) -> Dict[str, Any]:
+        """Forming bar (or last closed bar) with indicator values"""
+        bar = self._forming_bar()
+        if bar is None:
+            return dict(zip(self.columns, self._closed[-1])) if self._closed else {}
+        values = [x for ind in self._indicators for x in ind.peek(*bar)]
+        return dict(zip(self.columns, (self._forming_start, *bar, *values)))
+
+    def frame(self, since: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Closed bars (cached between closes) plus the forming bar"""
+        if self._closed_df is None:
+            self._closed_df = pd.DataFrame(list(self._closed), columns=self.columns)
+        df = self._closed_df
+        if self._forming_1m:
+            latest = self.latest()
+            df = pd.concat([df, pd.DataFrame([latest], columns=self.columns)], ignore_index=True) if len(df) \
+                else pd.DataFrame([latest], columns=self.columns)
+        if since is not None and len(df):
+            df = df[df["ts_local"] >= since].reset_index(drop=True)
+        return df
+
+
+# Indicators drawn as lines on the live trading chart (build_live_trading_chart)
+DEFAULT_CHART_INDICATORS = dict(ema=(9, 20), vwap=True)
+
+
+def chart_bars(engines: Dict, bars_1m: pd.DataFrame, timeframe: str,
+               indicators: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Resampled bars for a live chart, reusing the engine cached in `engines`
+    (e.g. st.session_state.chart_engines) for this timeframe.
+
+    Indicator columns are only computed when `indicators` (IndicatorEngine
+    keyword arguments, e.g. DEFAULT_CHART_INDICATORS) is given; the live
+    trading chart draws the EMA/SMA/VWAP columns it receives.
+    """
+    key = (timeframe, tuple(sorted(indicators.items()))) if indicators else timeframe
+    engine = engines.get(key)
+    if engine is None:
+        engine = engines[key] = IndicatorEngine(timeframe, **(indicators or {}))
+    return engine.update(bars_1m)
@@ -0,0 +1,238 @@
+"""
+Latency tracing for the live decision loop.
+
+Stages are timed as spans, either with the span() context manager or with the
+@traced decorator. Spans go into a bounded in-memory ring (process-wide, shared
+by Streamlit reruns). Each one is tagged with the trace it ran in, so a single
+decision loop can be broken down by stage:
+
+    with TRACER.trace():                      # one decision loop
+        bars = loader.fetch_latest_bars()     # @traced("fetch_latest_bars")
+        evaluation = engine.evaluate_all()    # @traced("evaluate_all")
+        with span("chart_render"):
+            ...
+        TRACER.record("bar_to_decision", bar_to_decision_seconds(closed_bar_ts))
+
+Linear scripts such as the Streamlit page use begin_trace() / .end() instead.
+bar_to_decision is measured from the close of the newest bar that had closed
+when it was fetched (the forming bar has no close yet), once per such bar;
+fetch_to_decision is the part of it spent after the fetch started.
+
+summary() gives p50/p95/p99 per stage for the sidebar panel. regressions()
+flags stages whose recent p95 is well above their earlier p95.
+
+Persistence is optional: set LATENCY_TRACE_DB to a DuckDB file, for example
+db_metrics.db, and spans are appended in batches to a latency_spans table.
+"""
+
+import atexit
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RING_SIZE = 5000        # spans kept in memory
+FLUSH_EVERY = 200       # spans buffered before a persistence flush
+RECENT_SAMPLES = 30     # window compared against older samples in regressions()
+REGRESSION_FACTOR = 1.5
+MAX_BAR_AGE_SECONDS = 600  # older bars mean a stale feed / closed market, not decision latency
+
+# Decision-loop stages in pipeline order (panel ordering)
+STAGES = [
+    "fetch_latest_bars",
+    "evaluate_all",
+    "ml_insights",
+    "scan_setups",
+    "chart_render",
+    "decision_loop",
+    "fetch_to_decision",
+    "bar_to_decision",
+]
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("latency_trace", default=None)
+
+
+def bar_to_decision_seconds(bar_ts_utc: datetime, bar_minutes: int = 1,
+                            now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds from the close of the bar starting at bar_ts_utc until now (None when stale)"""
+    now = now or datetime.now(timezone.utc)
+    closed = pd.Timestamp(bar_ts_utc) + pd.Timedelta(minutes=bar_minutes)
+    if closed.tzinfo is None:
+        closed = closed.tz_localize("UTC")
+    age = (pd.Timestamp(now) - closed).total_seconds()
+    return age if 0 <= age <= MAX_BAR_AGE_SECONDS else None
+
+
+class OpenTrace:
+    """A trace started with Tracer.begin_trace() and finished with end()"""
+
+    def __init__(self, tracer: "Tracer", stage: str):
+        self.tracer = tracer
+        self.stage = stage
+        self.trace_id = uuid.uuid4().hex[:12]
+        self._token = _current_trace.set(self.trace_id)
+        self._start = time.perf_counter()
+        self.seconds: Optional[float] = None
+
+    def end(self, ok: bool = True) -> float:
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self._start
+            self.tracer.record(self.stage, self.seconds, ok)
+            try:
+                _current_trace.reset(self._token)
+            except ValueError:  # ended from a different context
+                _current_trace.set(None)
+        return self.seconds
+
+
+class Tracer:
+    """Bounded ring of stage timings with optional DuckDB persistence"""
+
+    def __init__(self, capacity: int = RING_SIZE, persist_path: Optional[str] = None):
+        self.spans = deque(maxlen=capacity)
+        self.persist_path = persist_path
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, stage: str = "decision_loop"):
+        """Run one decision loop: nested spans share its trace id; the whole loop is timed as `stage`"""
+        open_trace = self.begin_trace(stage)
+        ok = False
+        try:
+            yield open_trace.trace_id
+            ok = True
+        finally:
+            open_trace.end(ok)
+
+    def begin_trace(self, stage: str = "decision_loop") -> OpenTrace:
+        return OpenTrace(self, stage)
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start, ok)
+
+    def record(self, stage: str, seconds: Optional[float], ok: bool = True):
+        """Add a measured duration (also used for latencies measured elsewhere, e.g. bar age)"""
+        if seconds is None:
+            return
+        entry = (datetime.now(timezone.utc), _current_trace.get(), stage, float(seconds), ok)
+        with self._lock:
+            self.spans.append(entry)
+            if self.persist_path:
+                self._pending.append(entry)
+                full = len(self._pending) >= FLUSH_EVERY
+            else:
+                full = False
+        if full:
+            self.flush()
+
+    def samples(self, stage: str) -> np.ndarray:
+        with self._lock:
+            return np.array([s[3] for s in self.spans if s[2] == stage])
+
+    def summary(self) -> pd.DataFrame:
+        """p50/p95/p99/max and last duration (ms) per stage"""
+        with self._lock:
+            spans = list(self.spans)
+        columns = ["stage", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms", "last_ms", "errors"]
+        if not spans:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(spans, columns=["ts", "trace_id", "stage", "seconds", "ok"])
+        rows = []
+        for stage, group in df.groupby("stage", sort=False):
+            ms = group["seconds"].to_numpy() * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            rows.append([stage, len(ms), p50, p95, p99, ms.max(), ms[-1], int((~group["ok"]).sum())])
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        out = pd.DataFrame(rows, columns=columns)
+        return out.sort_values("stage", key=lambda s: s.map(lambda x: order.get(x, len(order)))).reset_index(drop=True)
+
+    def regressions(self, recent: int = RECENT_SAMPLES, factor: float = REGRESSION_FACTOR) -> List[Dict]:
+        """Stages whose p95 over the last `recent` samples exceeds `factor` x the p95 before them"""
+        with self._lock:
+            spans = list(self.spans)
+        by_stage: Dict[str, List[float]] = {}
+        for s in spans:
+            by_stage.setdefault(s[2], []).append(s[3])
+        flagged = []
+        for stage, values in by_stage.items():
+            if len(values) < 2 * recent:
+                continue
+            before = float(np.percentile(values[:-recent], 95))
+            now = float(np.percentile(values[-recent:], 95))
+            if before > 0 and now > factor * before:
+                flagged.append({"stage": stage, "baseline_p95_ms": before * 1000,
+                                "recent_p95_ms": now * 1000, "ratio": now / before})
+        return flagged
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+            self._pending.clear()
+
+    def flush(self) -> bool:
+        """Append buffered spans to the persistence DB (kept for the next flush on failure)"""
+        with self._lock:
+            if not self.persist_path or not self._pending:
+                return True
+            pending, self._pending = self._pending, []
+        try:
+            import db_metrics  # repo root is on sys.path via config
+
+            con = db_metrics.connect(self.persist_path)
+            try:
+                con.execute("""
+                    CREATE TABLE IF NOT EXISTS latency_spans (
+                        ts TIMESTAMPTZ, trace_id VARCHAR, stage VARCHAR, seconds DOUBLE, ok BOOLEAN
+                    )
+                """)
+                con.executemany("INSERT INTO latency_spans VALUES (?, ?, ?, ?, ?)", pending)
+            finally:
+                con.close()
+            return True
+        except Exception as e:
+            logger.warning(f"Could not persist latency spans to {self.persist_path}: {e}")
+            with self._lock:
+                self._pending[:0] = pending[-RING_SIZE:]
+            return False
+
+
+TRACER = Tracer(persist_path=os.getenv("LATENCY_TRACE_DB") or None)
+atexit.register(TRACER.flush)
+
+
+def span(stage: str):
+    """Time a block as `stage` on the process-wide tracer"""
+    return TRACER.span(stage)
+
+
+def traced(stage: str):
+    """Decorator form of span()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,15 +1,101 @@
 """
 Live Chart Builder with Trade Zones
 Builds professional trading charts with clear trade entry zones
+
+LiveChartCache is the data layer for reruns: long windows are decimated
+(min/max preserving), prices are rounded to keep the JSON payload small, and
+the figure with its ORB/zone overlays is reused between reruns - only the
+candle data and the current-price line are replaced.
 """
 
+import math
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Callable, Hashable, Optional, Dict, List
 from enhanced_charting import EnhancedChart, ORBOverlay, ChartTimeframe
 
+CURRENT_PRICE = "current_price"  # name of the current-price shape/annotation
+OHLCV_AGG = {"ts_local": "first", "open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+LINE_PREFIXES = ("ema_", "sma_", "vwap")  # indicator columns drawn as price lines
+EMA_COLORS = {9: "#60a5fa", 20: "#a78bfa", 50: "#f472b6"}
+
+
+def decimate_ohlc(bars_df: pd.DataFrame, max_candles: Optional[int]) -> pd.DataFrame:
+    """
+    Merge consecutive bars into fixed time buckets so at most ~max_candles remain.
+
+    Buckets are aligned to the clock (stable across reruns) and aggregated as
+    OHLCV, so every high/low extreme survives. Extra columns keep their last value.
+    """
+    if not max_candles or len(bars_df) <= max_candles:
+        return bars_df
+
+    span = bars_df["ts_local"].iloc[-1] - bars_df["ts_local"].iloc[0]
+    minutes = max(1, math.ceil(span.total_seconds() / 60 / max_candles))
+    agg = {col: OHLCV_AGG.get(col, "last") for col in bars_df.columns}
+    buckets = bars_df["ts_local"].dt.floor(f"{minutes}min")
+    return bars_df.groupby(buckets, sort=True).agg(agg).reset_index(drop=True)
+
+
+def compact_bars(bars_df: pd.DataFrame, decimals: int = 2) -> pd.DataFrame:
+    """Chart columns only (OHLCV + indicator lines), prices rounded (tick is 0.1) to shrink the JSON payload"""
+    lines = [c for c in bars_df.columns if c.startswith(LINE_PREFIXES)]
+    cols = [c for c in OHLCV_AGG if c in bars_df.columns] + lines
+    out = bars_df[cols].copy()
+    prices = ["open", "high", "low", "close"] + lines
+    out[prices] = out[prices].round(decimals)
+    return out
+
+
+class LiveChartCache:
+    """
+    Reuses one chart figure across Streamlit reruns.
+
+    The figure is rebuilt only when `overlay_key` (ORB levels, trade levels,
+    tier, height...) changes; otherwise the candle/volume traces are swapped
+    for the new bars and the current-price line is moved.
+    """
+
+    def __init__(self, max_candles: int = 300):
+        self.max_candles = max_candles
+        self.fig: Optional[go.Figure] = None
+        self.key: Optional[Hashable] = None
+        self.stats = {"builds": 0, "updates": 0}
+
+    def render(self, bars_df: pd.DataFrame, overlay_key: Hashable,
+               build: Callable[[pd.DataFrame], go.Figure],
+               current_price: Optional[float] = None) -> go.Figure:
+        """Figure for bars_df; `build(bars)` draws it from scratch when overlays changed"""
+        bars = compact_bars(decimate_ohlc(bars_df, self.max_candles))
+        key = (overlay_key, current_price is None)
+        if self.fig is None or key != self.key:
+            self.fig = build(bars)
+            # Layout-only template: drops ~4KB of per-trace-type defaults from every payload
+            self.fig.layout.template = go.layout.Template(layout=self.fig.layout.template.layout)
+            self.key = key
+            self.stats["builds"] += 1
+            return self.fig
+
+        with self.fig.batch_update():
+            for trace in self.fig.data:
+                if trace.type == "candlestick":
+                    trace.update(x=bars["ts_local"], open=bars["open"], high=bars["high"],
+                                 low=bars["low"], close=bars["close"])
+                elif trace.type == "scatter" and trace.meta in bars:
+                    trace.update(x=bars["ts_local"], y=bars[trace.meta])
+                elif trace.type == "bar" and "volume" in bars:
+                    trace.update(x=bars["ts_local"], y=bars["volume"], marker_color=[
+                        '#26a69a' if c >= o else '#ef5350' for c, o in zip(bars["close"], bars["open"])
+                    ])
+            if current_price is not None:
+                self.fig.update_shapes(dict(y0=current_price, y1=current_price), selector=dict(name=CURRENT_PRICE))
+                self.fig.update_annotations(dict(y=current_price, text=f"Current: ${current_price:.2f}"),
+                                            selector=dict(name=CURRENT_PRICE))
+        self.stats["updates"] += 1
+        return self.fig
+
 
 def build_live_trading_chart(
     bars_df: pd.DataFrame,
@@ -61,6 +147,16 @@ def build_live_trading_chart(
 
     chart.fig = fig  # Set figure for overlay methods
 
+    # Indicator lines precomputed by IndicatorEngine (chart_bars with DEFAULT_CHART_INDICATORS)
+    for col in bars_df.columns:
+        if col.startswith("ema_"):
+            period = int(col[len("ema_"):])
+            chart.add_ema(bars_df, period, color=EMA_COLORS.get(period))
+        elif col.startswith("sma_"):
+            chart.add_sma(bars_df, int(col[len("sma_"):]))
+    if "vwap" in bars_df:
+        chart.add_vwap(bars_df)
+
     # Update layout for dark theme
     fig.update_layout(
         template='plotly_dark',
@@ -102,8 +198,9 @@ def build_live_trading_chart(
 
             fig.add_shape(
                 type="rect",
-                x0=bars_df["ts_local"].iloc[0],
-                x1=bars_df["ts_local"].iloc[-1],
+                xref="x domain",
+                x0=0,
+                x1=1,
                 y0=orb_high,
                 y1=long_zone_top,
                 fillcolor="rgba(16, 185, 129, 0.08)",  # Green
@@ -113,7 +210,8 @@ def build_live_trading_chart(
 
             # LONG label
             fig.add_annotation(
-                x=bars_df["ts_local"].iloc[-1],
+                xref="x domain",
+                x=1,
                 y=(orb_high + long_zone_top) / 2,
                 text="<b>🚀 LONG ZONE</b><br>Enter above ORB high",
                 showarrow=False,
@@ -130,8 +228,9 @@ def build_live_trading_chart(
 
             fig.add_shape(
                 type="rect",
-                x0=bars_df["ts_local"].iloc[0],
-                x1=bars_df["ts_local"].iloc[-1],
+                xref="x domain",
+                x0=0,
+                x1=1,
                 y0=short_zone_bottom,
                 y1=orb_low,
                 fillcolor="rgba(239, 68, 68, 0.08)",  # Red
@@ -141,7 +240,8 @@ def build_live_trading_chart(
 
             # SHORT label
             fig.add_annotation(
-                x=bars_df["ts_local"].iloc[-1],
+                xref="x domain",
+                x=1,
                 y=(orb_low + short_zone_bottom) / 2,
                 text="<b>🔻 SHORT ZONE</b><br>Enter below ORB low",
                 showarrow=False,
@@ -162,7 +262,9 @@ def build_live_trading_chart(
             line_width=3,
             annotation_text=f"Current: ${current_price:.2f}",
             annotation_position="left",
-            annotation_font=dict(size=14, color="#6366f1")
+            annotation_font=dict(size=14, color="#6366f1"),
+            name=CURRENT_PRICE,
+            annotation_name=CURRENT_PRICE
         )
 
     # Add trade markers if there's an active trade
@@ -203,11 +305,10 @@ def build_live_trading_chart(
                 annotation_font=dict(size=12, color="#10b981")
             )
 
-        # Add entry marker
-        last_time = bars_df["ts_local"].iloc[-1]
-
+        # Add entry marker (right edge of the plot)
         fig.add_annotation(
-            x=last_time,
+            xref="x domain",
+            x=1,
             y=entry_price,
             text="▶" if direction == "LONG" else "◀",
             showarrow=True,
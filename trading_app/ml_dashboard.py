@@ -3,10 +3,18 @@ ML Performance Monitoring Dashboard
 
 Streamlit page for monitoring ML model performance.
 
+Reads the pre-aggregated ML rollups (ml_monitoring/outcome_logger.py)
+through a read-only OutcomeLogger (short-lived read-only connections, so the
+dashboard never holds gold.db's write lock); only the prediction log tab
+touches ml_predictions (latest 100 rows). If the rollups were never built,
+the reader aggregates ml_predictions directly until
+`python ml_monitoring/outcome_logger.py --rebuild-rollups` is run.
+
 Usage:
     streamlit run trading_app/ml_dashboard.py
 """
 
+import os
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
@@ -34,12 +42,21 @@ if not ML_ENABLED:
     st.error("ML system is disabled. Enable ML_ENABLED in config.py to use this dashboard.")
     st.stop()
 
+
+@st.cache_resource
+def get_outcome_logger() -> OutcomeLogger:
+    """One shared read-only logger for all reruns and sessions (holds no connection)"""
+    gold_db_path = os.getenv("GOLD_DB_PATH", str(Path(__file__).parent.parent / "gold.db"))
+    return OutcomeLogger(gold_db_path, read_only=True)
+
+
 # Initialize logger
-logger = OutcomeLogger()
+logger = get_outcome_logger()
 
 # Sidebar controls
 st.sidebar.title("Controls")
 lookback_days = st.sidebar.slider("Lookback Period (days)", 1, 90, 30)
+rolling_days = st.sidebar.slider("Rolling Window (days)", 1, 30, 7)
 instrument = st.sidebar.selectbox("Instrument", ["MGC", "NQ", "MPL"], index=0)
 
 if st.sidebar.button("🔄 Refresh Data"):
@@ -107,23 +124,7 @@ with tabs[0]:
 
         # Get daily performance data for charts
         try:
-            import duckdb
-            conn = duckdb.connect("../gold.db")
-
-            daily_data = conn.execute("""
-                SELECT
-                    date_local,
-                    directional_accuracy,
-                    win_rate,
-                    avg_r_multiple,
-                    total_predictions
-                FROM ml_performance
-                WHERE date_local >= CURRENT_DATE - INTERVAL ? DAY
-                  AND instrument = ?
-                ORDER BY date_local ASC
-            """, [lookback_days, instrument]).fetchdf()
-
-            conn.close()
+            daily_data = logger.daily_performance(days=lookback_days, instrument=instrument, window=rolling_days)
 
             if not daily_data.empty:
                 # Accuracy over time
@@ -139,6 +140,14 @@ with tabs[0]:
                     marker=dict(size=8)
                 ))
 
+                fig_accuracy.add_trace(go.Scatter(
+                    x=daily_data['date_local'],
+                    y=daily_data['rolling_accuracy'] * 100,
+                    mode='lines',
+                    name=f'{rolling_days}d Rolling',
+                    line=dict(color='#6f42c1', width=2, dash='dot')
+                ))
+
                 # Add baseline
                 fig_accuracy.add_hline(
                     y=50,
@@ -174,6 +183,14 @@ with tabs[0]:
                         marker=dict(size=8)
                     ))
 
+                    fig_winrate.add_trace(go.Scatter(
+                        x=daily_data['date_local'],
+                        y=daily_data['rolling_win_rate'] * 100,
+                        mode='lines',
+                        name=f'{rolling_days}d Rolling',
+                        line=dict(color='#198754', width=2, dash='dot')
+                    ))
+
                     fig_winrate.add_hline(
                         y=50,
                         line_dash="dash",
@@ -229,30 +246,7 @@ with tabs[1]:
     st.header("Recent Predictions")
 
     try:
-        import duckdb
-        conn = duckdb.connect("../gold.db")
-
-        predictions = conn.execute("""
-            SELECT
-                timestamp_utc,
-                orb_time,
-                strategy_name,
-                predicted_direction,
-                confidence,
-                confidence_level,
-                actual_direction,
-                actual_r_multiple,
-                win,
-                orb_size,
-                rsi_14
-            FROM ml_predictions
-            WHERE instrument = ?
-              AND DATE(timestamp_utc) >= CURRENT_DATE - INTERVAL ? DAY
-            ORDER BY timestamp_utc DESC
-            LIMIT 100
-        """, [instrument, lookback_days]).fetchdf()
-
-        conn.close()
+        predictions = logger.recent_predictions(days=lookback_days, instrument=instrument, limit=100)
 
         if predictions.empty:
             st.info("No predictions logged yet. Predictions will appear here once the trading app makes its first ML prediction.")
@@ -318,44 +312,30 @@ with tabs[2]:
     st.header("Accuracy Analysis")
 
     try:
-        import duckdb
-        conn = duckdb.connect("../gold.db")
-
-        # Get completed predictions
-        predictions = conn.execute("""
-            SELECT
-                predicted_direction,
-                actual_direction,
-                confidence,
-                confidence_level,
-                orb_time,
-                win
-            FROM ml_predictions
-            WHERE instrument = ?
-              AND actual_direction IS NOT NULL
-              AND DATE(timestamp_utc) >= CURRENT_DATE - INTERVAL ? DAY
-        """, [instrument, lookback_days]).fetchdf()
-
-        conn.close()
+        # Pre-aggregated by confidence bucket / ORB time
+        accuracy_by_conf = logger.performance_by('conf_bucket', days=lookback_days, instrument=instrument)
+        accuracy_by_orb = logger.performance_by('orb_time', days=lookback_days, instrument=instrument)
 
-        if predictions.empty:
+        if accuracy_by_conf.empty:
             st.info("No completed predictions yet for accuracy analysis.")
         else:
+            accuracy_by_conf['confidence_bucket'] = accuracy_by_conf['conf_bucket'].map(
+                lambda b: f"{b * 10}-{b * 10 + 10}%"
+            )
+            accuracy_by_conf['accuracy'] *= 100
+            accuracy_by_orb['accuracy'] *= 100
+
             col1, col2 = st.columns(2)
 
             with col1:
-                # Accuracy by confidence level
-                st.subheader("Accuracy by Confidence Level")
-
-                accuracy_by_conf = predictions.groupby('confidence_level').apply(
-                    lambda x: 100 * (x['predicted_direction'] == x['actual_direction']).sum() / len(x)
-                ).reset_index(name='accuracy')
+                # Accuracy by confidence bucket
+                st.subheader("Accuracy by Confidence")
 
                 fig_conf = px.bar(
                     accuracy_by_conf,
-                    x='confidence_level',
+                    x='confidence_bucket',
                     y='accuracy',
-                    labels={'confidence_level': 'Confidence Level', 'accuracy': 'Accuracy (%)'},
+                    labels={'confidence_bucket': 'Confidence', 'accuracy': 'Accuracy (%)'},
                     color='accuracy',
                     color_continuous_scale='RdYlGn',
                     range_color=[0, 100]
@@ -370,10 +350,6 @@ with tabs[2]:
                 # Accuracy by ORB time
                 st.subheader("Accuracy by ORB Time")
 
-                accuracy_by_orb = predictions.groupby('orb_time').apply(
-                    lambda x: 100 * (x['predicted_direction'] == x['actual_direction']).sum() / len(x)
-                ).reset_index(name='accuracy')
-
                 fig_orb = px.bar(
                     accuracy_by_orb,
                     x='orb_time',
@@ -389,14 +365,40 @@ with tabs[2]:
 
                 st.plotly_chart(fig_orb, use_container_width=True)
 
+            # Calibration (reliability): stated confidence vs realized accuracy
+            st.subheader("Calibration")
+
+            fig_cal = go.Figure()
+            fig_cal.add_trace(go.Scatter(
+                x=accuracy_by_conf['avg_confidence'] * 100,
+                y=accuracy_by_conf['accuracy'],
+                mode='lines+markers',
+                name='Model',
+                text=accuracy_by_conf['outcomes'].astype(int).astype(str) + ' outcomes',
+                line=dict(color='#0066cc', width=2),
+                marker=dict(size=8)
+            ))
+            fig_cal.add_trace(go.Scatter(
+                x=[0, 100], y=[0, 100],
+                mode='lines',
+                name='Perfect calibration',
+                line=dict(color='gray', dash='dash')
+            ))
+            fig_cal.update_layout(
+                xaxis_title="Mean Confidence (%)",
+                yaxis_title="Accuracy (%)",
+                xaxis_range=[0, 100],
+                yaxis_range=[0, 100],
+                height=300,
+                margin=dict(l=0, r=0, t=0, b=0)
+            )
+
+            st.plotly_chart(fig_cal, use_container_width=True)
+
             # Confusion matrix
             st.subheader("Confusion Matrix")
 
-            confusion = pd.crosstab(
-                predictions['predicted_direction'],
-                predictions['actual_direction'],
-                margins=True
-            )
+            confusion = logger.confusion_matrix(days=lookback_days, instrument=instrument)
 
             st.dataframe(confusion, use_container_width=True)
 
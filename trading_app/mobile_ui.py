@@ -7,10 +7,11 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Optional
-import duckdb
 from pathlib import Path
 from config import TZ_LOCAL
-from live_chart_builder import build_live_trading_chart, calculate_trade_levels
+import db_metrics
+from enhanced_charting import DEFAULT_CHART_INDICATORS, ChartTimeframe, chart_bars
+from live_chart_builder import LiveChartCache, build_live_trading_chart, calculate_trade_levels
 
 
 # ============================================================================
@@ -559,7 +560,7 @@ def get_setup_config(instrument: str, orb_time: str, db_path: str = None):
             if not db_path.exists():
                 return None
 
-        conn = duckdb.connect(str(db_path), read_only=True)
+        conn = db_metrics.connect(str(db_path), read_only=True)
 
         # Query for HALF setup first (preferred), then FULL as fallback
         query = """
@@ -1149,11 +1150,14 @@ def render_chart_card(data_loader, strategy_engine, latest_evaluation):
     with st.expander("📊 Show Chart", expanded=False):
         try:
             # Get recent bars
-            bars_df = data_loader.fetch_latest_bars(lookback_minutes=120)
+            bars_df = data_loader.get_recent_bars(lookback_minutes=120)
 
             if bars_df.empty:
                 st.warning("No bar data available")
             else:
+                engines = st.session_state.setdefault("chart_engines", {})
+                chart_df = chart_bars(engines, bars_df, ChartTimeframe.M1, DEFAULT_CHART_INDICATORS)
+
                 # Get ORB data
                 state = latest_evaluation.state if latest_evaluation else None
                 orb_high = state.current_orb_high if hasattr(state, 'current_orb_high') else None
@@ -1212,22 +1216,32 @@ def render_chart_card(data_loader, strategy_engine, latest_evaluation):
                     filter_result = data_loader.check_orb_size_filter(orb_high, orb_low, orb_name)
                     filter_passed = filter_result.get('pass', True)
 
-                # Build enhanced chart with trade levels
-                fig = build_live_trading_chart(
-                    bars_df=bars_df,
-                    orb_high=orb_high,
-                    orb_low=orb_low,
-                    orb_name=orb_name,
-                    orb_start=orb_start,
-                    orb_end=orb_end,
+                # Build enhanced chart with trade levels (figure reused between reruns)
+                if "mobile_chart_cache" not in st.session_state:
+                    st.session_state.mobile_chart_cache = LiveChartCache(max_candles=150)
+                chart_cache = st.session_state.mobile_chart_cache
+                overlay_key = (orb_high, orb_low, orb_name, orb_start, orb_end, filter_passed, tier,
+                               entry_price, stop_price, target_price, direction)
+                fig = chart_cache.render(
+                    chart_df,
+                    overlay_key,
+                    lambda bars: build_live_trading_chart(
+                        bars_df=bars,
+                        orb_high=orb_high,
+                        orb_low=orb_low,
+                        orb_name=orb_name,
+                        orb_start=orb_start,
+                        orb_end=orb_end,
+                        current_price=current_price,
+                        filter_passed=filter_passed,
+                        tier=tier,
+                        entry_price=entry_price,
+                        stop_price=stop_price,
+                        target_price=target_price,
+                        direction=direction,
+                        height=350  # Mobile height
+                    ),
                     current_price=current_price,
-                    filter_passed=filter_passed,
-                    tier=tier,
-                    entry_price=entry_price,
-                    stop_price=stop_price,
-                    target_price=target_price,
-                    direction=direction,
-                    height=350  # Mobile height
                 )
 
                 st.plotly_chart(fig, width='stretch')
@@ -1,16 +1,21 @@
 """
 POSITION TRACKING PANEL
 Live monitoring of active positions with P&L, timers, and quick actions.
+
+With a RiskStateStore, raised and acknowledged alerts are logged on the
+'positions' stream so reminders are not re-fired after a restart.
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 import logging
 
 logger = logging.getLogger(__name__)
 
+POSITIONS_STREAM = "positions"
+
 
 @dataclass
 class PositionAlert:
@@ -21,6 +26,14 @@ class PositionAlert:
     triggered_at: datetime
     acknowledged: bool = False
 
+    @staticmethod
+    def from_dict(data: dict) -> 'PositionAlert':
+        """Create from an event log dictionary"""
+        data = dict(data)
+        if isinstance(data["triggered_at"], str):
+            data["triggered_at"] = datetime.fromisoformat(data["triggered_at"])
+        return PositionAlert(**data)
+
 
 class PositionTracker:
     """
@@ -29,8 +42,9 @@ class PositionTracker:
     Provides live P&L, timers, distance to stop/target, and alerts.
     """
 
-    def __init__(self, timezone: ZoneInfo = ZoneInfo("Australia/Brisbane")):
+    def __init__(self, timezone: ZoneInfo = ZoneInfo("Australia/Brisbane"), store=None):
         self.tz = timezone
+        self.store = store  # Optional RiskStateStore (event log + snapshots)
         self.position_alerts: List[PositionAlert] = []
 
         # Alert thresholds
@@ -39,6 +53,37 @@ class PositionTracker:
         self.TARGET_WARNING_POINTS = 5.0  # Alert when within 5 points of target
         self.MAX_TIME_MINUTES = 90  # Max time for CASCADE/NIGHT_ORB strategies
 
+        if self.store is not None:
+            state, events = self.store.load(POSITIONS_STREAM)
+            if state:
+                self.position_alerts = [PositionAlert.from_dict(d) for d in state["alerts"]]
+            for _, event, payload in events:
+                self._apply(event, payload)
+
+    def _record(self, event: str, payload: Dict[str, Any]):
+        """Append event (write-ahead), apply it, snapshot when due"""
+        seq = self.store.append(POSITIONS_STREAM, event, payload) if self.store is not None else None
+        self._apply(event, payload)
+        if seq is not None and self.store.snapshot_due(POSITIONS_STREAM):
+            self.store.snapshot(POSITIONS_STREAM, {"alerts": [asdict(a) for a in self.position_alerts]}, seq)
+
+    def _apply(self, event: str, payload: Dict[str, Any]):
+        """Apply one event to in-memory state (also used for replay)"""
+        if event == "ALERT":
+            self.position_alerts.append(PositionAlert.from_dict(payload["alert"]))
+        elif event == "ALERT_ACK":
+            for alert in self.position_alerts:
+                if alert.position_id == payload["position_id"] and alert.alert_type == payload["alert_type"]:
+                    alert.acknowledged = True
+        elif event == "ALERTS_CLEARED":
+            cutoff = datetime.fromisoformat(payload["cutoff"])
+            self.position_alerts = [a for a in self.position_alerts if a.triggered_at > cutoff]
+
+    def _raise(self, alert: PositionAlert) -> PositionAlert:
+        """Record a new alert; returns the tracked instance"""
+        self._record("ALERT", {"alert": asdict(alert)})
+        return self.position_alerts[-1]
+
     def check_position_alerts(self, position: dict, current_price: float,
                               strategy: str = "UNKNOWN") -> List[PositionAlert]:
         """
@@ -83,8 +128,7 @@ class PositionTracker:
                     message=f"[ACTION REQUIRED] Position at +{pnl_r:.1f}R - MOVE STOP TO BREAKEVEN",
                     triggered_at=datetime.now(self.tz)
                 )
-                alerts.append(alert)
-                self.position_alerts.append(alert)
+                alerts.append(self._raise(alert))
 
         # 2. Stop approaching warning
         if direction == "LONG":
@@ -105,8 +149,7 @@ class PositionTracker:
                     message=f"[WARNING] Stop approaching ({distance_to_stop:.1f}pts away)",
                     triggered_at=datetime.now(self.tz)
                 )
-                alerts.append(alert)
-                self.position_alerts.append(alert)
+                alerts.append(self._raise(alert))
 
         # 3. Target approaching
         if 'target_price' in position and position['target_price']:
@@ -130,8 +173,7 @@ class PositionTracker:
                         message=f"[INFO] Target approaching ({distance_to_target:.1f}pts away)",
                         triggered_at=datetime.now(self.tz)
                     )
-                    alerts.append(alert)
-                    self.position_alerts.append(alert)
+                    alerts.append(self._raise(alert))
 
         # 4. Time limit warning (for strategies with time limits)
         if strategy in ["CASCADE", "NIGHT_ORB"]:
@@ -152,8 +194,7 @@ class PositionTracker:
                             message=f"[WARNING] {strategy} time limit approaching ({time_in_trade:.0f}/{self.MAX_TIME_MINUTES}min)",
                             triggered_at=datetime.now(self.tz)
                         )
-                        alerts.append(alert)
-                        self.position_alerts.append(alert)
+                        alerts.append(self._raise(alert))
 
         return alerts
 
@@ -166,14 +207,13 @@ class PositionTracker:
 
     def acknowledge_alert(self, position_id: str, alert_type: str):
         """Acknowledge an alert"""
-        for alert in self.position_alerts:
-            if alert.position_id == position_id and alert.alert_type == alert_type:
-                alert.acknowledged = True
+        self._record("ALERT_ACK", {"position_id": position_id, "alert_type": alert_type})
 
     def clear_old_alerts(self, hours: int = 24):
         """Clear alerts older than N hours"""
         cutoff = datetime.now(self.tz) - timedelta(hours=hours)
-        self.position_alerts = [a for a in self.position_alerts if a.triggered_at > cutoff]
+        if any(a.triggered_at <= cutoff for a in self.position_alerts):
+            self._record("ALERTS_CLEARED", {"cutoff": cutoff})
 
 
 # ============================================================================
@@ -1,17 +1,35 @@
 """
 RISK MANAGEMENT SAFEGUARDS
 Prevents account blowup from overtrading, revenge trading, or excessive losses.
+
+With a RiskStateStore, every state change (position opened / marked /
+closed, emergency stop) is appended to the app-state DB before it is
+applied, and a new RiskManager recovers from the latest snapshot plus the
+events after it, so daily/weekly loss limits survive reloads and restarts.
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from enum import Enum
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Dollars per point per contract
+TICK_VALUES = {"MGC": 10.0, "NQ": 2.0, "MPL": 50.0}
+
+RISK_STREAM = "risk"
+SNAPSHOT_HISTORY_DAYS = 8  # Realized P&L kept in snapshots (covers the current week)
+
+
+def tick_value(instrument: str) -> float:
+    """Dollars per point per contract (1.0 for unknown instruments)"""
+    return TICK_VALUES.get(instrument, 1.0)
+
 
 class RiskStatus:
     """Risk status constants"""
@@ -47,6 +65,21 @@ class Position:
     risk_r: float
     current_pnl_dollars: float = 0.0
     current_pnl_r: float = 0.0
+    exit_price: Optional[float] = None
+    exit_time: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for the event log"""
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: dict) -> 'Position':
+        """Create from an event log dictionary"""
+        data = dict(data)
+        for key in ("entry_time", "exit_time"):
+            if isinstance(data.get(key), str):
+                data[key] = datetime.fromisoformat(data[key])
+        return Position(**data)
 
     def update_pnl(self, current_price: float, tick_value: float):
         """Update P&L based on current price"""
@@ -98,10 +131,12 @@ class RiskManager:
 
     def __init__(self, account_size: float,
                  limits: RiskLimits,
-                 timezone: ZoneInfo = ZoneInfo("Australia/Brisbane")):
+                 timezone: ZoneInfo = ZoneInfo("Australia/Brisbane"),
+                 store=None):
         self.account_size = account_size
         self.limits = limits
         self.tz = timezone
+        self.store = store  # Optional RiskStateStore (event log + snapshots)
 
         # Track positions
         self.active_positions: Dict[str, Position] = {}
@@ -114,6 +149,78 @@ class RiskManager:
         # Emergency stop flag
         self.emergency_stop = False
 
+        # Bar of the last logged mark (marks are logged once per bar)
+        self.last_mark_ts: Optional[str] = None
+
+        if self.store is not None:
+            self._recover()
+
+    # ------------------------------------------------------------------
+    # Event log
+    # ------------------------------------------------------------------
+
+    def _record(self, event: str, payload: Dict[str, Any]):
+        """Append event (write-ahead), apply it, snapshot when due"""
+        seq = self.store.append(RISK_STREAM, event, payload) if self.store is not None else None
+        self._apply(event, payload)
+        if seq is not None and self.store.snapshot_due(RISK_STREAM):
+            self.store.snapshot(RISK_STREAM, self._snapshot_state(), seq)
+
+    def _apply(self, event: str, payload: Dict[str, Any]):
+        """Apply one event to in-memory state (also used for replay)"""
+        if event == "OPENED":
+            position = Position.from_dict(payload["position"])
+            self.active_positions[position.position_id] = position
+        elif event == "CLOSED":
+            position = self.active_positions.pop(payload["position_id"], None)
+            if position is None:
+                return
+            exit_time = datetime.fromisoformat(payload["exit_time"]) \
+                if isinstance(payload["exit_time"], str) else payload["exit_time"]
+            position.update_pnl(payload["exit_price"], tick_value(position.instrument))
+            position.exit_price, position.exit_time = payload["exit_price"], exit_time
+            self._update_pnl_tracking(position, exit_time)
+            self.closed_positions.append(position)
+        elif event == "MARKED":
+            self._mark(payload["prices"])
+            self.last_mark_ts = payload.get("bar_ts")
+        elif event == "EMERGENCY":
+            self.emergency_stop = payload["active"]
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        """Compact state: open positions, recent realized P&L, flags"""
+        cutoff = (datetime.now(self.tz) - timedelta(days=SNAPSHOT_HISTORY_DAYS)).date()
+        return {
+            "active_positions": [p.to_dict() for p in self.active_positions.values()],
+            "closed_positions": [p.to_dict() for p in self.closed_positions
+                                 if p.exit_time is None or p.exit_time.date() >= cutoff],
+            "daily_pnl": {k.isoformat(): v for k, v in self.daily_pnl.items() if k >= cutoff},
+            "weekly_pnl": {k.isoformat(): v for k, v in self.weekly_pnl.items()
+                           if k >= cutoff - timedelta(days=7)},
+            "emergency_stop": self.emergency_stop,
+            "last_mark_ts": self.last_mark_ts,
+        }
+
+    def _recover(self):
+        """Load the latest snapshot and replay the events after it"""
+        state, events = self.store.load(RISK_STREAM)
+        if state:
+            self.active_positions = {d["position_id"]: Position.from_dict(d) for d in state["active_positions"]}
+            self.closed_positions = [Position.from_dict(d) for d in state["closed_positions"]]
+            self.daily_pnl = {date.fromisoformat(k): v for k, v in state["daily_pnl"].items()}
+            self.weekly_pnl = {date.fromisoformat(k): v for k, v in state["weekly_pnl"].items()}
+            self.emergency_stop = state["emergency_stop"]
+            self.last_mark_ts = state["last_mark_ts"]
+        for _, event, payload in events:
+            self._apply(event, payload)
+        if state or events:
+            logger.info(f"Risk state recovered: {len(self.active_positions)} open, "
+                        f"{len(events)} events replayed")
+
+    # ------------------------------------------------------------------
+    # Positions
+    # ------------------------------------------------------------------
+
     def add_position(self, position: Position) -> Tuple[bool, str]:
         """
         Add new position (enter trade).
@@ -145,7 +252,7 @@ class RiskManager:
             return False, f"Max correlated positions reached for {position.instrument}"
 
         # Add position
-        self.active_positions[position.position_id] = position
+        self._record("OPENED", {"position": position.to_dict()})
         logger.info(f"Position added: {position.instrument} {position.direction} @ {position.entry_price}")
 
         return True, "Position added"
@@ -166,26 +273,8 @@ class RiskManager:
         if position_id not in self.active_positions:
             return False, "Position not found"
 
-        position = self.active_positions[position_id]
-
-        # Calculate final P&L
-        if position.instrument == "MGC":
-            tick_value = 10.0
-        elif position.instrument == "NQ":
-            tick_value = 2.0
-        elif position.instrument == "MPL":
-            tick_value = 50.0
-        else:
-            tick_value = 1.0
-
-        position.update_pnl(exit_price, tick_value)
-
-        # Update daily/weekly P&L
-        self._update_pnl_tracking(position, exit_time)
-
-        # Move to closed positions
-        self.closed_positions.append(position)
-        del self.active_positions[position_id]
+        self._record("CLOSED", {"position_id": position_id, "exit_price": exit_price, "exit_time": exit_time})
+        position = self.closed_positions[-1]
 
         logger.info(f"Position closed: {position.instrument} P&L=${position.current_pnl_dollars:.2f} ({position.current_pnl_r:.2f}R)")
 
@@ -197,18 +286,37 @@ class RiskManager:
             return
 
         position = self.active_positions[position_id]
+        position.update_pnl(current_price, tick_value(position.instrument))
+
+    def mark_to_market(self, prices: Dict[str, float], bar_ts: Optional[datetime] = None):
+        """
+        Mark every open position to the latest price of its instrument.
 
-        # Determine tick value
-        if position.instrument == "MGC":
-            tick_value = 10.0
-        elif position.instrument == "NQ":
-            tick_value = 2.0
-        elif position.instrument == "MPL":
-            tick_value = 50.0
+        With bar_ts, the mark is logged once per new bar (so open P&L counts
+        toward loss limits after a restart); repeated refreshes of the same
+        bar only update memory.
+        """
+        bar_key = bar_ts.isoformat() if isinstance(bar_ts, (datetime, date)) else bar_ts
+        if self.store is not None and bar_key is not None and bar_key != self.last_mark_ts and self.active_positions:
+            self._record("MARKED", {"prices": prices, "bar_ts": bar_key})
         else:
-            tick_value = 1.0
+            self._mark(prices)
+
+    def _mark(self, prices: Dict[str, float]):
+        """Vectorized P&L update for all open positions with a price"""
+        positions = [p for p in self.active_positions.values() if p.instrument in prices]
+        if not positions:
+            return
+        price = np.array([prices[p.instrument] for p in positions], dtype=float)
+        entry = np.array([p.entry_price for p in positions], dtype=float)
+        sign = np.array([-1.0 if p.direction == "SHORT" else 1.0 for p in positions])
+        scale = np.array([p.size * tick_value(p.instrument) for p in positions], dtype=float)
+        risk = np.array([p.risk_dollars for p in positions], dtype=float)
 
-        position.update_pnl(current_price, tick_value)
+        pnl = (price - entry) * sign * scale
+        pnl_r = np.divide(pnl, risk, out=np.zeros_like(pnl), where=risk > 0)
+        for position, dollars, r in zip(positions, pnl.tolist(), pnl_r.tolist()):
+            position.current_pnl_dollars, position.current_pnl_r = dollars, r
 
     def _update_pnl_tracking(self, position: Position, exit_time: datetime):
         """Update daily and weekly P&L tracking"""
@@ -372,12 +480,12 @@ class RiskManager:
 
     def emergency_stop_all(self):
         """Activate emergency stop - no more trading"""
-        self.emergency_stop = True
+        self._record("EMERGENCY", {"active": True})
         logger.critical("EMERGENCY STOP ACTIVATED")
 
     def reset_emergency_stop(self):
         """Reset emergency stop"""
-        self.emergency_stop = False
+        self._record("EMERGENCY", {"active": False})
         logger.info("Emergency stop reset")
 
     def get_active_positions(self) -> List[Dict]:
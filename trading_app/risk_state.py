@@ -0,0 +1,136 @@
+"""
+Risk State Store - append-only event log with compact snapshots
+================================================================
+
+RiskManager and PositionTracker state (open positions, realized daily and
+weekly P&L, emergency stop, position alerts) used to live only in Streamlit
+session state, so a reload or restart reset the day's loss limits. Both
+now record every state change as an event in the app-state DB:
+
+    risk_events     (stream, seq, ts, event, payload JSON)   append-only
+    risk_snapshots  (stream, seq, ts, state JSON)            latest wins
+
+Every SNAPSHOT_EVERY events the owner writes a compact snapshot of its
+state; recovery loads the newest snapshot and replays only the events after
+it, O(snapshot + tail). compact() drops events already covered by a
+snapshot once they are older than keep_days.
+
+One long-lived connection per store; writes are serialized with a lock
+(Streamlit sessions share the process).
+"""
+
+import json
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from config import DB_PATH
+import db_metrics
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_EVERY = 200  # Events between snapshots
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, default=_default, sort_keys=True)
+
+
+class RiskStateStore:
+    """Event log and snapshots for named state streams ('risk', 'positions')"""
+
+    def __init__(self, db_path: str = DB_PATH, snapshot_every: int = SNAPSHOT_EVERY):
+        self.db_path = db_path
+        self.snapshot_every = snapshot_every
+        self.con = db_metrics.connect(db_path)
+        self._lock = threading.Lock()
+        self._since_snapshot: Dict[str, int] = {}
+        self._setup_tables()
+
+    def _setup_tables(self):
+        self.con.execute("CREATE SEQUENCE IF NOT EXISTS risk_event_seq")
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS risk_events (
+                seq BIGINT PRIMARY KEY DEFAULT nextval('risk_event_seq'),
+                stream VARCHAR NOT NULL,
+                ts TIMESTAMPTZ NOT NULL,
+                event VARCHAR NOT NULL,
+                payload JSON
+            )
+        """)
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS risk_snapshots (
+                stream VARCHAR NOT NULL,
+                seq BIGINT NOT NULL,
+                ts TIMESTAMPTZ NOT NULL,
+                state JSON NOT NULL,
+                PRIMARY KEY (stream, seq)
+            )
+        """)
+
+    def append(self, stream: str, event: str, payload: Dict[str, Any], ts: Optional[datetime] = None) -> int:
+        """Append one event; returns its sequence number"""
+        with self._lock:
+            seq = self.con.execute(
+                "INSERT INTO risk_events (stream, ts, event, payload) VALUES (?, ?, ?, ?) RETURNING seq",
+                [stream, ts or datetime.now().astimezone(), event, dumps(payload)]
+            ).fetchone()[0]
+            self._since_snapshot[stream] = self._since_snapshot.get(stream, 0) + 1
+        return seq
+
+    def snapshot_due(self, stream: str) -> bool:
+        return self._since_snapshot.get(stream, 0) >= self.snapshot_every
+
+    def snapshot(self, stream: str, state: Dict[str, Any], seq: int):
+        """Store state as of event seq (inclusive)"""
+        with self._lock:
+            self.con.execute(
+                "INSERT OR REPLACE INTO risk_snapshots VALUES (?, ?, ?, ?)",
+                [stream, seq, datetime.now().astimezone(), dumps(state)]
+            )
+            self._since_snapshot[stream] = 0
+        logger.info(f"Risk state snapshot: {stream} @ {seq}")
+
+    def load(self, stream: str) -> Tuple[Optional[Dict[str, Any]], List[Tuple[int, str, Dict[str, Any]]]]:
+        """(latest snapshot state or None, [(seq, event, payload)] after it)"""
+        with self._lock:
+            row = self.con.execute(
+                "SELECT seq, state FROM risk_snapshots WHERE stream = ? ORDER BY seq DESC LIMIT 1", [stream]
+            ).fetchone()
+            since = row[0] if row else -1
+            events = self.con.execute(
+                "SELECT seq, event, payload FROM risk_events WHERE stream = ? AND seq > ? ORDER BY seq",
+                [stream, since]
+            ).fetchall()
+            self._since_snapshot[stream] = len(events)
+        state = json.loads(row[1]) if row else None
+        return state, [(seq, event, json.loads(payload) if payload else {}) for seq, event, payload in events]
+
+    def compact(self, stream: str, keep_days: int = 30) -> int:
+        """Delete events covered by the latest snapshot and older than keep_days; returns rows removed"""
+        with self._lock:
+            row = self.con.execute(
+                "SELECT max(seq) FROM risk_snapshots WHERE stream = ?", [stream]
+            ).fetchone()
+            if row[0] is None:
+                return 0
+            removed = self.con.execute(f"""
+                DELETE FROM risk_events
+                WHERE stream = ? AND seq <= ? AND ts < now() - INTERVAL {int(keep_days)} DAY
+            """, [stream, row[0]]).fetchone()[0]
+            self.con.execute(
+                "DELETE FROM risk_snapshots WHERE stream = ? AND seq < ?", [stream, row[0]]
+            )
+        return removed
+
+    def close(self):
+        self.con.close()
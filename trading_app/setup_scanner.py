@@ -12,6 +12,7 @@ from zoneinfo import ZoneInfo
 from setup_detector import SetupDetector
 from config import MGC_ORB_CONFIGS, NQ_ORB_CONFIGS, MPL_ORB_CONFIGS
 from config import MGC_ORB_SIZE_FILTERS, NQ_ORB_SIZE_FILTERS, MPL_ORB_SIZE_FILTERS
+from latency_tracing import traced
 
 
 class SetupStatus:
@@ -167,6 +168,7 @@ class SetupScanner:
 
         return SetupStatus.READY  # Assume ready if no filter info
 
+    @traced("scan_setups")
     def scan_all_setups(
         self,
         current_prices: Dict[str, float],
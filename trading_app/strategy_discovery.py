@@ -10,6 +10,10 @@ from typing import List, Optional, Dict
 import logging
 from pathlib import Path
 import os
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from orb_facts import facts_source
 
 logger = logging.getLogger(__name__)
 
@@ -108,25 +112,6 @@ class StrategyDiscovery:
         if not table:
             raise ValueError(f"Unknown instrument: {config.instrument}")
 
-        # Get historical data for this ORB
-        orb_prefix = f"orb_{config.orb_time}"
-
-        query = f"""
-        SELECT
-            date_local,
-            {orb_prefix}_high as orb_high,
-            {orb_prefix}_low as orb_low,
-            {orb_prefix}_size as orb_size,
-            {orb_prefix}_break_dir as break_dir,
-            atr_20 as atr
-        FROM {table}
-        WHERE {orb_prefix}_high IS NOT NULL
-          AND {orb_prefix}_low IS NOT NULL
-          AND {orb_prefix}_break_dir IS NOT NULL
-          AND {orb_prefix}_break_dir != 'NONE'
-        ORDER BY date_local
-        """
-
         con = self._get_connection()
         if con is None:
             return BacktestResult(
@@ -141,7 +126,28 @@ class StrategyDiscovery:
                 total_r=0.0
             )
 
-        df = con.execute(query).df()
+        # Get historical data for this ORB (long-format orb_facts + day-level ATR;
+        # the wide table is unpivoted when orb_facts has not been built)
+        query = f"""
+        SELECT
+            f.date_local,
+            f.orb_high,
+            f.orb_low,
+            f.orb_size,
+            f.break_dir,
+            d.atr_20 as atr
+        FROM {facts_source(con, config.instrument)} f
+        JOIN {table} d ON d.date_local = f.date_local
+        WHERE f.instrument = ?
+          AND f.orb_time = ?
+          AND f.orb_high IS NOT NULL
+          AND f.orb_low IS NOT NULL
+          AND f.break_dir IS NOT NULL
+          AND f.break_dir != 'NONE'
+        ORDER BY f.date_local
+        """
+
+        df = con.execute(query, [config.instrument, config.orb_time]).df()
 
         if df.empty:
             return BacktestResult(
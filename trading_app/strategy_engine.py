@@ -11,6 +11,7 @@ import logging
 
 from config import *
 from data_loader import LiveDataLoader
+from latency_tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +70,7 @@ class StrategyEngine:
         self.loader = data_loader
         self.current_position = None  # Track if in a trade
         self.ml_engine = ml_engine  # Optional ML inference engine
+        self.feature_store = None  # Point-in-time ML features (created on first use)
 
         # Load instrument-specific configs
         self.instrument = data_loader.symbol
@@ -102,6 +104,7 @@ class StrategyEngine:
     # MAIN EVALUATION LOOP
     # ========================================================================
 
+    @traced("evaluate_all")
     def evaluate_all(self) -> StrategyEvaluation:
         """
         Evaluate all strategies in priority order.
@@ -923,6 +926,7 @@ class StrategyEngine:
     # ML INTEGRATION
     # ========================================================================
 
+    @traced("ml_insights")
     def _enhance_with_ml_insights(self, evaluation: StrategyEvaluation) -> StrategyEvaluation:
         """
         Enhance strategy evaluation with ML predictions.
@@ -1032,9 +1036,40 @@ class StrategyEngine:
             logger.error(f"Failed to get setup info for {orb_name}: {e}")
             return None
 
+    def _get_feature_store(self):
+        """Feature store for this instrument, with prior-day context from gold.db if available."""
+        if self.feature_store is None:
+            import os
+            from pathlib import Path
+            import db_metrics
+            from ml_training.feature_store import FeatureStore
+
+            if self.instrument in ["NQ", "MNQ"]:
+                instrument = "NQ"
+            elif self.instrument in ["MPL", "PL"]:
+                instrument = "MPL"
+            else:
+                instrument = "MGC"
+            self.feature_store = FeatureStore(instrument)
+
+            try:
+                gold_db_path = os.getenv("GOLD_DB_PATH", str(Path(__file__).parent.parent / "gold.db"))
+                gold_con = db_metrics.connect(gold_db_path, read_only=True)
+                try:
+                    self.feature_store.load_history(gold_con)
+                finally:
+                    gold_con.close()
+            except Exception as e:
+                # Cloud mode: no gold.db - ATR / prior-day R stay unknown (NaN)
+                logger.warning(f"Feature store history unavailable: {e}")
+        return self.feature_store
+
     def _get_ml_features(self) -> Dict:
         """
-        Extract features from data loader for ML inference.
+        Current point-in-time feature vector for ML inference.
+
+        Same feature definitions as training (ml_training/feature_store.py);
+        the store is fed only the bars it has not seen yet.
 
         Returns:
             Dictionary of features ready for ML model
@@ -1043,16 +1078,6 @@ class StrategyEngine:
 
         now_local = datetime.now(TZ_LOCAL)
 
-        # Get session levels
-        asia_hl = self._get_today_asia_levels()
-        london_hl = self._get_today_london_levels()
-
-        # Get ORB data if available
-        orb_data = {}
-        # Note: LiveDataLoader doesn't have get_orb() method
-        # ORB data comes from state variables instead
-        # Skip this section for now - ML will use available features
-
         # Determine current ORB context
         current_hour = now_local.hour
         current_orb_time = None
@@ -1069,35 +1094,12 @@ class StrategyEngine:
         else:
             current_orb_time = "0030"
 
-        # Build feature dictionary
-        features = {
-            'date_local': now_local.strftime('%Y-%m-%d'),
-            'instrument': self.instrument,
-            'orb_time': current_orb_time,
-            'session_context': 'ASIA' if 9 <= current_hour < 18 else 'LONDON' if 18 <= current_hour < 23 else 'NY',
-        }
-
-        # Add session data
-        if asia_hl:
-            features['asia_high'] = asia_hl['high']
-            features['asia_low'] = asia_hl['low']
-            features['asia_range'] = asia_hl['high'] - asia_hl['low']
-
-        if london_hl:
-            features['london_high'] = london_hl['high']
-            features['london_low'] = london_hl['low']
-            features['london_range'] = london_hl['high'] - london_hl['low']
-
-        # Add current ORB if available
-        if current_orb_time and current_orb_time in orb_data:
-            orb = orb_data[current_orb_time]
-            features['orb_high'] = orb['high']
-            features['orb_low'] = orb['low']
-            features['orb_size'] = orb['high'] - orb['low']
-
-        # Add ATR and RSI if available (would come from data_loader in full implementation)
-        features['atr_14'] = 5.0  # Placeholder - should come from data_loader
-        features['rsi_14'] = 50.0  # Placeholder - should come from data_loader
+        store = self._get_feature_store()
+        store.update(self.loader.bars_df)
+        features = store.vector(current_orb_time)
+        if features is None:
+            # No bars yet
+            features = {'instrument': self.instrument, 'orb_time': current_orb_time}
 
         return features
 
@@ -3,13 +3,13 @@ UTILITY FUNCTIONS
 Helper functions for position sizing, formatting, logging, etc.
 """
 
-import duckdb
 import pandas as pd
 from datetime import datetime
 from typing import Optional
 import logging
 
 from config import DB_PATH, JOURNAL_TABLE, TZ_LOCAL
+import db_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -63,7 +63,7 @@ def log_to_journal(evaluation):
         evaluation: StrategyEvaluation object
     """
     try:
-        con = duckdb.connect(DB_PATH)
+        con = db_metrics.connect(DB_PATH)
 
         # Create journal table if not exists
         con.execute(f"""
@@ -116,7 +116,7 @@ def get_recent_journal_entries(limit: int = 50):
     """
     try:
         # Don't use read_only to avoid connection conflicts
-        con = duckdb.connect(DB_PATH)
+        con = db_metrics.connect(DB_PATH)
 
         # Check if table exists first
         table_exists = con.execute(f"""